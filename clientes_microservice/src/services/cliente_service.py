@@ -122,6 +122,7 @@ def list_clientes(filtros=None):  # -> dict[str, list]:
 
     Filtros soportados (pasar en el dict `filtros`):
       - ids: filtrar clientes asociados a un vendedor (usa tabla vendedor_clientes)
+      - zona: solo los clientes de esa zona
 
     Retorna:
         dict: {
@@ -139,6 +140,10 @@ def list_clientes(filtros=None):  # -> dict[str, list]:
             if cliente_ids:
                 query = query.filter(Cliente.id.in_(cliente_ids))
 
+        zona = filtros.get('zona') if filtros else None
+        if zona:
+            query = query.filter(Cliente.zona == zona)
+
         if filtros.get('correo_empresa'):
             correo = filtros['correo_empresa'].strip().lower()
             print(f"Filtrando por correo_empresa: {correo}")
@@ -1,6 +1,6 @@
 import pytest
-from src.services.cliente_service import register_cliente, ClienteServiceError
-from src.models.cliente import Cliente
+from src.services.cliente_service import register_cliente, list_clientes, ClienteServiceError
+from src.models.cliente import Cliente, db
 
 @pytest.fixture
 def valid_data():
@@ -202,3 +202,21 @@ def test_error_al_guardar_cliente(app, mocker, valid_data):
             register_cliente(valid_data)
         assert exc.value.status_code == 500
         assert 'ERROR_CREAR_CLIENTE' in str(exc.value.message)
+
+
+def test_list_clientes_filtra_por_zona(app, valid_data):
+    with app.app_context():
+        norte = Cliente(**{**valid_data, 'zona': 'Norte', 'nit': 'N00000001', 'correo_contacto': 'n@empresa.com'})
+        sur = Cliente(**{**valid_data, 'zona': 'Sur', 'nit': 'S00000001', 'correo_contacto': 's@empresa.com'})
+        db.session.add_all([norte, sur])
+        db.session.commit()
+        try:
+            result = list_clientes({'zona': 'Norte'})
+            assert [c['id'] for c in result['data']] == [norte.id]
+
+            result = list_clientes({'zona': 'Norte', 'ids': f"{norte.id},{sur.id}"})
+            assert [c['id'] for c in result['data']] == [norte.id]
+        finally:
+            db.session.delete(norte)
+            db.session.delete(sur)
+            db.session.commit()
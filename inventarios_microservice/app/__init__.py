@@ -19,6 +19,15 @@ def create_app():
     
     # Configuración de Redis Service
     app.config['REDIS_SERVICE_URL'] = os.getenv('REDIS_SERVICE_URL', 'http://localhost:5011')
+
+    # Cache HTTP de lecturas (ETag + Cache-Control). Por defecto 0: el cliente
+    # siempre revalida con If-None-Match porque el stock cambia con frecuencia.
+    app.config['HTTP_CACHE_MAX_AGE'] = int(os.getenv('HTTP_CACHE_MAX_AGE', 0))
+
+    # Vigencia por defecto de las reservas de stock (POST /api/inventarios/reservar)
+    app.config['RESERVA_TTL_SEGUNDOS'] = int(os.getenv('RESERVA_TTL_SEGUNDOS', 900))
+    # Vigencia máxima que puede pedir un cliente
+    app.config['RESERVA_TTL_MAX_SEGUNDOS'] = int(os.getenv('RESERVA_TTL_MAX_SEGUNDOS', 86400))
     
     # CORS
     CORS(app)
@@ -3,5 +3,6 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 from .inventario import Inventario
+from .reserva import Reserva, ReservaItem
 
-__all__ = ['db', 'Inventario']
+__all__ = ['db', 'Inventario', 'Reserva', 'ReservaItem']
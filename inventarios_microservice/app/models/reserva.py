@@ -0,0 +1,45 @@
+from . import db
+import uuid
+
+
+class Reserva(db.Model):
+    """Reserva de stock de las líneas de un pedido (descontado hasta confirmar o liberar)."""
+    __tablename__ = "reservas_inventario"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # activa -> confirmada | liberada | expirada
+    estado = db.Column(db.String(20), nullable=False, default='activa')
+    referencia = db.Column(db.String(100), nullable=True)
+    # Sin fecha de expiración la reserva solo termina al confirmarla o liberarla
+    expira_en = db.Column(db.DateTime, nullable=True)
+
+    usuario_creacion = db.Column(db.String(100), nullable=True)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+    fecha_actualizacion = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
+
+    items = db.relationship('ReservaItem', backref='reserva', lazy='selectin', cascade='all, delete-orphan')
+
+    # Búsqueda de reservas activas vencidas
+    __table_args__ = (
+        db.Index('idx_reservas_estado_expira', 'estado', 'expira_en'),
+    )
+
+
+class ReservaItem(db.Model):
+    """Cantidad reservada de un inventario (producto en una ubicación)."""
+    __tablename__ = "reservas_inventario_items"
+
+    id = db.Column(db.Integer, primary_key=True)
+    reserva_id = db.Column(
+        db.String(36),
+        db.ForeignKey('reservas_inventario.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    inventario_id = db.Column(
+        db.String(36),
+        db.ForeignKey('inventarios.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    producto_id = db.Column(db.Integer, nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
-from app.services import inventarios_service
-from app.services import ValidationError, NotFoundError, ConflictError
+from app.services import inventarios_service, reservas_service
+from app.services import ValidationError, NotFoundError, ConflictError, StockInsuficienteError
+from app.utils.http_cache import json_condicional
 
 bp_inventarios = Blueprint("inventarios", __name__)
 
@@ -45,12 +46,12 @@ def listar_inventarios():
             offset=offset
         )
         
-        return jsonify({
+        return json_condicional({
             "inventarios": inventarios,
             "total": len(inventarios),
             "limite": limite,
             "offset": offset
-        }), 200
+        })
     except Exception as e:
         return jsonify({"error": f"Error interno: {str(e)}"}), 500
 
@@ -60,7 +61,7 @@ def obtener_inventario(inventario_id):
     """Obtiene un inventario por su ID."""
     try:
         inventario = inventarios_service.obtener_inventario_por_id(inventario_id)
-        return jsonify(inventario), 200
+        return json_condicional(inventario)
     except NotFoundError as e:
         return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -132,10 +133,65 @@ def obtener_inventarios_por_producto(producto_id):
     """Obtiene todos los inventarios de un producto específico."""
     try:
         inventarios = inventarios_service.listar_inventarios(producto_id=producto_id)
-        return jsonify({
+        return json_condicional({
             "productoId": producto_id,
             "inventarios": inventarios,
             "total": len(inventarios)
-        }), 200
+        })
+    except Exception as e:
+        return jsonify({"error": f"Error interno: {str(e)}"}), 500
+
+
+@bp_inventarios.route("/reservar", methods=["POST"])
+def reservar_stock():
+    """Reserva en una sola transacción el stock de todas las líneas de un pedido."""
+    try:
+        data = request.get_json(silent=True)
+        reserva = reservas_service.reservar_stock(data)
+        return jsonify(reserva), 201
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except StockInsuficienteError as e:
+        return jsonify({"error": str(e), "faltantes": e.faltantes}), 409
+    except Exception as e:
+        return jsonify({"error": f"Error interno: {str(e)}"}), 500
+
+
+@bp_inventarios.route("/reservas/<reserva_id>", methods=["GET"])
+def obtener_reserva(reserva_id):
+    """Obtiene una reserva por su ID."""
+    try:
+        return jsonify(reservas_service.obtener_reserva(reserva_id)), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Error interno: {str(e)}"}), 500
+
+
+@bp_inventarios.route("/reservas/<reserva_id>/confirmar", methods=["POST"])
+def confirmar_reserva(reserva_id):
+    """Confirma una reserva activa (el stock queda descontado)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        reserva = reservas_service.confirmar_reserva(reserva_id, data.get("referencia"))
+        return jsonify(reserva), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConflictError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": f"Error interno: {str(e)}"}), 500
+
+
+@bp_inventarios.route("/reservas/<reserva_id>/liberar", methods=["POST"])
+def liberar_reserva(reserva_id):
+    """Libera una reserva activa y devuelve su stock al inventario."""
+    try:
+        reserva = reservas_service.liberar_reserva(reserva_id)
+        return jsonify(reserva), 200
+    except NotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ConflictError as e:
+        return jsonify({"error": str(e)}), 409
     except Exception as e:
         return jsonify({"error": f"Error interno: {str(e)}"}), 500
@@ -4,6 +4,7 @@ from app.utils.errors import (
     ValidationError,
     NotFoundError,
     ConflictError,
+    StockInsuficienteError,
     UnauthorizedError,
     ForbiddenError,
 )
@@ -14,6 +15,7 @@ __all__ = [
     'ValidationError',
     'NotFoundError',
     'ConflictError',
+    'StockInsuficienteError',
     'UnauthorizedError',
     'ForbiddenError',
 ]
\ No newline at end of file
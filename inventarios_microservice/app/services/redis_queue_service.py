@@ -3,7 +3,7 @@ Servicio para encolar mensajes en Redis Queue.
 """
 import requests
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from flask import current_app
 
 logger = logging.getLogger(__name__)
@@ -67,6 +67,55 @@ class RedisQueueService:
             logger.error(f"❌ Error inesperado encolando mensaje: {e}")
             return False
     
+    @staticmethod
+    def enqueue_cache_updates(producto_ids: List[Any], action: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Encola un solo mensaje para actualizar el cache de varios productos
+        (ej. una reserva con varias líneas).
+        
+        Args:
+            producto_ids: IDs de los productos afectados
+            action: reserve, confirm, release, expire
+            data: Datos adicionales opcionales
+        
+        Returns:
+            True si se encoló correctamente, False si hubo error
+        """
+        producto_ids = list(dict.fromkeys(producto_ids))
+        if not producto_ids:
+            return True
+        try:
+            redis_url = RedisQueueService._get_redis_url()
+            
+            payload = {
+                'channel': 'inventarios_updates',
+                'message': {
+                    'productoIds': producto_ids,
+                    'action': action,
+                    'data': data or {}
+                }
+            }
+            
+            response = requests.post(
+                f"{redis_url}/api/queue/publish",
+                json=payload,
+                timeout=5
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"✅ Mensaje encolado: {action} para {len(producto_ids)} productos")
+                return True
+            else:
+                logger.error(f"❌ Error encolando mensaje: {response.status_code} - {response.text}")
+                return False
+                
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Redis Service no disponible: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Error inesperado encolando mensaje: {e}")
+            return False
+    
     @staticmethod
     def check_health() -> bool:
         """Verifica que Redis Service esté disponible."""
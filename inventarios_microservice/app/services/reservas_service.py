@@ -0,0 +1,299 @@
+"""
+Reservas de stock para pedidos.
+
+Una reserva descuenta en una sola transacción el stock de todas las líneas de
+un pedido: o se reservan todas o ninguna. Las filas de inventario de los
+productos involucrados se bloquean (SELECT ... FOR UPDATE, siempre por id para
+no generar deadlocks) antes de descontar o devolver stock, así dos pedidos
+simultáneos no pueden vender el mismo stock.
+
+El stock reservado vuelve al inventario si la reserva se libera o si vence
+(expira_en) sin haberse confirmado.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+from uuid import uuid4
+from flask import current_app
+from app.models import db
+from app.models.inventario import Inventario
+from app.models.reserva import Reserva, ReservaItem
+from app.services.redis_queue_service import RedisQueueService
+from . import NotFoundError, ConflictError, ValidationError, StockInsuficienteError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _to_dict(r: Reserva) -> Dict[str, Any]:
+    """Convierte una reserva a diccionario para la respuesta JSON."""
+    return {
+        "id": r.id,
+        "estado": r.estado,
+        "referencia": r.referencia,
+        "expiraEn": r.expira_en.isoformat() if r.expira_en else None,
+        "usuarioCreacion": r.usuario_creacion,
+        "fechaCreacion": r.fecha_creacion.isoformat() if r.fecha_creacion else None,
+        "items": [
+            {"inventarioId": i.inventario_id, "productoId": i.producto_id, "cantidad": i.cantidad}
+            for i in r.items
+        ],
+    }
+
+
+def _normalizar_items(items: Any) -> Dict[int, int]:
+    """Valida las líneas y suma las cantidades de un mismo producto."""
+    if not isinstance(items, list) or not items:
+        raise ValidationError("El campo 'items' debe ser una lista no vacía")
+
+    cantidades: Dict[int, int] = {}
+    for posicion, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValidationError(f"La línea {posicion} debe ser un objeto con 'productoId' y 'cantidad'")
+        try:
+            producto_id = int(item.get("productoId"))
+        except (TypeError, ValueError):
+            raise ValidationError(f"La línea {posicion} requiere un 'productoId' entero")
+        cantidad = item.get("cantidad")
+        if isinstance(cantidad, bool) or not isinstance(cantidad, int) or cantidad <= 0:
+            raise ValidationError(f"La línea {posicion} requiere una 'cantidad' entera mayor a cero")
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+    return cantidades
+
+
+def _ttl_segundos(valor: Any) -> int:
+    """Vigencia pedida (o la configurada por defecto); 0 significa sin vencimiento."""
+    if valor is None:
+        return int(current_app.config.get("RESERVA_TTL_SEGUNDOS", 900))
+    maximo = int(current_app.config.get("RESERVA_TTL_MAX_SEGUNDOS", 86400))
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor < 0 or valor > maximo:
+        raise ValidationError(f"El campo 'ttlSegundos' debe ser un entero entre 0 y {maximo}")
+    return valor
+
+
+def _devolver_stock(reservas: List[Reserva]) -> None:
+    """
+    Suma al inventario lo reservado (sin commit); el UPDATE es relativo, no lee la cantidad.
+
+    Las filas se bloquean y actualizan por id, el mismo orden de reservar_stock:
+    los ítems de una reserva están en el orden en que se tomó el stock, no por id.
+    """
+    devolver: Dict[int, int] = defaultdict(int)
+    for reserva in reservas:
+        for item in reserva.items:
+            devolver[item.inventario_id] += item.cantidad
+    ids = sorted(devolver)
+
+    Inventario.query.filter(Inventario.id.in_(ids)).order_by(Inventario.id).with_for_update().all()
+    for inventario_id in ids:
+        Inventario.query.filter(Inventario.id == inventario_id).update(
+            {Inventario.cantidad: Inventario.cantidad + devolver[inventario_id]},
+            synchronize_session=False
+        )
+
+
+def _productos(reservas: List[Reserva]) -> List[int]:
+    return list(dict.fromkeys(item.producto_id for r in reservas for item in r.items))
+
+
+def liberar_reservas_vencidas() -> int:
+    """
+    Devuelve al inventario el stock de las reservas activas vencidas.
+
+    Returns:
+        Cantidad de reservas expiradas
+    """
+    vencidas = (
+        Reserva.query
+        .filter(Reserva.estado == 'activa', Reserva.expira_en.isnot(None), Reserva.expira_en <= datetime.utcnow())
+        .order_by(Reserva.id)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not vencidas:
+        return 0
+
+    try:
+        _devolver_stock(vencidas)
+        for reserva in vencidas:
+            reserva.estado = 'expirada'
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    RedisQueueService.enqueue_cache_updates(
+        _productos(vencidas), action='expire', data={'reservaIds': [r.id for r in vencidas]}
+    )
+    logger.info(f"⏱️ Reservas expiradas: {len(vencidas)}")
+    return len(vencidas)
+
+
+def reservar_stock(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reserva el stock de todas las líneas de un pedido en una sola transacción.
+
+    Cada producto se toma de sus ubicaciones con más stock primero. Si algún
+    producto no alcanza no se reserva nada.
+
+    Args:
+        payload: {"items": [{"productoId", "cantidad"}, ...], "ttlSegundos"?,
+                  "referencia"?, "usuario"?}
+
+    Raises:
+        ValidationError: Si las líneas o la vigencia son inválidas
+        StockInsuficienteError: Con el detalle de los productos sin stock suficiente
+    """
+    if not isinstance(payload, dict):
+        raise ValidationError("No se proporcionaron datos")
+    cantidades = _normalizar_items(payload.get("items"))
+    ttl = _ttl_segundos(payload.get("ttlSegundos"))
+
+    # El stock de reservas vencidas vuelve a estar disponible
+    liberar_reservas_vencidas()
+
+    try:
+        inventarios = (
+            Inventario.query
+            .filter(Inventario.producto_id.in_(list(cantidades)))
+            .order_by(Inventario.id)
+            .with_for_update()
+            .all()
+        )
+        por_producto = defaultdict(list)
+        for inventario in inventarios:
+            por_producto[inventario.producto_id].append(inventario)
+
+        faltantes = []
+        asignaciones = []
+        for producto_id, cantidad in cantidades.items():
+            filas = sorted(por_producto[producto_id], key=lambda i: (-i.cantidad, i.id))
+            disponible = sum(max(i.cantidad, 0) for i in filas)
+            if disponible < cantidad:
+                faltantes.append({"productoId": producto_id, "solicitado": cantidad, "disponible": disponible})
+                continue
+            pendiente = cantidad
+            for inventario in filas:
+                tomar = min(inventario.cantidad, pendiente)
+                if tomar > 0:
+                    asignaciones.append((inventario, tomar))
+                    pendiente -= tomar
+                if pendiente == 0:
+                    break
+
+        if faltantes:
+            db.session.rollback()
+            raise StockInsuficienteError("No hay stock suficiente para reservar el pedido", faltantes)
+
+        reserva = Reserva(
+            id=str(uuid4()),
+            estado='activa',
+            referencia=payload.get("referencia"),
+            usuario_creacion=payload.get("usuario"),
+            expira_en=datetime.utcnow() + timedelta(seconds=ttl) if ttl else None,
+        )
+        for inventario, tomar in asignaciones:
+            inventario.cantidad -= tomar
+            if payload.get("usuario"):
+                inventario.usuario_actualizacion = payload.get("usuario")
+            reserva.items.append(ReservaItem(
+                inventario_id=inventario.id, producto_id=inventario.producto_id, cantidad=tomar
+            ))
+        db.session.add(reserva)
+        db.session.commit()
+    except StockInsuficienteError:
+        raise
+    except Exception:
+        # Fallas de la base (deadlock, serialización, conexión) no son errores del
+        # cliente: se propagan para que la ruta responda 500 y el cliente reintente
+        db.session.rollback()
+        raise
+
+    # Un solo evento de cache para todos los productos de la reserva
+    RedisQueueService.enqueue_cache_updates(list(cantidades), action='reserve', data={'reservaId': reserva.id})
+
+    logger.info(f"✅ Reserva creada: {reserva.id} ({len(cantidades)} productos)")
+    return _to_dict(reserva)
+
+
+def _obtener_bloqueada(reserva_id: str) -> Reserva:
+    reserva = Reserva.query.filter(Reserva.id == reserva_id).with_for_update().first()
+    if not reserva:
+        raise NotFoundError(f"Reserva con ID '{reserva_id}' no encontrada")
+    return reserva
+
+
+def obtener_reserva(reserva_id: str) -> Dict[str, Any]:
+    """Obtiene una reserva por su ID."""
+    reserva = db.session.get(Reserva, reserva_id)
+    if not reserva:
+        raise NotFoundError(f"Reserva con ID '{reserva_id}' no encontrada")
+    return _to_dict(reserva)
+
+
+def confirmar_reserva(reserva_id: str, referencia: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Confirma una reserva activa: el stock queda descontado definitivamente.
+
+    Confirmar dos veces no tiene efecto. Una reserva vencida se expira y no
+    puede confirmarse.
+    """
+    reserva = _obtener_bloqueada(reserva_id)
+
+    if reserva.estado == 'confirmada':
+        db.session.rollback()
+        return _to_dict(reserva)
+    if reserva.estado != 'activa':
+        db.session.rollback()
+        raise ConflictError(f"La reserva '{reserva_id}' está {reserva.estado} y no puede confirmarse")
+
+    vencida = reserva.expira_en is not None and reserva.expira_en <= datetime.utcnow()
+    try:
+        if vencida:
+            _devolver_stock([reserva])
+            reserva.estado = 'expirada'
+        else:
+            reserva.estado = 'confirmada'
+            if referencia:
+                reserva.referencia = referencia
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if vencida:
+        RedisQueueService.enqueue_cache_updates(_productos([reserva]), action='expire', data={'reservaIds': [reserva.id]})
+        raise ConflictError(f"La reserva '{reserva_id}' expiró")
+
+    logger.info(f"✅ Reserva confirmada: {reserva_id}")
+    return _to_dict(reserva)
+
+
+def liberar_reserva(reserva_id: str) -> Dict[str, Any]:
+    """
+    Libera una reserva activa y devuelve su stock al inventario.
+
+    Liberar una reserva ya liberada o expirada no tiene efecto; una reserva
+    confirmada no puede liberarse.
+    """
+    reserva = _obtener_bloqueada(reserva_id)
+
+    if reserva.estado in ('liberada', 'expirada'):
+        db.session.rollback()
+        return _to_dict(reserva)
+    if reserva.estado != 'activa':
+        db.session.rollback()
+        raise ConflictError(f"La reserva '{reserva_id}' está {reserva.estado} y no puede liberarse")
+
+    try:
+        _devolver_stock([reserva])
+        reserva.estado = 'liberada'
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    RedisQueueService.enqueue_cache_updates(_productos([reserva]), action='release', data={'reservaId': reserva.id})
+
+    logger.info(f"✅ Reserva liberada: {reserva_id}")
+    return _to_dict(reserva)
@@ -18,6 +18,13 @@ class ConflictError(ServiceError):
     pass
 
 
+class StockInsuficienteError(ConflictError):
+    """No hay stock para todas las líneas de una reserva (409)."""
+    def __init__(self, mensaje, faltantes):
+        super().__init__(mensaje)
+        self.faltantes = faltantes
+
+
 class UnauthorizedError(ServiceError):
     """No autenticado (401)."""
     pass
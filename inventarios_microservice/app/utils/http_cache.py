@@ -0,0 +1,29 @@
+import hashlib
+from typing import Any
+from flask import Response, current_app, jsonify, make_response, request
+
+
+def _aplicar_cabeceras_cache(response: Response, etag: str) -> Response:
+    """Agrega ETag y Cache-Control a la respuesta."""
+    response.set_etag(etag)
+    max_age = current_app.config.get("HTTP_CACHE_MAX_AGE", 0)
+    response.headers["Cache-Control"] = f"private, max-age={max_age}, must-revalidate"
+    return response
+
+
+def json_condicional(payload: Any) -> Response:
+    """
+    Serializa el payload como JSON con un ETag fuerte basado en su contenido.
+
+    Si el If-None-Match del request coincide, responde 304 sin cuerpo. El hash se
+    calcula sobre el contenido porque las respuestas incluyen datos enriquecidos
+    desde el microservicio de productos (nombre, SKU) que no tienen marca de
+    actualización local.
+    """
+    response = jsonify(payload)
+    etag = hashlib.sha256(response.get_data()).hexdigest()[:40]
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+
+    return _aplicar_cabeceras_cache(response, etag)
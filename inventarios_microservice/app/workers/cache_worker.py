@@ -115,24 +115,27 @@ class CacheWorker:
         
         Args:
             message: Mensaje recibido con estructura {productoId, action, data}
+                o {productoIds: [...], action, data} cuando afecta a varios productos
         """
         try:
-            producto_id = message.get('productoId')
+            producto_ids = message.get('productoIds') or [message.get('productoId')]
+            producto_ids = [p for p in producto_ids if p]
             action = message.get('action')
             
-            if not producto_id:
+            if not producto_ids:
                 logger.warning("⚠️ Mensaje sin productoId ignorado")
                 return
             
-            logger.info(f"📨 Procesando: {action} para producto {producto_id}")
-            
-            # Para cualquier acción, recargamos todos los inventarios del producto desde la BD
-            inventarios = self._get_inventarios_from_db(producto_id)
-            
-            # Actualizar cache
-            self._update_cache(producto_id, inventarios)
-            
-            logger.info(f"✅ Procesado: {action} para producto {producto_id}")
+            for producto_id in producto_ids:
+                logger.info(f"📨 Procesando: {action} para producto {producto_id}")
+                
+                # Para cualquier acción, recargamos todos los inventarios del producto desde la BD
+                inventarios = self._get_inventarios_from_db(producto_id)
+                
+                # Actualizar cache
+                self._update_cache(producto_id, inventarios)
+                
+                logger.info(f"✅ Procesado: {action} para producto {producto_id}")
             
         except Exception as e:
             logger.error(f"❌ Error procesando mensaje: {e}")
@@ -1,5 +1,5 @@
 import pytest
-from app.services import ValidationError, ConflictError, NotFoundError
+from app.services import ValidationError, ConflictError, NotFoundError, StockInsuficienteError
 
 
 @pytest.fixture
@@ -321,3 +321,132 @@ def test_health_endpoint(client):
 
     assert response.status_code == 200
     assert response.get_json()["ok"] is True
+
+
+def test_listar_inventarios_incluye_etag(client, mocker, sample_inventario_dict):
+    mocker.patch(
+        "app.routes.inventarios.inventarios_service.listar_inventarios",
+        return_value=[sample_inventario_dict],
+    )
+
+    response = client.get("/api/inventarios")
+
+    assert response.status_code == 200
+    assert response.headers.get("ETag")
+    assert "must-revalidate" in response.headers["Cache-Control"]
+
+
+def test_listar_inventarios_responde_304_con_etag_vigente(client, mocker, sample_inventario_dict):
+    mocker.patch(
+        "app.routes.inventarios.inventarios_service.listar_inventarios",
+        return_value=[sample_inventario_dict],
+    )
+    etag = client.get("/api/inventarios").headers["ETag"]
+
+    response = client.get("/api/inventarios", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_obtener_inventario_etag_cambia_con_contenido(client, mocker, sample_inventario_dict):
+    servicio = mocker.patch(
+        "app.routes.inventarios.inventarios_service.obtener_inventario_por_id",
+        return_value=sample_inventario_dict,
+    )
+    etag = client.get(f"/api/inventarios/{sample_inventario_dict['id']}").headers["ETag"]
+
+    servicio.return_value = {**sample_inventario_dict, "cantidad": 5}
+    response = client.get(
+        f"/api/inventarios/{sample_inventario_dict['id']}",
+        headers={"If-None-Match": etag},
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["cantidad"] == 5
+    assert response.headers["ETag"] != etag
+
+
+def test_reservar_stock_success(client, mocker):
+    reservar = mocker.patch(
+        "app.routes.inventarios.reservas_service.reservar_stock",
+        return_value={"id": "reserva-1", "estado": "activa", "items": []},
+    )
+    payload = {"items": [{"productoId": 1, "cantidad": 2}]}
+
+    response = client.post("/api/inventarios/reservar", json=payload)
+
+    assert response.status_code == 201
+    assert response.get_json()["id"] == "reserva-1"
+    reservar.assert_called_once_with(payload)
+
+
+def test_reservar_stock_insuficiente(client, mocker):
+    faltantes = [{"productoId": 1, "solicitado": 5, "disponible": 2}]
+    mocker.patch(
+        "app.routes.inventarios.reservas_service.reservar_stock",
+        side_effect=StockInsuficienteError("sin stock", faltantes),
+    )
+
+    response = client.post("/api/inventarios/reservar", json={"items": [{"productoId": 1, "cantidad": 5}]})
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "sin stock", "faltantes": faltantes}
+
+
+def test_reservar_stock_validation_error(client, mocker):
+    mocker.patch(
+        "app.routes.inventarios.reservas_service.reservar_stock",
+        side_effect=ValidationError("items invalidos"),
+    )
+
+    response = client.post("/api/inventarios/reservar", json={})
+
+    assert response.status_code == 400
+
+
+def test_confirmar_reserva_route(client, mocker):
+    confirmar = mocker.patch(
+        "app.routes.inventarios.reservas_service.confirmar_reserva",
+        return_value={"id": "reserva-1", "estado": "confirmada"},
+    )
+
+    response = client.post("/api/inventarios/reservas/reserva-1/confirmar", json={"referencia": "pedido-1"})
+
+    assert response.status_code == 200
+    confirmar.assert_called_once_with("reserva-1", "pedido-1")
+
+
+def test_confirmar_reserva_expirada(client, mocker):
+    mocker.patch(
+        "app.routes.inventarios.reservas_service.confirmar_reserva",
+        side_effect=ConflictError("expiró"),
+    )
+
+    response = client.post("/api/inventarios/reservas/reserva-1/confirmar")
+
+    assert response.status_code == 409
+
+
+def test_liberar_reserva_route(client, mocker):
+    mocker.patch(
+        "app.routes.inventarios.reservas_service.liberar_reserva",
+        side_effect=NotFoundError("no existe"),
+    )
+
+    response = client.post("/api/inventarios/reservas/reserva-1/liberar")
+
+    assert response.status_code == 404
+
+
+def test_liberar_reserva_falla_de_base(client, mocker):
+    from sqlalchemy.exc import OperationalError
+    mocker.patch(
+        "app.routes.inventarios.reservas_service.liberar_reserva",
+        side_effect=OperationalError("UPDATE", {}, Exception("deadlock detected")),
+    )
+
+    response = client.post("/api/inventarios/reservas/reserva-1/liberar")
+
+    assert response.status_code == 500
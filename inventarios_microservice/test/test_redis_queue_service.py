@@ -30,6 +30,18 @@ class TestRedisQueueService:
         assert kwargs['json']['message']['productoId'] == 'prod-1'
         assert kwargs['json']['message']['action'] == 'create'
 
+    @patch('app.services.redis_queue_service.requests.post')
+    def test_enqueue_cache_updates_un_solo_mensaje(self, mock_post, app):
+        mock_post.return_value = MagicMock(status_code=200)
+
+        with app.app_context():
+            result = RedisQueueService.enqueue_cache_updates([1, 2, 1], 'reserve', {'reservaId': 'r-1'})
+
+        assert result is True
+        mock_post.assert_called_once()
+        message = mock_post.call_args.kwargs['json']['message']
+        assert message == {'productoIds': [1, 2], 'action': 'reserve', 'data': {'reservaId': 'r-1'}}
+
     @patch('app.services.redis_queue_service.requests.post')
     def test_enqueue_cache_update_failure_status(self, mock_post, app):
         mock_response = MagicMock()
@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models import db
+from app.models.inventario import Inventario
+from app.models.reserva import Reserva
+from app.services.reservas_service import (
+    reservar_stock,
+    confirmar_reserva,
+    liberar_reserva,
+    obtener_reserva,
+    liberar_reservas_vencidas,
+    ValidationError,
+    ConflictError,
+    NotFoundError,
+    StockInsuficienteError,
+)
+
+
+@pytest.fixture
+def base(app):
+    """Base sqlite en memoria con las tablas del microservicio."""
+    if 'productos' not in db.metadata.tables:
+        # La tabla productos es de otro microservicio; solo hace falta para la FK
+        db.Table('productos', db.metadata, db.Column('id', db.Integer, primary_key=True))
+    with app.app_context():
+        db.create_all()
+        yield db.session
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def cola(mocker):
+    return mocker.patch(
+        'app.services.reservas_service.RedisQueueService.enqueue_cache_updates', return_value=True
+    )
+
+
+def _inventario(session, producto_id, cantidad, ubicacion):
+    inventario = Inventario(producto_id=producto_id, cantidad=cantidad, ubicacion=ubicacion)
+    session.add(inventario)
+    session.commit()
+    return inventario.id
+
+
+def _cantidades(session, producto_id):
+    session.expire_all()
+    return sorted(i.cantidad for i in Inventario.query.filter_by(producto_id=producto_id))
+
+
+def test_reservar_descuenta_todas_las_lineas(base, cola):
+    _inventario(base, 1, 5, 'A')
+    _inventario(base, 1, 8, 'B')
+    _inventario(base, 2, 3, 'A')
+
+    reserva = reservar_stock({
+        'items': [{'productoId': 1, 'cantidad': 6}, {'productoId': 2, 'cantidad': 1},
+                  {'productoId': 1, 'cantidad': 4}],
+        'referencia': 'pedido-1',
+    })
+
+    assert reserva['estado'] == 'activa'
+    assert reserva['expiraEn'] is not None
+    # Se toma primero de la ubicación con más stock
+    assert sorted((i['productoId'], i['cantidad']) for i in reserva['items']) == [(1, 2), (1, 8), (2, 1)]
+    assert _cantidades(base, 1) == [0, 3]
+    assert _cantidades(base, 2) == [2]
+    cola.assert_called_once_with([1, 2], action='reserve', data={'reservaId': reserva['id']})
+
+
+def test_reservar_sin_stock_no_descuenta_nada(base, cola):
+    _inventario(base, 1, 5, 'A')
+    _inventario(base, 2, 1, 'A')
+
+    with pytest.raises(StockInsuficienteError) as exc:
+        reservar_stock({'items': [{'productoId': 1, 'cantidad': 2}, {'productoId': 2, 'cantidad': 3},
+                                  {'productoId': 3, 'cantidad': 1}]})
+
+    assert exc.value.faltantes == [
+        {'productoId': 2, 'solicitado': 3, 'disponible': 1},
+        {'productoId': 3, 'solicitado': 1, 'disponible': 0},
+    ]
+    assert _cantidades(base, 1) == [5]
+    assert _cantidades(base, 2) == [1]
+    assert Reserva.query.count() == 0
+    cola.assert_not_called()
+
+
+@pytest.mark.parametrize('payload', [
+    {},
+    {'items': []},
+    {'items': [{'productoId': 'x', 'cantidad': 1}]},
+    {'items': [{'productoId': 1, 'cantidad': 0}]},
+    {'items': [{'productoId': 1, 'cantidad': 1}], 'ttlSegundos': -1},
+])
+def test_reservar_valida_payload(base, cola, payload):
+    with pytest.raises(ValidationError):
+        reservar_stock(payload)
+
+
+def test_confirmar_reserva(base, cola):
+    _inventario(base, 1, 5, 'A')
+    reserva = reservar_stock({'items': [{'productoId': 1, 'cantidad': 2}]})
+
+    confirmada = confirmar_reserva(reserva['id'], referencia='pedido-9')
+
+    assert confirmada['estado'] == 'confirmada'
+    assert confirmada['referencia'] == 'pedido-9'
+    assert confirmar_reserva(reserva['id'])['estado'] == 'confirmada'
+    assert _cantidades(base, 1) == [3]
+    with pytest.raises(ConflictError):
+        liberar_reserva(reserva['id'])
+
+
+def test_liberar_reserva_devuelve_stock(base, cola):
+    _inventario(base, 1, 5, 'A')
+    reserva = reservar_stock({'items': [{'productoId': 1, 'cantidad': 5}]})
+    assert _cantidades(base, 1) == [0]
+
+    liberada = liberar_reserva(reserva['id'])
+
+    assert liberada['estado'] == 'liberada'
+    assert _cantidades(base, 1) == [5]
+    cola.assert_called_with([1], action='release', data={'reservaId': reserva['id']})
+    # Liberar otra vez no devuelve stock de nuevo
+    liberar_reserva(reserva['id'])
+    assert _cantidades(base, 1) == [5]
+    with pytest.raises(ConflictError):
+        confirmar_reserva(reserva['id'])
+
+
+def test_reserva_vencida_libera_su_stock(base, cola):
+    _inventario(base, 1, 4, 'A')
+    vencida = reservar_stock({'items': [{'productoId': 1, 'cantidad': 4}]})
+    Reserva.query.filter_by(id=vencida['id']).update({'expira_en': datetime.utcnow() - timedelta(seconds=1)})
+    base.commit()
+
+    # La nueva reserva usa el stock que tenía la vencida
+    nueva = reservar_stock({'items': [{'productoId': 1, 'cantidad': 3}], 'ttlSegundos': 0})
+
+    assert nueva['expiraEn'] is None
+    assert obtener_reserva(vencida['id'])['estado'] == 'expirada'
+    assert _cantidades(base, 1) == [1]
+    with pytest.raises(ConflictError):
+        confirmar_reserva(vencida['id'])
+    assert liberar_reservas_vencidas() == 0
+
+
+def test_confirmar_reserva_vencida(base, cola):
+    _inventario(base, 1, 4, 'A')
+    reserva = reservar_stock({'items': [{'productoId': 1, 'cantidad': 4}]})
+    Reserva.query.filter_by(id=reserva['id']).update({'expira_en': datetime.utcnow() - timedelta(seconds=1)})
+    base.commit()
+
+    with pytest.raises(ConflictError):
+        confirmar_reserva(reserva['id'])
+
+    assert obtener_reserva(reserva['id'])['estado'] == 'expirada'
+    assert _cantidades(base, 1) == [4]
+
+
+def test_reserva_no_encontrada(base, cola):
+    with pytest.raises(NotFoundError):
+        confirmar_reserva('no-existe')
+    with pytest.raises(NotFoundError):
+        liberar_reserva('no-existe')
+
+
+def test_vencidas_devuelven_stock_en_bloque(base, cola):
+    """Varias reservas vencidas sobre las mismas filas suman lo devuelto"""
+    _inventario(base, 1, 5, 'A')
+    _inventario(base, 1, 2, 'B')
+    primera = reservar_stock({'items': [{'productoId': 1, 'cantidad': 6}]})
+    segunda = reservar_stock({'items': [{'productoId': 1, 'cantidad': 1}]})
+    Reserva.query.filter(Reserva.id.in_([primera['id'], segunda['id']])).update(
+        {'expira_en': datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False
+    )
+    base.commit()
+
+    assert liberar_reservas_vencidas() == 2
+    assert _cantidades(base, 1) == [2, 5]
+
+
+def test_falla_de_base_no_es_error_de_validacion(base, cola, mocker):
+    """Un deadlock o una falla de conexión se propaga (500), no se reporta como 400"""
+    _inventario(base, 1, 5, 'A')
+    reserva = reservar_stock({'items': [{'productoId': 1, 'cantidad': 2}]})
+    mocker.patch.object(base, 'commit', side_effect=OperationalError('UPDATE', {}, Exception('deadlock detected')))
+
+    with pytest.raises(OperationalError):
+        liberar_reserva(reserva['id'])
+    with pytest.raises(OperationalError):
+        reservar_stock({'items': [{'productoId': 1, 'cantidad': 1}]})
+    cola.assert_called_once()
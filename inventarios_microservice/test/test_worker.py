@@ -0,0 +1,22 @@
+from worker import CacheWorkerSubscriber
+
+
+def test_barrido_libera_reservas_vencidas_hasta_detenerse(app, mocker):
+    worker = CacheWorkerSubscriber('localhost', 6379, 'http://redis-service.test', 'sqlite://', 0)
+    mocker.patch('app.create_app', return_value=app)
+    llamadas = []
+
+    def liberar():
+        llamadas.append(1)
+        if len(llamadas) == 2:
+            worker._detenido.set()
+        if len(llamadas) == 1:
+            raise RuntimeError('base no disponible')
+        return 3
+
+    mocker.patch('app.services.reservas_service.liberar_reservas_vencidas', side_effect=liberar)
+
+    worker._barrer_reservas_vencidas()
+
+    # Un error en una pasada no detiene el barrido
+    assert len(llamadas) == 2
@@ -18,6 +18,9 @@ class Config:
     VENDEDORES_URL = os.environ.get('VENDEDORES_URL', 'http://localhost:5007')
     PEDIDOS_URL = os.environ.get('PEDIDOS_URL', 'http://localhost:5012')
     LOGISTICA_URL = os.environ.get('LOGISTICA_URL', 'http://localhost:5013')
+
+    # Segundos que se recuerda el vendedor de un correo (ver services/identidad)
+    IDENTIDAD_CACHE_TTL = int(os.environ.get('IDENTIDAD_CACHE_TTL', 300))
     
     # Configuración de JWT (debe coincidir con auth-usuario)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
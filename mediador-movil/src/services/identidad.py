@@ -0,0 +1,49 @@
+"""
+Resolución cacheada del vendedor dueño del token.
+
+Las consultas de visitas necesitan el id del vendedor asociado al correo del
+token, y lo obtenían buscando por correo en el microservicio de vendedores en
+cada petición. Esa asociación casi nunca cambia, así que lo resuelto se guarda
+en memoria por IDENTIDAD_CACHE_TTL segundos (clave: correo). Solo se guardan
+las búsquedas con resultado: un vendedor recién creado se encuentra en la
+siguiente petición. Ningún servicio avisa de cambios de correo o bajas: se ven
+al vencer la entrada, así que lo desactualizado dura como máximo
+IDENTIDAD_CACHE_TTL.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from src.config.config import Config
+from src.services.vendedores import listar_vendedores_externo
+
+_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def limpiar_cache_identidad() -> None:
+    """Descarta todas las identidades guardadas."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def vendedores_por_correo(email: str) -> List[Dict[str, Any]]:
+    """
+    Vendedores con ese correo (normalmente uno).
+
+    Returns:
+        Lista de vendedores (vacía si no hay)
+    Raises:
+        VendedorServiceError: Si falla el microservicio de vendedores
+    """
+    with _cache_lock:
+        entrada = _cache.get(email)
+        if entrada is not None and entrada[0] > time.monotonic():
+            return entrada[1]
+
+    respuesta = listar_vendedores_externo(filters={"correo": email})
+    vendedores = (respuesta.get("items") or []) if isinstance(respuesta, dict) else []
+    if vendedores:
+        with _cache_lock:
+            _cache[email] = (time.monotonic() + float(Config.IDENTIDAD_CACHE_TTL), vendedores)
+    return vendedores
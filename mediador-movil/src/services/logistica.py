@@ -6,7 +6,8 @@ from typing import Any, Dict, Optional, Iterable
 import requests
 from flask import current_app
 
-from src.services.vendedores import listar_vendedores_externo, VendedorServiceError
+from src.services.vendedores import VendedorServiceError
+from src.services.identidad import vendedores_por_correo
 from src.config.config import Config
 
 
@@ -94,7 +95,7 @@ def listar_visitas_logistica(
 
     if vendedor_email:
         try:
-            vendedores_response = listar_vendedores_externo(filters={"correo": vendedor_email})
+            items = vendedores_por_correo(vendedor_email)
         except VendedorServiceError as exc:
             raise LogisticaServiceError(
                 {
@@ -104,7 +105,6 @@ def listar_visitas_logistica(
                 exc.status_code,
             ) from exc
 
-        items = vendedores_response.get("items") if isinstance(vendedores_response, dict) else None
         if not items:
             raise LogisticaServiceError(
                 {
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def limpiar_identidades():
+    """Cada test resuelve vendedores sin lo guardado por otros."""
+    from src.services.identidad import limpiar_cache_identidad
+    limpiar_cache_identidad()
+    yield
+    limpiar_cache_identidad()
@@ -159,7 +159,7 @@ def test_actualizar_visita_logistica_entorno_personalizado(mock_patch):
     )
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_exito(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -207,7 +207,7 @@ def test_listar_visitas_logistica_exito(mock_get, mock_listar_vendedores):
     assert visitas[0]["cliente"]["nombre"] == "Cliente Cinco"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 def test_listar_visitas_logistica_vendedor_no_encontrado(mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": []}
 
@@ -218,7 +218,7 @@ def test_listar_visitas_logistica_vendedor_no_encontrado(mock_listar_vendedores)
     assert exc.value.message["codigo"] == "VENDEDOR_NO_ENCONTRADO"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 def test_listar_visitas_logistica_vendedor_sin_id(mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{}]}
 
@@ -229,7 +229,7 @@ def test_listar_visitas_logistica_vendedor_sin_id(mock_listar_vendedores):
     assert exc.value.message["codigo"] == "VENDEDOR_SIN_ID"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 def test_listar_visitas_logistica_error_vendedor(mock_listar_vendedores):
     from src.services.vendedores import VendedorServiceError
 
@@ -242,7 +242,7 @@ def test_listar_visitas_logistica_error_vendedor(mock_listar_vendedores):
     assert exc.value.message["codigo"] == "ERROR_VENDEDOR"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_http_error(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -259,7 +259,7 @@ def test_listar_visitas_logistica_http_error(mock_get, mock_listar_vendedores):
     assert exc.value.message["error"] == "fallo"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_http_error_sin_json(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -276,7 +276,7 @@ def test_listar_visitas_logistica_http_error_sin_json(mock_get, mock_listar_vend
     assert exc.value.message["codigo"] == "ERROR_LOGISTICA"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_respuesta_invalida(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -292,7 +292,7 @@ def test_listar_visitas_logistica_respuesta_invalida(mock_get, mock_listar_vende
     assert exc.value.message["codigo"] == "RESPUESTA_INVALIDA"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_error_conexion(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -305,7 +305,7 @@ def test_listar_visitas_logistica_error_conexion(mock_get, mock_listar_vendedore
     assert exc.value.message["codigo"] == "ERROR_CONEXION"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_error_clientes_http(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -339,7 +339,7 @@ def test_listar_visitas_logistica_error_clientes_http(mock_get, mock_listar_vend
     assert exc.value.message.get("error") == "cliente no encontrado"
 
 
-@patch("src.services.logistica.listar_vendedores_externo")
+@patch("src.services.identidad.listar_vendedores_externo")
 @patch("src.services.logistica.requests.get")
 def test_listar_visitas_logistica_error_clientes_conexion(mock_get, mock_listar_vendedores):
     mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
@@ -364,3 +364,19 @@ def test_listar_visitas_logistica_error_clientes_conexion(mock_get, mock_listar_
 
     assert exc.value.status_code == 503
     assert exc.value.message["codigo"] == "ERROR_CLIENTES_CONEXION"
+
+
+@patch("src.services.identidad.listar_vendedores_externo")
+@patch("src.services.logistica.requests.get")
+def test_listar_visitas_logistica_reutiliza_vendedor_resuelto(mock_get, mock_listar_vendedores):
+    mock_listar_vendedores.return_value = {"items": [{"id": "ven-1"}]}
+    visitas_response = MagicMock()
+    visitas_response.status_code = 200
+    visitas_response.json.return_value = {"visitas": []}
+    mock_get.return_value = visitas_response
+
+    listar_visitas_logistica(vendedor_email="v@test.com")
+    listar_visitas_logistica(vendedor_email="v@test.com")
+
+    assert mock_listar_vendedores.call_count == 1
+    assert all(c.kwargs["params"]["vendedor_id"] == "ven-1" for c in mock_get.call_args_list)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app, Response
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 from src.services.vendedores import (
     crear_vendedor_externo, 
@@ -8,10 +8,12 @@ from src.services.vendedores import (
     crear_plan_venta_externo,
     listar_planes_venta_externo,
     obtener_plan_venta_externo,
-    generar_reporte_ventas_vendedor
+    generar_reporte_ventas_vendedor,
+    iterar_reporte_ventas_vendedores
 )
 import csv
 import io
+import itertools
 from datetime import datetime
 
 # Crear el blueprint para vendedores
@@ -246,6 +248,100 @@ def generar_reporte_ventas(vendedor_id):
         }), 500
 
 
+class _LineaCSV:
+    """Destino para csv.writer que devuelve cada línea en lugar de acumularla."""
+    def write(self, linea):
+        return linea
+
+
+@vendedores_bp.route('/vendedor/reporte-ventas', methods=['GET'])
+@jwt_required()
+def exportar_reporte_ventas_vendedores():
+    """
+    Endpoint del BFF para exportar en CSV las ventas de un mes de todos los
+    vendedores (o los de una zona), una fila por vendedor.
+    
+    El CSV se envía a medida que se genera: los vendedores se leen por
+    páginas y sus ventas se piden en bloque por página.
+    
+    Query params:
+        - mes (int, required): Mes (1-12)
+        - anio (int, required): Año (ej: 2025)
+        - zona (str, optional): Solo los vendedores de esta zona
+    """
+    try:
+        mes = request.args.get('mes')
+        anio = request.args.get('anio')
+        zona = request.args.get('zona')
+        
+        if not mes or not anio:
+            return jsonify({
+                'error': 'Los parámetros mes y anio son requeridos',
+                'codigo': 'PARAMETROS_FALTANTES'
+            }), 400
+        
+        try:
+            mes = int(mes)
+            anio = int(anio)
+        except ValueError:
+            return jsonify({
+                'error': 'Los parámetros mes y anio deben ser números enteros',
+                'codigo': 'PARAMETROS_INVALIDOS'
+            }), 400
+        
+        filas = iterar_reporte_ventas_vendedores(mes, anio, zona=zona)
+        # La primera página se obtiene antes de responder, para que un error
+        # de los microservicios se reporte con su código de estado
+        primera = next(filas, None)
+        
+    except VendedorServiceError as e:
+        return jsonify(e.message), e.status_code
+    except Exception as e:
+        current_app.logger.error(f"Error inesperado al exportar reporte de ventas: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor',
+            'codigo': 'ERROR_INESPERADO',
+            'detalle': str(e)
+        }), 500
+    
+    def generar():
+        writer = csv.writer(_LineaCSV())
+        yield writer.writerow([
+            'Vendedor ID', 'Nombre', 'Correo', 'Zona', 'Ventas Realizadas', 'Monto Total',
+            'Monto Promedio', 'Clientes Únicos', 'Meta de Ingresos', '% Cumplimiento'
+        ])
+        if primera is None:
+            return
+        try:
+            for fila in itertools.chain([primera], filas):
+                yield writer.writerow([
+                    fila['vendedor_id'],
+                    fila['nombre_completo'],
+                    fila['correo'],
+                    fila['zona'],
+                    fila['ventas_realizadas'],
+                    f"{fila['monto_total']:.2f}",
+                    f"{fila['monto_promedio']:.2f}",
+                    fila['clientes_unicos'],
+                    f"{fila['meta_ingresos']:.2f}",
+                    f"{fila['cumplimiento_porcentaje']:.2f}"
+                ])
+        except Exception as e:
+            # Los encabezados ya se enviaron: se marca el archivo como incompleto
+            current_app.logger.error(f"Error durante la exportación del reporte de ventas: {str(e)}")
+            yield writer.writerow(['ERROR', 'Reporte incompleto: falló la consulta a un microservicio'])
+    
+    filename = f"reporte_ventas_vendedores_{anio}_{mes:02d}.csv"
+    return Response(
+        stream_with_context(generar()),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'Content-Type': 'text/csv; charset=utf-8'
+        }
+    )
+
+
 @vendedores_bp.route('/planes-venta', methods=['POST'])
 @jwt_required()
 def crear_plan_venta():
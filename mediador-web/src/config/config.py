@@ -20,3 +20,8 @@ class Config:
     
     # Configuración de JWT (debe coincidir con auth-usuario)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
+    
+    # Llamadas en paralelo a microservicios (ej. reporte de ventas)
+    ORQUESTACION_TIMEOUT_LLAMADA = float(os.environ.get('ORQUESTACION_TIMEOUT_LLAMADA', 10))
+    ORQUESTACION_PLAZO_GLOBAL = float(os.environ.get('ORQUESTACION_PLAZO_GLOBAL', 15))
+    ORQUESTACION_MAX_WORKERS = int(os.environ.get('ORQUESTACION_MAX_WORKERS', 16))
@@ -0,0 +1,111 @@
+"""
+Consulta de clientes en el microservicio de clientes, con cache de corta duración.
+
+Se usa para enriquecer listados (zona y ubicación del cliente de cada pedido):
+los ids se deduplican y se resuelven en llamadas masivas a GET /cliente?ids=,
+y lo resuelto se guarda unos segundos (CLIENTES_CACHE_TTL) para que listados
+seguidos no vuelvan a pedir los mismos clientes.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+# Ids por llamada a GET /cliente?ids= (mantiene acotado el largo de la URL)
+IDS_POR_LOTE = 100
+
+_cache_clientes: Dict[str, tuple] = {}
+_cache_zonas: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return float(os.environ.get('CLIENTES_CACHE_TTL', 60))
+
+
+def _clientes_url() -> str:
+    return os.environ.get('CLIENTES_URL', 'http://localhost:5010')
+
+
+def limpiar_cache_clientes() -> None:
+    """Descarta los clientes y zonas guardados."""
+    with _cache_lock:
+        _cache_clientes.clear()
+        _cache_zonas.clear()
+
+
+def _guardar(clientes: Iterable[Dict[str, Any]], vence: float) -> None:
+    with _cache_lock:
+        for cliente in clientes:
+            if cliente.get('id') is not None:
+                _cache_clientes[str(cliente['id'])] = (vence, cliente)
+
+
+def _listar(params: Dict[str, Any], headers: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+    response = requests.get(f"{_clientes_url()}/cliente", params=params, headers=headers, timeout=5)
+    response.raise_for_status()
+    return response.json().get('data', [])
+
+
+def obtener_clientes_por_ids(ids: Iterable[Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene varios clientes por id.
+
+    Args:
+        ids: Ids de clientes (se deduplican; se ignoran los vacíos)
+        headers: Encabezados HTTP para el microservicio de clientes
+
+    Returns:
+        dict: {id (str): cliente}; los ids que no existen no aparecen
+
+    Raises:
+        requests.exceptions.RequestException: Si falla la consulta de los que no están en cache
+    """
+    pendientes = list(dict.fromkeys(str(i) for i in ids if i is not None and str(i) != ''))
+    ahora = time.monotonic()
+    encontrados = {}
+    with _cache_lock:
+        for cliente_id in list(pendientes):
+            guardado = _cache_clientes.get(cliente_id)
+            if guardado and guardado[0] > ahora:
+                encontrados[cliente_id] = guardado[1]
+                pendientes.remove(cliente_id)
+
+    vence = ahora + _ttl()
+    for inicio in range(0, len(pendientes), IDS_POR_LOTE):
+        lote = pendientes[inicio:inicio + IDS_POR_LOTE]
+        clientes = _listar({'ids': ','.join(lote)}, headers)
+        _guardar(clientes, vence)
+        encontrados.update((str(c['id']), c) for c in clientes if c.get('id') is not None)
+
+    return encontrados
+
+
+def obtener_clientes_por_zona(zona: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene los clientes de una zona en una sola llamada (GET /cliente?zona=).
+
+    Returns:
+        dict: {id (str): cliente}
+
+    Raises:
+        requests.exceptions.RequestException: Si falla la consulta
+    """
+    ahora = time.monotonic()
+    with _cache_lock:
+        guardado = _cache_zonas.get(zona)
+        if guardado and guardado[0] > ahora:
+            return guardado[1]
+
+    clientes = {
+        str(c['id']): c
+        for c in _listar({'zona': zona}, headers)
+        if c.get('id') is not None and c.get('zona') == zona
+    }
+    vence = ahora + _ttl()
+    _guardar(clientes.values(), vence)
+    with _cache_lock:
+        _cache_zonas[zona] = (vence, clientes)
+    return clientes
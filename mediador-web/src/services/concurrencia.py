@@ -0,0 +1,129 @@
+"""
+Ejecución en paralelo de llamadas independientes a microservicios.
+
+Los endpoints que combinan varias consultas que no dependen entre sí (ej. el
+reporte de ventas: vendedor, planes y pedidos) las lanzan juntas y esperan a
+la más lenta en lugar de sumar sus tiempos. Cada llamada tiene su timeout y
+todas comparten un plazo global; la que no termina a tiempo se reporta como
+LlamadaTimeoutError y su resultado se descarta cuando llegue.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from flask import current_app, has_app_context
+
+# Valores por defecto (configurables con ORQUESTACION_*)
+TIMEOUT_LLAMADA = 10
+PLAZO_GLOBAL = 15
+MAX_WORKERS = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class LlamadaTimeoutError(TimeoutError):
+    """Una llamada no terminó dentro de su timeout o del plazo global."""
+    def __init__(self, nombre, segundos):
+        super().__init__(f"La llamada '{nombre}' no respondió en {segundos:.1f}s")
+        self.nombre = nombre
+        self.segundos = segundos
+
+
+class Llamada:
+    """Función a ejecutar con sus argumentos y, opcionalmente, un timeout propio (segundos)."""
+    def __init__(self, funcion, *args, timeout=None, **kwargs):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+
+
+class Resultado:
+    """Valor o error de una llamada."""
+    def __init__(self, valor=None, error=None, duracion=0.0):
+        self.valor = valor
+        self.error = error
+        self.duracion = duracion
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def obtener(self):
+        """Retorna el valor, o lanza el error con el que terminó la llamada."""
+        if self.error is not None:
+            raise self.error
+        return self.valor
+
+
+def _config(nombre, default):
+    if has_app_context():
+        return current_app.config.get(nombre, default)
+    return default
+
+
+def _obtener_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(_config('ORQUESTACION_MAX_WORKERS', MAX_WORKERS)),
+                thread_name_prefix='orquestacion'
+            )
+        return _executor
+
+
+def _en_contexto(app, funcion):
+    """Envuelve la llamada para que corra con el contexto de aplicación del llamador y capture su error."""
+    def ejecutar(*args, **kwargs):
+        inicio = time.monotonic()
+        try:
+            if app is None:
+                return Resultado(valor=funcion(*args, **kwargs), duracion=time.monotonic() - inicio)
+            with app.app_context():
+                return Resultado(valor=funcion(*args, **kwargs), duracion=time.monotonic() - inicio)
+        except Exception as e:
+            return Resultado(error=e, duracion=time.monotonic() - inicio)
+    return ejecutar
+
+
+def ejecutar_en_paralelo(llamadas, plazo=None):
+    """
+    Ejecuta llamadas independientes en paralelo.
+
+    Args:
+        llamadas (dict): {nombre: Llamada}
+        plazo (float, optional): Segundos máximos para todas las llamadas
+            (default ORQUESTACION_PLAZO_GLOBAL)
+
+    Returns:
+        dict: {nombre: Resultado}; las llamadas que fallan o exceden su tiempo
+        quedan con `error` (LlamadaTimeoutError si fue por tiempo)
+    """
+    if plazo is None:
+        plazo = float(_config('ORQUESTACION_PLAZO_GLOBAL', PLAZO_GLOBAL))
+    timeout_default = float(_config('ORQUESTACION_TIMEOUT_LLAMADA', TIMEOUT_LLAMADA))
+    app = current_app._get_current_object() if has_app_context() else None
+
+    executor = _obtener_executor()
+    inicio = time.monotonic()
+    futuros = {
+        nombre: executor.submit(_en_contexto(app, llamada.funcion), *llamada.args, **llamada.kwargs)
+        for nombre, llamada in llamadas.items()
+    }
+
+    resultados = {}
+    for nombre, futuro in futuros.items():
+        timeout = llamadas[nombre].timeout or timeout_default
+        # Los tiempos se cuentan desde que se lanzaron las llamadas: se espera
+        # lo que le queda a cada una, sin pasar del plazo global
+        limite = min(timeout, plazo)
+        restante = max(0.0, limite - (time.monotonic() - inicio))
+        try:
+            resultados[nombre] = futuro.result(timeout=restante)
+        except FuturesTimeoutError:
+            futuro.cancel()
+            resultados[nombre] = Resultado(error=LlamadaTimeoutError(nombre, limite), duracion=limite)
+    return resultados
@@ -2,10 +2,16 @@
 Servicio para interactuar con el microservicio de pedidos.
 """
 import os
+import calendar
 import requests
 import logging
 from flask import current_app
 from datetime import datetime
+from src.services.clientes import IDS_POR_LOTE, obtener_clientes_por_ids, obtener_clientes_por_zona
+from src.services.concurrencia import Llamada, ejecutar_en_paralelo
+
+# Estados que no cuentan como venta en los reportes
+ESTADOS_NO_VENTA = ('cancelado', 'rechazado', 'anulado')
 
 
 class PedidosServiceError(Exception):
@@ -16,10 +22,17 @@ class PedidosServiceError(Exception):
         self.status_code = status_code
 
 
+def _rango_mes(mes, anio):
+    """Primer y último día del mes en formato YYYY-MM-DD (filtros fecha_desde/fecha_hasta)."""
+    ultimo_dia = calendar.monthrange(anio, mes)[1]
+    return f"{anio:04d}-{mes:02d}-01", f"{anio:04d}-{mes:02d}-{ultimo_dia:02d}"
+
+
 def obtener_pedidos_vendedor(vendedor_id, mes=None, anio=None):
     """
     Obtiene los pedidos de un vendedor desde el microservicio de pedidos.
-    Filtra por mes y año si se proporcionan.
+    Filtra por mes y año si se proporcionan; el filtro lo aplica el
+    microservicio (fecha_desde/fecha_hasta), así solo se descarga ese mes.
     
     Args:
         vendedor_id (str): ID del vendedor
@@ -50,10 +63,13 @@ def obtener_pedidos_vendedor(vendedor_id, mes=None, anio=None):
             logging.getLogger(__name__).warning(msg)
 
     try:
-        # Llamar al endpoint de pedidos con filtro de vendedor
+        # Llamar al endpoint de pedidos con filtro de vendedor (y del mes)
+        params = {'vendedor_id': vendedor_id}
+        if mes is not None and anio is not None:
+            params['fecha_desde'], params['fecha_hasta'] = _rango_mes(mes, anio)
         response = requests.get(
             f"{pedidos_url}/pedido",
-            params={'vendedor_id': vendedor_id},
+            params=params,
             timeout=10
         )
         response.raise_for_status()
@@ -61,7 +77,8 @@ def obtener_pedidos_vendedor(vendedor_id, mes=None, anio=None):
         data = response.json()
         pedidos = data.get('data', [])
         
-        # Si se proporcionaron mes y año, filtrar por fecha
+        # Si se proporcionaron mes y año, filtrar por fecha (también cubre una
+        # versión anterior del microservicio que ignore fecha_desde/fecha_hasta)
         if mes is not None and anio is not None:
             pedidos_filtrados = []
             for pedido in pedidos:
@@ -104,10 +121,105 @@ def obtener_pedidos_vendedor(vendedor_id, mes=None, anio=None):
             'detalle': str(e)
         }, 500)
 
+def obtener_resumen_pedidos_vendedor(vendedor_id, mes, anio, excluir_estados=ESTADOS_NO_VENTA):
+    """
+    Obtiene los totales de pedidos de un vendedor en un mes, leídos de los
+    resúmenes mensuales del microservicio de pedidos (GET /pedido/ventas-mensuales).
+    El costo no depende de la cantidad de pedidos del vendedor.
+
+    Args:
+        vendedor_id (str): ID del vendedor
+        mes (int): Mes (1-12)
+        anio (int): Año
+        excluir_estados (iterable): Estados que no cuentan en los totales
+
+    Returns:
+        dict: {'total_pedidos', 'monto_total', 'clientes_unicos', 'por_estado'}
+
+    Raises:
+        PedidosServiceError: Si ocurre un error de conexión o del microservicio
+    """
+    return obtener_ventas_mensuales_vendedores([vendedor_id], mes, anio, excluir_estados)[str(vendedor_id)]
+
+
+def obtener_ventas_mensuales_vendedores(vendedor_ids, mes, anio, excluir_estados=ESTADOS_NO_VENTA):
+    """
+    Obtiene en una sola llamada los totales del mes de varios vendedores
+    (GET /pedido/ventas-mensuales con los ids separados por coma).
+
+    Args:
+        vendedor_ids (iterable): IDs de vendedores
+        mes (int): Mes (1-12)
+        anio (int): Año
+        excluir_estados (iterable): Estados que no cuentan en los totales
+
+    Returns:
+        dict: {vendedor_id (str): {'total_pedidos', 'monto_total', 'clientes_unicos', 'por_estado'}};
+        los vendedores sin ventas tienen totales en cero
+
+    Raises:
+        PedidosServiceError: Si ocurre un error de conexión o del microservicio
+    """
+    pedidos_url = os.environ.get('PEDIDOS_URL', 'http://localhost:5012')
+    vendedor_ids = [str(v) for v in vendedor_ids]
+
+    try:
+        response = requests.get(
+            f"{pedidos_url}/pedido/ventas-mensuales",
+            params={
+                'vendedor_id': ','.join(vendedor_ids),
+                'periodo': f"{anio:04d}-{mes:02d}",
+                'excluir_estados': ','.join(excluir_estados)
+            },
+            timeout=10
+        )
+        response.raise_for_status()
+        ventas = {str(v.get('vendedor_id')): v for v in response.json().get('data', [])}
+        resultado = {}
+        for vendedor_id in vendedor_ids:
+            resumen = ventas.get(vendedor_id, {})
+            resultado[vendedor_id] = {
+                'total_pedidos': resumen.get('total_pedidos', 0),
+                'monto_total': resumen.get('monto_total', 0),
+                'clientes_unicos': resumen.get('clientes_unicos', 0),
+                'por_estado': resumen.get('por_estado', {})
+            }
+        return resultado
+    except requests.exceptions.HTTPError as e:
+        current_app.logger.error(f"Error del microservicio de pedidos en ventas mensuales: {e.response.text}")
+        try:
+            error_data = e.response.json()
+        except Exception:
+            error_data = {'error': e.response.text, 'codigo': 'ERROR_INESPERADO'}
+        raise PedidosServiceError(error_data, e.response.status_code)
+    except requests.exceptions.RequestException as e:
+        current_app.logger.error(f"Error de conexión con microservicio de pedidos: {str(e)}")
+        raise PedidosServiceError({
+            'error': 'Error de conexión con el microservicio de pedidos',
+            'codigo': 'ERROR_CONEXION'
+        }, 503)
+
+
+def _enriquecer_con_cliente(pedido, cliente):
+    """Copia del pedido con la zona y ubicación de su cliente (si se conocen)."""
+    pedido_enriquecido = pedido.copy()
+    if cliente:
+        if cliente.get('zona'):
+            pedido_enriquecido['cliente_zona'] = cliente['zona']
+        if cliente.get('ubicacion'):
+            pedido_enriquecido['cliente_ubicacion'] = cliente['ubicacion']
+    return pedido_enriquecido
+
+
 def listar_pedidos(vendedor_id=None, cliente_id=None, zona=None, estado=None, headers=None):
     """
     Obtiene la lista de pedidos del microservicio externo.
-    Si se especifica zona, filtra los pedidos por la zona del cliente.
+    Si se especifica zona, solo se piden al microservicio los pedidos de los
+    clientes de esa zona.
+
+    Los pedidos se enriquecen con la zona y ubicación del cliente resolviendo
+    todos los clientes del listado en llamadas masivas (GET /cliente?ids=),
+    con una cache corta (ver src.services.clientes).
 
     Args:
         vendedor_id (str, optional): Filtro por ID de vendedor.
@@ -123,7 +235,6 @@ def listar_pedidos(vendedor_id=None, cliente_id=None, zona=None, estado=None, he
         PedidosServiceError: Si ocurre un error de conexión o del microservicio.
     """
     pedidos_url = os.environ.get('PEDIDOS_URL', 'http://localhost:5012')
-    clientes_url = os.environ.get('CLIENTES_URL', 'http://localhost:5010')
     
     # Construir parámetros de consulta
     params = {}
@@ -140,71 +251,70 @@ def listar_pedidos(vendedor_id=None, cliente_id=None, zona=None, estado=None, he
         request_headers.update(headers)
     
     try:
-        # Obtener pedidos del microservicio
-        response = requests.get(
-            f"{pedidos_url}/pedido",
-            params=params,
-            headers=request_headers,
-            timeout=10
-        )
-        response.raise_for_status()
+        clientes = {}
+        lotes_params = [params]
         
-        pedidos_data = response.json()
+        if zona:
+            # Filtrar en origen: solo los pedidos de clientes de la zona
+            clientes = obtener_clientes_por_zona(zona, request_headers)
+            ids_zona = list(clientes)
+            if cliente_id:
+                ids_zona = [i for i in ids_zona if i == str(cliente_id)]
+            if not ids_zona:
+                current_app.logger.info(f"Pedidos filtrados por zona '{zona}': 0 encontrados")
+                return {'data': []}
+            lotes_params = [
+                {**params, 'cliente_id': ','.join(ids_zona[inicio:inicio + IDS_POR_LOTE])}
+                for inicio in range(0, len(ids_zona), IDS_POR_LOTE)
+            ]
         
-        # Enriquecer pedidos con información del cliente (zona y ubicación)
-        pedidos_enriquecidos = []
-        pedidos_filtrados_por_zona = []
+        # Obtener pedidos del microservicio (varios lotes de clientes se piden en paralelo)
+        def _obtener_lote(lote):
+            response = requests.get(
+                f"{pedidos_url}/pedido",
+                params=lote,
+                headers=request_headers,
+                timeout=10
+            )
+            response.raise_for_status()
+            return response.json().get('data', [])
+
+        if len(lotes_params) == 1:
+            pedidos = _obtener_lote(lotes_params[0])
+        else:
+            resultados = ejecutar_en_paralelo({
+                indice: Llamada(_obtener_lote, lote) for indice, lote in enumerate(lotes_params)
+            })
+            pedidos = []
+            for indice in range(len(lotes_params)):
+                pedidos.extend(resultados[indice].obtener())
+            pedidos.sort(key=lambda p: p.get('fecha_pedido') or '', reverse=True)
         
-        for pedido in pedidos_data.get('data', []):
-            pedido_enriquecido = pedido.copy()
-            
+        # Enriquecer pedidos con información del cliente (zona y ubicación)
+        if not zona:
             try:
-                cliente_id_pedido = pedido.get('cliente_id')
-                if cliente_id_pedido:
-                    # Llamada al microservicio de clientes para obtener zona y ubicación
-                    cliente_response = requests.get(
-                        f"{clientes_url}/cliente/{cliente_id_pedido}",
-                        headers=request_headers,
-                        timeout=5
-                    )
-                    cliente_response.raise_for_status()
-                    cliente_data = cliente_response.json()
-                    
-                    # Agregar zona y ubicación del cliente al pedido
-                    cliente_info = cliente_data.get('data', {})
-                    zona_cliente = cliente_info.get('zona')
-                    ubicacion_cliente = cliente_info.get('ubicacion')
-                    
-                    if zona_cliente:
-                        pedido_enriquecido['cliente_zona'] = zona_cliente
-                    if ubicacion_cliente:
-                        pedido_enriquecido['cliente_ubicacion'] = ubicacion_cliente
-                    
-                    # Si se filtra por zona, verificar si coincide
-                    if zona:
-                        if zona_cliente == zona:
-                            pedidos_filtrados_por_zona.append(pedido_enriquecido)
-                    else:
-                        pedidos_enriquecidos.append(pedido_enriquecido)
-                else:
-                    # Si no hay cliente_id, agregar sin enriquecer
-                    if not zona:
-                        pedidos_enriquecidos.append(pedido_enriquecido)
-                        
+                clientes = obtener_clientes_por_ids(
+                    (p.get('cliente_id') for p in pedidos if p.get('cliente_id')),
+                    request_headers
+                )
             except requests.exceptions.RequestException as e:
-                current_app.logger.warning(f"Error obteniendo info de cliente {cliente_id_pedido}: {str(e)}")
-                # Agregar pedido sin información del cliente
-                if not zona:
-                    pedidos_enriquecidos.append(pedido_enriquecido)
-                continue
+                current_app.logger.warning(f"Error obteniendo info de clientes: {str(e)}")
+                # Devolver los pedidos sin información del cliente
+                clientes = {}
+        
+        pedidos_enriquecidos = [
+            _enriquecer_con_cliente(pedido, clientes.get(str(pedido.get('cliente_id'))))
+            for pedido in pedidos
+        ]
         
         # Retornar según si se filtró por zona o no
         if zona:
-            current_app.logger.info(f"Pedidos filtrados por zona '{zona}': {len(pedidos_filtrados_por_zona)} encontrados")
-            return {'data': pedidos_filtrados_por_zona}
+            # Por si el microservicio de pedidos ignora la lista de clientes
+            pedidos_enriquecidos = [p for p in pedidos_enriquecidos if p.get('cliente_zona') == zona]
+            current_app.logger.info(f"Pedidos filtrados por zona '{zona}': {len(pedidos_enriquecidos)} encontrados")
         else:
             current_app.logger.info(f"Pedidos listados exitosamente: {len(pedidos_enriquecidos)} pedidos enriquecidos")
-            return {'data': pedidos_enriquecidos}
+        return {'data': pedidos_enriquecidos}
         
     except requests.exceptions.HTTPError as e:
         current_app.logger.error(f"Error del microservicio de pedidos: {e.response.text}")
@@ -2,10 +2,17 @@ import os
 import requests
 from flask import current_app
 from src.services.auth import register_user, AuthServiceError
-from src.services.pedidos import obtener_pedidos_vendedor, PedidosServiceError
+from src.services.pedidos import (
+    obtener_resumen_pedidos_vendedor, obtener_ventas_mensuales_vendedores, PedidosServiceError
+)
+from src.services.concurrencia import Llamada, LlamadaTimeoutError, ejecutar_en_paralelo
 from datetime import datetime
 from decimal import Decimal
 
+# Vendedores y planes por página al generar reportes de todos los vendedores
+# (máximo aceptado por el microservicio de vendedores)
+TAMANO_PAGINA_REPORTE = 100
+
 class VendedorServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de vendedores."""
     def __init__(self, message, status_code):
@@ -355,10 +362,26 @@ def obtener_plan_venta_externo(plan_id):
         }, 500)
 
 
+def _validar_mes_anio(mes, anio):
+    """Valida el periodo de un reporte de ventas."""
+    if not isinstance(mes, int) or mes < 1 or mes > 12:
+        raise VendedorServiceError({
+            'error': 'El mes debe ser un número entre 1 y 12',
+            'codigo': 'MES_INVALIDO'
+        }, 400)
+    
+    if not isinstance(anio, int) or anio < 2020 or anio > 2050:
+        raise VendedorServiceError({
+            'error': 'El año debe estar entre 2020 y 2050',
+            'codigo': 'ANIO_INVALIDO'
+        }, 400)
+
+
 def generar_reporte_ventas_vendedor(vendedor_id, mes, anio):
     """
     Genera datos agregados para el reporte de ventas de un vendedor.
-    Orquesta llamadas a microservicios de vendedores y pedidos.
+    Orquesta llamadas a microservicios de vendedores y pedidos, en paralelo
+    (la latencia es la de la llamada más lenta, no la suma).
     
     Args:
         vendedor_id (str): ID del vendedor
@@ -377,56 +400,40 @@ def generar_reporte_ventas_vendedor(vendedor_id, mes, anio):
     """
     try:
         # Validar mes y año
-        if not isinstance(mes, int) or mes < 1 or mes > 12:
-            raise VendedorServiceError({
-                'error': 'El mes debe ser un número entre 1 y 12',
-                'codigo': 'MES_INVALIDO'
-            }, 400)
-        
-        if not isinstance(anio, int) or anio < 2020 or anio > 2050:
-            raise VendedorServiceError({
-                'error': 'El año debe estar entre 2020 y 2050',
-                'codigo': 'ANIO_INVALIDO'
-            }, 400)
-        
-        # 1. Obtener información del vendedor
-        vendedor = obtener_detalle_vendedor_externo(vendedor_id)
+        _validar_mes_anio(mes, anio)
         
-        # 2. Construir periodo en formato YYYY-MM
+        # Construir periodo en formato YYYY-MM
         periodo = f"{anio:04d}-{mes:02d}"
         
-        # 3. Obtener planes de venta del vendedor para ese periodo
-        planes_response = listar_planes_venta_externo(
-            vendedor_id=vendedor_id,
-            periodo=periodo,
-            page=1,
-            size=100  # Asumiendo que un vendedor no tiene más de 100 planes en un mes
-        )
-        
-        planes = planes_response.get('items', [])
-        
-        # 4. Obtener pedidos del vendedor para ese mes/año
-        try:
-            pedidos = obtener_pedidos_vendedor(vendedor_id, mes, anio)
-        except PedidosServiceError as e:
-            current_app.logger.error(f"Error al obtener pedidos: {str(e)}")
-            # Si no se pueden obtener pedidos, continuar con datos vacíos
-            pedidos = []
+        # Las consultas no dependen entre sí: se hacen en paralelo
+        resultados = ejecutar_en_paralelo({
+            # 1. Información del vendedor
+            'vendedor': Llamada(obtener_detalle_vendedor_externo, vendedor_id),
+            # 2. Planes de venta del vendedor para ese periodo
+            'planes': Llamada(
+                listar_planes_venta_externo,
+                vendedor_id=vendedor_id,
+                periodo=periodo,
+                page=1,
+                size=100  # Asumiendo que un vendedor no tiene más de 100 planes en un mes
+            ),
+            # 3. Totales del mes leídos de los resúmenes mensuales del microservicio de pedidos
+            # (excluye cancelados/rechazados/anulados)
+            'resumen': Llamada(obtener_resumen_pedidos_vendedor, vendedor_id, mes, anio),
+        })
         
-        # 5. Calcular métricas
-        # Agrupar pedidos por estado
-        # Incluir todos los pedidos excepto cancelados/rechazados
-        pedidos_completados = [p for p in pedidos if p.get('estado') not in ['cancelado', 'rechazado', 'anulado']]
+        vendedor = _resultado_vendedores(resultados['vendedor'])
+        planes = _resultado_vendedores(resultados['planes']).get('items', [])
         
-        # Clientes únicos
-        clientes_unicos = set(p.get('cliente_id') for p in pedidos_completados if p.get('cliente_id'))
+        # Si no se pueden obtener los pedidos, continuar con datos vacíos
+        resumen = _resultado_pedidos(resultados['resumen'], 'resumen de pedidos', {})
         
         # Totales de ventas
-        total_ventas = len(pedidos_completados)
-        monto_total = sum(float(p.get('total', 0)) for p in pedidos_completados)
+        total_ventas = int(resumen.get('total_pedidos', 0))
+        monto_total = float(resumen.get('monto_total', 0))
         monto_promedio = monto_total / total_ventas if total_ventas > 0 else 0
         
-        # 6. Calcular métricas por plan y totales generales
+        # Calcular métricas por plan y totales generales
         planes_con_metricas = []
         meta_ingresos_total = Decimal('0')
         
@@ -466,11 +473,10 @@ def generar_reporte_ventas_vendedor(vendedor_id, mes, anio):
                 'ventas_realizadas': total_ventas,
                 'monto_total': round(monto_total, 2),
                 'monto_promedio': round(monto_promedio, 2),
-                'clientes_unicos': len(clientes_unicos),
+                'clientes_unicos': int(resumen.get('clientes_unicos', 0)),
                 'meta_ingresos_total': float(meta_ingresos_total),
                 'cumplimiento_porcentaje': float(round(cumplimiento_total, 2))
-            },
-            'pedidos_detalle': pedidos_completados  # Para análisis adicional si se necesita
+            }
         }
         
     except VendedorServiceError:
@@ -485,6 +491,120 @@ def generar_reporte_ventas_vendedor(vendedor_id, mes, anio):
         }, 500)
 
 
+def _ultima_pagina(respuesta, cantidad, page):
+    """True si una página de TAMANO_PAGINA_REPORTE es la última del listado."""
+    total = respuesta.get('total')
+    return cantidad < TAMANO_PAGINA_REPORTE or (total is not None and page * TAMANO_PAGINA_REPORTE >= total)
+
+
+def _metas_por_vendedor(periodo):
+    """
+    Suma las metas de ingresos de los planes del periodo por vendedor.
+
+    Los planes del periodo se recorren por páginas (cada plan trae sus
+    vendedores), sin consultar a cada vendedor por separado.
+    """
+    metas = {}
+    page = 1
+    while True:
+        respuesta = listar_planes_venta_externo(periodo=periodo, page=page, size=TAMANO_PAGINA_REPORTE)
+        planes = respuesta.get('items', [])
+        for plan in planes:
+            meta = Decimal(str(plan.get('meta_ingresos', 0)))
+            for vendedor in plan.get('vendedores') or []:
+                vendedor_id = str(vendedor.get('id'))
+                metas[vendedor_id] = metas.get(vendedor_id, Decimal('0')) + meta
+        if _ultima_pagina(respuesta, len(planes), page):
+            return metas
+        page += 1
+
+
+def iterar_reporte_ventas_vendedores(mes, anio, zona=None):
+    """
+    Genera, vendedor por vendedor, las métricas de ventas de un mes para
+    todos los vendedores (o los de una zona).
+
+    Los vendedores se leen por páginas y las ventas de cada página se piden
+    al microservicio de pedidos en una sola llamada, así la memoria usada no
+    depende de la cantidad de vendedores y no hay una llamada por vendedor.
+    El periodo se valida y los planes se leen antes de devolver el generador.
+
+    Args:
+        mes (int): Mes (1-12)
+        anio (int): Año (ej: 2025)
+        zona (str, optional): Solo los vendedores de esta zona
+
+    Returns:
+        generator: dicts con vendedor_id, nombre_completo, correo, zona,
+        ventas_realizadas, monto_total, monto_promedio, clientes_unicos,
+        meta_ingresos y cumplimiento_porcentaje
+
+    Raises:
+        VendedorServiceError: Si el periodo es inválido o falla un microservicio
+    """
+    _validar_mes_anio(mes, anio)
+    metas = _metas_por_vendedor(f"{anio:04d}-{mes:02d}")
+
+    def filas():
+        page = 1
+        while True:
+            respuesta = listar_vendedores(zona=zona, page=page, size=TAMANO_PAGINA_REPORTE)
+            vendedores = respuesta.get('items', [])
+            if not vendedores:
+                return
+            try:
+                ventas = obtener_ventas_mensuales_vendedores([v.get('id') for v in vendedores], mes, anio)
+            except PedidosServiceError as e:
+                raise VendedorServiceError(e.message, e.status_code)
+
+            for vendedor in vendedores:
+                vendedor_id = str(vendedor.get('id'))
+                resumen = ventas[vendedor_id]
+                total_ventas = int(resumen.get('total_pedidos', 0))
+                monto_total = float(resumen.get('monto_total', 0))
+                meta = metas.get(vendedor_id, Decimal('0'))
+                cumplimiento = (Decimal(str(monto_total)) / meta * 100) if meta > 0 else Decimal('0')
+                yield {
+                    'vendedor_id': vendedor_id,
+                    'nombre_completo': f"{vendedor.get('nombre', '')} {vendedor.get('apellidos', '')}".strip(),
+                    'correo': vendedor.get('correo'),
+                    'zona': vendedor.get('zona', 'N/A'),
+                    'ventas_realizadas': total_ventas,
+                    'monto_total': round(monto_total, 2),
+                    'monto_promedio': round(monto_total / total_ventas, 2) if total_ventas > 0 else 0,
+                    'clientes_unicos': int(resumen.get('clientes_unicos', 0)),
+                    'meta_ingresos': float(meta),
+                    'cumplimiento_porcentaje': float(round(cumplimiento, 2))
+                }
+
+            if _ultima_pagina(respuesta, len(vendedores), page):
+                return
+            page += 1
+
+    return filas()
+
+
+def _resultado_vendedores(resultado):
+    """Valor de una llamada requerida por el reporte; un timeout se reporta como 504."""
+    try:
+        return resultado.obtener()
+    except LlamadaTimeoutError as e:
+        current_app.logger.error(f"Timeout en el reporte de ventas: {str(e)}")
+        raise VendedorServiceError({
+            'error': 'Un microservicio no respondió a tiempo',
+            'codigo': 'TIMEOUT_MICROSERVICIO'
+        }, 504)
+
+
+def _resultado_pedidos(resultado, descripcion, vacio):
+    """Valor de una llamada opcional del reporte; si falló se registra y se usa `vacio`."""
+    try:
+        return resultado.obtener()
+    except (PedidosServiceError, LlamadaTimeoutError) as e:
+        current_app.logger.error(f"Error al obtener {descripcion}: {str(e)}")
+        return vacio
+
+
 def _obtener_nombre_mes(mes):
     """Retorna el nombre del mes en español."""
     meses = {
@@ -375,3 +375,60 @@ def test_obtener_detalle_vendedor_error_servicio_generico(mock_obtener_detalle,
     json_data = response.get_json()
     assert 'error' in json_data
     mock_obtener_detalle.assert_called_once_with('v123')
+
+# ==================== Tests para exportar_reporte_ventas_vendedores ====================
+
+def _fila_reporte(vendedor_id, monto):
+    return {
+        'vendedor_id': vendedor_id, 'nombre_completo': f'Vendedor {vendedor_id}', 'correo': f'{vendedor_id}@test.com',
+        'zona': 'Norte', 'ventas_realizadas': 2, 'monto_total': monto, 'monto_promedio': monto / 2,
+        'clientes_unicos': 1, 'meta_ingresos': 1000.0, 'cumplimiento_porcentaje': monto / 10
+    }
+
+@patch('src.blueprints.vendedores.iterar_reporte_ventas_vendedores')
+def test_exportar_reporte_ventas_vendedores_csv(mock_iterar, client, access_token):
+    mock_iterar.return_value = iter([_fila_reporte('v1', 100.0), _fila_reporte('v2', 250.5)])
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    response = client.get('/vendedor/reporte-ventas?mes=3&anio=2025&zona=Norte', headers=headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert 'reporte_ventas_vendedores_2025_03.csv' in response.headers['Content-Disposition']
+    lineas = response.get_data(as_text=True).splitlines()
+    assert lineas[0].startswith('Vendedor ID,Nombre')
+    assert lineas[1] == 'v1,Vendedor v1,v1@test.com,Norte,2,100.00,50.00,1,1000.00,10.00'
+    assert lineas[2].startswith('v2,')
+    mock_iterar.assert_called_once_with(3, 2025, zona='Norte')
+
+@patch('src.blueprints.vendedores.iterar_reporte_ventas_vendedores')
+def test_exportar_reporte_ventas_vendedores_error_inicial(mock_iterar, client, access_token):
+    mock_iterar.side_effect = VendedorServiceError({'error': 'El mes debe ser un número entre 1 y 12', 'codigo': 'MES_INVALIDO'}, 400)
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    response = client.get('/vendedor/reporte-ventas?mes=13&anio=2025', headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['codigo'] == 'MES_INVALIDO'
+
+@patch('src.blueprints.vendedores.iterar_reporte_ventas_vendedores')
+def test_exportar_reporte_ventas_vendedores_error_durante_exportacion(mock_iterar, client, access_token):
+    def filas():
+        yield _fila_reporte('v1', 100.0)
+        raise VendedorServiceError({'error': 'caído'}, 503)
+    mock_iterar.return_value = filas()
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    response = client.get('/vendedor/reporte-ventas?mes=3&anio=2025', headers=headers)
+
+    lineas = response.get_data(as_text=True).splitlines()
+    assert response.status_code == 200
+    assert lineas[1].startswith('v1,')
+    assert lineas[-1].startswith('ERROR,Reporte incompleto')
+
+def test_exportar_reporte_ventas_vendedores_parametros_faltantes(client, access_token):
+    headers = {'Authorization': f'Bearer {access_token}'}
+    response = client.get('/vendedor/reporte-ventas?mes=3', headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['codigo'] == 'PARAMETROS_FALTANTES'
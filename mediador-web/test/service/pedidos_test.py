@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 import requests
 from src.services.pedidos import listar_pedidos, PedidosServiceError
+from src.services.clientes import limpiar_cache_clientes
 from flask import Flask
 
 @pytest.fixture
@@ -15,6 +16,12 @@ def provide_app_context(app):
     with app.app_context():
         yield
 
+@pytest.fixture(autouse=True)
+def cache_clientes_vacia():
+    limpiar_cache_clientes()
+    yield
+    limpiar_cache_clientes()
+
 # ==================== Tests para listar_pedidos ====================
 
 @patch('src.services.pedidos.requests.get')
@@ -28,21 +35,12 @@ def test_listar_pedidos_exito(mock_get):
         ]
     }
     
-    # Mock de respuestas del servicio de clientes
-    mock_cliente1_response = {
-        'data': {
-            'id': 'cli-1',
-            'zona': 'Norte',
-            'ubicacion': 'Calle 123'
-        }
-    }
-    
-    mock_cliente2_response = {
-        'data': {
-            'id': 'cli-2',
-            'zona': 'Sur',
-            'ubicacion': 'Carrera 456'
-        }
+    # Mock de respuesta del servicio de clientes (una sola consulta por ids)
+    mock_clientes_response = {
+        'data': [
+            {'id': 'cli-1', 'zona': 'Norte', 'ubicacion': 'Calle 123'},
+            {'id': 'cli-2', 'zona': 'Sur', 'ubicacion': 'Carrera 456'}
+        ]
     }
     
     # Configurar el mock para que retorne diferentes respuestas según la URL
@@ -54,10 +52,8 @@ def test_listar_pedidos_exito(mock_get):
         
         if '/pedido' in url:
             mock_response.json.return_value = mock_pedidos_response
-        elif '/cliente/cli-1' in url:
-            mock_response.json.return_value = mock_cliente1_response
-        elif '/cliente/cli-2' in url:
-            mock_response.json.return_value = mock_cliente2_response
+        elif url.endswith('/cliente'):
+            mock_response.json.return_value = mock_clientes_response
         
         return mock_response
     
@@ -77,8 +73,9 @@ def test_listar_pedidos_exito(mock_get):
         assert result['data'][1]['cliente_zona'] == 'Sur'
         assert result['data'][1]['cliente_ubicacion'] == 'Carrera 456'
         
-        # Verificar que se hicieron las 3 llamadas (1 pedidos + 2 clientes)
-        assert mock_get.call_count == 3
+        # Verificar que se hicieron 2 llamadas (1 pedidos + 1 clientes por ids)
+        assert mock_get.call_count == 2
+        assert mock_get.call_args_list[1][1]['params'] == {'ids': 'cli-1,cli-2'}
         mock_logger.info.assert_called_once()
 
 @patch('src.services.pedidos.requests.get')
@@ -91,11 +88,9 @@ def test_listar_pedidos_con_filtros(mock_get):
     }
     
     mock_cliente_response = {
-        'data': {
-            'id': 'cli-123',
-            'zona': 'Centro',
-            'ubicacion': 'Calle Principal'
-        }
+        'data': [
+            {'id': 'cli-123', 'zona': 'Centro', 'ubicacion': 'Calle Principal'}
+        ]
     }
     
     def side_effect_get(*args, **kwargs):
@@ -106,7 +101,7 @@ def test_listar_pedidos_con_filtros(mock_get):
         
         if '/pedido' in url:
             mock_response.json.return_value = mock_pedidos_response
-        elif '/cliente/cli-123' in url:
+        elif url.endswith('/cliente'):
             mock_response.json.return_value = mock_cliente_response
         
         return mock_response
@@ -330,3 +325,95 @@ def test_listar_pedidos_con_variable_entorno(mock_get):
                 timeout=10
             )
 
+
+@patch('src.services.pedidos.requests.get')
+def test_listar_pedidos_por_zona_filtra_en_origen(mock_get):
+    """Con zona, se consultan los clientes de la zona y solo sus pedidos"""
+    def side_effect_get(url, params=None, **kwargs):
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        if url.endswith('/cliente'):
+            mock_response.json.return_value = {'data': [
+                {'id': 1, 'zona': 'Norte', 'ubicacion': 'Calle 1'},
+                {'id': 2, 'zona': 'Norte', 'ubicacion': 'Calle 2'},
+                {'id': 3, 'zona': 'Sur', 'ubicacion': 'Calle 3'}
+            ]}
+        else:
+            mock_response.json.return_value = {'data': [
+                {'id': 'ped-1', 'cliente_id': 1, 'fecha_pedido': '2025-01-15T10:00:00'},
+                {'id': 'ped-2', 'cliente_id': 2, 'fecha_pedido': '2025-01-16T10:00:00'}
+            ]}
+        return mock_response
+
+    mock_get.side_effect = side_effect_get
+
+    with patch('src.services.pedidos.current_app'):
+        result = listar_pedidos(vendedor_id='ven-1', zona='Norte')
+
+    assert [p['id'] for p in result['data']] == ['ped-1', 'ped-2']
+    assert all(p['cliente_zona'] == 'Norte' for p in result['data'])
+    assert result['data'][1]['cliente_ubicacion'] == 'Calle 2'
+
+    assert mock_get.call_count == 2
+    assert mock_get.call_args_list[0][1]['params'] == {'zona': 'Norte'}
+    assert mock_get.call_args_list[1][1]['params'] == {'vendedor_id': 'ven-1', 'cliente_id': '1,2'}
+
+@patch('src.services.pedidos.requests.get')
+def test_listar_pedidos_zona_sin_clientes_no_consulta_pedidos(mock_get):
+    """Si la zona no tiene clientes no se consulta el microservicio de pedidos"""
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    mock_response.json.return_value = {'data': []}
+    mock_get.return_value = mock_response
+
+    with patch('src.services.pedidos.current_app'):
+        result = listar_pedidos(zona='Oriente')
+
+    assert result == {'data': []}
+    assert mock_get.call_count == 1
+    assert mock_get.call_args[0][0].endswith('/cliente')
+
+@patch('src.services.pedidos.requests.get')
+def test_listar_pedidos_reutiliza_clientes_en_cache(mock_get):
+    """Un segundo listado con los mismos clientes no vuelve a consultarlos"""
+    def side_effect_get(url, params=None, **kwargs):
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        if url.endswith('/cliente'):
+            mock_response.json.return_value = {'data': [{'id': 7, 'zona': 'Centro'}]}
+        else:
+            mock_response.json.return_value = {'data': [
+                {'id': 'ped-1', 'cliente_id': 7},
+                {'id': 'ped-2', 'cliente_id': 7}
+            ]}
+        return mock_response
+
+    mock_get.side_effect = side_effect_get
+
+    with patch('src.services.pedidos.current_app'):
+        listar_pedidos()
+        result = listar_pedidos()
+
+    assert all(p['cliente_zona'] == 'Centro' for p in result['data'])
+    urls = [c[0][0] for c in mock_get.call_args_list]
+    assert sum(1 for u in urls if u.endswith('/cliente')) == 1
+    assert mock_get.call_args_list[1][1]['params'] == {'ids': '7'}
+
+@patch('src.services.pedidos.requests.get')
+def test_listar_pedidos_error_clientes_devuelve_sin_enriquecer(mock_get):
+    """Si falla el microservicio de clientes se devuelven los pedidos sin enriquecer"""
+    def side_effect_get(url, params=None, **kwargs):
+        if url.endswith('/cliente'):
+            raise requests.exceptions.ConnectionError("clientes caído")
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {'data': [{'id': 'ped-1', 'cliente_id': 1}]}
+        return mock_response
+
+    mock_get.side_effect = side_effect_get
+
+    with patch('src.services.pedidos.current_app') as mock_current_app:
+        result = listar_pedidos()
+
+    assert result['data'] == [{'id': 'ped-1', 'cliente_id': 1}]
+    mock_current_app.logger.warning.assert_called_once()
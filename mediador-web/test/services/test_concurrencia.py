@@ -0,0 +1,86 @@
+"""
+Tests unitarios para la ejecución en paralelo de llamadas a microservicios.
+"""
+import threading
+import time
+
+import pytest
+from flask import Flask, current_app
+
+from src.services.concurrencia import Llamada, LlamadaTimeoutError, ejecutar_en_paralelo
+
+
+class TestEjecutarEnParalelo:
+    """Tests para ejecutar_en_paralelo"""
+
+    def test_llamadas_corren_en_paralelo(self):
+        """Test: la duración total es la de la llamada más lenta, no la suma"""
+        barrera = threading.Barrier(3, timeout=2)
+
+        def llamada(valor):
+            # Solo avanza si las tres llamadas están corriendo al mismo tiempo
+            barrera.wait()
+            time.sleep(0.1)
+            return valor
+
+        inicio = time.monotonic()
+        resultados = ejecutar_en_paralelo({nombre: Llamada(llamada, nombre) for nombre in ('a', 'b', 'c')})
+
+        assert {nombre: r.obtener() for nombre, r in resultados.items()} == {'a': 'a', 'b': 'b', 'c': 'c'}
+        assert time.monotonic() - inicio < 0.25
+
+    def test_error_queda_en_su_resultado(self):
+        """Test: el error de una llamada no afecta a las demás"""
+        def falla():
+            raise ValueError('sin datos')
+
+        resultados = ejecutar_en_paralelo({
+            'ok': Llamada(lambda x, y=0: x + y, 1, y=2),
+            'falla': Llamada(falla)
+        })
+
+        assert resultados['ok'].ok and resultados['ok'].obtener() == 3
+        assert not resultados['falla'].ok
+        with pytest.raises(ValueError):
+            resultados['falla'].obtener()
+
+    def test_timeout_por_llamada(self):
+        """Test: una llamada lenta se reporta como timeout sin esperar a que termine"""
+        liberar = threading.Event()
+
+        inicio = time.monotonic()
+        resultados = ejecutar_en_paralelo({
+            'lenta': Llamada(liberar.wait, 5, timeout=0.1),
+            'rapida': Llamada(lambda: 'listo')
+        })
+        liberar.set()
+
+        assert time.monotonic() - inicio < 1
+        assert resultados['rapida'].obtener() == 'listo'
+        with pytest.raises(LlamadaTimeoutError) as exc:
+            resultados['lenta'].obtener()
+        assert exc.value.nombre == 'lenta'
+
+    def test_plazo_global(self):
+        """Test: el plazo global limita todas las llamadas"""
+        liberar = threading.Event()
+
+        inicio = time.monotonic()
+        resultados = ejecutar_en_paralelo({
+            'a': Llamada(liberar.wait, 5),
+            'b': Llamada(liberar.wait, 5)
+        }, plazo=0.1)
+        liberar.set()
+
+        assert time.monotonic() - inicio < 1
+        assert all(isinstance(r.error, LlamadaTimeoutError) for r in resultados.values())
+
+    def test_llamadas_usan_contexto_de_aplicacion(self):
+        """Test: las llamadas ven la configuración de la app del llamador"""
+        app = Flask(__name__)
+        app.config['VALOR'] = 'desde-app'
+
+        with app.app_context():
+            resultados = ejecutar_en_paralelo({'config': Llamada(lambda: current_app.config['VALOR'])})
+
+        assert resultados['config'].obtener() == 'desde-app'
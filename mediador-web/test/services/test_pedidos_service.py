@@ -3,7 +3,7 @@ Tests unitarios para el servicio de pedidos.
 """
 import pytest
 from unittest.mock import patch, MagicMock
-from src.services.pedidos import obtener_pedidos_vendedor, PedidosServiceError
+from src.services.pedidos import obtener_pedidos_vendedor, obtener_resumen_pedidos_vendedor, PedidosServiceError
 
 
 class TestObtenerPedidosVendedor:
@@ -80,6 +80,12 @@ class TestObtenerPedidosVendedor:
         # Assert - solo debe retornar el pedido de enero
         assert len(resultado) == 1
         assert resultado[0]['id'] == 1
+        # El rango del mes se envía al microservicio
+        assert mock_get.call_args.kwargs['params'] == {
+            'vendedor_id': 'v123',
+            'fecha_desde': '2025-01-01',
+            'fecha_hasta': '2025-01-31'
+        }
     
     @patch('src.services.pedidos.requests.get')
     def test_obtener_pedidos_error_conexion(self, mock_get):
@@ -110,3 +116,54 @@ class TestObtenerPedidosVendedor:
         # Assert
         assert len(resultado) == 0
         assert isinstance(resultado, list)
+
+
+class TestObtenerResumenPedidosVendedor:
+    """Tests para obtener_resumen_pedidos_vendedor"""
+    
+    @patch('src.services.pedidos.requests.get')
+    def test_obtener_resumen_del_mes(self, mock_get):
+        """Test: pide al microservicio el resumen del mes excluyendo ventas anuladas"""
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'data': [{
+            'vendedor_id': 'v123', 'periodo': '2024-02',
+            'total_pedidos': 3, 'monto_total': 120.0, 'clientes_unicos': 2, 'por_estado': {}
+        }]}
+        mock_get.return_value = mock_response
+        
+        # Act
+        resultado = obtener_resumen_pedidos_vendedor('v123', 2, 2024)
+        
+        # Assert
+        assert resultado == {'total_pedidos': 3, 'monto_total': 120.0, 'clientes_unicos': 2, 'por_estado': {}}
+        assert mock_get.call_args.args[0].endswith('/pedido/ventas-mensuales')
+        assert mock_get.call_args.kwargs['params'] == {
+            'vendedor_id': 'v123',
+            'periodo': '2024-02',
+            'excluir_estados': 'cancelado,rechazado,anulado'
+        }
+    
+    @patch('src.services.pedidos.requests.get')
+    def test_obtener_resumen_vendedor_sin_ventas(self, mock_get):
+        """Test: un vendedor sin resumen en el mes tiene totales en cero"""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {'data': []}
+        mock_get.return_value = mock_response
+        
+        resultado = obtener_resumen_pedidos_vendedor('v123', 3, 2024)
+        
+        assert resultado == {'total_pedidos': 0, 'monto_total': 0, 'clientes_unicos': 0, 'por_estado': {}}
+    
+    @patch('src.services.pedidos.requests.get')
+    def test_obtener_resumen_error_conexion(self, mock_get):
+        """Test: error de conexión con microservicio"""
+        import requests
+        from flask import Flask
+        mock_get.side_effect = requests.exceptions.ConnectionError('Connection failed')
+        
+        with Flask(__name__).app_context():
+            with pytest.raises(PedidosServiceError) as exc:
+                obtener_resumen_pedidos_vendedor('v123', 1, 2025)
+        
+        assert exc.value.status_code == 503
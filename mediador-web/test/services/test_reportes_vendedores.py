@@ -3,20 +3,21 @@ Tests unitarios para la generación de reportes de ventas.
 """
 import pytest
 from unittest.mock import patch, MagicMock
+from flask import Flask
 from src.services.vendedores import generar_reporte_ventas_vendedor, VendedorServiceError
 
 
 class TestGenerarReporteVentas:
     """Tests para generar_reporte_ventas_vendedor"""
     
-    @patch('src.services.vendedores.obtener_pedidos_vendedor')
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
     @patch('src.services.vendedores.listar_planes_venta_externo')
     @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
     def test_generar_reporte_con_datos_completos(
         self, 
         mock_vendedor, 
         mock_planes, 
-        mock_pedidos
+        mock_resumen
     ):
         """Test: generar reporte con datos completos"""
         # Arrange
@@ -40,22 +41,7 @@ class TestGenerarReporteVentas:
             ]
         }
         
-        mock_pedidos.return_value = [
-            {
-                'id': 1,
-                'total': 1500.50,
-                'cliente_id': 100,
-                'estado': 'completado',
-                'fecha_pedido': '2025-01-15T10:30:00'
-            },
-            {
-                'id': 2,
-                'total': 2000.00,
-                'cliente_id': 101,
-                'estado': 'completado',
-                'fecha_pedido': '2025-01-20T14:00:00'
-            }
-        ]
+        mock_resumen.return_value = {'total_pedidos': 2, 'monto_total': 3500.50, 'clientes_unicos': 2}
         
         # Act
         resultado = generar_reporte_ventas_vendedor('v123', 1, 2025)
@@ -69,14 +55,14 @@ class TestGenerarReporteVentas:
         assert resultado['metricas']['clientes_unicos'] == 2
         assert len(resultado['planes']) == 1
     
-    @patch('src.services.vendedores.obtener_pedidos_vendedor')
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
     @patch('src.services.vendedores.listar_planes_venta_externo')
     @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
     def test_generar_reporte_sin_ventas(
         self, 
         mock_vendedor, 
         mock_planes, 
-        mock_pedidos
+        mock_resumen
     ):
         """Test: generar reporte cuando no hay ventas"""
         # Arrange
@@ -100,7 +86,7 @@ class TestGenerarReporteVentas:
             ]
         }
         
-        mock_pedidos.return_value = []
+        mock_resumen.return_value = {'total_pedidos': 0, 'monto_total': 0, 'clientes_unicos': 0, 'por_estado': {}}
         
         # Act
         resultado = generar_reporte_ventas_vendedor('v123', 1, 2025)
@@ -129,14 +115,14 @@ class TestGenerarReporteVentas:
         assert exc.value.status_code == 400
         assert 'ANIO_INVALIDO' in str(exc.value.message)
     
-    @patch('src.services.vendedores.obtener_pedidos_vendedor')
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
     @patch('src.services.vendedores.listar_planes_venta_externo')
     @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
     def test_generar_reporte_calcula_cumplimiento(
         self, 
         mock_vendedor, 
         mock_planes, 
-        mock_pedidos
+        mock_resumen
     ):
         """Test: verificar cálculo de porcentaje de cumplimiento"""
         # Arrange
@@ -160,15 +146,7 @@ class TestGenerarReporteVentas:
             ]
         }
         
-        mock_pedidos.return_value = [
-            {
-                'id': 1,
-                'total': 5000.00,  # 50% de la meta
-                'cliente_id': 100,
-                'estado': 'completado',
-                'fecha_pedido': '2025-01-15T10:30:00'
-            }
-        ]
+        mock_resumen.return_value = {'total_pedidos': 1, 'monto_total': 5000.00, 'clientes_unicos': 1}
         
         # Act
         resultado = generar_reporte_ventas_vendedor('v123', 1, 2025)
@@ -177,3 +155,130 @@ class TestGenerarReporteVentas:
         assert resultado['metricas']['monto_total'] == 5000.00
         assert resultado['metricas']['meta_ingresos_total'] == 10000.00
         assert resultado['metricas']['cumplimiento_porcentaje'] == 50.00
+
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
+    @patch('src.services.vendedores.listar_planes_venta_externo')
+    @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
+    def test_generar_reporte_usa_resumen_del_mes(
+        self,
+        mock_vendedor,
+        mock_planes,
+        mock_resumen
+    ):
+        """Test: las métricas vienen del resumen calculado por pedidos, no de sumar la lista"""
+        from src.services.pedidos import PedidosServiceError
+        mock_vendedor.return_value = {'id': 'v123', 'nombre': 'Juan', 'apellidos': 'Pérez'}
+        mock_planes.return_value = {'items': []}
+        mock_resumen.return_value = {'total_pedidos': 4, 'monto_total': 400.0, 'clientes_unicos': 3}
+
+        with Flask(__name__).app_context():
+            resultado = generar_reporte_ventas_vendedor('v123', 2, 2025)
+
+        mock_resumen.assert_called_once_with('v123', 2, 2025)
+        assert resultado['metricas']['ventas_realizadas'] == 4
+        assert resultado['metricas']['monto_promedio'] == 100.0
+        assert resultado['metricas']['clientes_unicos'] == 3
+        assert 'pedidos_detalle' not in resultado
+
+        mock_resumen.side_effect = PedidosServiceError({'error': 'down'}, 503)
+        with Flask(__name__).app_context():
+            resultado = generar_reporte_ventas_vendedor('v123', 2, 2025)
+        assert resultado['metricas']['ventas_realizadas'] == 0
+
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
+    @patch('src.services.vendedores.listar_planes_venta_externo')
+    @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
+    def test_generar_reporte_consulta_en_paralelo(
+        self,
+        mock_vendedor,
+        mock_planes,
+        mock_resumen
+    ):
+        """Test: las tres consultas corren al mismo tiempo"""
+        import threading
+        barrera = threading.Barrier(3, timeout=2)
+
+        def en_paralelo(valor):
+            def llamada(*args, **kwargs):
+                barrera.wait()  # falla si alguna consulta espera a otra
+                return valor
+            return llamada
+
+        mock_vendedor.side_effect = en_paralelo({'id': 'v123', 'nombre': 'Juan', 'apellidos': 'Pérez'})
+        mock_planes.side_effect = en_paralelo({'items': []})
+        mock_resumen.side_effect = en_paralelo({'total_pedidos': 1, 'monto_total': 10.0, 'clientes_unicos': 1})
+
+        with Flask(__name__).app_context():
+            resultado = generar_reporte_ventas_vendedor('v123', 2, 2025)
+
+        assert resultado['vendedor']['nombre_completo'] == 'Juan Pérez'
+        assert resultado['metricas']['ventas_realizadas'] == 1
+
+    @patch('src.services.vendedores.obtener_resumen_pedidos_vendedor')
+    @patch('src.services.vendedores.listar_planes_venta_externo')
+    @patch('src.services.vendedores.obtener_detalle_vendedor_externo')
+    def test_generar_reporte_timeout_vendedor(
+        self,
+        mock_vendedor,
+        mock_planes,
+        mock_resumen
+    ):
+        """Test: si el microservicio de vendedores no responde a tiempo se retorna 504"""
+        import threading
+        liberar = threading.Event()
+        mock_vendedor.side_effect = lambda *args: liberar.wait(5)
+        mock_planes.return_value = {'items': []}
+        mock_resumen.return_value = {}
+
+        app = Flask(__name__)
+        app.config['ORQUESTACION_PLAZO_GLOBAL'] = 0.1
+        with app.app_context():
+            with pytest.raises(VendedorServiceError) as exc:
+                generar_reporte_ventas_vendedor('v123', 2, 2025)
+        liberar.set()
+
+        assert exc.value.status_code == 504
+        assert exc.value.message['codigo'] == 'TIMEOUT_MICROSERVICIO'
+
+
+class TestIterarReporteVentasVendedores:
+    """Tests para iterar_reporte_ventas_vendedores"""
+
+    @patch('src.services.vendedores.TAMANO_PAGINA_REPORTE', 2)
+    @patch('src.services.vendedores.obtener_ventas_mensuales_vendedores')
+    @patch('src.services.vendedores.listar_vendedores')
+    @patch('src.services.vendedores.listar_planes_venta_externo')
+    def test_recorre_vendedores_por_pagina_con_ventas_en_bloque(self, mock_planes, mock_vendedores, mock_ventas):
+        """Test: una llamada de ventas por página de vendedores, metas sumadas desde los planes"""
+        from src.services.vendedores import iterar_reporte_ventas_vendedores
+        mock_planes.return_value = {'items': [
+            {'meta_ingresos': 1000, 'vendedores': [{'id': 'v1'}, {'id': 'v3'}]},
+            {'meta_ingresos': 500, 'vendedores': [{'id': 'v1'}]},
+        ], 'total': 2}
+        paginas = {
+            1: {'items': [{'id': 'v1', 'nombre': 'Ana'}, {'id': 'v2', 'nombre': 'Luis'}], 'total': 3},
+            2: {'items': [{'id': 'v3', 'nombre': 'Eva'}], 'total': 3},
+        }
+        mock_vendedores.side_effect = lambda zona=None, page=1, size=10: paginas[page]
+        mock_ventas.side_effect = lambda ids, mes, anio: {
+            i: {'total_pedidos': 3, 'monto_total': 750.0, 'clientes_unicos': 2} for i in ids
+        }
+
+        filas = list(iterar_reporte_ventas_vendedores(4, 2025, zona='Norte'))
+
+        assert [f['vendedor_id'] for f in filas] == ['v1', 'v2', 'v3']
+        assert filas[0]['meta_ingresos'] == 1500.0
+        assert filas[0]['cumplimiento_porcentaje'] == 50.0
+        assert filas[0]['monto_promedio'] == 250.0
+        assert filas[1]['meta_ingresos'] == 0.0
+        assert filas[2]['cumplimiento_porcentaje'] == 75.0
+        assert [c.args[0] for c in mock_ventas.call_args_list] == [['v1', 'v2'], ['v3']]
+        assert all(c.kwargs['zona'] == 'Norte' for c in mock_vendedores.call_args_list)
+        mock_planes.assert_called_once_with(periodo='2025-04', page=1, size=2)
+
+    def test_periodo_invalido(self):
+        """Test: el periodo se valida antes de generar filas"""
+        from src.services.vendedores import iterar_reporte_ventas_vendedores
+        with pytest.raises(VendedorServiceError) as exc:
+            iterar_reporte_ventas_vendedores(0, 2025)
+        assert exc.value.message['codigo'] == 'MES_INVALIDO'
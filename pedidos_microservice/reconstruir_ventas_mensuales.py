@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Reconstrucción de los resúmenes mensuales de ventas a partir de los pedidos.
+
+Se ejecuta una vez al desplegar los resúmenes (las tablas se crean vacías) o
+para corregirlos. Es seguro correrlo con réplicas del servicio atendiendo
+pedidos: mientras reconstruye, las escrituras sobre pedidos esperan al commit.
+
+Uso:
+    python reconstruir_ventas_mensuales.py
+"""
+import json
+import os
+import sys
+
+if os.path.exists(".env"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def main():
+    from src import create_app
+    from src.models.pedios import db
+    from src.services.ventas_mensuales import reconstruir_ventas_mensuales
+
+    app = create_app()
+    with app.app_context():
+        try:
+            resumenes = reconstruir_ventas_mensuales()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    print(json.dumps({'resumenes': resumenes}, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
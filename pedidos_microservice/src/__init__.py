@@ -1,7 +1,9 @@
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from src.config.config import Config
-from src.models.pedios import db
+from src.models.pedios import Pedido, db
+from src.models.pedidos_productos import PedidoProducto
+from src.models.ventas_mensuales import VentaMensual
 from src.blueprints.health import health_bp
 from src.blueprints.pedidos import pedidos_bp
 
@@ -26,7 +28,12 @@ def create_app(config_class=Config):
     app.register_blueprint(pedidos_bp)
     
     # Crear tablas de la base de datos
+    # (los resúmenes mensuales se pueblan con reconstruir_ventas_mensuales.py)
     with app.app_context():
         db.create_all()
+        # create_all no agrega índices nuevos a tablas que ya existen
+        for tabla in (Pedido.__table__, PedidoProducto.__table__):
+            for indice in tabla.indexes:
+                indice.create(bind=db.engine, checkfirst=True)
     
     return app
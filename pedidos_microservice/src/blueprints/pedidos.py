@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify, current_app
 
-from src.services.pedidos import PedidoServiceError, detalle_pedido, registrar_pedido, listar_pedidos
+from src.services.pedidos import (
+    PedidoServiceError, detalle_pedido, registrar_pedido, registrar_pedidos_lote, listar_pedidos, resumen_pedidos,
+    resumen_ventas_mensuales
+)
 
 # Crear el blueprint para clientes
 pedidos_bp = Blueprint('pedido', __name__)
@@ -24,18 +27,50 @@ def crear_pedido():
         }), 500
 
 
+@pedidos_bp.route('/pedido/lote', methods=['POST'])
+def crear_pedidos_lote():
+    """
+    Endpoint para registrar varios pedidos a la vez (sincronización offline)
+    Body: {"pedidos": [ {cliente_id, total, productos, vendedor_id}, ... ]}
+    """
+    try:
+        data = request.get_json(silent=True)
+        response_data = registrar_pedidos_lote(data)
+        return jsonify(response_data), 201 if response_data['rechazados'] == 0 else 207
+    except PedidoServiceError as e:
+        return jsonify(e.message), e.status_code
+    except Exception as e:
+        current_app.logger.error(f"Error en crear lote de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor',
+            'codigo': 'ERROR_INTERNO_SERVIDOR',
+        }), 500
+
+
 @pedidos_bp.route('/pedido', methods=['GET'])
 def obtener_pedidos():
     """
     Endpoint para listar pedidos. Soporta query params opcionales:
     - vendedor_id
     - cliente_id
+    - estado
+    - fecha_desde / fecha_hasta: rango de fecha_pedido (YYYY-MM-DD o ISO 8601, inclusivo)
+    - limit: tamaño de página (sin limit se devuelven todos)
+    - cursor: next_cursor de la página anterior
     """
     try:
         vendedor_id = request.args.get('vendedor_id')
         cliente_id = request.args.get('cliente_id')
         estado = request.args.get('estado')
-        pedidos = listar_pedidos(vendedor_id=vendedor_id, cliente_id=cliente_id, estado=estado)
+        pedidos = listar_pedidos(
+            vendedor_id=vendedor_id,
+            cliente_id=cliente_id,
+            estado=estado,
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor'),
+            fecha_desde=request.args.get('fecha_desde'),
+            fecha_hasta=request.args.get('fecha_hasta')
+        )
         return jsonify(pedidos), 200
     except PedidoServiceError as e:
         return jsonify(e.message), e.status_code
@@ -46,6 +81,63 @@ def obtener_pedidos():
             'codigo': 'ERROR_INTERNO_SERVIDOR',
         }), 500
     
+@pedidos_bp.route('/pedido/resumen', methods=['GET'])
+def obtener_resumen_pedidos():
+    """
+    Endpoint con totales de pedidos calculados en la base de datos. Query params opcionales:
+    - vendedor_id
+    - cliente_id
+    - fecha_desde / fecha_hasta
+    - excluir_estados: estados separados por coma que no cuentan en los totales
+    """
+    try:
+        resumen = resumen_pedidos(
+            vendedor_id=request.args.get('vendedor_id'),
+            cliente_id=request.args.get('cliente_id'),
+            fecha_desde=request.args.get('fecha_desde'),
+            fecha_hasta=request.args.get('fecha_hasta'),
+            excluir_estados=request.args.get('excluir_estados')
+        )
+        return jsonify(resumen), 200
+    except PedidoServiceError as e:
+        return jsonify(e.message), e.status_code
+    except Exception as e:
+        current_app.logger.error(f"Error en obtener resumen de pedidos: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor',
+            'codigo': 'ERROR_INTERNO_SERVIDOR',
+        }), 500
+
+
+@pedidos_bp.route('/pedido/ventas-mensuales', methods=['GET'])
+def obtener_ventas_mensuales():
+    """
+    Endpoint con los totales de ventas de uno o varios vendedores en un mes,
+    leídos de los resúmenes mensuales. Query params:
+    - periodo: mes en formato YYYY-MM (requerido)
+    - vendedor_id: uno o varios separados por coma (opcional; sin él, todos)
+    - excluir_estados: estados separados por coma que no cuentan en los totales
+    """
+    try:
+        periodo = request.args.get('periodo')
+        if not periodo:
+            return jsonify({'error': 'Periodo requerido', 'codigo': 'PERIODO_REQUERIDO'}), 400
+        ventas = resumen_ventas_mensuales(
+            periodo,
+            vendedor_ids=request.args.get('vendedor_id'),
+            excluir_estados=request.args.get('excluir_estados')
+        )
+        return jsonify(ventas), 200
+    except PedidoServiceError as e:
+        return jsonify(e.message), e.status_code
+    except Exception as e:
+        current_app.logger.error(f"Error en obtener ventas mensuales: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor',
+            'codigo': 'ERROR_INTERNO_SERVIDOR',
+        }), 500
+
+
 @pedidos_bp.route('/pedido/<int:pedido_id>', methods=['GET'])
 def obtener_detalle_pedido(pedido_id):
     """
@@ -29,3 +29,8 @@ class Config:
     
     # Configuración de bcrypt
     BCRYPT_LOG_ROUNDS = 12
+    
+    # Tamaño máximo de página al listar pedidos con ?limit=
+    PEDIDOS_LIMITE_MAX = int(os.environ.get('PEDIDOS_LIMITE_MAX', 500))
+    # Pedidos máximos por llamada a POST /pedido/lote
+    PEDIDOS_LOTE_MAX = int(os.environ.get('PEDIDOS_LOTE_MAX', 200))
@@ -11,7 +11,7 @@ class PedidoProducto(db.Model):
     __tablename__ = 'pedido_producto'
 
     id = db.Column(db.Integer, primary_key=True)
-    pedido_id = db.Column(db.Integer, nullable=False)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id', ondelete='CASCADE'), nullable=False, index=True)
     producto_id = db.Column(db.Integer, nullable=False)
     cantidad = db.Column(db.Integer, nullable=False)
     precio = db.Column(db.Float, nullable=False)
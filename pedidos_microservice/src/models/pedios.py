@@ -11,6 +11,12 @@ class Pedido(db.Model):
     Modelo de pedido
     """
     __tablename__ = 'pedidos'
+    # Historiales por vendedor, cliente o estado: filtro + orden por fecha en un solo índice
+    __table_args__ = (
+        db.Index('idx_pedidos_vendedor_fecha', 'vendedor_id', 'fecha_pedido'),
+        db.Index('idx_pedidos_cliente_fecha', 'cliente_id', 'fecha_pedido'),
+        db.Index('idx_pedidos_estado_fecha', 'estado', 'fecha_pedido'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     # Store related entity IDs without enforcing cross-service foreign key constraints
@@ -0,0 +1,35 @@
+# Resúmenes de ventas por vendedor, mes y estado (se mantienen al crear pedidos
+# o cambiar su estado; ver src.services.ventas_mensuales)
+from src.models.pedios import db
+
+
+class VentaMensual(db.Model):
+    """
+    Pedidos y monto de un vendedor en un mes (YYYY-MM) para un estado
+    """
+    __tablename__ = 'ventas_mensuales'
+
+    vendedor_id = db.Column(db.String, primary_key=True)
+    periodo = db.Column(db.String(7), primary_key=True)
+    estado = db.Column(db.String(50), primary_key=True)
+    pedidos = db.Column(db.Integer, nullable=False, default=0)
+    monto = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VentaMensual {self.vendedor_id} {self.periodo} {self.estado}>'
+
+
+class VentaMensualCliente(db.Model):
+    """
+    Pedidos de cada cliente dentro de un resumen mensual (para contar clientes únicos)
+    """
+    __tablename__ = 'ventas_mensuales_clientes'
+
+    vendedor_id = db.Column(db.String, primary_key=True)
+    periodo = db.Column(db.String(7), primary_key=True)
+    estado = db.Column(db.String(50), primary_key=True)
+    cliente_id = db.Column(db.Integer, primary_key=True)
+    pedidos = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VentaMensualCliente {self.vendedor_id} {self.periodo} {self.estado} {self.cliente_id}>'
@@ -1,7 +1,14 @@
 
+import base64
+import json
+from datetime import datetime, timedelta
+
 from flask import current_app
+from sqlalchemy import distinct, func, insert, select, tuple_
 from src.models.pedidos_productos import PedidoProducto
 from src.models.pedios import Pedido, db
+from src.models.ventas_mensuales import VentaMensual, VentaMensualCliente
+from src.services import ventas_mensuales
 
 
 class PedidoServiceError(Exception):
@@ -11,11 +18,13 @@ class PedidoServiceError(Exception):
         self.message = message
         self.status_code = status_code
 
-def registrar_pedido(data):
-    """
-    Función para registrar un nuevo pedido
+def _validar_pedido(data):
     """
+    Valida los datos de un pedido antes de guardarlo.
 
+    Raises:
+        PedidoServiceError: 400 con el código del error de validación
+    """
     if data is None:
         raise PedidoServiceError({'error': 'No se proporcionaron datos'}, 400)
 
@@ -34,71 +43,277 @@ def registrar_pedido(data):
     if (data['productos'] == []):
         raise PedidoServiceError({'error': 'El pedido debe contener al menos un producto', 'codigo': 'PRODUCTOS_VACIO'}, 400)
 
-    try:
-        pedido = Pedido(
+    for prod in data['productos']:
+        if not isinstance(prod, dict) or any(prod.get(campo) is None for campo in ('id', 'cantidad', 'precio')):
+            raise PedidoServiceError({
+                'error': 'Cada producto requiere id, cantidad y precio',
+                'codigo': 'PRODUCTO_INVALIDO'
+            }, 400)
+
+
+def _crear_pedidos(datos):
+    """
+    Agrega pedidos y sus productos a la sesión actual, sin hacer commit.
+
+    Los pedidos se insertan juntos (un flush para obtener sus ids) y todas las
+    líneas de producto en un solo INSERT con múltiples filas. También se suman
+    a los resúmenes mensuales de ventas de su vendedor.
+
+    Args:
+        datos (list): pedidos ya validados
+
+    Returns:
+        list: instancias de Pedido en el mismo orden que `datos`
+    """
+    pedidos = [
+        Pedido(
             cliente_id=data['cliente_id'],
             estado='pendiente',
             total=data['total'],
             vendedor_id=data.get('vendedor_id')
         )
-        pedido.save()
-        for prod in data['productos']:
-            pedido_producto = PedidoProducto(
-                pedido_id=pedido.id,
-                producto_id=prod['id'],
-                cantidad=prod['cantidad'],
-                precio=prod['precio']
-            )
-            pedido_producto.save()
-        
+        for data in datos
+    ]
+    db.session.add_all(pedidos)
+    db.session.flush()
+    ventas_mensuales.registrar_pedidos(pedidos)
+
+    lineas = [
+        {
+            'pedido_id': pedido.id,
+            'producto_id': prod['id'],
+            'cantidad': prod['cantidad'],
+            'precio': prod['precio']
+        }
+        for pedido, data in zip(pedidos, datos)
+        for prod in data['productos']
+    ]
+    db.session.execute(insert(PedidoProducto), lineas)
+    return pedidos
+
+
+def registrar_pedido(data):
+    """
+    Función para registrar un nuevo pedido
+
+    El pedido y todos sus productos se guardan en una sola transacción: o
+    queda completo o no queda nada.
+    """
+    _validar_pedido(data)
+
+    try:
+        pedido = _crear_pedidos([data])[0]
+        db.session.commit()
         return pedido.to_dict()
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Error al guardar el pedido: {str(e)}")
         raise PedidoServiceError({'error': 'Error al guardar el pedido', 'codigo': 'ERROR_GUARDAR_PEDIDO'}, 500)
+
+
+def registrar_pedidos_lote(data):
+    """
+    Registra varios pedidos a la vez (sincronización de pedidos tomados sin conexión).
+
+    Los pedidos inválidos se reportan por posición y no impiden guardar los
+    demás. Los válidos se guardan todos en una sola transacción; si la base
+    de datos falla no se guarda ninguno y el lote completo puede reintentarse.
+
+    Args:
+        data (dict): {'pedidos': [ {cliente_id, total, productos, vendedor_id}, ... ]}
+
+    Returns:
+        dict: {'creados': n, 'rechazados': m, 'resultados': [ ... ]} con un
+        resultado por pedido, en el mismo orden del lote
+    """
+    pedidos_lote = data.get('pedidos') if isinstance(data, dict) else None
+    if not isinstance(pedidos_lote, list) or not pedidos_lote:
+        raise PedidoServiceError({'error': 'Se requiere una lista "pedidos" no vacía', 'codigo': 'LOTE_VACIO'}, 400)
+
+    lote_max = current_app.config.get('PEDIDOS_LOTE_MAX', 200)
+    if len(pedidos_lote) > lote_max:
+        raise PedidoServiceError({
+            'error': f'El lote admite máximo {lote_max} pedidos',
+            'codigo': 'LOTE_DEMASIADO_GRANDE'
+        }, 400)
+
+    resultados = [None] * len(pedidos_lote)
+    validos = []
+    for indice, pedido_data in enumerate(pedidos_lote):
+        try:
+            _validar_pedido(pedido_data)
+            validos.append(indice)
+        except PedidoServiceError as e:
+            resultados[indice] = {'indice': indice, 'status': e.status_code, **e.message}
+        except Exception:
+            resultados[indice] = {'indice': indice, 'status': 400, 'error': 'Pedido inválido', 'codigo': 'PEDIDO_INVALIDO'}
+
+    if validos:
+        try:
+            pedidos = _crear_pedidos([pedidos_lote[indice] for indice in validos])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error al guardar el lote de pedidos: {str(e)}")
+            raise PedidoServiceError({'error': 'Error al guardar el lote de pedidos', 'codigo': 'ERROR_GUARDAR_LOTE'}, 500)
+
+        for indice, pedido in zip(validos, pedidos):
+            resultados[indice] = {'indice': indice, 'status': 201, 'data': pedido.to_dict()}
+
+    return {
+        'creados': len(validos),
+        'rechazados': len(pedidos_lote) - len(validos),
+        'resultados': resultados
+    }
     
 
-def listar_pedidos(vendedor_id=None, cliente_id=None, estado=None):
+def _codificar_cursor(pedido):
+    """Cursor opaco con la posición (fecha_pedido, id) del último pedido de la página."""
+    posicion = json.dumps([pedido.fecha_pedido.isoformat(), pedido.id])
+    return base64.urlsafe_b64encode(posicion.encode('utf-8')).decode('ascii')
+
+
+def _decodificar_cursor(cursor):
+    try:
+        fecha, pedido_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(fecha), int(pedido_id)
+    except Exception:
+        raise PedidoServiceError({'error': 'Cursor inválido', 'codigo': 'CURSOR_INVALIDO'}, 400)
+
+
+def _parsear_fecha(valor, nombre, fin=False):
+    """
+    Convierte un filtro de fecha (YYYY-MM-DD o ISO con hora) a datetime.
+
+    Con `fin=True` el límite es inclusivo y se devuelve el primer instante
+    posterior, para comparar con `<`: una fecha sin hora incluye el día completo.
+    """
+    if valor is None or str(valor).strip() == '':
+        return None
+    texto = str(valor).strip()
+    try:
+        fecha = datetime.fromisoformat(texto.replace('Z', '+00:00'))
+    except ValueError:
+        raise PedidoServiceError({
+            'error': f'El parámetro {nombre} debe tener formato YYYY-MM-DD o ISO 8601',
+            'codigo': 'FECHA_INVALIDA'
+        }, 400)
+    # fecha_pedido se guarda en UTC sin zona horaria
+    if fecha.tzinfo is not None:
+        fecha = (fecha - fecha.utcoffset()).replace(tzinfo=None)
+    if fin:
+        return fecha + (timedelta(days=1) if len(texto) == 10 else timedelta(microseconds=1))
+    return fecha
+
+
+def _aplicar_filtros(query, vendedor_id=None, cliente_id=None, estado=None, fecha_desde=None, fecha_hasta=None):
+    """Aplica los filtros comunes del listado y del resumen (solo los que vienen con valor)."""
+    # Apply filters only when provided (not None and not empty string)
+    if vendedor_id is not None and str(vendedor_id) != '':
+        # vendedor_id is stored as string in the model; compare as string
+        query = query.filter(Pedido.vendedor_id == str(vendedor_id))
+
+    if cliente_id is not None and str(cliente_id) != '':
+        # Acepta un id o varios separados por coma (ej. los clientes de una zona)
+        clientes = []
+        for valor in str(cliente_id).split(','):
+            if valor.strip() == '':
+                continue
+            try:
+                clientes.append(int(valor))
+            except Exception:
+                # if cannot convert, keep as-is so filter will likely not match
+                clientes.append(valor.strip())
+        if len(clientes) == 1:
+            query = query.filter(Pedido.cliente_id == clientes[0])
+        else:
+            query = query.filter(Pedido.cliente_id.in_(clientes))
+
+    if estado is not None and str(estado).strip() != '':
+        query = query.filter(Pedido.estado == str(estado).strip())
+
+    if fecha_desde is not None:
+        query = query.filter(Pedido.fecha_pedido >= fecha_desde)
+    if fecha_hasta is not None:
+        query = query.filter(Pedido.fecha_pedido < fecha_hasta)
+
+    return query
+
+
+def listar_pedidos(vendedor_id=None, cliente_id=None, estado=None, limit=None, cursor=None,
+                   fecha_desde=None, fecha_hasta=None):
     """
     Lista pedidos. Filtros opcionales por vendedor_id, cliente_id y estado.
     Ordena por fecha_pedido descendente para mostrar historial más reciente primero.
 
+    El conteo de productos de cada pedido se obtiene en la misma consulta
+    (subconsulta correlacionada), y con `limit` se pagina por (fecha_pedido, id):
+    cada página es una lectura por índice, sin OFFSET, sin importar qué tan
+    largo sea el historial.
+
     Args:
         vendedor_id (str|int|None): id del vendedor para filtrar
-        cliente_id (int|None): id del cliente para filtrar
+        cliente_id (int|str|None): id del cliente, o varios separados por coma
         estado (str|None): estado del pedido (pendiente, en_proceso, despachado, entregado, cancelado)
+        limit (int|None): tamaño de página; None devuelve todos los pedidos
+        cursor (str|None): `next_cursor` de la página anterior
+        fecha_desde (str|None): fecha_pedido mínima (YYYY-MM-DD o ISO 8601)
+        fecha_hasta (str|None): fecha_pedido máxima, inclusiva; sin hora incluye el día completo
 
     Returns:
-        dict: {'data': [ ... ]}
+        dict: {'data': [ ... ]} y, al paginar, 'next_cursor' (None en la última página)
     """
+    if limit is not None:
+        limite_max = current_app.config.get('PEDIDOS_LIMITE_MAX', 500)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if limit < 1 or limit > limite_max:
+            raise PedidoServiceError({
+                'error': f'El parámetro limit debe estar entre 1 y {limite_max}',
+                'codigo': 'LIMITE_INVALIDO'
+            }, 400)
+    if cursor and limit is None:
+        raise PedidoServiceError({'error': 'El cursor requiere el parámetro limit', 'codigo': 'CURSOR_SIN_LIMITE'}, 400)
+    posicion = _decodificar_cursor(cursor) if cursor else None
+    desde = _parsear_fecha(fecha_desde, 'fecha_desde')
+    hasta = _parsear_fecha(fecha_hasta, 'fecha_hasta', fin=True)
+
     try:
-        query = Pedido.query
+        total_productos = (
+            select(func.count(PedidoProducto.id))
+            .where(PedidoProducto.pedido_id == Pedido.id)
+            .correlate(Pedido)
+            .scalar_subquery()
+        )
+        query = db.session.query(Pedido, total_productos.label('total_productos'))
+        query = _aplicar_filtros(query, vendedor_id, cliente_id, estado, desde, hasta)
 
-        # Apply filters only when provided (not None and not empty string)
-        if vendedor_id is not None and str(vendedor_id) != '':
-            # vendedor_id is stored as string in the model; compare as string
-            query = query.filter(Pedido.vendedor_id == str(vendedor_id))
+        if posicion is not None:
+            query = query.filter(tuple_(Pedido.fecha_pedido, Pedido.id) < tuple_(*posicion))
 
-        if cliente_id is not None and str(cliente_id) != '':
-            try:
-                cliente_int = int(cliente_id)
-            except Exception:
-                # if cannot convert, keep as-is so filter will likely not match
-                cliente_int = cliente_id
-            query = query.filter(Pedido.cliente_id == cliente_int)
+        # Orden por fecha de creación (desc); el id desempata pedidos de la misma fecha
+        query = query.order_by(Pedido.fecha_pedido.desc(), Pedido.id.desc())
+        if limit is not None:
+            # Un registro extra indica si hay página siguiente
+            query = query.limit(limit + 1)
 
-        if estado is not None and str(estado).strip() != '':
-            query = query.filter(Pedido.estado == str(estado).strip())
+        filas = query.all()
+        hay_mas = limit is not None and len(filas) > limit
+        if hay_mas:
+            filas = filas[:limit]
 
-        # Orden por fecha de creación (desc)
-        query = query.order_by(Pedido.fecha_pedido.desc())
-        pedidos = query.all()
         resultado = []
-        for pedido in pedidos:
+        for pedido, cantidad_productos in filas:
             item = pedido.to_dict()
-            pedido_productos = PedidoProducto.query.filter(PedidoProducto.pedido_id == pedido.id).count()
-            item['total_productos'] = pedido_productos
+            item['total_productos'] = cantidad_productos
             resultado.append(item)
-        return {'data': resultado}
+
+        respuesta = {'data': resultado}
+        if limit is not None:
+            respuesta['next_cursor'] = _codificar_cursor(filas[-1][0]) if hay_mas else None
+        return respuesta
     except PedidoServiceError:
         # allow service errors to bubble up
         raise
@@ -107,6 +322,122 @@ def listar_pedidos(vendedor_id=None, cliente_id=None, estado=None):
         raise PedidoServiceError({'error': 'Error al listar pedidos', 'codigo': 'ERROR_LISTAR_PEDIDOS'}, 500)
 
 
+def resumen_pedidos(vendedor_id=None, cliente_id=None, fecha_desde=None, fecha_hasta=None, excluir_estados=None):
+    """
+    Totales de pedidos calculados en la base de datos (para reportes de ventas).
+
+    Args:
+        vendedor_id, cliente_id: filtros opcionales, como en listar_pedidos
+        fecha_desde, fecha_hasta: rango de fecha_pedido, como en listar_pedidos
+        excluir_estados (list|str|None): estados que no cuentan en los totales
+            (ej. "cancelado,rechazado"); siguen apareciendo en `por_estado`
+
+    Returns:
+        dict: {'data': {'total_pedidos', 'monto_total', 'clientes_unicos', 'por_estado'}}
+    """
+    desde = _parsear_fecha(fecha_desde, 'fecha_desde')
+    hasta = _parsear_fecha(fecha_hasta, 'fecha_hasta', fin=True)
+    if isinstance(excluir_estados, str):
+        excluir_estados = excluir_estados.split(',')
+    excluidos = {e.strip() for e in (excluir_estados or []) if e and e.strip()}
+
+    try:
+        por_estado_query = db.session.query(
+            Pedido.estado,
+            func.count(Pedido.id),
+            func.coalesce(func.sum(Pedido.total), 0)
+        )
+        por_estado_query = _aplicar_filtros(por_estado_query, vendedor_id, cliente_id, None, desde, hasta)
+        por_estado = {
+            estado: {'pedidos': cantidad, 'monto_total': round(float(monto), 2)}
+            for estado, cantidad, monto in por_estado_query.group_by(Pedido.estado).all()
+        }
+
+        clientes_query = db.session.query(func.count(distinct(Pedido.cliente_id)))
+        clientes_query = _aplicar_filtros(clientes_query, vendedor_id, cliente_id, None, desde, hasta)
+        if excluidos:
+            clientes_query = clientes_query.filter(Pedido.estado.notin_(excluidos))
+
+        incluidos = [valores for estado, valores in por_estado.items() if estado not in excluidos]
+        return {'data': {
+            'total_pedidos': sum(v['pedidos'] for v in incluidos),
+            'monto_total': round(sum(v['monto_total'] for v in incluidos), 2),
+            'clientes_unicos': clientes_query.scalar() or 0,
+            'por_estado': por_estado
+        }}
+    except Exception as e:
+        current_app.logger.error(f"Error al resumir pedidos: {str(e)}")
+        raise PedidoServiceError({'error': 'Error al resumir pedidos', 'codigo': 'ERROR_RESUMEN_PEDIDOS'}, 500)
+
+
+def resumen_ventas_mensuales(periodo, vendedor_ids=None, excluir_estados=None):
+    """
+    Totales de ventas por vendedor en un mes, leídos de los resúmenes mensuales.
+
+    El costo no depende de cuántos pedidos tenga cada vendedor: se leen a lo
+    sumo una fila por estado y una por cliente de cada vendedor.
+
+    Args:
+        periodo (str): mes en formato YYYY-MM
+        vendedor_ids (list|str|None): vendedores (lista o separados por coma);
+            None devuelve todos los que tienen pedidos en el mes
+        excluir_estados (list|str|None): estados que no cuentan en los totales,
+            como en resumen_pedidos
+
+    Returns:
+        dict: {'data': [{'vendedor_id', 'periodo', 'total_pedidos', 'monto_total',
+        'clientes_unicos', 'por_estado'}, ...]}; un vendedor pedido sin ventas
+        aparece con totales en cero
+    """
+    try:
+        datetime.strptime(str(periodo), '%Y-%m')
+    except ValueError:
+        raise PedidoServiceError({'error': 'El parámetro periodo debe tener formato YYYY-MM', 'codigo': 'PERIODO_INVALIDO'}, 400)
+    periodo = str(periodo)
+    if isinstance(vendedor_ids, str):
+        vendedor_ids = vendedor_ids.split(',')
+    if vendedor_ids is not None:
+        vendedor_ids = list(dict.fromkeys(str(v).strip() for v in vendedor_ids if v and str(v).strip()))
+    if isinstance(excluir_estados, str):
+        excluir_estados = excluir_estados.split(',')
+    excluidos = {e.strip() for e in (excluir_estados or []) if e and e.strip()}
+
+    try:
+        ventas_query = VentaMensual.query.filter(VentaMensual.periodo == periodo, VentaMensual.pedidos > 0)
+        clientes_query = db.session.query(
+            VentaMensualCliente.vendedor_id, func.count(distinct(VentaMensualCliente.cliente_id))
+        ).filter(VentaMensualCliente.periodo == periodo, VentaMensualCliente.pedidos > 0)
+        if vendedor_ids is not None:
+            ventas_query = ventas_query.filter(VentaMensual.vendedor_id.in_(vendedor_ids))
+            clientes_query = clientes_query.filter(VentaMensualCliente.vendedor_id.in_(vendedor_ids))
+        if excluidos:
+            clientes_query = clientes_query.filter(VentaMensualCliente.estado.notin_(excluidos))
+        clientes_unicos = dict(clientes_query.group_by(VentaMensualCliente.vendedor_id).all())
+
+        resumenes = {}
+        for vendedor_id in vendedor_ids or []:
+            resumenes[vendedor_id] = {'por_estado': {}}
+        for venta in ventas_query.all():
+            resumen = resumenes.setdefault(venta.vendedor_id, {'por_estado': {}})
+            resumen['por_estado'][venta.estado] = {'pedidos': venta.pedidos, 'monto_total': round(venta.monto, 2)}
+
+        resultado = []
+        for vendedor_id, resumen in resumenes.items():
+            incluidos = [valores for estado, valores in resumen['por_estado'].items() if estado not in excluidos]
+            resultado.append({
+                'vendedor_id': vendedor_id,
+                'periodo': periodo,
+                'total_pedidos': sum(v['pedidos'] for v in incluidos),
+                'monto_total': round(sum(v['monto_total'] for v in incluidos), 2),
+                'clientes_unicos': clientes_unicos.get(vendedor_id, 0),
+                'por_estado': resumen['por_estado']
+            })
+        return {'data': resultado}
+    except Exception as e:
+        current_app.logger.error(f"Error al obtener ventas mensuales: {str(e)}")
+        raise PedidoServiceError({'error': 'Error al obtener ventas mensuales', 'codigo': 'ERROR_VENTAS_MENSUALES'}, 500)
+
+
 def detalle_pedido(pedido_id):
     """
     Obtiene el detalle de un pedido por su ID.
@@ -137,7 +468,7 @@ def detalle_pedido(pedido_id):
 
 def actualizar_estado_pedido(pedido_id, nuevo_estado):
     """
-    Actualiza el estado de un pedido.
+    Actualiza el estado de un pedido (y lo pasa al resumen mensual del nuevo estado).
     Args:
         pedido_id (int): ID del pedido
         nuevo_estado (str): Nuevo estado del pedido
@@ -145,13 +476,17 @@ def actualizar_estado_pedido(pedido_id, nuevo_estado):
         bool: True si se actualizó, False si no se encontró
     """
     try:
-        pedido = db.session.get(Pedido, pedido_id)
+        # Bloquea el pedido para que dos cambios simultáneos no lo muevan dos veces
+        pedido = db.session.get(Pedido, pedido_id, with_for_update=True)
         if pedido:
+            estado_anterior = pedido.estado
             pedido.estado = nuevo_estado
+            ventas_mensuales.mover_pedido(pedido, estado_anterior)
             pedido.save()
             return True
         return False
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Error al actualizar estado del pedido: {str(e)}")
         raise PedidoServiceError({'error': 'Error al actualizar estado del pedido', 'codigo': 'ERROR_ACTUALIZAR_ESTADO'}, 500)
 
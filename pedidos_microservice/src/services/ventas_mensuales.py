@@ -0,0 +1,154 @@
+"""
+Mantenimiento de los resúmenes mensuales de ventas (tablas ventas_mensuales y
+ventas_mensuales_clientes).
+
+Cada pedido con vendedor suma al resumen de (vendedor, mes de fecha_pedido,
+estado). Las funciones de este módulo agregan sus cambios a la sesión actual
+sin hacer commit, así el resumen queda en la misma transacción que el pedido.
+"""
+from collections import defaultdict
+
+from sqlalchemy import extract, func, text
+
+from src.models.pedios import Pedido, db
+from src.models.ventas_mensuales import VentaMensual, VentaMensualCliente
+
+# Llave del advisory lock que serializa las reconstrucciones en PostgreSQL
+LLAVE_BLOQUEO_RECONSTRUCCION = 4512001
+
+
+def periodo_de(fecha):
+    """Mes de una fecha en formato YYYY-MM."""
+    return fecha.strftime('%Y-%m')
+
+
+def _acumular(modelo, filas, sumas):
+    """
+    Suma `filas` a las existentes con la misma llave (INSERT ... ON CONFLICT DO UPDATE).
+
+    Args:
+        modelo: VentaMensual o VentaMensualCliente
+        filas (list): dicts con la llave primaria y los incrementos
+        sumas (tuple): columnas que se incrementan
+    """
+    if not filas:
+        return
+    tabla = modelo.__table__
+    claves = [columna.name for columna in tabla.primary_key.columns]
+    dialecto = db.session.get_bind().dialect.name
+
+    if dialecto in ('postgresql', 'sqlite'):
+        if dialecto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        sentencia = insert(tabla)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=claves,
+            set_={columna: tabla.c[columna] + sentencia.excluded[columna] for columna in sumas}
+        )
+        db.session.execute(sentencia, filas)
+        return
+
+    # Otros motores: lectura y escritura dentro de la misma transacción
+    for fila in filas:
+        registro = db.session.get(modelo, tuple(fila[clave] for clave in claves))
+        if registro is None:
+            db.session.add(modelo(**fila))
+        else:
+            for columna in sumas:
+                setattr(registro, columna, getattr(registro, columna) + fila[columna])
+
+
+def _aplicar(movimientos):
+    """
+    Aplica movimientos (pedido, estado, signo) a los resúmenes.
+
+    Los movimientos de una misma llave se agrupan para escribir una fila por llave.
+    """
+    ventas = defaultdict(lambda: [0, 0.0])
+    clientes = defaultdict(int)
+    for pedido, estado, signo in movimientos:
+        if pedido.vendedor_id is None:
+            continue
+        llave = (str(pedido.vendedor_id), periodo_de(pedido.fecha_pedido), estado)
+        ventas[llave][0] += signo
+        ventas[llave][1] += signo * pedido.total
+        clientes[llave + (pedido.cliente_id,)] += signo
+
+    _acumular(VentaMensual, [
+        {'vendedor_id': v, 'periodo': p, 'estado': e, 'pedidos': cantidad, 'monto': monto}
+        for (v, p, e), (cantidad, monto) in ventas.items()
+    ], ('pedidos', 'monto'))
+    _acumular(VentaMensualCliente, [
+        {'vendedor_id': v, 'periodo': p, 'estado': e, 'cliente_id': c, 'pedidos': cantidad}
+        for (v, p, e, c), cantidad in clientes.items()
+    ], ('pedidos',))
+
+
+def registrar_pedidos(pedidos):
+    """Suma pedidos nuevos (ya con flush, para tener fecha_pedido) a sus resúmenes."""
+    _aplicar([(pedido, pedido.estado, 1) for pedido in pedidos])
+
+
+def mover_pedido(pedido, estado_anterior):
+    """Pasa un pedido del resumen de `estado_anterior` al de su estado actual."""
+    if estado_anterior == pedido.estado:
+        return
+    _aplicar([(pedido, estado_anterior, -1), (pedido, pedido.estado, 1)])
+
+
+def reconstruir_ventas_mensuales():
+    """
+    Recalcula todos los resúmenes a partir de la tabla de pedidos (sin commit).
+
+    Se usa para poblar las tablas la primera vez o corregirlas (script
+    reconstruir_ventas_mensuales.py); el resto del tiempo se mantienen de
+    forma incremental.
+
+    En PostgreSQL toma un advisory lock (una sola reconstrucción a la vez) y
+    bloquea pedidos en modo SHARE hasta el commit: las altas y cambios de estado
+    concurrentes esperan y suman sus incrementos sobre el resumen ya
+    reconstruido, en vez de perderse entre la lectura y el borrado.
+
+    Returns:
+        int: cantidad de resúmenes (vendedor, mes, estado) generados
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(
+            text('SELECT pg_advisory_xact_lock(:llave)'), {'llave': LLAVE_BLOQUEO_RECONSTRUCCION}
+        )
+        db.session.execute(text(f'LOCK TABLE {Pedido.__tablename__} IN SHARE MODE'))
+
+    anio = extract('year', Pedido.fecha_pedido)
+    mes = extract('month', Pedido.fecha_pedido)
+    filas = (
+        db.session.query(
+            Pedido.vendedor_id, anio, mes, Pedido.estado, Pedido.cliente_id,
+            func.count(Pedido.id), func.coalesce(func.sum(Pedido.total), 0)
+        )
+        .filter(Pedido.vendedor_id.isnot(None))
+        .group_by(Pedido.vendedor_id, anio, mes, Pedido.estado, Pedido.cliente_id)
+        .all()
+    )
+
+    ventas = defaultdict(lambda: [0, 0.0])
+    clientes = []
+    for vendedor_id, anio_pedido, mes_pedido, estado, cliente_id, cantidad, monto in filas:
+        llave = (vendedor_id, f"{int(anio_pedido):04d}-{int(mes_pedido):02d}", estado)
+        ventas[llave][0] += cantidad
+        ventas[llave][1] += float(monto)
+        clientes.append({
+            'vendedor_id': llave[0], 'periodo': llave[1], 'estado': estado,
+            'cliente_id': cliente_id, 'pedidos': cantidad
+        })
+
+    db.session.query(VentaMensualCliente).delete()
+    db.session.query(VentaMensual).delete()
+    if ventas:
+        db.session.execute(VentaMensual.__table__.insert(), [
+            {'vendedor_id': v, 'periodo': p, 'estado': e, 'pedidos': cantidad, 'monto': monto}
+            for (v, p, e), (cantidad, monto) in ventas.items()
+        ])
+        db.session.execute(VentaMensualCliente.__table__.insert(), clientes)
+    return len(ventas)
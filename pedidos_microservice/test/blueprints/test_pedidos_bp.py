@@ -43,6 +43,26 @@ def test_crear_pedido_unexpected_exception(client, monkeypatch):
     assert body.get('codigo') == 'ERROR_INTERNO_SERVIDOR'
 
 
+def test_crear_pedidos_lote(client):
+    producto = [{'id': 1, 'cantidad': 1, 'precio': 5.0}]
+    response = client.post('/pedido/lote', json={'pedidos': [
+        {'cliente_id': 4700, 'total': 5.0, 'productos': producto},
+        {'cliente_id': 4700, 'total': 5.0, 'productos': producto},
+    ]})
+    assert response.status_code == 201
+    assert response.get_json()['creados'] == 2
+
+    response = client.post('/pedido/lote', json={'pedidos': [
+        {'cliente_id': 4700, 'total': 5.0, 'productos': producto},
+        {'cliente_id': 4700, 'total': 5.0, 'productos': []},
+    ]})
+    assert response.status_code == 207
+    assert response.get_json()['rechazados'] == 1
+
+    response = client.post('/pedido/lote', json={})
+    assert response.status_code == 400
+
+
 def test_obtener_pedidos_without_filters(client, session):
     # seed pedidos directly in DB
     from src.models.pedios import Pedido
@@ -88,6 +108,64 @@ def test_obtener_pedidos_filtering(client, session):
     assert all(item.get('estado') == 'entregado' for item in data)
 
 
+def test_obtener_pedidos_paginado(client, session):
+    from src.models.pedios import Pedido
+
+    for _ in range(3):
+        session.add(Pedido(cliente_id=4300, estado='pendiente', total=1.0, vendedor_id='v_bp_pag'))
+    session.commit()
+
+    response = client.get('/pedido?vendedor_id=v_bp_pag&limit=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['data']) == 2
+    assert body['next_cursor']
+
+    response = client.get(f"/pedido?vendedor_id=v_bp_pag&limit=2&cursor={body['next_cursor']}")
+    body = response.get_json()
+    assert len(body['data']) == 1
+    assert body['next_cursor'] is None
+
+    response = client.get('/pedido?limit=-1')
+    assert response.status_code == 400
+
+
+def test_obtener_resumen_pedidos(client, session):
+    from src.models.pedios import Pedido
+
+    session.add(Pedido(cliente_id=4900, estado='pendiente', total=12.0, vendedor_id='v_bp_res'))
+    session.add(Pedido(cliente_id=4901, estado='cancelado', total=8.0, vendedor_id='v_bp_res'))
+    session.commit()
+
+    response = client.get('/pedido/resumen?vendedor_id=v_bp_res&excluir_estados=cancelado')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['total_pedidos'] == 1
+    assert data['monto_total'] == 12.0
+    assert data['por_estado']['cancelado']['pedidos'] == 1
+
+    response = client.get('/pedido/resumen?fecha_hasta=ayer')
+    assert response.status_code == 400
+
+
+def test_obtener_ventas_mensuales(client, session):
+    producto = {'id': 1, 'cantidad': 1, 'precio': 30.0}
+    creado = client.post('/pedido', json={
+        'cliente_id': 4910, 'total': 30.0, 'vendedor_id': 'v_bp_vm', 'productos': [producto]
+    }).get_json()
+    periodo = creado['fecha_pedido'][:7]
+
+    response = client.get(f'/pedido/ventas-mensuales?periodo={periodo}&vendedor_id=v_bp_vm')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data[0]['vendedor_id'] == 'v_bp_vm'
+    assert data[0]['total_pedidos'] == 1
+    assert data[0]['monto_total'] == 30.0
+
+    assert client.get('/pedido/ventas-mensuales').status_code == 400
+    assert client.get('/pedido/ventas-mensuales?periodo=enero').status_code == 400
+
+
 def test_obtener_detalle_pedido_success(client, session):
     from src.models.pedios import Pedido
     from src.models.pedidos_productos import PedidoProducto
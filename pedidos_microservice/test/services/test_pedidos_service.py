@@ -1,9 +1,9 @@
 import pytest
 
-from src.services.pedidos import registrar_pedido, PedidoServiceError
+from src.services.pedidos import registrar_pedido, registrar_pedidos_lote, PedidoServiceError
 from src.models.pedios import Pedido
 from src.models.pedidos_productos import PedidoProducto
-from src.services.pedidos import listar_pedidos, actualizar_estado_pedido
+from src.services.pedidos import listar_pedidos, actualizar_estado_pedido, resumen_pedidos
 
 
 def test_registrar_pedido_none_raises():
@@ -74,21 +74,23 @@ def test_registrar_pedido_success(session):
 
 
 def test_registrar_pedido_save_exception(app, monkeypatch):
-    # force Pedido.save to raise to exercise error handling
-    def fake_save(self):
+    # force the commit to fail to exercise error handling
+    from src.models.pedios import db
+
+    def fake_commit():
         # raise a more specific exception type to satisfy linters
         raise RuntimeError('db fail')
 
-    monkeypatch.setattr(Pedido, 'save', fake_save)
-
     data = {
         'cliente_id': 1,
         'total': 10,
         'productos': [{'id': 1, 'cantidad': 1, 'precio': 10}]
     }
 
-    with pytest.raises(PedidoServiceError) as exc:
-        registrar_pedido(data)
+    with app.app_context():
+        monkeypatch.setattr(db.session, 'commit', fake_commit)
+        with pytest.raises(PedidoServiceError) as exc:
+            registrar_pedido(data)
 
     assert exc.value.status_code == 500
     assert exc.value.message.get('codigo') == 'ERROR_GUARDAR_PEDIDO'
@@ -104,39 +106,81 @@ def test_registrar_pedido_total_cero():
     assert exc.value.message.get('codigo') == 'TOTAL_MENOR_CERO'
 
 
-def test_registrar_pedido_producto_save_exception(monkeypatch):
-    # make Pedido.save succeed but PedidoProducto.save fail to exercise that branch
-    class DummyPedido:
-        def __init__(self):
-            self.id = 123
-            self.cliente_id = 1
-            self.estado = 'pendiente'
-            self.total = 10
-            self.vendedor_id = None
+def test_registrar_pedido_producto_save_exception(session, monkeypatch):
+    # if inserting the product lines fails, the pedido itself must not be saved
+    import src.services.pedidos as pedidos_service
 
-        def save(self):
-            return self
+    def fake_insert(model):
+        raise RuntimeError('pp fail')
 
-        def to_dict(self):
-            return {'id': self.id, 'cliente_id': self.cliente_id, 'total': self.total}
+    monkeypatch.setattr(pedidos_service, 'insert', fake_insert)
+    antes = session.query(Pedido).filter(Pedido.cliente_id == 4400).count()
 
-    def fake_pedido_init(*args, **kwargs):
-        return DummyPedido()
+    data = {'cliente_id': 4400, 'total': 10, 'productos': [{'id': 1, 'cantidad': 1, 'precio': 10}]}
+    with pytest.raises(PedidoServiceError) as exc:
+        registrar_pedido(data)
 
-    monkeypatch.setattr('src.services.pedidos.Pedido', fake_pedido_init)
+    assert exc.value.status_code == 500
+    assert exc.value.message.get('codigo') == 'ERROR_GUARDAR_PEDIDO'
+    assert session.query(Pedido).filter(Pedido.cliente_id == 4400).count() == antes
 
-    def fake_pp_save(self):
-        raise RuntimeError('pp fail')
 
-    monkeypatch.setattr('src.services.pedidos.PedidoProducto', PedidoProducto)
-    monkeypatch.setattr(PedidoProducto, 'save', fake_pp_save)
+def test_registrar_pedido_un_solo_commit(session, monkeypatch):
+    from src.models.pedios import db
+
+    commits = []
+    commit_original = db.session.commit
+    def contar_commit():
+        commits.append(1)
+        commit_original()
+    monkeypatch.setattr(db.session, 'commit', contar_commit)
+
+    productos = [{'id': i, 'cantidad': 1, 'precio': 1.0} for i in range(1, 51)]
+    result = registrar_pedido({'cliente_id': 4500, 'total': 50.0, 'productos': productos})
+
+    assert len(commits) == 1
+    assert session.query(PedidoProducto).filter(PedidoProducto.pedido_id == result['id']).count() == 50
 
-    data = {'cliente_id': 1, 'total': 10, 'productos': [{'id': 1, 'cantidad': 1, 'precio': 10}]}
+
+def test_registrar_pedido_producto_incompleto():
+    data = {'cliente_id': 1, 'total': 10, 'productos': [{'id': 1, 'cantidad': 1}]}
     with pytest.raises(PedidoServiceError) as exc:
         registrar_pedido(data)
 
-    assert exc.value.status_code == 500
-    assert exc.value.message.get('codigo') == 'ERROR_GUARDAR_PEDIDO'
+    assert exc.value.status_code == 400
+    assert exc.value.message.get('codigo') == 'PRODUCTO_INVALIDO'
+
+
+def test_registrar_pedidos_lote_reporta_invalidos_por_posicion(session):
+    data = {'pedidos': [
+        {'cliente_id': 4600, 'total': 5.0, 'vendedor_id': 'v_lote', 'productos': [{'id': 1, 'cantidad': 1, 'precio': 5.0}]},
+        {'cliente_id': 4600, 'total': 0, 'productos': [{'id': 1, 'cantidad': 1, 'precio': 5.0}]},
+        {'cliente_id': 4600, 'total': 8.0, 'productos': [{'id': 2, 'cantidad': 2, 'precio': 4.0}, {'id': 3, 'cantidad': 1, 'precio': 0.0}]},
+    ]}
+
+    result = registrar_pedidos_lote(data)
+
+    assert result['creados'] == 2
+    assert result['rechazados'] == 1
+    assert [r['status'] for r in result['resultados']] == [201, 400, 201]
+    assert result['resultados'][1]['codigo'] == 'TOTAL_MENOR_CERO'
+    pedido_id = result['resultados'][2]['data']['id']
+    assert session.query(PedidoProducto).filter(PedidoProducto.pedido_id == pedido_id).count() == 2
+
+
+def test_registrar_pedidos_lote_vacio_o_grande(app):
+    with app.app_context():
+        with pytest.raises(PedidoServiceError) as exc:
+            registrar_pedidos_lote({'pedidos': []})
+        assert exc.value.message['codigo'] == 'LOTE_VACIO'
+
+        app.config['PEDIDOS_LOTE_MAX'] = 1
+        try:
+            with pytest.raises(PedidoServiceError) as exc:
+                registrar_pedidos_lote({'pedidos': [{}, {}]})
+            assert exc.value.message['codigo'] == 'LOTE_DEMASIADO_GRANDE'
+        finally:
+            app.config.pop('PEDIDOS_LOTE_MAX')
 
 
 def test_registrar_pedido_productos_vacio_branch():
@@ -198,6 +242,15 @@ def test_listar_pedidos_filtrar_por_cliente(session):
     assert all(r.get('cliente_id') == 999 for r in result)
 
 
+def test_listar_pedidos_filtrar_por_varios_clientes(session):
+    for cliente_id in (801, 802, 803):
+        session.add(Pedido(cliente_id=cliente_id, estado='pendiente', total=5.0, vendedor_id='v_multi'))
+    session.commit()
+
+    result = listar_pedidos(vendedor_id='v_multi', cliente_id='801,803')['data']
+    assert sorted(r['cliente_id'] for r in result) == [801, 803]
+
+
 def test_listar_pedidos_filtrar_por_estado(session):
     p_ok = Pedido(cliente_id=1, estado='pendiente', total=5.0, vendedor_id='v1')
     p_other = Pedido(cliente_id=1, estado='entregado', total=6.0, vendedor_id='v1')
@@ -228,6 +281,139 @@ def test_listar_pedidos_orden_desc_por_fecha(session):
     assert data[0]['fecha_pedido'] >= data[1]['fecha_pedido']
 
 
+def test_listar_pedidos_total_productos_en_una_consulta(app, session):
+    from sqlalchemy import event
+    from src.models.pedios import db
+
+    pedidos = []
+    for cantidad in (0, 1, 3):
+        p = Pedido(cliente_id=4100, estado='pendiente', total=10.0, vendedor_id='v_n1')
+        session.add(p)
+        session.commit()
+        for i in range(cantidad):
+            session.add(PedidoProducto(pedido_id=p.id, producto_id=i + 1, cantidad=1, precio=1.0))
+        pedidos.append((p.id, cantidad))
+    session.commit()
+
+    consultas = []
+    def contar(conn, cursor, statement, *args):
+        consultas.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', contar)
+    try:
+        data = listar_pedidos(vendedor_id='v_n1')['data']
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', contar)
+
+    assert len(consultas) == 1
+    assert {(d['id'], d['total_productos']) for d in data} == set(pedidos)
+
+
+def test_listar_pedidos_paginacion_por_cursor(session):
+    from datetime import datetime
+
+    # Misma fecha para todos: el id desempata y ningún pedido se repite ni se pierde
+    fecha = datetime(2025, 3, 1, 12, 0, 0)
+    ids = []
+    for _ in range(5):
+        p = Pedido(cliente_id=4200, estado='pendiente', total=1.0, vendedor_id='v_pag')
+        p.fecha_pedido = fecha
+        session.add(p)
+        session.commit()
+        ids.append(p.id)
+
+    vistos = []
+    cursor = None
+    paginas = 0
+    while True:
+        pagina = listar_pedidos(vendedor_id='v_pag', limit=2, cursor=cursor)
+        vistos.extend(d['id'] for d in pagina['data'])
+        paginas += 1
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            break
+
+    assert paginas == 3
+    assert vistos == sorted(ids, reverse=True)
+
+
+@pytest.mark.parametrize('kwargs, codigo', [
+    ({'limit': 0}, 'LIMITE_INVALIDO'),
+    ({'limit': 'abc'}, 'LIMITE_INVALIDO'),
+    ({'limit': 10, 'cursor': 'no-es-cursor'}, 'CURSOR_INVALIDO'),
+    ({'cursor': 'abc'}, 'CURSOR_SIN_LIMITE'),
+])
+def test_listar_pedidos_paginacion_parametros_invalidos(app, kwargs, codigo):
+    with app.app_context():
+        with pytest.raises(PedidoServiceError) as exc:
+            listar_pedidos(**kwargs)
+
+    assert exc.value.status_code == 400
+    assert exc.value.message['codigo'] == codigo
+
+
+def _pedido_en_fecha(session, fecha, estado='pendiente', total=10.0, cliente_id=4800, vendedor_id='v_rep'):
+    p = Pedido(cliente_id=cliente_id, estado=estado, total=total, vendedor_id=vendedor_id)
+    p.fecha_pedido = fecha
+    session.add(p)
+    session.commit()
+    return p
+
+
+def test_listar_pedidos_rango_de_fechas(session):
+    from datetime import datetime
+
+    _pedido_en_fecha(session, datetime(2024, 12, 31, 23, 59, 59))
+    enero_1 = _pedido_en_fecha(session, datetime(2025, 1, 1, 0, 0, 0))
+    enero_31 = _pedido_en_fecha(session, datetime(2025, 1, 31, 18, 30, 0))
+    _pedido_en_fecha(session, datetime(2025, 2, 1, 0, 0, 0))
+
+    data = listar_pedidos(vendedor_id='v_rep', fecha_desde='2025-01-01', fecha_hasta='2025-01-31')['data']
+
+    assert [d['id'] for d in data] == [enero_31.id, enero_1.id]
+
+
+def test_listar_pedidos_fecha_invalida(app):
+    with app.app_context():
+        with pytest.raises(PedidoServiceError) as exc:
+            listar_pedidos(fecha_desde='31/01/2025')
+
+    assert exc.value.status_code == 400
+    assert exc.value.message['codigo'] == 'FECHA_INVALIDA'
+
+
+def test_resumen_pedidos_agrega_en_sql(session):
+    from datetime import datetime
+
+    marzo = datetime(2025, 3, 10)
+    _pedido_en_fecha(session, marzo, total=100.0, cliente_id=1, vendedor_id='v_res')
+    _pedido_en_fecha(session, marzo, total=50.5, cliente_id=1, vendedor_id='v_res')
+    _pedido_en_fecha(session, marzo, estado='entregado', total=20.0, cliente_id=2, vendedor_id='v_res')
+    _pedido_en_fecha(session, marzo, estado='cancelado', total=999.0, cliente_id=3, vendedor_id='v_res')
+    _pedido_en_fecha(session, datetime(2025, 4, 1), total=70.0, cliente_id=4, vendedor_id='v_res')
+
+    resumen = resumen_pedidos(
+        vendedor_id='v_res',
+        fecha_desde='2025-03-01',
+        fecha_hasta='2025-03-31',
+        excluir_estados='cancelado,rechazado'
+    )['data']
+
+    assert resumen['total_pedidos'] == 3
+    assert resumen['monto_total'] == pytest.approx(170.5)
+    assert resumen['clientes_unicos'] == 2
+    assert resumen['por_estado'] == {
+        'pendiente': {'pedidos': 2, 'monto_total': 150.5},
+        'entregado': {'pedidos': 1, 'monto_total': 20.0},
+        'cancelado': {'pedidos': 1, 'monto_total': 999.0},
+    }
+
+
+def test_resumen_pedidos_sin_datos(session):
+    resumen = resumen_pedidos(vendedor_id='v_sin_pedidos')['data']
+
+    assert resumen == {'total_pedidos': 0, 'monto_total': 0, 'clientes_unicos': 0, 'por_estado': {}}
+
+
 def test_actualizar_estado_pedido_success(session):
     # Crear un pedido
     p = Pedido(cliente_id=1, estado='pendiente', total=10.0, vendedor_id='v1')
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime
+
+from src.models.pedios import Pedido
+from src.models.ventas_mensuales import VentaMensual
+from src.services.pedidos import (
+    registrar_pedido, registrar_pedidos_lote, actualizar_estado_pedido, resumen_ventas_mensuales,
+    resumen_pedidos, PedidoServiceError
+)
+from src.services.ventas_mensuales import periodo_de, reconstruir_ventas_mensuales
+
+
+def _pedido(cliente_id, total, vendedor_id):
+    return {'cliente_id': cliente_id, 'total': total, 'vendedor_id': vendedor_id,
+            'productos': [{'id': 1, 'cantidad': 1, 'precio': total}]}
+
+
+def test_registrar_pedido_actualiza_resumen_mensual(session):
+    creado = registrar_pedido(_pedido(1, 100.0, 'v_vm_1'))
+    registrar_pedidos_lote({'pedidos': [_pedido(1, 50.0, 'v_vm_1'), _pedido(2, 25.0, 'v_vm_1')]})
+    periodo = creado['fecha_pedido'][:7]
+
+    venta = session.get(VentaMensual, ('v_vm_1', periodo, 'pendiente'))
+    assert venta.pedidos == 3
+    assert venta.monto == pytest.approx(175.0)
+
+    resumen = resumen_ventas_mensuales(periodo, vendedor_ids='v_vm_1')['data']
+    assert resumen == [{
+        'vendedor_id': 'v_vm_1',
+        'periodo': periodo,
+        'total_pedidos': 3,
+        'monto_total': 175.0,
+        'clientes_unicos': 2,
+        'por_estado': {'pendiente': {'pedidos': 3, 'monto_total': 175.0}}
+    }]
+
+
+def test_cambio_de_estado_mueve_el_pedido_entre_resumenes(session):
+    cancelado = registrar_pedido(_pedido(10, 40.0, 'v_vm_2'))
+    registrar_pedido(_pedido(11, 60.0, 'v_vm_2'))
+    periodo = cancelado['fecha_pedido'][:7]
+
+    assert actualizar_estado_pedido(cancelado['id'], 'cancelado') is True
+
+    resumen = resumen_ventas_mensuales(periodo, vendedor_ids=['v_vm_2'], excluir_estados='cancelado')['data'][0]
+    assert resumen['total_pedidos'] == 1
+    assert resumen['monto_total'] == 60.0
+    assert resumen['clientes_unicos'] == 1
+    assert resumen['por_estado'] == {
+        'pendiente': {'pedidos': 1, 'monto_total': 60.0},
+        'cancelado': {'pedidos': 1, 'monto_total': 40.0},
+    }
+
+
+def test_resumen_mensual_varios_vendedores(session):
+    creado = registrar_pedido(_pedido(20, 10.0, 'v_vm_3'))
+    registrar_pedido(_pedido(21, 30.0, 'v_vm_4'))
+    periodo = creado['fecha_pedido'][:7]
+
+    resumen = resumen_ventas_mensuales(periodo, vendedor_ids='v_vm_3,v_vm_4,v_vm_sin_ventas')['data']
+
+    assert [(r['vendedor_id'], r['total_pedidos'], r['monto_total']) for r in resumen] == [
+        ('v_vm_3', 1, 10.0), ('v_vm_4', 1, 30.0), ('v_vm_sin_ventas', 0, 0)
+    ]
+
+
+def test_resumen_mensual_periodo_invalido(app):
+    with app.app_context():
+        with pytest.raises(PedidoServiceError) as exc:
+            resumen_ventas_mensuales('2025-13')
+
+    assert exc.value.status_code == 400
+    assert exc.value.message['codigo'] == 'PERIODO_INVALIDO'
+
+
+def test_reconstruir_coincide_con_resumen_de_pedidos(session):
+    marzo = datetime(2024, 3, 5)
+    for estado, total, cliente_id in (('pendiente', 10.0, 30), ('entregado', 15.5, 31), ('cancelado', 99.0, 30)):
+        pedido = Pedido(cliente_id=cliente_id, estado=estado, total=total, vendedor_id='v_vm_5')
+        pedido.fecha_pedido = marzo
+        session.add(pedido)
+    session.commit()
+
+    reconstruir_ventas_mensuales()
+    session.commit()
+
+    esperado = resumen_pedidos(
+        vendedor_id='v_vm_5', fecha_desde='2024-03-01', fecha_hasta='2024-03-31', excluir_estados='cancelado'
+    )['data']
+    resumen = resumen_ventas_mensuales(periodo_de(marzo), vendedor_ids='v_vm_5', excluir_estados='cancelado')['data'][0]
+    for campo in ('total_pedidos', 'monto_total', 'clientes_unicos', 'por_estado'):
+        assert resumen[campo] == esperado[campo]
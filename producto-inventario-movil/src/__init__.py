@@ -4,6 +4,7 @@ from src.config.config import Config
 from src.blueprints.health import health_bp
 from src.blueprints.producto import producto_bp
 from src.blueprints.pedidos import pedidos_bp
+from src.services import cache_l1
 
 import logging
 import os
@@ -31,6 +32,9 @@ def create_app(config_class=Config):
     # Inicializar JWT
     JWTManager(app)
     
+    # Cache L1 en memoria y escucha de invalidaciones (si está habilitado)
+    cache_l1.iniciar(app.config)
+    
     # Registrar blueprints
     app.register_blueprint(health_bp)
     app.register_blueprint(producto_bp)
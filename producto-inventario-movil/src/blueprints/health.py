@@ -1,4 +1,6 @@
-from flask import Blueprint
+from flask import Blueprint, current_app, jsonify
+
+from src.services import cache_l1
 
 # Crear el blueprint para health check
 health_bp = Blueprint('health', __name__)
@@ -9,3 +11,16 @@ def health_check():
     Health check endpoint - retorna 200 OK
     """
     return 'OK', 200
+
+
+@health_bp.route('/health/cache', methods=['GET'])
+def cache_metrics():
+    """
+    Aciertos del cache por nivel: l1 (memoria del proceso) y l2 (Redis Service)
+    """
+    l1 = cache_l1.obtener_l1(current_app.config)
+    return jsonify({
+        'modo': current_app.config.get('CACHE_BACKEND', 'http'),
+        'l1_habilitado': l1 is not None,
+        'metricas': l1.metricas() if l1 is not None else None
+    }), 200
@@ -1,114 +1,278 @@
 """Cliente HTTP para interactuar con el Redis Service.
 
 Este cliente encapsula las operaciones de cache necesarias para el BFF móvil
-apoyado en el servicio redis_service (expuesto vía HTTP).
+apoyado en el servicio redis_service (expuesto vía HTTP). Con
+CACHE_BACKEND=redis habla directo con Redis (CACHE_REDIS_URL) mediante un pool
+de conexiones por proceso, con las mismas claves, TTL y formato de valores.
 """
 from __future__ import annotations
 
+import json
 import logging
-from typing import Any, Optional
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
 from urllib.parse import quote
 
+import redis
 import requests
 from flask import current_app
 
+from src.services import cache_l1
+from src.services.cache_codec import MEDIA_TYPE, CacheCodec
+from src.services.cache_l1 import CacheL1
+
 logger = logging.getLogger(__name__)
 
+# Errores de conexión con el cache en cualquiera de los dos modos
+ERRORES_CONEXION = (requests.RequestException, redis.RedisError)
+
+# Pools de conexiones a Redis compartidos por los CacheClient del proceso (uno por URL)
+_pools: Dict[str, redis.BlockingConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_redis_directo(config: Mapping[str, Any]) -> Optional[redis.Redis]:
+    """Cliente Redis sobre el pool del proceso, o None si se usa Redis Service (HTTP).
+
+    Se activa con CACHE_BACKEND=redis. Crear el cliente no abre conexiones:
+    se toman del pool en cada operación y se devuelven al terminar.
+    """
+    if config.get('CACHE_BACKEND', 'http') != 'redis':
+        return None
+
+    url = config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            timeout = float(config.get('CACHE_REDIS_TIMEOUT', 3))
+            pool = redis.BlockingConnectionPool.from_url(
+                url,
+                max_connections=int(config.get('CACHE_REDIS_MAX_CONNECTIONS', 20)),
+                timeout=timeout,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+            _pools[url] = pool
+    return redis.Redis(connection_pool=pool)
+
 
 class CacheClient:
     """Cliente ligero para Redis Service."""
 
-    def __init__(self, base_url: str, default_ttl: int = 300, timeout: int = 3) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        default_ttl: int = 300,
+        timeout: int = 3,
+        codec: Optional[CacheCodec] = None,
+        l1: Optional[CacheL1] = None,
+        redis_client: Optional[redis.Redis] = None,
+        canal_invalidacion: Optional[str] = None
+    ) -> None:
         self.base_url = base_url.rstrip('/')
         self.cache_endpoint = f"{self.base_url}/api/cache"
         self.default_ttl = default_ttl
         self.timeout = timeout
+        # Con un codec distinto de JSON plano los valores viajan ya codificados
+        self.codec = codec or CacheCodec()
+        # Cache en memoria del proceso consultado antes que Redis Service
+        self.l1 = l1
+        # Con un cliente Redis las operaciones no pasan por Redis Service; las
+        # escrituras se publican en canal_invalidacion como hace Redis Service
+        self.redis_client = redis_client
+        self.canal_invalidacion = canal_invalidacion
 
     @classmethod
     def from_app_config(cls) -> "CacheClient":
         cfg = current_app.config
         return cls(
             base_url=cfg.get('REDIS_SERVICE_URL', 'http://localhost:5011'),
-            default_ttl=cfg.get('CACHE_DEFAULT_TTL', 300)
+            default_ttl=cfg.get('CACHE_DEFAULT_TTL', 300),
+            codec=CacheCodec.from_config(cfg),
+            l1=cache_l1.obtener_l1(cfg),
+            redis_client=obtener_redis_directo(cfg),
+            canal_invalidacion=cfg.get('CACHE_INVALIDATION_CHANNEL')
         )
 
+    @property
+    def modo(self) -> str:
+        """'redis' si habla directo con Redis, 'http' si usa Redis Service."""
+        return 'redis' if self.redis_client is not None else 'http'
+
     def _build_key(self, producto_id: str) -> str:
         return f"inventarios:producto:{producto_id}"
 
     def _encode_key(self, key: str) -> str:
         return quote(key, safe='')
 
-    def get_inventarios_by_producto(self, producto_id: str) -> Optional[Any]:
-        key = self._build_key(producto_id)
+    def _get_value(self, key: str) -> Tuple[int, Any]:
+        """Consulta una clave (primero en el L1) y devuelve (status_code, valor)."""
+        if self.l1 is not None:
+            encontrado, value = self.l1.get(key)
+            if encontrado:
+                return 200, value
+
+        status_code, value = self._get_remote(key)
+        if self.l1 is not None and status_code in (200, 404):
+            self.l1.registrar_l2(status_code == 200)
+        return status_code, value
+
+    def _get_remote(self, key: str) -> Tuple[int, Any]:
+        """Consulta una clave en Redis Service (o en Redis en modo directo)."""
+        if self.redis_client is not None:
+            return self._get_directo(key)
+
+        url = f"{self.cache_endpoint}/{self._encode_key(key)}"
+        if self.codec.is_plain_json:
+            response = requests.get(url, timeout=self.timeout)
+        else:
+            response = requests.get(url, headers={'Accept': MEDIA_TYPE}, timeout=self.timeout)
+
+        if response.status_code != 200:
+            return response.status_code, None
+
+        if not self.codec.is_plain_json and response.headers.get('Content-Type', '').startswith(MEDIA_TYPE):
+            self._guardar_l1(key, response.content, self.codec.decode, response.headers.get('X-Cache-TTL'))
+            return 200, self.codec.decode(response.content)
+
+        # Respuesta JSON (también de un Redis Service anterior que ignora Accept)
+        payload = response.json()
+        self._guardar_l1(key, response.content, self._valor_de_respuesta_json, payload.get('ttl'))
+        return 200, payload.get('value')
+
+    def _get_directo(self, key: str) -> Tuple[int, Any]:
+        """Lee el valor y su TTL en un solo viaje a Redis."""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            datos, ttl = pipe.get(key).ttl(key).execute()
+
+        if datos is None:
+            return 404, None
+        self._guardar_l1(key, datos, self.codec.decode, ttl)
+        return 200, self.codec.decode(datos)
+
+    def _valor_de_respuesta_json(self, datos: bytes) -> Any:
+        return self.codec.decode(datos).get('value')
+
+    def _guardar_l1(self, key: str, datos: Any, decodificador, ttl: Any) -> None:
+        """Guarda en el L1 la respuesta recibida, sin pasar el TTL que le queda en Redis."""
+        if self.l1 is None or not isinstance(datos, bytes):
+            return
         try:
-            response = requests.get(
+            ttl = int(ttl) if ttl is not None else None
+        except (TypeError, ValueError):
+            ttl = None
+        self.l1.set(key, datos, decodificador, ttl)
+
+    def _publicar_invalidacion(self, key: str) -> None:
+        """Avisa a los L1 de otros procesos que la clave cambió (solo modo directo)."""
+        if not self.canal_invalidacion:
+            return
+        try:
+            self.redis_client.publish(self.canal_invalidacion, json.dumps({'keys': [key]}))
+        except redis.RedisError as exc:
+            logger.warning("No se pudo publicar invalidación de %s: %s", key, exc)
+
+    def _set_value(self, key: str, value: Any, ttl: int) -> int:
+        """Guarda un valor con el codec configurado y devuelve el status code."""
+        if self.redis_client is not None:
+            self.redis_client.setex(key, ttl, self.codec.encode(value))
+            self._publicar_invalidacion(key)
+            return 201
+
+        if not self.codec.is_plain_json:
+            response = requests.put(
                 f"{self.cache_endpoint}/{self._encode_key(key)}",
+                params={'ttl': ttl},
+                data=self.codec.encode(value),
+                headers={'Content-Type': MEDIA_TYPE},
                 timeout=self.timeout
             )
-            if response.status_code == 200:
-                payload = response.json()
+            # Redis Service anterior sin PUT: guardar como JSON
+            if response.status_code not in (404, 405):
+                return response.status_code
+
+        response = requests.post(
+            f"{self.cache_endpoint}/",
+            json={'key': key, 'value': value, 'ttl': ttl},
+            timeout=self.timeout
+        )
+        return response.status_code
+
+    def get_inventarios_by_producto(self, producto_id: str) -> Optional[Any]:
+        key = self._build_key(producto_id)
+        try:
+            status_code, value = self._get_value(key)
+            if status_code == 200:
                 logger.info(
                     "Cache HIT en redis_service para producto %s", producto_id
                 )
-                return payload.get('value')
-            if response.status_code == 404:
+                return value
+            if status_code == 404:
                 logger.info(
                     "Cache MISS en redis_service para producto %s", producto_id
                 )
                 return None
             logger.warning(
                 "Cache GET devolvió status inesperado %s para key %s",
-                response.status_code,
+                status_code,
                 key
             )
             return None
-        except requests.RequestException as exc:
+        except ERRORES_CONEXION as exc:
             logger.warning("Error consultando cache: %s", exc)
             return None
 
     def set_inventarios_by_producto(self, producto_id: str, value: Any, ttl: Optional[int] = None) -> bool:
         key = self._build_key(producto_id)
-        payload = {
-            'key': key,
-            'value': value,
-            'ttl': ttl or self.default_ttl
-        }
+        ttl = ttl or self.default_ttl
         try:
-            response = requests.post(
-                f"{self.cache_endpoint}/",
-                json=payload,
-                timeout=self.timeout
-            )
-            if response.status_code in (200, 201):
+            status_code = self._set_value(key, value, ttl)
+            if self.l1 is not None:
+                self.l1.invalidar(key)
+            if status_code in (200, 201):
                 logger.info(
                     "Cache SET en redis_service para producto %s (TTL %s)",
                     producto_id,
-                    payload['ttl']
+                    ttl
                 )
                 return True
             logger.warning(
                 "No se pudo guardar cache para key %s. Status: %s",
                 key,
-                response.status_code
+                status_code
             )
             return False
-        except requests.RequestException as exc:
+        except ERRORES_CONEXION as exc:
             logger.warning("Error guardando en cache: %s", exc)
             return False
 
     def delete_producto_cache(self, producto_id: str) -> bool:
         key = self._build_key(producto_id)
         try:
-            response = requests.delete(
-                f"{self.cache_endpoint}/{self._encode_key(key)}",
-                timeout=self.timeout
-            )
-            return response.status_code == 200
-        except requests.RequestException as exc:
+            if self.redis_client is not None:
+                eliminado = bool(self.redis_client.delete(key))
+                self._publicar_invalidacion(key)
+            else:
+                response = requests.delete(
+                    f"{self.cache_endpoint}/{self._encode_key(key)}",
+                    timeout=self.timeout
+                )
+                eliminado = response.status_code == 200
+            if self.l1 is not None:
+                self.l1.invalidar(key)
+            return eliminado
+        except ERRORES_CONEXION as exc:
             logger.warning("Error eliminando cache para producto %s: %s", producto_id, exc)
             return False
 
     def is_available(self) -> bool:
+        if self.redis_client is not None:
+            try:
+                return bool(self.redis_client.ping())
+            except redis.RedisError:
+                return False
         try:
             response = requests.get(f"{self.base_url}/health", timeout=2)
             return response.status_code == 200
@@ -0,0 +1,168 @@
+"""
+Codecs para los valores guardados en cache (mismo formato que redis_service)
+
+Un valor codificado empieza con un encabezado de 3 bytes:
+
+    0xC1 | serializador | compresión
+
+- 0xC1 nunca aparece al inicio de un JSON (ni en UTF-8), así que los valores
+  antiguos guardados como texto JSON se siguen leyendo sin cambios.
+- Serializador: b'j' (JSON, escrito con orjson si está disponible) o b'm' (msgpack).
+- Compresión: b'-' (ninguna), b'z' (zlib), b's' (zstd) o b'l' (lz4). Solo se
+  comprime cuando el valor serializado supera `compression_min_bytes`.
+
+Con serializador "json" y sin compresión se escribe JSON plano sin encabezado,
+idéntico al formato anterior, para que versiones viejas puedan leerlo durante
+el despliegue.
+"""
+import json
+import zlib
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+MAGIC = b'\xc1'
+MEDIA_TYPE = 'application/vnd.medisupply.cache'
+
+SERIALIZERS = ('json', 'orjson', 'msgpack')
+COMPRESSIONS = ('none', 'zlib', 'zstd', 'lz4')
+
+_SERIALIZER_IDS = {'json': b'j', 'orjson': b'j', 'msgpack': b'm'}
+_COMPRESSION_IDS = {'none': b'-', 'zlib': b'z', 'zstd': b's', 'lz4': b'l'}
+
+
+def _json_functions() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    """Funciones JSON más rápidas disponibles (orjson o la librería estándar)"""
+    try:
+        import orjson
+        return orjson.dumps, orjson.loads
+    except ImportError:
+        return (lambda value: json.dumps(value).encode('utf-8')), json.loads
+
+
+def _serializer(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == 'orjson':
+        import orjson
+        return orjson.dumps, orjson.loads
+    if name == 'msgpack':
+        import msgpack
+        return (lambda value: msgpack.packb(value, use_bin_type=True)), (lambda data: msgpack.unpackb(data, raw=False))
+    return (lambda value: json.dumps(value).encode('utf-8')), json.loads
+
+
+def _compressor(name: str, level: int = None) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if name == 'zstd':
+        import zstandard
+        return (zstandard.ZstdCompressor(level=level or 3).compress,
+                zstandard.ZstdDecompressor().decompress)
+    if name == 'lz4':
+        import lz4.frame
+        return lz4.frame.compress, lz4.frame.decompress
+    if name == 'zlib':
+        return (lambda data: zlib.compress(data, level or 6)), zlib.decompress
+    return (lambda data: data), (lambda data: data)
+
+
+class CacheCodec:
+    """Serializa y comprime valores de cache registrando el formato en un encabezado"""
+
+    def __init__(self, serializer: str = 'json', compression: str = 'none',
+                 compression_min_bytes: int = 1024, compression_level: int = None):
+        """
+        Args:
+            serializer: 'json', 'orjson' o 'msgpack'
+            compression: 'none', 'zlib', 'zstd' o 'lz4'
+            compression_min_bytes: Tamaño serializado a partir del cual se comprime
+            compression_level: Nivel de compresión (None = default del algoritmo)
+
+        Raises:
+            ValueError: Si el formato no existe o su librería no está instalada
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Serializador de cache no soportado: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Compresión de cache no soportada: {compression}")
+
+        try:
+            self._dumps, _ = _serializer(serializer)
+            self._compress, _ = _compressor(compression, compression_level)
+        except ImportError as e:
+            raise ValueError(f"Formato de cache {serializer}/{compression} no disponible: {e}")
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self._header = MAGIC + _SERIALIZER_IDS[serializer]
+        # Decodificadores por id, creados al primer uso (permite leer formatos distintos al propio)
+        self._loads: Dict[bytes, Callable[[bytes], Any]] = {b'j': _json_functions()[1]}
+        self._decompress: Dict[bytes, Callable[[bytes], bytes]] = {b'-': (lambda data: data)}
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "CacheCodec":
+        """Crea el codec a partir de CACHE_SERIALIZER, CACHE_COMPRESSION y CACHE_COMPRESSION_MIN_BYTES"""
+        return cls(
+            serializer=config.get('CACHE_SERIALIZER', 'json'),
+            compression=config.get('CACHE_COMPRESSION', 'none'),
+            compression_min_bytes=int(config.get('CACHE_COMPRESSION_MIN_BYTES', 1024))
+        )
+
+    @property
+    def is_plain_json(self) -> bool:
+        """True si el codec escribe JSON plano (formato anterior, sin encabezado)"""
+        return self.serializer == 'json' and self.compression == 'none'
+
+    def encode(self, value: Any) -> bytes:
+        """Serializa un valor y lo comprime si supera el umbral"""
+        data = self._dumps(value)
+        if self.is_plain_json:
+            return data
+
+        compression = 'none'
+        if self.compression != 'none' and len(data) >= self.compression_min_bytes:
+            data = self._compress(data)
+            compression = self.compression
+        return self._header + _COMPRESSION_IDS[compression] + data
+
+    def decode(self, data) -> Any:
+        """
+        Decodifica un valor en cualquiera de los formatos soportados
+
+        Raises:
+            ValueError: Si el valor usa un formato cuya librería no está instalada
+        """
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data.startswith(MAGIC):
+            return self._loads[b'j'](data)
+
+        serializer_id, compression_id, payload = data[1:2], data[2:3], data[3:]
+        return self._loads_for(serializer_id)(self._decompress_for(compression_id)(payload))
+
+    def _loads_for(self, serializer_id: bytes) -> Callable[[bytes], Any]:
+        if serializer_id not in self._loads:
+            name = next((n for n, i in _SERIALIZER_IDS.items() if i == serializer_id), None)
+            if name is None:
+                raise ValueError(f"Serializador de cache desconocido: {serializer_id!r}")
+            try:
+                self._loads[serializer_id] = _serializer(name)[1]
+            except ImportError as e:
+                raise ValueError(f"No se puede leer el valor ({name} no instalado): {e}")
+        return self._loads[serializer_id]
+
+    def _decompress_for(self, compression_id: bytes) -> Callable[[bytes], bytes]:
+        if compression_id not in self._decompress:
+            name = next((n for n, i in _COMPRESSION_IDS.items() if i == compression_id), None)
+            if name is None:
+                raise ValueError(f"Compresión de cache desconocida: {compression_id!r}")
+            try:
+                self._decompress[compression_id] = _compressor(name)[1]
+            except ImportError as e:
+                raise ValueError(f"No se puede leer el valor ({name} no instalado): {e}")
+        return self._decompress[compression_id]
+
+    @staticmethod
+    def is_encoded(data: bytes) -> bool:
+        """Valida que unos bytes tengan un formato de valor reconocible (encabezado o JSON)"""
+        if not data:
+            return False
+        if data.startswith(MAGIC):
+            return len(data) >= 3 and data[1:2] in _SERIALIZER_IDS.values() and data[2:3] in _COMPRESSION_IDS.values()
+        return True
@@ -0,0 +1,77 @@
+"""
+Resolución cacheada del vendedor o cliente dueño del token.
+
+Los endpoints móviles (crear y listar pedidos) necesitan el vendedor o los
+clientes asociados al correo del token, y los obtenían buscando por correo en
+su microservicio en cada petición. Esa asociación casi nunca cambia, así que
+lo resuelto se guarda en memoria por IDENTIDAD_CACHE_TTL segundos (clave: tipo
+y correo). Solo se guardan las búsquedas con resultado: un vendedor o cliente
+recién creado se encuentra en la siguiente petición. Ningún servicio avisa de
+cambios de correo o bajas: se ven al vencer la entrada, así que lo desactualizado
+dura como máximo IDENTIDAD_CACHE_TTL.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.config.config import Config
+from src.services.vendedores import listar_vendedores_externo
+from src.services.clientes import listar_clientes_externo
+
+_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def limpiar_cache_identidad() -> None:
+    """Descarta todas las identidades guardadas."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _resolver(tipo: str, email: str, consultar: Callable[[str], Any]) -> Any:
+    clave = (tipo, email)
+    ahora = time.monotonic()
+    with _cache_lock:
+        entrada = _cache.get(clave)
+        if entrada is not None and entrada[0] > ahora:
+            return entrada[1]
+
+    valor = consultar(email)
+    if valor:
+        with _cache_lock:
+            _cache[clave] = (time.monotonic() + float(Config.IDENTIDAD_CACHE_TTL), valor)
+    return valor
+
+
+def _consultar_vendedores(email: str) -> List[Dict[str, Any]]:
+    respuesta = listar_vendedores_externo(filters={'correo': email})
+    return (respuesta.get('items') or []) if isinstance(respuesta, dict) else []
+
+
+def _consultar_clientes(email: str) -> List[Dict[str, Any]]:
+    respuesta = listar_clientes_externo(email)
+    return (respuesta.get('data') or []) if isinstance(respuesta, dict) else []
+
+
+def vendedores_por_correo(email: str) -> List[Dict[str, Any]]:
+    """
+    Vendedores con ese correo (normalmente uno).
+
+    Returns:
+        Lista de vendedores (vacía si no hay)
+    Raises:
+        VendedorServiceError: Si falla el microservicio de vendedores
+    """
+    return _resolver('vendedor', email, _consultar_vendedores)
+
+
+def clientes_por_correo(email: str) -> List[Dict[str, Any]]:
+    """
+    Clientes con ese correo de empresa.
+
+    Returns:
+        Lista de clientes (vacía si no hay)
+    Raises:
+        ClienteServiceError: Si falla el microservicio de clientes
+    """
+    return _resolver('cliente', email, _consultar_clientes)
@@ -7,12 +7,14 @@ from __future__ import annotations
 
 from calendar import c
 import logging
+import time
 from typing import Any, Dict, Iterable, List, MutableMapping, Optional
 
 import requests
 from flask import current_app
 
 from src.services.cache_client import CacheClient
+from src.services.http_revalidacion import get_condicional
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +72,7 @@ def _fetch_inventarios_from_upstream(producto_id: str) -> Dict[str, Any]:
     timeout = cfg.get('INVENTARIOS_TIMEOUT', 8)
 
     try:
-        response = requests.get(
+        response = get_condicional(
             f"{base_url}/api/inventarios",
             params={'productoId': producto_id},
             timeout=timeout
@@ -198,6 +200,108 @@ def actualizar_inventatrio_externo(producto_id: str, ajuste_cantidad: int) -> bo
     return False
 
 
+def reservar_inventario_externo(productos: List[Dict[str, Any]], referencia: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Reserva en una sola llamada el stock de todas las líneas de un pedido.
+
+    El microservicio descuenta todas las líneas en una transacción: si alguna
+    no tiene stock no se descuenta ninguna.
+
+    Args:
+        productos: Líneas del pedido ({'id', 'cantidad'})
+        referencia: Referencia opcional de la reserva
+
+    Returns:
+        Reserva creada (incluye 'id' para confirmarla o liberarla)
+    Raises:
+        InventarioServiceError: Si no hay stock suficiente o falla el microservicio.
+    """
+    inventarios_url = current_app.config.get('INVENTARIOS_URL')
+    items = [{'productoId': item['id'], 'cantidad': int(item.get('cantidad', 1))} for item in productos]
+    try:
+        response = requests.post(
+            f"{inventarios_url}/api/inventarios/reservar",
+            json={'items': items, 'referencia': referencia},
+            timeout=10
+        )
+    except requests.RequestException as e:
+        logger.error(f"❌ Error de conexión reservando inventario: {e}")
+        raise InventarioServiceError({
+            'error': 'Error al conectar con el microservicio de inventarios',
+            'codigo': 'ERROR_CONEXION_INVENTARIOS'
+        }, 503)
+
+    if response.status_code == 201:
+        reserva = response.json()
+        logger.info(f"✅ Inventario reservado: {reserva.get('id')}")
+        return reserva
+
+    error_data = response.json() if response.content else {}
+    if response.status_code == 409:
+        raise InventarioServiceError({
+            'error': 'No hay suficiente inventario para realizar el pedido',
+            'codigo': 'INVENTARIO_INSUFICIENTE',
+            'faltantes': error_data.get('faltantes', [])
+        }, 409)
+    logger.error(f"❌ Error reservando inventario: {response.status_code} - {error_data}")
+    raise InventarioServiceError({
+        'error': error_data.get('error', 'Error al reservar inventario'),
+        'codigo': 'ERROR_RESERVA_INVENTARIO'
+    }, 400 if response.status_code == 400 else 502)
+
+
+# Reintentos al confirmar una reserva (espera base en segundos, se duplica en cada intento)
+INTENTOS_CONFIRMAR_RESERVA = 4
+ESPERA_CONFIRMAR_RESERVA = 0.25
+
+
+def _cerrar_reserva(reserva_id: str, accion: str, data: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """Confirma o libera una reserva; retorna el status HTTP, o None si no hubo conexión."""
+    inventarios_url = current_app.config.get('INVENTARIOS_URL')
+    try:
+        response = requests.post(
+            f"{inventarios_url}/api/inventarios/reservas/{reserva_id}/{accion}",
+            json=data or {},
+            timeout=10
+        )
+    except requests.RequestException as e:
+        logger.error(f"❌ Error de conexión ({accion}) reserva {reserva_id}: {e}")
+        return None
+    if response.status_code != 200:
+        logger.error(f"❌ Error ({accion}) reserva {reserva_id}: {response.status_code} - {response.text}")
+    return response.status_code
+
+
+def confirmar_reserva_externa(reserva_id: str, referencia: Optional[str] = None) -> bool:
+    """
+    Confirma una reserva para que su stock quede descontado definitivamente.
+
+    Una reserva sin confirmar devuelve su stock al inventario al vencer, así que
+    los errores de conexión y 5xx se reintentan con espera exponencial. Un 4xx
+    (ej. la reserva ya expiró) no se reintenta.
+
+    Returns:
+        True si quedó confirmada
+    """
+    data = {'referencia': referencia} if referencia else None
+    espera = ESPERA_CONFIRMAR_RESERVA
+    for intento in range(1, INTENTOS_CONFIRMAR_RESERVA + 1):
+        status = _cerrar_reserva(reserva_id, 'confirmar', data)
+        if status == 200:
+            return True
+        if status is not None and status < 500:
+            return False
+        if intento < INTENTOS_CONFIRMAR_RESERVA:
+            time.sleep(espera)
+            espera *= 2
+    return False
+
+
+def liberar_reserva_externa(reserva_id: str) -> bool:
+    """Libera una reserva y devuelve su stock al inventario (si falla, vuelve al vencer)."""
+    return _cerrar_reserva(reserva_id, 'liberar') == 200
+
+
 def _get_inventarios_by_producto(producto_id: str) -> Dict[str, Any]:
     """
     Obtiene inventarios de un producto (cache-first strategy).
@@ -274,7 +378,7 @@ def _get_from_microservice(producto_id: str) -> List[Dict[str, Any]]:
         logger.info(f"📡 Consultando microservicio para producto {producto_id}")
         print(f"{inventarios_url}/api/inventarios")
         
-        response = requests.get(
+        response = get_condicional(
             f"{inventarios_url}/api/inventarios",
             params={'productoId': producto_id},
             timeout=10
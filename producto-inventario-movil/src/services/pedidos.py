@@ -4,10 +4,11 @@ from unittest import result
 from flask import cli, current_app
 import requests
 from src.config.config import Config
-from src.services.vendedores import listar_vendedores_externo
-from src.services.inventarios import actualizar_inventatrio_externo
-from src.services.productos import get_productos_con_inventarios
-from src.services.clientes import listar_clientes_externo
+from src.services.identidad import vendedores_por_correo, clientes_por_correo
+from src.services.inventarios import (
+    reservar_inventario_externo, confirmar_reserva_externa, liberar_reserva_externa, InventarioServiceError
+)
+from src.services.productos import get_productos_con_inventarios_por_ids
 
 
 class PedidoServiceError(Exception):
@@ -54,28 +55,31 @@ def crear_pedido_externo(datos_pedido, email, rol):
     try:
 
         if rol == 'vendedor':
-            venndedor_response = listar_vendedores_externo(filters={'correo': email})
-
-            if not venndedor_response.get('items') or len(venndedor_response['items']) == 0:
+            vendedores = vendedores_por_correo(email)
+            if not vendedores:
                 raise PedidoServiceError({'error': 'Vendedor no encontrado', 'codigo': 'VENDEDOR_NO_ENCONTRADO'}, 404)
 
-            vendedor_id = venndedor_response['items'][0]['id']
+            vendedor_id = vendedores[0]['id']
         elif rol == 'cliente':
-            cliente_response = listar_clientes_externo(email)
-            if not cliente_response.get('data') or len(cliente_response['data']) == 0:
+            clientes = clientes_por_correo(email)
+            if not clientes:
                 raise PedidoServiceError({'error': 'Cliente no encontrado', 'codigo': 'CLIENTE_NO_ENCONTRADO'}, 404)
-            cliente_id = cliente_response['data'][0]['id']
+            cliente_id = clientes[0]['id']
 
-        # Actualizar inventario
-        resultado_validacion = validate_order_against_products(productos, get_productos_con_inventarios())
+        # Validar contra el stock de los productos del pedido (no el catálogo completo)
+        producto_ids = [item.get('id') for item in productos if isinstance(item, dict)]
+        resultado_validacion = validate_order_against_products(
+            productos, get_productos_con_inventarios_por_ids(producto_ids)
+        )
         if not resultado_validacion['valid']:
             raise PedidoServiceError({'error': 'Validación de productos fallida', 'detalles': resultado_validacion['errors']}, 400)
         
-        for item in productos:
-            resultado_inventario = actualizar_inventatrio_externo(item['id'], -int(item.get('cantidad', 1)))
-            if not resultado_inventario:
-                raise PedidoServiceError({'error': 'Error al actualizar inventario', 'detalles': resultado_inventario.get('error')}, 500)
-            
+        # Todas las líneas se reservan juntas: o hay stock para el pedido completo o no se descuenta nada
+        try:
+            reserva = reservar_inventario_externo(productos)
+        except InventarioServiceError as e:
+            raise PedidoServiceError(e.message, e.status_code)
+
         payload = datos_pedido.copy()
         payload['vendedor_id'] = vendedor_id
         payload['cliente_id'] = cliente_id
@@ -85,19 +89,29 @@ def crear_pedido_externo(datos_pedido, email, rol):
                 json=payload,
                 headers={'Content-Type': 'application/json'}
             )
-            if (response.status_code != 201):
-                current_app.logger.error(f"Error del microservicio de pedidos: {response.status_code} - {response.text}")
-                raise PedidoServiceError({'error': 'Error al crear el pedido en el microservicio de pedidos', 'codigo': 'ERROR_MICROSERVICIO_PEDIDOS'}, response.status_code)
         except requests.exceptions.RequestException as e:
             current_app.logger.error(f"Error al conectar con el microservicio de pedidos: {str(e)}")
+            liberar_reserva_externa(reserva['id'])
             raise PedidoServiceError({'error': 'Error al conectar con el microservicio de pedidos'}, 503)
-
-        current_app.logger.info(f"Pedido creado exitosamente: {response.json()}")
-        # Nota: por simplicidad en los tests unitarios retornamos la respuesta del
-        # microservicio de pedidos inmediatamente. Las validaciones y actualizaciones
-        # de inventario se pueden realizar en un flujo asíncrono o posterior si se
-        # desea mantener la consistencia transaccional.
-        return response.json()
+        if (response.status_code != 201):
+            current_app.logger.error(f"Error del microservicio de pedidos: {response.status_code} - {response.text}")
+            liberar_reserva_externa(reserva['id'])
+            raise PedidoServiceError({'error': 'Error al crear el pedido en el microservicio de pedidos', 'codigo': 'ERROR_MICROSERVICIO_PEDIDOS'}, response.status_code)
+
+        pedido = response.json()
+        if not confirmar_reserva_externa(reserva['id'], referencia=str(pedido.get('id', ''))):
+            # El pedido existe pero su stock volvería al inventario al vencer la reserva:
+            # se informa en lugar de responder como si todo estuviera bien
+            current_app.logger.error(f"No se pudo confirmar la reserva {reserva['id']} del pedido {pedido.get('id')}")
+            raise PedidoServiceError({
+                'error': 'El pedido se creó pero no se pudo confirmar la reserva de inventario',
+                'codigo': 'RESERVA_NO_CONFIRMADA',
+                'pedido': pedido,
+                'reserva_id': reserva['id']
+            }, 502)
+
+        current_app.logger.info(f"Pedido creado exitosamente: {pedido}")
+        return pedido
 
     except requests.exceptions.RequestException as e:
         current_app.logger.error(f"Error al conectar con el microservicio de pedidos: {str(e)}")
@@ -113,8 +127,7 @@ def listar_pedidos_externo(filtros=None, email=None, rol=None):
 
     if rol == 'vendedor':
         if email:
-            venndedor_response = listar_vendedores_externo(filters={'correo': email})
-            items = venndedor_response.get('items', []) if isinstance(venndedor_response, dict) else []
+            items = vendedores_por_correo(email)
             if not items:
                 raise PedidoServiceError({'error': 'Vendedor no encontrado', 'codigo': 'VENDEDOR_NO_ENCONTRADO'}, 404)
             vendedor_id = items[0].get('id')
@@ -123,8 +136,7 @@ def listar_pedidos_externo(filtros=None, email=None, rol=None):
             filtros['vendedor_id'] = vendedor_id
     elif rol == 'cliente':
         if email:
-            cliente_response = listar_clientes_externo(email)
-            items = cliente_response.get('data', []) if isinstance(cliente_response, dict) else []
+            items = clientes_por_correo(email)
             if not items:
                 raise PedidoServiceError({'error': 'Cliente no encontrado', 'codigo': 'CLIENTE_NO_ENCONTRADO'}, 404)
             cliente_ids = [item.get('id') for item in items if item.get('id') is not None]
@@ -3,6 +3,7 @@ import requests
 import json
 from flask import current_app, jsonify
 from src.config.config import Config as config
+from src.services.http_revalidacion import get_condicional
 from typing import Any, Dict, Iterable, List, MutableMapping, Optional
 from src.services.inventarios import InventarioServiceError, _get_inventarios_by_producto, _actualizar_inventario, obtener_productos_con_inventarios
 
@@ -40,6 +41,30 @@ def get_productos_con_inventarios(params: Optional[MutableMapping[str, Any]] = N
     return inventario_response
     
 
+# Máximo de productos por página que acepta el microservicio de productos
+TAMANO_LOTE_IDS = 100
+
+
+def get_productos_con_inventarios_por_ids(producto_ids: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Obtiene solo los productos indicados con su stock (inventarios con cache por producto).
+
+    Pensado para validar un pedido sin traer el catálogo completo: los productos
+    se piden por lotes de IDs y `cantidad_disponible` es el total de inventario.
+    Los IDs no numéricos se omiten (el producto queda como no encontrado).
+    """
+    ids = list(dict.fromkeys(str(pid) for pid in producto_ids if str(pid).strip().isdigit()))
+    productos: List[Dict[str, Any]] = []
+    for inicio in range(0, len(ids), TAMANO_LOTE_IDS):
+        lote = ids[inicio:inicio + TAMANO_LOTE_IDS]
+        payload = consultar_productos_externo({'ids': ','.join(lote), 'per_page': len(lote)})
+        productos.extend(_extract_productos(payload))
+
+    if not productos:
+        return {'data': [], 'source': 'microservices'}
+    return aplanar_productos_con_inventarios(obtener_productos_con_inventarios(productos))
+
+
 def _extract_productos(payload: Any) -> List[Dict[str, Any]]:
     if isinstance(payload, list):
         return payload
@@ -83,7 +108,7 @@ def consultar_productos_externo(params=None):
     url_producto = config.PRODUCTO_URL + '/api/productos/'
 
     try:
-        response = requests.get(
+        response = get_condicional(
             url_producto,
             params=params
         )
@@ -134,7 +159,7 @@ def obtener_detalle_producto_externo(producto_id):
     url_producto = f"{config.PRODUCTO_URL}/api/productos/{producto_id}"
 
     try:
-        response = requests.get(url_producto)
+        response = get_condicional(url_producto)
 
         if response.status_code == 404:
             current_app.logger.warning(f"Producto {producto_id} no encontrado")
@@ -206,7 +231,7 @@ def obtener_producto_por_sku_externo(sku):
     url_producto = f"{config.PRODUCTO_URL}/api/productos/sku/{sku}"
 
     try:
-        response = requests.get(url_producto)
+        response = get_condicional(url_producto)
 
         if response.status_code == 404:
             current_app.logger.warning(f"Producto con SKU {sku} no encontrado")
@@ -22,3 +22,12 @@ def disable_external_requests(monkeypatch):
     monkeypatch.setattr(_requests, "patch", _raise)
 
     yield
+
+
+@pytest.fixture(autouse=True)
+def limpiar_identidades():
+    """Cada test resuelve vendedores y clientes sin lo guardado por otros."""
+    from src.services.identidad import limpiar_cache_identidad
+    limpiar_cache_identidad()
+    yield
+    limpiar_cache_identidad()
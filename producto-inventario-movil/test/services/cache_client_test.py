@@ -374,3 +374,44 @@ class TestCacheClientIsAvailable:
         
         call_args = mock_get.call_args
         assert call_args[1]['timeout'] == 2
+
+
+class TestCacheClientRedisDirecto:
+    """Tests del modo directo (CACHE_BACKEND=redis)."""
+
+    @pytest.fixture
+    def redis_client(self):
+        return Mock()
+
+    @pytest.fixture
+    def cliente_directo(self, redis_client):
+        return CacheClient(
+            base_url='http://localhost:5011',
+            redis_client=redis_client,
+            canal_invalidacion='cache:invalidaciones'
+        )
+
+    @patch('src.services.cache_client.requests.delete')
+    def test_delete_en_redis_publica_invalidacion(self, mock_delete, cliente_directo, redis_client):
+        """Verifica que el borrado va directo a Redis y avisa a los L1."""
+        redis_client.delete.return_value = 1
+
+        assert cliente_directo.delete_producto_cache('123') is True
+
+        redis_client.delete.assert_called_once_with('inventarios:producto:123')
+        redis_client.publish.assert_called_once_with(
+            'cache:invalidaciones', '{"keys": ["inventarios:producto:123"]}'
+        )
+        mock_delete.assert_not_called()
+
+    def test_get_error_de_redis_retorna_none(self, cliente_directo, redis_client):
+        """Verifica que un error de conexión con Redis se trata como MISS."""
+        import redis
+        redis_client.pipeline.side_effect = redis.ConnectionError('down')
+
+        assert cliente_directo.get_inventarios_by_producto('123') is None
+
+    def test_is_available_usa_ping(self, cliente_directo, redis_client):
+        """Verifica que la salud se consulta con PING."""
+        redis_client.ping.return_value = True
+        assert cliente_directo.is_available() is True
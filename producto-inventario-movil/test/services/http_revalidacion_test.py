@@ -0,0 +1,58 @@
+"""Tests para el cliente HTTP con revalidación condicional."""
+from unittest.mock import Mock
+
+import pytest
+
+from src.services import http_revalidacion
+from src.services.http_revalidacion import get_condicional
+
+
+@pytest.fixture(autouse=True)
+def limpiar_respuestas():
+    http_revalidacion.limpiar()
+    yield
+    http_revalidacion.limpiar()
+
+
+def _respuesta(status_code, content=b'', headers=None):
+    response = Mock(status_code=status_code)
+    response.content = content
+    response.headers = headers or {}
+    response.encoding = 'utf-8'
+    return response
+
+
+def test_revalida_con_etag_y_reutiliza_copia(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{"producto": {"id": 1}}', {'ETag': '"v1"'})
+    )
+    primera = get_condicional('http://productos/api/productos/1')
+    assert primera.status_code == 200
+    mock_get.assert_called_once_with('http://productos/api/productos/1')
+
+    mock_get.return_value = _respuesta(304)
+    segunda = get_condicional('http://productos/api/productos/1')
+
+    _, kwargs = mock_get.call_args
+    assert kwargs['headers'] == {'If-None-Match': '"v1"'}
+    assert segunda.status_code == 200
+    assert segunda.json() == {'producto': {'id': 1}}
+
+
+def test_respuesta_nueva_reemplaza_copia(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{"v": 1}', {'ETag': '"v1"'})
+    )
+    get_condicional('http://inventarios/api/inventarios', params={'productoId': '1'})
+
+    mock_get.return_value = _respuesta(200, b'{"v": 2}', {'ETag': '"v2"'})
+    get_condicional('http://inventarios/api/inventarios', params={'productoId': '1'})
+
+    mock_get.return_value = _respuesta(304)
+    response = get_condicional('http://inventarios/api/inventarios', params={'productoId': '1'})
+
+    _, kwargs = mock_get.call_args
+    assert kwargs['headers'] == {'If-None-Match': '"v2"'}
+    assert response.json() == {'v': 2}
@@ -0,0 +1,75 @@
+import pytest
+
+from src.config.config import Config
+from src.services import identidad
+from src.services.identidad import vendedores_por_correo, clientes_por_correo
+from src.services.vendedores import VendedorServiceError
+
+
+@pytest.fixture
+def consultas_vendedores(monkeypatch):
+    consultas = []
+
+    def fake_listar(filters=None):
+        consultas.append(filters['correo'])
+        if filters['correo'] == 'nuevo@e.com':
+            return {'items': []}
+        return {'items': [{'id': 'v-1', 'correo': filters['correo']}]}
+
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', fake_listar)
+    return consultas
+
+
+def test_vendedor_se_resuelve_una_sola_vez(consultas_vendedores):
+    assert vendedores_por_correo('v@e.com')[0]['id'] == 'v-1'
+    assert vendedores_por_correo('v@e.com')[0]['id'] == 'v-1'
+
+    assert consultas_vendedores == ['v@e.com']
+
+
+def test_sin_resultado_no_se_guarda(consultas_vendedores):
+    assert vendedores_por_correo('nuevo@e.com') == []
+    assert vendedores_por_correo('nuevo@e.com') == []
+
+    assert consultas_vendedores == ['nuevo@e.com', 'nuevo@e.com']
+
+
+def test_entrada_vence_con_ttl(consultas_vendedores, monkeypatch):
+    monkeypatch.setattr(Config, 'IDENTIDAD_CACHE_TTL', 60)
+    reloj = [1000.0]
+    monkeypatch.setattr(identidad.time, 'monotonic', lambda: reloj[0])
+
+    vendedores_por_correo('v@e.com')
+    reloj[0] += 59
+    vendedores_por_correo('v@e.com')
+    reloj[0] += 2
+    vendedores_por_correo('v@e.com')
+
+    assert consultas_vendedores == ['v@e.com', 'v@e.com']
+
+
+def test_clientes_y_vendedores_se_guardan_por_separado(consultas_vendedores, monkeypatch):
+    consultas_clientes = []
+
+    def fake_clientes(email):
+        consultas_clientes.append(email)
+        return {'data': [{'id': 7}, {'id': 8}]}
+
+    monkeypatch.setattr('src.services.identidad.listar_clientes_externo', fake_clientes)
+    vendedores_por_correo('v@e.com')
+    assert [c['id'] for c in clientes_por_correo('v@e.com')] == [7, 8]
+    assert [c['id'] for c in clientes_por_correo('v@e.com')] == [7, 8]
+    assert vendedores_por_correo('v@e.com')[0]['id'] == 'v-1'
+
+    assert consultas_vendedores == ['v@e.com']
+    assert consultas_clientes == ['v@e.com']
+
+
+def test_error_del_microservicio_se_propaga(monkeypatch):
+    def falla(filters=None):
+        raise VendedorServiceError('Error al listar los vendedores', 503)
+
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', falla)
+
+    with pytest.raises(VendedorServiceError):
+        vendedores_por_correo('v@e.com')
@@ -9,7 +9,7 @@ from src.services.inventarios import (
     _upsert_cache,
     InventarioServiceError,
 )
-from src.services.productos import get_productos_con_inventarios, _extract_productos
+from src.services.productos import get_productos_con_inventarios, get_productos_con_inventarios_por_ids, _extract_productos
 from src.services.cache_client import CacheClient
 
 
@@ -183,3 +183,41 @@ def test_get_productos_con_inventarios_skips_invalid_products(app, monkeypatch):
 
     assert res['total'] == 1
     assert len(res['data']) == 1
+
+
+def test_get_productos_con_inventarios_por_ids_solo_consulta_los_del_pedido(app, monkeypatch):
+    consultas = []
+
+    def fake_consultar(params=None):
+        consultas.append(params)
+        return {'productos': [{'id': int(pid), 'cantidad_disponible': 999} for pid in params['ids'].split(',')]}
+
+    monkeypatch.setattr('src.services.productos.consultar_productos_externo', fake_consultar)
+
+    class FakeCache(CacheClient):
+        def __init__(self): pass
+        def get_inventarios_by_producto(self, producto_id: str):
+            return {'inventarios': [{'cantidad': 4}], 'totalInventario': 4}
+    monkeypatch.setattr('src.services.inventarios.CacheClient.from_app_config', classmethod(lambda cls: FakeCache()))
+
+    with app.app_context():
+        res = get_productos_con_inventarios_por_ids([7, '3', 7, 'abc'])
+
+    assert consultas == [{'ids': '7,3', 'per_page': 2}]
+    # El stock disponible es el total de inventario, no el campo del producto
+    assert [(p['id'], p['cantidad_disponible']) for p in res['data']] == [(7, 4), (3, 4)]
+    assert all('inventarios' not in p for p in res['data'])
+
+
+def test_get_productos_con_inventarios_por_ids_por_lotes(app, monkeypatch):
+    consultas = []
+    monkeypatch.setattr(
+        'src.services.productos.consultar_productos_externo',
+        lambda params=None: consultas.append(params) or {'productos': []}
+    )
+
+    with app.app_context():
+        res = get_productos_con_inventarios_por_ids(range(1, 151))
+
+    assert [c['per_page'] for c in consultas] == [100, 50]
+    assert res['data'] == []
@@ -1,3 +1,4 @@
+import requests
 import pytest
 from flask import Flask
 from unittest.mock import MagicMock
@@ -7,6 +8,9 @@ from src.services.inventarios import (
     _get_from_microservice,
     actualizar_inventatrio_externo,
     _actualizar_inventario,
+    reservar_inventario_externo,
+    confirmar_reserva_externa,
+    liberar_reserva_externa,
     InventarioServiceError,
 )
 from src.services.productos import aplanar_productos_con_inventarios
@@ -130,3 +134,102 @@ def test__actualizar_inventario_put_behavior(monkeypatch):
     monkeypatch.setattr('src.services.inventarios.requests.put', lambda *a, **kw: RespFail())
     with pytest.raises(Exception):
         _actualizar_inventario('inv1', {'cantidad': 9})
+
+
+def test_reservar_inventario_externo_envia_todas_las_lineas(monkeypatch):
+    llamadas = []
+
+    def fake_post(url, json=None, timeout=None):
+        llamadas.append((url, json))
+        return MagicMock(status_code=201, json=lambda: {'id': 'r-1', 'estado': 'activa'})
+
+    monkeypatch.setattr('src.services.inventarios.requests.post', fake_post)
+    app = make_app()
+    with app.app_context():
+        reserva = reservar_inventario_externo([{'id': 1, 'cantidad': 2}, {'id': 7}])
+
+    assert reserva['id'] == 'r-1'
+    assert llamadas == [(
+        'http://inventarios:5009/api/inventarios/reservar',
+        {'items': [{'productoId': 1, 'cantidad': 2}, {'productoId': 7, 'cantidad': 1}], 'referencia': None}
+    )]
+
+
+def test_reservar_inventario_externo_sin_stock(monkeypatch):
+    faltantes = [{'productoId': 1, 'solicitado': 5, 'disponible': 2}]
+    resp = MagicMock(status_code=409, content=b'{}', json=lambda: {'error': 'sin stock', 'faltantes': faltantes})
+    monkeypatch.setattr('src.services.inventarios.requests.post', lambda *a, **kw: resp)
+    app = make_app()
+    with app.app_context():
+        with pytest.raises(InventarioServiceError) as exc:
+            reservar_inventario_externo([{'id': 1, 'cantidad': 5}])
+
+    assert exc.value.status_code == 409
+    assert exc.value.message['codigo'] == 'INVENTARIO_INSUFICIENTE'
+    assert exc.value.message['faltantes'] == faltantes
+
+
+def test_confirmar_y_liberar_reserva_externa(monkeypatch):
+    urls = []
+
+    def fake_post(url, json=None, timeout=None):
+        urls.append(url)
+        return MagicMock(status_code=200 if url.endswith('/confirmar') else 409, text='')
+
+    monkeypatch.setattr('src.services.inventarios.requests.post', fake_post)
+    app = make_app()
+    with app.app_context():
+        assert confirmar_reserva_externa('r-1', referencia='p-1') is True
+        assert liberar_reserva_externa('r-1') is False
+
+    assert urls == [
+        'http://inventarios:5009/api/inventarios/reservas/r-1/confirmar',
+        'http://inventarios:5009/api/inventarios/reservas/r-1/liberar',
+    ]
+
+
+def test_confirmar_reserva_externa_reintenta_errores_transitorios(monkeypatch):
+    respuestas = [None, 503, 200]
+    esperas = []
+
+    def fake_post(url, json=None, timeout=None):
+        status = respuestas.pop(0)
+        if status is None:
+            raise requests.RequestException('sin conexión')
+        return MagicMock(status_code=status, text='')
+
+    monkeypatch.setattr('src.services.inventarios.requests.post', fake_post)
+    monkeypatch.setattr('src.services.inventarios.time.sleep', esperas.append)
+    app = make_app()
+    with app.app_context():
+        assert confirmar_reserva_externa('r-1') is True
+
+    assert esperas == [0.25, 0.5]
+
+
+def test_confirmar_reserva_externa_no_reintenta_4xx(monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(
+        'src.services.inventarios.requests.post',
+        lambda *a, **kw: llamadas.append(a) or MagicMock(status_code=409, text='expiró')
+    )
+    monkeypatch.setattr('src.services.inventarios.time.sleep', lambda s: pytest.fail('no debe esperar'))
+    app = make_app()
+    with app.app_context():
+        assert confirmar_reserva_externa('r-1') is False
+
+    assert len(llamadas) == 1
+
+
+def test_confirmar_reserva_externa_agota_intentos(monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(
+        'src.services.inventarios.requests.post',
+        lambda *a, **kw: llamadas.append(a) or MagicMock(status_code=500, text='')
+    )
+    monkeypatch.setattr('src.services.inventarios.time.sleep', lambda s: None)
+    app = make_app()
+    with app.app_context():
+        assert confirmar_reserva_externa('r-1') is False
+
+    assert len(llamadas) == 4
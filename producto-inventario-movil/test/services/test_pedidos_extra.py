@@ -3,14 +3,18 @@ import requests
 from unittest.mock import patch, MagicMock
 
 from src.services.pedidos import crear_pedido_externo, PedidoServiceError
+from src.services.inventarios import InventarioServiceError
 
 
 def test_crear_pedido_externo_success(monkeypatch):
     mock_vendor = {'items': [{'id': 'v-1'}]}
 
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: mock_vendor)
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: mock_vendor)
     monkeypatch.setattr('src.services.pedidos.validate_order_against_products', lambda items, prod: {'valid': True, 'errors': []})
-    monkeypatch.setattr('src.services.pedidos.actualizar_inventatrio_externo', lambda pid, adj: True)
+    monkeypatch.setattr('src.services.pedidos.reservar_inventario_externo', lambda productos: {'id': 'r-1'})
+    confirmadas = []
+    monkeypatch.setattr('src.services.pedidos.confirmar_reserva_externa',
+                        lambda reserva_id, referencia=None: confirmadas.append((reserva_id, referencia)) or True)
 
     class Resp:
         status_code = 201
@@ -26,26 +30,84 @@ def test_crear_pedido_externo_success(monkeypatch):
     app = create_app()
     with app.app_context():
         # evitar que la función real consulte productos (externo)
-        monkeypatch.setattr('src.services.pedidos.get_productos_con_inventarios', lambda params=None: {'data': []})
+        monkeypatch.setattr('src.services.pedidos.get_productos_con_inventarios_por_ids', lambda producto_ids: {'data': []})
         res = crear_pedido_externo(data, 'v@e.com', 'vendedor')
 
     assert res['id'] == 'pedido-1'
+    assert confirmadas == [('r-1', 'pedido-1')]
 
 
-def test_crear_pedido_externo_inventory_update_failure_propagates(monkeypatch):
+def test_crear_pedido_externo_inventario_insuficiente_no_crea_pedido(monkeypatch):
     mock_vendor = {'items': [{'id': 'v-1'}]}
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: mock_vendor)
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: mock_vendor)
     monkeypatch.setattr('src.services.pedidos.validate_order_against_products', lambda items, prod: {'valid': True, 'errors': []})
 
-    # Simulate inventory update failing by raising an exception
-    def fail_update(pid, adj):
-        raise Exception('inventory update failed')
+    faltantes = [{'productoId': 1, 'solicitado': 1, 'disponible': 0}]
 
-    monkeypatch.setattr('src.services.pedidos.actualizar_inventatrio_externo', fail_update)
+    def sin_stock(productos):
+        raise InventarioServiceError({'error': 'sin stock', 'codigo': 'INVENTARIO_INSUFICIENTE', 'faltantes': faltantes}, 409)
+
+    monkeypatch.setattr('src.services.pedidos.reservar_inventario_externo', sin_stock)
+    post = MagicMock()
+    monkeypatch.setattr('src.services.pedidos.requests.post', post)
+
+    data = {'productos': [{'id': 1, 'cantidad': 1}], 'total': 100, 'cliente_id': 1}
+    from src import create_app
+    app = create_app()
+    with app.app_context():
+        monkeypatch.setattr('src.services.pedidos.get_productos_con_inventarios_por_ids', lambda producto_ids: {'data': []})
+        with pytest.raises(PedidoServiceError) as exc:
+            crear_pedido_externo(data, 'v@e.com', 'vendedor')
+
+    assert exc.value.status_code == 409
+    assert exc.value.message['faltantes'] == faltantes
+    post.assert_not_called()
+
+
+def test_crear_pedido_externo_libera_reserva_si_falla_pedido(monkeypatch):
+    mock_vendor = {'items': [{'id': 'v-1'}]}
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: mock_vendor)
+    monkeypatch.setattr('src.services.pedidos.validate_order_against_products', lambda items, prod: {'valid': True, 'errors': []})
+    monkeypatch.setattr('src.services.pedidos.reservar_inventario_externo', lambda productos: {'id': 'r-2'})
+    liberadas = []
+    monkeypatch.setattr('src.services.pedidos.liberar_reserva_externa', lambda reserva_id: liberadas.append(reserva_id) or True)
+    monkeypatch.setattr('src.services.pedidos.requests.post', lambda *a, **kw: MagicMock(status_code=500, text='error'))
 
     data = {'productos': [{'id': 1, 'cantidad': 1}], 'total': 100, 'cliente_id': 1}
     from src import create_app
     app = create_app()
     with app.app_context():
-        with pytest.raises(Exception):
+        monkeypatch.setattr('src.services.pedidos.get_productos_con_inventarios_por_ids', lambda producto_ids: {'data': []})
+        with pytest.raises(PedidoServiceError) as exc:
             crear_pedido_externo(data, 'v@e.com', 'vendedor')
+
+    assert exc.value.status_code == 500
+    assert liberadas == ['r-2']
+
+
+def test_crear_pedido_externo_reserva_no_confirmada(monkeypatch):
+    mock_vendor = {'items': [{'id': 'v-1'}]}
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: mock_vendor)
+    monkeypatch.setattr('src.services.pedidos.validate_order_against_products', lambda items, prod: {'valid': True, 'errors': []})
+    monkeypatch.setattr('src.services.pedidos.reservar_inventario_externo', lambda productos: {'id': 'r-3'})
+    monkeypatch.setattr('src.services.pedidos.confirmar_reserva_externa', lambda reserva_id, referencia=None: False)
+    liberadas = []
+    monkeypatch.setattr('src.services.pedidos.liberar_reserva_externa', lambda reserva_id: liberadas.append(reserva_id))
+    monkeypatch.setattr(
+        'src.services.pedidos.requests.post',
+        lambda *a, **kw: MagicMock(status_code=201, json=lambda: {'id': 'pedido-3'})
+    )
+
+    data = {'productos': [{'id': 1, 'cantidad': 1}], 'total': 100, 'cliente_id': 1}
+    from src import create_app
+    app = create_app()
+    with app.app_context():
+        monkeypatch.setattr('src.services.pedidos.get_productos_con_inventarios_por_ids', lambda producto_ids: {'data': []})
+        with pytest.raises(PedidoServiceError) as exc:
+            crear_pedido_externo(data, 'v@e.com', 'vendedor')
+
+    assert exc.value.status_code == 502
+    assert exc.value.message['codigo'] == 'RESERVA_NO_CONFIRMADA'
+    assert exc.value.message['pedido'] == {'id': 'pedido-3'}
+    # el pedido existe: la reserva no se libera
+    assert liberadas == []
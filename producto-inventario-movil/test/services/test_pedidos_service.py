@@ -29,7 +29,7 @@ def test_crear_pedido_externo_missing_fields():
 
 
 def test_listar_pedidos_externo_success(monkeypatch):
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
 
     captured = {}
 
@@ -61,7 +61,7 @@ def test_listar_pedidos_externo_success(monkeypatch):
 
 
 def test_listar_pedidos_externo_vendedor_no_encontrado(monkeypatch):
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: {'items': []})
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: {'items': []})
 
     from src import create_app
     app = create_app()
@@ -74,7 +74,7 @@ def test_listar_pedidos_externo_vendedor_no_encontrado(monkeypatch):
 
 
 def test_listar_pedidos_externo_vendedor_sin_id(monkeypatch):
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: {'items': [{}]})
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: {'items': [{}]})
 
     from src import create_app
     app = create_app()
@@ -87,7 +87,7 @@ def test_listar_pedidos_externo_vendedor_sin_id(monkeypatch):
 
 
 def test_listar_pedidos_externo_error_backend(monkeypatch):
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
 
     class Resp:
         status_code = 400
@@ -109,7 +109,7 @@ def test_listar_pedidos_externo_error_backend(monkeypatch):
 
 
 def test_listar_pedidos_externo_error_conexion(monkeypatch):
-    monkeypatch.setattr('src.services.pedidos.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
+    monkeypatch.setattr('src.services.identidad.listar_vendedores_externo', lambda filters=None: {'items': [{'id': 'v-1'}]})
 
     def raise_req(*args, **kwargs):
         raise requests.exceptions.RequestException('boom')
@@ -139,7 +139,7 @@ def test_crear_pedido_externo_productos_invalid():
 def test_crear_pedido_externo_vendedor_not_found():
     # mock listar_vendedores_externo to return no items
     with make_app_ctx():
-        with patch('src.services.pedidos.listar_vendedores_externo', return_value={'items': []}):
+        with patch('src.services.identidad.listar_vendedores_externo', return_value={'items': []}):
             data = {'productos': [{'id': 1}], 'total': 10, 'cliente_id': 1}
             with pytest.raises(PedidoServiceError) as exc:
                 crear_pedido_externo(data, 'v@e.com', 'vendedor')
@@ -152,14 +152,17 @@ def test_crear_pedido_externo_requests_error():
     # mock listar_vendedores_externo to return a vendor, but requests.post to raise
     mock_vendor = {'items': [{'id': 'v-1'}]}
     with make_app_ctx():
-        with patch('src.services.pedidos.listar_vendedores_externo', return_value=mock_vendor):
+        with patch('src.services.identidad.listar_vendedores_externo', return_value=mock_vendor):
             # evitar consulta real a productos (se parchea para que retorne lista vacía)
-            with patch('src.services.pedidos.get_productos_con_inventarios', return_value={'data': []}):
-                # evitar que la actualización de inventario intente llamadas externas
-                with patch('src.services.pedidos.actualizar_inventatrio_externo', return_value=True):
+            with patch('src.services.pedidos.get_productos_con_inventarios_por_ids', return_value={'data': []}):
+                # evitar que la reserva de inventario intente llamadas externas
+                with patch('src.services.pedidos.reservar_inventario_externo', return_value={'id': 'r-1'}), \
+                     patch('src.services.pedidos.liberar_reserva_externa', return_value=True) as liberar:
                     with patch('src.services.pedidos.requests.post', side_effect=requests.exceptions.RequestException('conn fail')):
                         data = {'productos': [{'id': 1}], 'total': 10, 'cliente_id': 1}
                         with pytest.raises(PedidoServiceError) as exc:
                             crear_pedido_externo(data, 'v@e.com', 'vendedor')
 
     assert exc.value.status_code == 503
+    # el pedido no se creó: el stock reservado vuelve al inventario
+    liberar.assert_called_once_with('r-1')
@@ -5,6 +5,7 @@ from src.blueprints.health import health_bp
 from src.blueprints.producto import producto_bp
 from src.blueprints.inventarios import inventarios_bp
 from src.blueprints.logistica import logistica_bp
+from src.services import cache_l1
 
 def create_app(config_class=Config):
     """
@@ -16,6 +17,9 @@ def create_app(config_class=Config):
     # Inicializar JWT
     jwt = JWTManager(app)
     
+    # Cache L1 en memoria y escucha de invalidaciones (si está habilitado)
+    cache_l1.iniciar(app.config)
+    
     # Registrar blueprints
     app.register_blueprint(health_bp)
     app.register_blueprint(producto_bp)
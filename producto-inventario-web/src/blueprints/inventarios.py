@@ -244,17 +244,23 @@ def ajustar_cantidad(inventario_id):
 def cache_health():
     """Verifica el estado del cache."""
     try:
-        from src.services.cache_client import CacheClient
+        from src.services.cache_client import CacheClient, obtener_redis_directo
         from flask import current_app
         
         redis_url = current_app.config.get('REDIS_SERVICE_URL')
-        cache_client = CacheClient(redis_url)
+        cache_client = CacheClient(redis_url, redis_client=obtener_redis_directo(current_app.config))
         
         is_available = cache_client.is_available()
         
+        from src.services import cache_l1
+        l1 = cache_l1.obtener_l1(current_app.config)
+        
         return jsonify({
             'cache': 'available' if is_available else 'unavailable',
-            'redis_service_url': redis_url
+            'redis_service_url': redis_url,
+            'modo': current_app.config.get('CACHE_BACKEND', 'http'),
+            # Aciertos por nivel: l1 (memoria del proceso) y l2 (Redis Service)
+            'metricas': l1.metricas() if l1 is not None else None
         }), 200 if is_available else 503
         
     except Exception as e:
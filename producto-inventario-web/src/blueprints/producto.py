@@ -1,6 +1,5 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, Response, redirect
 import json
-import io
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.productos import ProductoServiceError
 from src.services.productos import (
@@ -150,20 +149,24 @@ def obtener_producto_por_sku(sku):
 def descargar_certificacion(producto_id):
     """
     Endpoint del BFF para descargar la certificación de un producto.
-    Retorna el archivo PDF directamente desde el microservicio.
+    Transmite el archivo por bloques desde el microservicio sin cargarlo en
+    memoria, respetando Range e If-None-Match del cliente.
     """
     try:
-        file_content, filename, mimetype = descargar_certificacion_producto_externo(producto_id)
+        descarga = descargar_certificacion_producto_externo(producto_id, request.headers)
         
-        # Crear un objeto BytesIO para send_file
-        file_stream = io.BytesIO(file_content)
+        if descarga['redirect_url']:
+            return redirect(descarga['redirect_url'], code=302)
         
-        return send_file(
-            file_stream,
-            mimetype=mimetype,
-            as_attachment=True,
-            download_name=filename
+        response = Response(
+            descarga['contenido'] if descarga['contenido'] is not None else b'',
+            status=descarga['status_code'],
+            mimetype=descarga['mimetype'],
+            headers=descarga['headers'],
+            direct_passthrough=True
         )
+        response.headers.set('Content-Disposition', 'attachment', filename=descarga['filename'])
+        return response
     except ProductoServiceError as e:
         return jsonify(e.message), e.status_code
     except Exception as e:
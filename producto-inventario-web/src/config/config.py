@@ -18,7 +18,27 @@ class Config:
     INVENTARIOS_URL = os.environ.get('INVENTARIOS_URL', 'http://localhost:5009')
     PEDIDOS_URL = os.environ.get('PEDIDOS_URL', 'http://localhost:5012')
     REDIS_SERVICE_URL = os.environ.get('REDIS_SERVICE_URL', 'http://localhost:5011')
+    # Formato de los valores de cache (ver cache_codec); json sin compresión es el formato original
+    CACHE_SERIALIZER = os.environ.get('CACHE_SERIALIZER', 'json')
+    CACHE_COMPRESSION = os.environ.get('CACHE_COMPRESSION', 'none')
+    CACHE_COMPRESSION_MIN_BYTES = int(os.environ.get('CACHE_COMPRESSION_MIN_BYTES', 1024))
+    # Acceso al cache: http (vía Redis Service) o redis (conexión directa con pool)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'http')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')  # ej. redis://redis:6379/0
+    CACHE_REDIS_MAX_CONNECTIONS = int(os.environ.get('CACHE_REDIS_MAX_CONNECTIONS', 20))
+    CACHE_REDIS_TIMEOUT = float(os.environ.get('CACHE_REDIS_TIMEOUT', 3))
+    # Cache L1 en memoria delante de Redis Service, invalidado por el canal de Redis
+    CACHE_L1_ENABLED = os.environ.get('CACHE_L1_ENABLED', 'False').lower() == 'true'
+    CACHE_L1_TTL = int(os.environ.get('CACHE_L1_TTL', 30))
+    CACHE_L1_MAX_BYTES = int(os.environ.get('CACHE_L1_MAX_BYTES', 32 * 1024 * 1024))
+    CACHE_L1_REDIS_URL = os.environ.get('CACHE_L1_REDIS_URL')  # ej. redis://redis:6379/0
+    CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL', 'cache:invalidaciones')
     LOGISTICA_URL = os.environ.get('LOGISTICA_URL', 'http://localhost:5013')
     
     # Configuración de JWT (debe coincidir con auth-usuario)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
+    
+    # Descarga de certificaciones: si el microservicio responde con una redirección
+    # (URL prefirmada del almacenamiento de objetos), redirigir al cliente en lugar
+    # de transmitir el archivo a través del BFF
+    CERTIFICACION_REDIRECCION_DIRECTA = os.environ.get('CERTIFICACION_REDIRECCION_DIRECTA', 'False').lower() == 'true'
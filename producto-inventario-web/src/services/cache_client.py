@@ -1,19 +1,188 @@
 """
 Cliente para consultar cache de inventarios desde Redis Service.
+
+Por defecto usa la API HTTP de Redis Service. Con CACHE_BACKEND=redis habla
+directo con Redis (CACHE_REDIS_URL) usando un pool de conexiones por proceso,
+con las mismas claves, TTL y formato de valores que escribe Redis Service.
 """
+import json
+import threading
 import requests
 import logging
-from typing import Optional, List, Dict, Any
+import redis
+from typing import Optional, List, Dict, Any, Mapping, Tuple
+from src.services.cache_codec import CacheCodec, MEDIA_TYPE
+from src.services.cache_l1 import CacheL1
 
 logger = logging.getLogger(__name__)
 
+# Errores de conexión con el cache en cualquiera de los dos modos
+ERRORES_CONEXION = (requests.RequestException, redis.RedisError)
+
+# Pools de conexiones a Redis compartidos por los CacheClient del proceso (uno por URL)
+_pools: Dict[str, redis.BlockingConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_redis_directo(config: Mapping[str, Any]) -> Optional[redis.Redis]:
+    """
+    Cliente Redis sobre el pool del proceso, o None si se usa Redis Service (HTTP).
+    
+    Se activa con CACHE_BACKEND=redis. Crear el cliente no abre conexiones:
+    se toman del pool en cada operación y se devuelven al terminar.
+    """
+    if config.get('CACHE_BACKEND', 'http') != 'redis':
+        return None
+    
+    url = config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            timeout = float(config.get('CACHE_REDIS_TIMEOUT', 3))
+            pool = redis.BlockingConnectionPool.from_url(
+                url,
+                max_connections=int(config.get('CACHE_REDIS_MAX_CONNECTIONS', 20)),
+                timeout=timeout,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+            _pools[url] = pool
+    return redis.Redis(connection_pool=pool)
+
 
 class CacheClient:
     """Cliente para leer y escribir valores en el cache expuesto por Redis Service."""
     
-    def __init__(self, redis_service_url: str):
+    def __init__(
+        self,
+        redis_service_url: str,
+        codec: Optional[CacheCodec] = None,
+        l1: Optional[CacheL1] = None,
+        redis_client: Optional[redis.Redis] = None,
+        canal_invalidacion: Optional[str] = None
+    ):
+        """
+        Args:
+            redis_service_url: URL base de Redis Service
+            codec: Formato de los valores. Con un codec distinto de JSON plano los
+                valores viajan ya codificados (y comprimidos) y se decodifican
+                aquí, sin convertirlos a JSON en Redis Service.
+            l1: Cache en memoria del proceso consultado antes que Redis Service
+            redis_client: Cliente Redis directo (ver obtener_redis_directo); si se
+                indica, las operaciones no pasan por Redis Service
+            canal_invalidacion: Canal donde publicar las claves escritas en modo
+                directo, como hace Redis Service, para invalidar los L1
+        """
         self.redis_service_url = redis_service_url.rstrip('/')
         self.cache_endpoint = f"{self.redis_service_url}/api/cache"
+        self.codec = codec or CacheCodec()
+        self.l1 = l1
+        self.redis_client = redis_client
+        self.canal_invalidacion = canal_invalidacion
+    
+    @property
+    def modo(self) -> str:
+        """'redis' si habla directo con Redis, 'http' si usa Redis Service."""
+        return 'redis' if self.redis_client is not None else 'http'
+    
+    def _get_value(self, key: str) -> Tuple[int, Any]:
+        """Consulta una clave (primero en el L1) y devuelve (status_code, valor)."""
+        if self.l1 is not None:
+            encontrado, value = self.l1.get(key)
+            if encontrado:
+                return 200, value
+        
+        status_code, value = self._get_remote(key)
+        if self.l1 is not None and status_code in (200, 404):
+            self.l1.registrar_l2(status_code == 200)
+        return status_code, value
+    
+    def _get_remote(self, key: str) -> Tuple[int, Any]:
+        """Consulta una clave en Redis Service (o en Redis en modo directo)."""
+        if self.redis_client is not None:
+            return self._get_directo(key)
+        
+        headers = None if self.codec.is_plain_json else {'Accept': MEDIA_TYPE}
+        if headers:
+            response = requests.get(f"{self.cache_endpoint}/{key}", headers=headers, timeout=3)
+        else:
+            response = requests.get(f"{self.cache_endpoint}/{key}", timeout=3)
+        
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        if headers and response.headers.get('Content-Type', '').startswith(MEDIA_TYPE):
+            self._guardar_l1(key, response.content, self.codec.decode, response.headers.get('X-Cache-TTL'))
+            return 200, self.codec.decode(response.content)
+        
+        # Respuesta JSON (también de un Redis Service anterior que ignora Accept)
+        payload = response.json()
+        self._guardar_l1(key, response.content, self._valor_de_respuesta_json, payload.get('ttl'))
+        return 200, payload.get('value')
+    
+    def _get_directo(self, key: str) -> Tuple[int, Any]:
+        """Lee el valor y su TTL en un solo viaje a Redis."""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            datos, ttl = pipe.get(key).ttl(key).execute()
+        
+        if datos is None:
+            return 404, None
+        self._guardar_l1(key, datos, self.codec.decode, ttl)
+        return 200, self.codec.decode(datos)
+    
+    def _valor_de_respuesta_json(self, datos: bytes) -> Any:
+        return self.codec.decode(datos).get('value')
+    
+    def _guardar_l1(self, key: str, datos: Any, decodificador, ttl: Any) -> None:
+        """Guarda en el L1 la respuesta recibida, sin pasar el TTL que le queda en Redis."""
+        if self.l1 is None or not isinstance(datos, bytes):
+            return
+        try:
+            ttl = int(ttl) if ttl is not None else None
+        except (TypeError, ValueError):
+            ttl = None
+        self.l1.set(key, datos, decodificador, ttl)
+    
+    def _publicar_invalidacion(self, key: str) -> None:
+        """Avisa a los L1 de otros procesos que la clave cambió (solo modo directo)."""
+        if not self.canal_invalidacion:
+            return
+        try:
+            self.redis_client.publish(self.canal_invalidacion, json.dumps({'keys': [key]}))
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ No se pudo publicar invalidación de {key}: {e}")
+    
+    def _set_value(self, key: str, value: Any, ttl: int) -> int:
+        """Guarda un valor con el codec configurado y devuelve el status code."""
+        if self.redis_client is not None:
+            self.redis_client.setex(key, ttl, self.codec.encode(value))
+            self._publicar_invalidacion(key)
+            return 201
+        
+        if not self.codec.is_plain_json:
+            response = requests.put(
+                f"{self.cache_endpoint}/{key}",
+                params={'ttl': ttl},
+                data=self.codec.encode(value),
+                headers={'Content-Type': MEDIA_TYPE},
+                timeout=3
+            )
+            # Redis Service anterior sin PUT: guardar como JSON
+            if response.status_code not in (404, 405):
+                return response.status_code
+        
+        response = requests.post(
+            f"{self.cache_endpoint}/",
+            json={
+                'key': key,
+                'value': value,
+                'ttl': ttl
+            },
+            timeout=3
+        )
+        return response.status_code
     
     def get_inventarios_by_producto(self, producto_id: str) -> Optional[List[Dict[str, Any]]]:
         """
@@ -28,28 +197,24 @@ class CacheClient:
         try:
             cache_key = f"inventarios:producto:{producto_id}"
             
-            response = requests.get(
-                f"{self.cache_endpoint}/{cache_key}",
-                timeout=3
-            )
+            status_code, inventarios = self._get_value(cache_key)
             
-            if response.status_code == 200:
-                data = response.json()
-                inventarios = data.get('value', [])
+            if status_code == 200:
+                inventarios = inventarios if inventarios is not None else []
                 logger.info(f"✅ Cache HIT: {cache_key} ({len(inventarios)} items)")
                 return inventarios
-            elif response.status_code == 404:
+            elif status_code == 404:
                 logger.info(f"⚠️ Cache MISS: {cache_key}")
                 return None
             else:
-                logger.error(f"❌ Error consultando cache: {response.status_code}")
+                logger.error(f"❌ Error consultando cache: {status_code}")
                 return None
                 
         except requests.Timeout:
             logger.warning(f"⏱️ Timeout consultando cache para producto {producto_id}")
             return None
-        except requests.RequestException as e:
-            logger.error(f"❌ Error de conexión con Redis Service: {e}")
+        except ERRORES_CONEXION as e:
+            logger.error(f"❌ Error de conexión con el cache: {e}")
             return None
         except Exception as e:
             logger.error(f"❌ Error inesperado consultando cache: {e}")
@@ -58,24 +223,23 @@ class CacheClient:
     def get_generic(self, key: str) -> Optional[Any]:
         """Obtiene un valor arbitrario desde el cache por clave."""
         try:
-            response = requests.get(f"{self.cache_endpoint}/{key}", timeout=3)
+            status_code, value = self._get_value(key)
 
-            if response.status_code == 200:
-                data = response.json()
+            if status_code == 200:
                 logger.info(f"✅ Cache HIT: {key}")
-                return data.get('value')
-            if response.status_code == 404:
+                return value
+            if status_code == 404:
                 logger.info(f"⚠️ Cache MISS: {key}")
                 return None
 
-            logger.error(f"❌ Error consultando cache: {response.status_code}")
+            logger.error(f"❌ Error consultando cache: {status_code}")
             return None
 
         except requests.Timeout:
             logger.warning(f"⏱️ Timeout consultando cache para key {key}")
             return None
-        except requests.RequestException as e:
-            logger.error(f"❌ Error de conexión con Redis Service: {e}")
+        except ERRORES_CONEXION as e:
+            logger.error(f"❌ Error de conexión con el cache: {e}")
             return None
         except Exception as e:
             logger.error(f"❌ Error inesperado consultando cache: {e}")
@@ -84,27 +248,21 @@ class CacheClient:
     def set_generic(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Guarda un valor arbitrario en el cache con TTL configurable."""
         try:
-            response = requests.post(
-                f"{self.cache_endpoint}/",
-                json={
-                    'key': key,
-                    'value': value,
-                    'ttl': ttl
-                },
-                timeout=3
-            )
+            status_code = self._set_value(key, value, ttl)
+            if self.l1 is not None:
+                self.l1.invalidar(key)
 
-            if response.status_code == 200 or response.status_code == 201:
+            if status_code == 200 or status_code == 201:
                 logger.info(f"✅ Cache SET: {key} (TTL {ttl}s)")
                 return True
 
-            logger.error(f"❌ Error guardando en cache: {response.status_code}")
+            logger.error(f"❌ Error guardando en cache: {status_code}")
             return False
 
         except requests.Timeout:
             logger.warning(f"⏱️ Timeout guardando cache para key {key}")
             return False
-        except requests.RequestException as e:
+        except ERRORES_CONEXION as e:
             logger.error(f"❌ Error de conexión guardando cache: {e}")
             return False
         except Exception as e:
@@ -112,7 +270,12 @@ class CacheClient:
             return False
     
     def is_available(self) -> bool:
-        """Verifica que Redis Service esté disponible."""
+        """Verifica que Redis Service (o Redis en modo directo) esté disponible."""
+        if self.redis_client is not None:
+            try:
+                return bool(self.redis_client.ping())
+            except redis.RedisError:
+                return False
         try:
             response = requests.get(f"{self.redis_service_url}/health", timeout=2)
             return response.status_code == 200
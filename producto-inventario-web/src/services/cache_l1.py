@@ -0,0 +1,238 @@
+"""
+Cache L1 en memoria del proceso, delante de Redis Service (L2).
+
+Guarda por un tiempo corto las respuestas de cache más leídas (zonas, agregados
+del catálogo) para no hacer una llamada HTTP a Redis Service en cada lectura.
+Es un LRU acotado por bytes y con TTL por entrada; los valores se guardan
+codificados y se decodifican en cada acierto, así quien los modifique no
+altera la copia guardada.
+
+Redis Service publica en CACHE_INVALIDATION_CHANNEL cada clave escrita o
+eliminada. Si CACHE_L1_REDIS_URL está configurada, un hilo escucha ese canal e
+invalida las entradas afectadas; si la suscripción se cae, el L1 se vacía y
+mientras tanto solo rige el TTL.
+"""
+import fnmatch
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheL1:
+    """LRU en memoria con TTL por entrada y límite de tamaño en bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: int = 30) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (datos codificados, decodificador, vence_en)
+        self._entradas: "OrderedDict[str, Tuple[bytes, Callable[[bytes], Any], float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._metricas = self._metricas_vacias()
+
+    @staticmethod
+    def _metricas_vacias() -> Dict[str, Dict[str, int]]:
+        return {
+            'l1': {'hits': 0, 'misses': 0, 'desalojos': 0, 'invalidaciones': 0},
+            'l2': {'hits': 0, 'misses': 0},
+        }
+
+    def configurar(self, max_bytes: int, ttl: int) -> None:
+        """Ajusta los límites y descarta lo guardado."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.ttl = ttl
+            self._entradas.clear()
+            self._bytes = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Busca una clave vigente.
+
+        Returns:
+            Tupla (encontrado, valor decodificado)
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is not None and entrada[2] <= ahora:
+                self._quitar(key)
+                entrada = None
+            if entrada is None:
+                self._metricas['l1']['misses'] += 1
+                return False, None
+            self._entradas.move_to_end(key)
+            self._metricas['l1']['hits'] += 1
+        return True, entrada[1](entrada[0])
+
+    def set(self, key: str, datos: bytes, decodificador: Callable[[bytes], Any], ttl: Optional[int] = None) -> None:
+        """
+        Guarda un valor codificado.
+
+        Args:
+            key: Clave de cache
+            datos: Valor codificado tal como llegó de Redis Service
+            decodificador: Función que convierte `datos` en el valor
+            ttl: Vigencia restante en L2; el L1 nunca guarda más allá de ella
+        """
+        vigencia = self.ttl if not ttl or ttl <= 0 else min(self.ttl, ttl)
+        tamaño = len(datos)
+        if vigencia <= 0 or tamaño > self.max_bytes:
+            return
+
+        with self._lock:
+            self._quitar(key)
+            self._entradas[key] = (datos, decodificador, time.monotonic() + vigencia)
+            self._bytes += tamaño
+            while self._bytes > self.max_bytes:
+                antigua, _ = next(iter(self._entradas.items()))
+                self._quitar(antigua)
+                self._metricas['l1']['desalojos'] += 1
+
+    def _quitar(self, key: str) -> bool:
+        entrada = self._entradas.pop(key, None)
+        if entrada is None:
+            return False
+        self._bytes -= len(entrada[0])
+        return True
+
+    def invalidar(self, *keys: str) -> None:
+        """Descarta claves puntuales."""
+        with self._lock:
+            for key in keys:
+                if self._quitar(key):
+                    self._metricas['l1']['invalidaciones'] += 1
+
+    def invalidar_patron(self, patron: str) -> None:
+        """Descarta las claves que coinciden con un patrón estilo Redis (inventarios:*)."""
+        with self._lock:
+            for key in [k for k in self._entradas if fnmatch.fnmatchcase(k, patron)]:
+                self._quitar(key)
+                self._metricas['l1']['invalidaciones'] += 1
+
+    def limpiar(self) -> None:
+        """Descarta todas las entradas."""
+        with self._lock:
+            self._metricas['l1']['invalidaciones'] += len(self._entradas)
+            self._entradas.clear()
+            self._bytes = 0
+
+    def registrar_l2(self, hit: bool) -> None:
+        """Cuenta un acierto o fallo de Redis Service (consultas que no resolvió el L1)."""
+        with self._lock:
+            self._metricas['l2']['hits' if hit else 'misses'] += 1
+
+    def aplicar_invalidacion(self, mensaje: Any) -> None:
+        """
+        Aplica un mensaje del canal de invalidación.
+
+        Formatos: {"keys": [...]}, {"pattern": "inventarios:*"} o {"flush": true}
+        """
+        if isinstance(mensaje, (bytes, str)):
+            mensaje = json.loads(mensaje)
+        if mensaje.get('flush'):
+            self.limpiar()
+        if mensaje.get('keys'):
+            self.invalidar(*mensaje['keys'])
+        if mensaje.get('pattern'):
+            self.invalidar_patron(mensaje['pattern'])
+
+    def metricas(self) -> Dict[str, Any]:
+        """Aciertos y fallos por nivel, con su tasa de aciertos."""
+        with self._lock:
+            resultado = {nivel: dict(valores) for nivel, valores in self._metricas.items()}
+            resultado['l1'].update(entradas=len(self._entradas), bytes=self._bytes, max_bytes=self.max_bytes)
+        for valores in resultado.values():
+            consultas = valores['hits'] + valores['misses']
+            valores['hit_ratio'] = round(valores['hits'] / consultas, 4) if consultas else 0.0
+        return resultado
+
+    def reiniciar_metricas(self) -> None:
+        with self._lock:
+            self._metricas = self._metricas_vacias()
+
+
+class InvalidacionesListener(threading.Thread):
+    """Hilo que escucha el canal de invalidación de Redis y limpia el L1."""
+
+    def __init__(self, cache: CacheL1, redis_url: str, canal: str, espera_reintento: int = 5) -> None:
+        super().__init__(name='cache-l1-invalidaciones', daemon=True)
+        self.cache = cache
+        self.redis_url = redis_url
+        self.canal = canal
+        self.espera_reintento = espera_reintento
+        self._detener = threading.Event()
+
+    def run(self) -> None:
+        import redis
+
+        while not self._detener.is_set():
+            try:
+                cliente = redis.Redis.from_url(self.redis_url, health_check_interval=30)
+                pubsub = cliente.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.canal)
+                # Lo guardado mientras no había suscripción pudo quedar obsoleto
+                self.cache.limpiar()
+                logger.info(f"✅ L1 suscrito a invalidaciones en {self.canal}")
+
+                while not self._detener.is_set():
+                    mensaje = pubsub.get_message(timeout=1.0)
+                    if mensaje and mensaje.get('type') == 'message':
+                        try:
+                            self.cache.aplicar_invalidacion(mensaje['data'])
+                        except (ValueError, AttributeError) as e:
+                            logger.warning(f"⚠️ Mensaje de invalidación inválido: {e}")
+                pubsub.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Suscripción de invalidaciones caída, se vacía el L1: {e}")
+                self.cache.limpiar()
+                self._detener.wait(self.espera_reintento)
+
+    def detener(self) -> None:
+        self._detener.set()
+
+
+# L1 compartido por todos los CacheClient del proceso
+l1 = CacheL1()
+_listener: Optional[InvalidacionesListener] = None
+_listener_lock = threading.Lock()
+
+
+def obtener_l1(config: Mapping[str, Any]) -> Optional[CacheL1]:
+    """L1 del proceso, o None si está deshabilitado (CACHE_L1_ENABLED)."""
+    return l1 if config.get('CACHE_L1_ENABLED') else None
+
+
+def iniciar(config: Mapping[str, Any]) -> None:
+    """
+    Configura el L1 del proceso y arranca la escucha de invalidaciones.
+
+    Se llama desde create_app; la escucha se inicia una sola vez por proceso.
+    """
+    global _listener
+    if not config.get('CACHE_L1_ENABLED'):
+        return
+
+    l1.configurar(
+        max_bytes=int(config.get('CACHE_L1_MAX_BYTES', 32 * 1024 * 1024)),
+        ttl=int(config.get('CACHE_L1_TTL', 30))
+    )
+
+    redis_url = config.get('CACHE_L1_REDIS_URL')
+    if not redis_url and config.get('CACHE_BACKEND') == 'redis':
+        redis_url = config.get('CACHE_REDIS_URL')
+    if not redis_url:
+        logger.warning("⚠️ L1 sin CACHE_L1_REDIS_URL: las entradas solo expiran por TTL")
+        return
+
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = InvalidacionesListener(
+                l1, redis_url, config.get('CACHE_INVALIDATION_CHANNEL', 'cache:invalidaciones')
+            )
+            _listener.start()
@@ -0,0 +1,87 @@
+"""
+Cliente HTTP con revalidación condicional (ETag / If-None-Match).
+
+Guarda en memoria la última respuesta 200 con ETag de cada URL consultada y la
+reutiliza cuando el microservicio responde 304 Not Modified, de modo que el BFF
+no vuelve a descargar listados o detalles que no han cambiado.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de respuestas guardadas por proceso (LRU)
+MAX_ENTRADAS = 512
+
+_respuestas: "OrderedDict[str, Tuple[str, bytes, Dict[str, str], Optional[str]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _clave(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Clave estable para una URL y sus parámetros de consulta."""
+    if not params:
+        return url
+    items = sorted((str(k), str(v)) for k, v in dict(params).items() if v is not None)
+    return f"{url}?{urlencode(items)}" if items else url
+
+
+def _reconstruir(clave: str, entrada: Tuple[str, bytes, Dict[str, str], Optional[str]]) -> requests.Response:
+    """Construye una respuesta 200 a partir de la copia guardada."""
+    _, contenido, headers, encoding = entrada
+    respuesta = requests.Response()
+    respuesta.status_code = 200
+    respuesta._content = contenido
+    respuesta.headers.update(headers)
+    respuesta.encoding = encoding
+    respuesta.url = clave
+    return respuesta
+
+
+def get_condicional(url: str, **kwargs: Any) -> requests.Response:
+    """
+    Ejecuta un GET enviando If-None-Match cuando hay una versión guardada.
+
+    Acepta los mismos argumentos que requests.get. Si el microservicio responde
+    304 se devuelve la copia local como una respuesta 200 normal; cualquier otra
+    respuesta se devuelve tal cual.
+    """
+    clave = _clave(url, kwargs.get('params'))
+    with _lock:
+        entrada = _respuestas.get(clave)
+
+    if entrada is not None:
+        headers = dict(kwargs.get('headers') or {})
+        headers['If-None-Match'] = entrada[0]
+        kwargs['headers'] = headers
+
+    response = requests.get(url, **kwargs)
+
+    if response.status_code == 304 and entrada is not None:
+        logger.info(f"♻️ Revalidado sin cambios (304): {clave}")
+        with _lock:
+            if clave in _respuestas:
+                _respuestas.move_to_end(clave)
+        return _reconstruir(clave, entrada)
+
+    if response.status_code == 200:
+        headers_respuesta = getattr(response, 'headers', None) or {}
+        etag = headers_respuesta.get('ETag')
+        if isinstance(etag, str) and etag:
+            with _lock:
+                _respuestas[clave] = (etag, response.content, dict(headers_respuesta), response.encoding)
+                _respuestas.move_to_end(clave)
+                while len(_respuestas) > MAX_ENTRADAS:
+                    _respuestas.popitem(last=False)
+
+    return response
+
+
+def limpiar() -> None:
+    """Descarta todas las respuestas guardadas."""
+    with _lock:
+        _respuestas.clear()
@@ -5,7 +5,10 @@ import requests
 import logging
 from typing import List, Dict, Any, Optional
 from flask import current_app
-from src.services.cache_client import CacheClient
+from src.services.cache_client import CacheClient, obtener_redis_directo
+from src.services.cache_codec import CacheCodec
+from src.services import cache_l1
+from src.services.http_revalidacion import get_condicional
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +19,14 @@ class InventariosService:
     @staticmethod
     def _get_cache_client() -> CacheClient:
         """Obtiene una instancia del cliente de cache."""
-        redis_url = current_app.config.get('REDIS_SERVICE_URL')
-        return CacheClient(redis_url)
+        cfg = current_app.config
+        return CacheClient(
+            cfg.get('REDIS_SERVICE_URL'),
+            CacheCodec.from_config(cfg),
+            cache_l1.obtener_l1(cfg),
+            redis_client=obtener_redis_directo(cfg),
+            canal_invalidacion=cfg.get('CACHE_INVALIDATION_CHANNEL')
+        )
     
     @staticmethod
     def _get_from_microservice(producto_id: str) -> List[Dict[str, Any]]:
@@ -33,7 +42,7 @@ class InventariosService:
         try:
             inventarios_url = current_app.config.get('INVENTARIOS_URL')
             
-            response = requests.get(
+            response = get_condicional(
                 f"{inventarios_url}/api/inventarios",
                 params={'productoId': producto_id},
                 timeout=10
@@ -325,7 +334,7 @@ class InventariosService:
                 params['estado'] = filtros['estado']
 
         try:
-            response = requests.get(
+            response = get_condicional(
                 f"{productos_url}/api/productos",
                 params=params or None,
                 timeout=15
@@ -382,7 +391,7 @@ class InventariosService:
 
             if inventarios is None:
                 try:
-                    inv_resp = requests.get(
+                    inv_resp = get_condicional(
                         f"{inventarios_url}/api/inventarios",
                         params={'productoId': producto_id},
                         timeout=10
@@ -427,7 +436,7 @@ class InventariosService:
             # Limpiar filtros nulos
             params = {k: v for k, v in (filtros or {}).items() if v is not None}
             
-            response = requests.get(
+            response = get_condicional(
                 f"{inventarios_url}/api/inventarios",
                 params=params,
                 timeout=10
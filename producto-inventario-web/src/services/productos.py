@@ -3,6 +3,7 @@ import requests
 import json
 from flask import current_app, jsonify
 from src.config.config import Config as config
+from src.services.http_revalidacion import get_condicional
 
 class ProductoServiceError(Exception):
     """Excepción personalizada para errores en la capa de servicio de productos."""
@@ -374,7 +375,7 @@ def consultar_productos_externo(params=None):
     url_producto = config.PRODUCTO_URL + '/api/productos/'
 
     try:
-        response = requests.get(
+        response = get_condicional(
             url_producto,
             params=params
         )
@@ -425,7 +426,7 @@ def obtener_detalle_producto_externo(producto_id):
     url_producto = f"{config.PRODUCTO_URL}/api/productos/{producto_id}"
 
     try:
-        response = requests.get(url_producto)
+        response = get_condicional(url_producto)
 
         if response.status_code == 404:
             current_app.logger.warning(f"Producto {producto_id} no encontrado")
@@ -482,7 +483,7 @@ def obtener_producto_por_sku_externo(sku):
     url_producto = f"{config.PRODUCTO_URL}/api/productos/sku/{sku}"
 
     try:
-        response = requests.get(url_producto)
+        response = get_condicional(url_producto)
 
         if response.status_code == 404:
             current_app.logger.warning(f"Producto con SKU {sku} no encontrado")
@@ -517,37 +518,92 @@ def obtener_producto_por_sku_externo(sku):
         }, 500)
 
 
-def descargar_certificacion_producto_externo(producto_id):
+# Cabeceras del cliente que se reenvían al microservicio (descargas parciales y condicionales)
+CABECERAS_DESCARGA_CLIENTE = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+
+# Cabeceras del microservicio que se reenvían al cliente
+CABECERAS_DESCARGA_RESPUESTA = (
+    'Content-Length', 'Content-Range', 'Accept-Ranges', 'ETag', 'Last-Modified', 'Cache-Control'
+)
+
+# Tamaño de los bloques transmitidos al cliente
+TAMANO_BLOQUE_DESCARGA = 64 * 1024
+
+
+def _iterar_contenido(response):
+    """Entrega el cuerpo de la respuesta por bloques y libera la conexión al terminar."""
+    try:
+        for bloque in response.iter_content(chunk_size=TAMANO_BLOQUE_DESCARGA):
+            if bloque:
+                yield bloque
+    finally:
+        response.close()
+
+
+def descargar_certificacion_producto_externo(producto_id, cabeceras_cliente=None):
     """
-    Descarga la certificación de un producto desde el microservicio.
+    Abre la descarga de la certificación de un producto desde el microservicio.
+
+    El archivo no se carga en memoria: se devuelve un iterador que transmite los
+    bloques del microservicio a medida que el cliente los consume. Las cabeceras
+    Range/If-None-Match del cliente se reenvían, así que las respuestas 206 y 304
+    del microservicio llegan tal cual al cliente.
 
     Args:
         producto_id (int): ID del producto.
+        cabeceras_cliente (Mapping): Cabeceras de la petición original (opcional).
 
     Returns:
-        tuple: (file_content, filename, mimetype) para enviar con send_file.
+        dict: status_code, contenido (iterador de bytes o None), filename, mimetype,
+        headers a reenviar y redirect_url (URL prefirmada si se debe redirigir al cliente).
 
     Raises:
         ProductoServiceError: Si no hay certificación disponible o hay error.
     """
     url_certificacion = f"{config.PRODUCTO_URL}/api/productos/{producto_id}/certificacion/descargar"
+    cabeceras_cliente = cabeceras_cliente or {}
+    headers = {
+        nombre: cabeceras_cliente.get(nombre)
+        for nombre in CABECERAS_DESCARGA_CLIENTE
+        if cabeceras_cliente.get(nombre)
+    }
 
     try:
-        response = requests.get(url_certificacion, stream=True)
+        response = requests.get(
+            url_certificacion, stream=True, headers=headers, allow_redirects=False, timeout=(5, 60)
+        )
+
+        # Certificación en almacenamiento de objetos: el microservicio redirige a una URL prefirmada
+        if response.status_code in (301, 302, 303, 307, 308) and response.headers.get('Location'):
+            location = response.headers['Location']
+            response.close()
+            if config.CERTIFICACION_REDIRECCION_DIRECTA:
+                return {
+                    'status_code': 302,
+                    'contenido': None,
+                    'filename': None,
+                    'mimetype': None,
+                    'headers': {},
+                    'redirect_url': location
+                }
+            response = requests.get(location, stream=True, headers=headers, timeout=(5, 60))
 
         if response.status_code == 404:
+            response.close()
             current_app.logger.warning(f"Certificación no encontrada para producto {producto_id}")
             raise ProductoServiceError({
                 'error': 'No hay certificación disponible para este producto',
                 'codigo': 'CERTIFICACION_NO_ENCONTRADA'
             }, 404)
 
-        if response.status_code != 200:
+        if response.status_code not in (200, 206, 304):
             current_app.logger.error(f"Error al descargar certificación: {response.status_code}")
             try:
                 error_data = response.json()
             except Exception:
                 error_data = {'error': 'Error al descargar certificación', 'codigo': 'ERROR_DESCARGA'}
+            finally:
+                response.close()
             raise ProductoServiceError(error_data, response.status_code)
 
         # Extraer información del archivo desde headers
@@ -557,9 +613,26 @@ def descargar_certificacion_producto_externo(producto_id):
             filename = content_disposition.split('filename=')[1].strip('"')
 
         mimetype = response.headers.get('Content-Type', 'application/pdf')
-        file_content = response.content
+        headers_respuesta = {
+            nombre: response.headers[nombre]
+            for nombre in CABECERAS_DESCARGA_RESPUESTA
+            if response.headers.get(nombre)
+        }
 
-        return file_content, filename, mimetype
+        if response.status_code == 304:
+            response.close()
+            contenido = None
+        else:
+            contenido = _iterar_contenido(response)
+
+        return {
+            'status_code': response.status_code,
+            'contenido': contenido,
+            'filename': filename,
+            'mimetype': mimetype,
+            'headers': headers_respuesta,
+            'redirect_url': None
+        }
 
     except ProductoServiceError:
         raise
@@ -120,12 +120,21 @@ def test_producto_batch_variants(client, mocker, auth_headers):
 def test_producto_download_paths(client, mocker, auth_headers):
     mock_download = mocker.patch(
         'src.blueprints.producto.descargar_certificacion_producto_externo',
-        side_effect=[(b'%PDF', 'cert.pdf', 'application/pdf'), ProductoServiceError({'error': 'no'}, 404), Exception('boom')]
+        side_effect=[
+            {
+                'status_code': 200, 'contenido': iter([b'%P', b'DF']), 'filename': 'cert.pdf',
+                'mimetype': 'application/pdf', 'headers': {'ETag': '"abc"'}, 'redirect_url': None
+            },
+            ProductoServiceError({'error': 'no'}, 404),
+            Exception('boom')
+        ]
     )
 
     response = client.get('/producto/3/certificacion', headers=auth_headers)
     assert response.status_code == 200
     assert response.data == b'%PDF'
+    assert response.headers['ETag'] == '"abc"'
+    assert 'cert.pdf' in response.headers['Content-Disposition']
 
     response = client.get('/producto/3/certificacion', headers=auth_headers)
     assert response.status_code == 404
@@ -134,3 +143,18 @@ def test_producto_download_paths(client, mocker, auth_headers):
     assert response.status_code == 500
     assert response.get_json()['codigo'] == 'ERROR_INESPERADO'
     mock_download.assert_called()
+
+
+def test_producto_download_redirige_a_url_prefirmada(client, mocker, auth_headers):
+    mocker.patch(
+        'src.blueprints.producto.descargar_certificacion_producto_externo',
+        return_value={
+            'status_code': 302, 'contenido': None, 'filename': None, 'mimetype': None,
+            'headers': {}, 'redirect_url': 'http://minio/cert.pdf?firma=1'
+        }
+    )
+
+    response = client.get('/producto/3/certificacion', headers=auth_headers)
+
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'http://minio/cert.pdf?firma=1'
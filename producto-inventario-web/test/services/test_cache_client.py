@@ -132,3 +132,87 @@ def test_cache_client_get_inventarios_exception(mocker):
     result = client.get_inventarios_by_producto('123')
     assert result is None
 
+
+
+def test_cache_client_codec_binario_get_y_set(mocker):
+    """Con codec binario los valores viajan codificados y se decodifican en el BFF."""
+    from src.services.cache_codec import CacheCodec, MEDIA_TYPE
+
+    codec = CacheCodec('orjson', 'zlib', compression_min_bytes=0)
+    client = CacheClient('http://redis:5011', codec)
+    valor = [{'producto_id': 1, 'inventarios': [{'cantidad': 5}]}]
+
+    respuesta = MagicMock(status_code=200, content=codec.encode(valor), headers={'Content-Type': MEDIA_TYPE})
+    mock_get = mocker.patch('src.services.cache_client.requests.get', return_value=respuesta)
+
+    assert client.get_generic('productos_con_inventarios') == valor
+    assert mock_get.call_args.kwargs['headers'] == {'Accept': MEDIA_TYPE}
+
+    mock_put = mocker.patch('src.services.cache_client.requests.put', return_value=MagicMock(status_code=201))
+    mock_post = mocker.patch('src.services.cache_client.requests.post')
+
+    assert client.set_generic('productos_con_inventarios', valor, ttl=300) is True
+    kwargs = mock_put.call_args.kwargs
+    assert kwargs['params'] == {'ttl': 300}
+    assert codec.decode(kwargs['data']) == valor
+    mock_post.assert_not_called()
+
+
+def test_cache_client_codec_binario_con_redis_service_anterior(mocker):
+    """Si Redis Service no soporta valores codificados se usa JSON."""
+    from src.services.cache_codec import CacheCodec
+
+    client = CacheClient('http://redis:5011', CacheCodec('orjson', 'zlib'))
+
+    respuesta = MagicMock(status_code=200, headers={'Content-Type': 'application/json'})
+    respuesta.json.return_value = {'value': {'a': 1}}
+    mocker.patch('src.services.cache_client.requests.get', return_value=respuesta)
+    assert client.get_generic('k') == {'a': 1}
+
+    mocker.patch('src.services.cache_client.requests.put', return_value=MagicMock(status_code=405))
+    mock_post = mocker.patch('src.services.cache_client.requests.post', return_value=MagicMock(status_code=201))
+    assert client.set_generic('k', {'a': 1}, ttl=60) is True
+    assert mock_post.call_args.kwargs['json'] == {'key': 'k', 'value': {'a': 1}, 'ttl': 60}
+
+
+def test_cache_client_modo_redis_directo(mocker):
+    """En modo directo lee y escribe en Redis sin llamar a Redis Service."""
+    import redis
+    from src.services.cache_codec import CacheCodec
+
+    codec = CacheCodec()
+    redis_client = MagicMock()
+    pipe = redis_client.pipeline.return_value.__enter__.return_value
+    pipe.get.return_value = pipe
+    pipe.ttl.return_value = pipe
+    pipe.execute.return_value = [codec.encode({'a': 1}), 120]
+    mock_get = mocker.patch('src.services.cache_client.requests.get')
+
+    client = CacheClient('http://redis:5011', codec, redis_client=redis_client, canal_invalidacion='cache:invalidaciones')
+    assert client.modo == 'redis'
+    assert client.get_generic('k') == {'a': 1}
+    pipe.get.assert_called_once_with('k')
+
+    pipe.execute.return_value = [None, -2]
+    assert client.get_generic('k') is None
+
+    assert client.set_generic('k', {'a': 2}, ttl=60) is True
+    redis_client.setex.assert_called_once_with('k', 60, codec.encode({'a': 2}))
+    redis_client.publish.assert_called_once_with('cache:invalidaciones', '{"keys": ["k"]}')
+
+    redis_client.setex.side_effect = redis.ConnectionError('down')
+    assert client.set_generic('k', {'a': 3}) is False
+    mock_get.assert_not_called()
+
+
+def test_obtener_redis_directo_reutiliza_pool():
+    """El pool se crea una vez por URL y solo con CACHE_BACKEND=redis."""
+    from src.services.cache_client import obtener_redis_directo
+
+    assert obtener_redis_directo({'CACHE_BACKEND': 'http'}) is None
+
+    config = {'CACHE_BACKEND': 'redis', 'CACHE_REDIS_URL': 'redis://cache-test:6379/3'}
+    primero = obtener_redis_directo(config)
+    segundo = obtener_redis_directo(config)
+    assert primero.connection_pool is segundo.connection_pool
+    assert primero.connection_pool.connection_kwargs['db'] == 3
@@ -0,0 +1,95 @@
+import json
+from unittest.mock import MagicMock
+
+from src.services import cache_l1
+from src.services.cache_client import CacheClient
+from src.services.cache_l1 import CacheL1
+
+
+def _decodificar(datos):
+    return json.loads(datos)
+
+
+def test_hit_devuelve_copia_independiente():
+    cache = CacheL1(max_bytes=1024, ttl=30)
+    cache.set('zonas', b'[{"id": 1}]', _decodificar)
+
+    encontrado, valor = cache.get('zonas')
+    valor[0]['id'] = 99
+
+    assert encontrado is True
+    assert cache.get('zonas') == (True, [{'id': 1}])
+
+
+def test_expira_segun_ttl_y_no_supera_el_de_l2(mocker):
+    reloj = mocker.patch('src.services.cache_l1.time.monotonic', return_value=100.0)
+    cache = CacheL1(max_bytes=1024, ttl=30)
+    cache.set('a', b'1', _decodificar)
+    cache.set('b', b'2', _decodificar, ttl=5)
+
+    reloj.return_value = 106.0
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+
+    reloj.return_value = 131.0
+    assert cache.get('a') == (False, None)
+
+
+def test_desaloja_lru_por_tamaño_en_bytes():
+    cache = CacheL1(max_bytes=10, ttl=30)
+    cache.set('a', b'1111', _decodificar)
+    cache.set('b', b'2222', _decodificar)
+    cache.get('a')
+    cache.set('c', b'3333', _decodificar)
+    cache.set('enorme', b'1' * 11, _decodificar)
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1111)
+    assert cache.get('enorme') == (False, None)
+    metricas = cache.metricas()['l1']
+    assert metricas['desalojos'] == 1
+    assert metricas['bytes'] == 8
+
+
+def test_aplicar_invalidacion():
+    cache = CacheL1()
+    for key in ('inventarios:producto:1', 'inventarios:producto:2', 'zonas'):
+        cache.set(key, b'1', _decodificar)
+
+    cache.aplicar_invalidacion(b'{"keys": ["zonas"]}')
+    assert cache.get('zonas')[0] is False
+    assert cache.get('inventarios:producto:1')[0] is True
+
+    cache.aplicar_invalidacion('{"pattern": "inventarios:*"}')
+    assert cache.get('inventarios:producto:2')[0] is False
+
+    cache.set('zonas', b'1', _decodificar)
+    cache.aplicar_invalidacion({'flush': True})
+    assert cache.metricas()['l1']['entradas'] == 0
+
+
+def test_cache_client_sirve_desde_l1_y_cuenta_por_nivel(mocker):
+    cache = CacheL1()
+    client = CacheClient('http://redis:5011', l1=cache)
+    respuesta = MagicMock(status_code=200, content=b'{"key": "zonas", "value": ["norte"], "ttl": 120}')
+    respuesta.json.return_value = {'key': 'zonas', 'value': ['norte'], 'ttl': 120}
+    mock_get = mocker.patch('src.services.cache_client.requests.get', return_value=respuesta)
+
+    assert client.get_generic('zonas') == ['norte']
+    assert client.get_generic('zonas') == ['norte']
+    assert mock_get.call_count == 1
+
+    mocker.patch('src.services.cache_client.requests.post', return_value=MagicMock(status_code=201))
+    client.set_generic('zonas', ['sur'])
+    mock_get.return_value = MagicMock(status_code=404)
+    assert client.get_generic('zonas') is None
+
+    metricas = cache.metricas()
+    assert (metricas['l1']['hits'], metricas['l1']['misses']) == (1, 2)
+    assert (metricas['l2']['hits'], metricas['l2']['misses']) == (1, 1)
+    assert metricas['l2']['hit_ratio'] == 0.5
+
+
+def test_obtener_l1_segun_configuracion():
+    assert cache_l1.obtener_l1({'CACHE_L1_ENABLED': False}) is None
+    assert cache_l1.obtener_l1({'CACHE_L1_ENABLED': True}) is cache_l1.l1
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services import http_revalidacion
+from src.services.http_revalidacion import get_condicional
+
+
+@pytest.fixture(autouse=True)
+def limpiar_respuestas():
+    http_revalidacion.limpiar()
+    yield
+    http_revalidacion.limpiar()
+
+
+def _respuesta(status_code, content=b'', headers=None):
+    response = MagicMock(status_code=status_code)
+    response.content = content
+    response.headers = headers or {}
+    response.encoding = 'utf-8'
+    return response
+
+
+def test_primera_consulta_no_envia_if_none_match(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{"productos": []}', {'ETag': '"abc"'})
+    )
+
+    get_condicional('http://productos/api/productos/', params={'page': 1})
+
+    mock_get.assert_called_once_with('http://productos/api/productos/', params={'page': 1})
+
+
+def test_revalida_y_reutiliza_copia_en_304(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{"productos": [1]}', {'ETag': '"abc"', 'Content-Type': 'application/json'})
+    )
+    get_condicional('http://productos/api/productos/', params={'page': 1}, timeout=5)
+
+    mock_get.return_value = _respuesta(304)
+    response = get_condicional('http://productos/api/productos/', params={'page': 1}, timeout=5)
+
+    _, kwargs = mock_get.call_args
+    assert kwargs['headers'] == {'If-None-Match': '"abc"'}
+    assert kwargs['timeout'] == 5
+    assert response.status_code == 200
+    assert response.json() == {'productos': [1]}
+
+
+def test_respuesta_sin_etag_no_se_guarda(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{}')
+    )
+    get_condicional('http://inventarios/api/inventarios')
+    get_condicional('http://inventarios/api/inventarios')
+
+    _, kwargs = mock_get.call_args
+    assert 'headers' not in kwargs
+
+
+def test_parametros_distintos_no_comparten_copia(mocker):
+    mock_get = mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{}', {'ETag': '"v1"'})
+    )
+    get_condicional('http://inventarios/api/inventarios', params={'productoId': 1})
+    get_condicional('http://inventarios/api/inventarios', params={'productoId': 2})
+
+    _, kwargs = mock_get.call_args
+    assert 'headers' not in kwargs
+
+
+def test_limite_de_entradas(mocker, monkeypatch):
+    monkeypatch.setattr(http_revalidacion, 'MAX_ENTRADAS', 2)
+    mocker.patch(
+        'src.services.http_revalidacion.requests.get',
+        return_value=_respuesta(200, b'{}', {'ETag': '"v1"'})
+    )
+    for producto_id in range(3):
+        get_condicional(f'http://productos/api/productos/{producto_id}')
+
+    assert len(http_revalidacion._respuestas) == 2
+    assert 'http://productos/api/productos/0' not in http_revalidacion._respuestas
@@ -43,7 +43,11 @@ def make_response(status, json_data=None, text='', headers=None, raise_exc=None,
     def raise_for_status():
         if raise_exc:
             raise raise_exc
-    return SimpleNamespace(status_code=status, json=json_func, text=text, headers=headers, raise_for_status=raise_for_status, content=content)
+    def iter_content(chunk_size=1):
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+    return SimpleNamespace(status_code=status, json=json_func, text=text, headers=headers, raise_for_status=raise_for_status,
+                           content=content, iter_content=iter_content, close=lambda: None)
 
 
 @pytest.fixture(autouse=True)
@@ -226,10 +230,10 @@ def test_producto_service_consultas_y_descargas(app, mocker):
             make_response(500, {'error': 'fail'}, text='fail'),
             requests.exceptions.RequestException('net')
         ]
-        content, filename, mimetype = descargar_certificacion_producto_externo(2)
-        assert filename == 'cert.pdf'
-        assert mimetype == 'application/pdf'
-        assert content.startswith(b'%PDF')
+        descarga = descargar_certificacion_producto_externo(2)
+        assert descarga['filename'] == 'cert.pdf'
+        assert descarga['mimetype'] == 'application/pdf'
+        assert b''.join(descarga['contenido']).startswith(b'%PDF')
 
         with pytest.raises(ProductoServiceError) as exc:
             descargar_certificacion_producto_externo(2)
@@ -242,3 +246,46 @@ def test_producto_service_consultas_y_descargas(app, mocker):
         with pytest.raises(ProductoServiceError) as exc:
             descargar_certificacion_producto_externo(2)
         assert exc.value.status_code == 503
+
+
+def test_descarga_certificacion_reenvia_range_y_transmite_por_bloques(app, mocker):
+    contenido = b'x' * 200000
+    mock_get = mocker.patch(
+        'src.services.productos.requests.get',
+        return_value=make_response(206, headers={
+            'Content-Type': 'application/pdf',
+            'Content-Range': 'bytes 0-199999/400000',
+            'Content-Length': '200000',
+            'ETag': '"abc"'
+        }, content=contenido)
+    )
+
+    with app.app_context():
+        descarga = descargar_certificacion_producto_externo(2, {'Range': 'bytes=0-199999'})
+
+    assert mock_get.call_args.kwargs['headers'] == {'Range': 'bytes=0-199999'}
+    assert mock_get.call_args.kwargs['stream'] is True
+    assert descarga['status_code'] == 206
+    assert descarga['headers']['Content-Range'] == 'bytes 0-199999/400000'
+    assert descarga['headers']['ETag'] == '"abc"'
+    bloques = list(descarga['contenido'])
+    assert len(bloques) > 1
+    assert b''.join(bloques) == contenido
+
+
+def test_descarga_certificacion_redireccion_prefirmada(app, mocker):
+    redireccion = make_response(302, headers={'Location': 'http://minio/cert.pdf?X-Amz-Signature=1'})
+    mock_get = mocker.patch('src.services.productos.requests.get', return_value=redireccion)
+
+    with app.app_context():
+        mocker.patch.object(config, 'CERTIFICACION_REDIRECCION_DIRECTA', True)
+        descarga = descargar_certificacion_producto_externo(2)
+        assert descarga['redirect_url'] == 'http://minio/cert.pdf?X-Amz-Signature=1'
+
+        mocker.patch.object(config, 'CERTIFICACION_REDIRECCION_DIRECTA', False)
+        mock_get.side_effect = [redireccion, make_response(200, content=b'%PDF')]
+        descarga = descargar_certificacion_producto_externo(2)
+
+    assert descarga['redirect_url'] is None
+    assert b''.join(descarga['contenido']) == b'%PDF'
+    assert mock_get.call_args.args[0] == 'http://minio/cert.pdf?X-Amz-Signature=1'
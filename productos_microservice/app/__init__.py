@@ -1,11 +1,45 @@
 from flask import Flask
+from sqlalchemy import inspect, text
 from .extensions import db, ma
 from .config import Config
 from .routes.productos_bp import productos_bp
 from .blueprints.videos_bp import videos_bp
 import os
 
-def create_app():
+# Columnas agregadas a tablas que ya existían en despliegues anteriores:
+# create_all no las crea, así que se agregan al iniciar (ver _agregar_columnas_nuevas)
+COLUMNAS_NUEVAS = {
+    'videos_evidencia': ('ruta_hls', 'ruta_poster', 'ruta_miniaturas'),
+}
+
+
+def _agregar_columnas_nuevas():
+    """Agrega con ALTER TABLE las columnas de COLUMNAS_NUEVAS que falten en la base"""
+    inspector = inspect(db.engine)
+    dialecto = db.engine.dialect
+    with db.engine.begin() as conexion:
+        for nombre_tabla, columnas in COLUMNAS_NUEVAS.items():
+            if not inspector.has_table(nombre_tabla):
+                continue
+            existentes = {columna['name'] for columna in inspector.get_columns(nombre_tabla)}
+            tabla = db.metadata.tables[nombre_tabla]
+            for nombre in columnas:
+                if nombre in existentes:
+                    continue
+                tipo = tabla.c[nombre].type.compile(dialect=dialecto)
+                # IF NOT EXISTS evita fallar si la API y el worker inician a la vez (PostgreSQL)
+                si_no_existe = 'IF NOT EXISTS ' if dialecto.name == 'postgresql' else ''
+                conexion.execute(text(f'ALTER TABLE {nombre_tabla} ADD COLUMN {si_no_existe}{nombre} {tipo}'))
+
+
+def create_app(config_overrides=None):
+    """
+    Crea la aplicación Flask
+
+    Args:
+        config_overrides: Valores de configuración que reemplazan a los de la clase
+            de configuración (ej. el worker de videos ajusta DB_POOL_SIZE a sus hilos)
+    """
     app = Flask(__name__)
     
     # Usar configuración de testing si está en modo test
@@ -15,6 +49,18 @@ def create_app():
     else:
         app.config.from_object(Config)
 
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    # Dimensionar el pool de conexiones (SQLite usa su propio pool sin tamaño)
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_recycle': app.config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': True
+        })
+
     # Debug: mostrar qué BD está usando
     print(f"🗃️  Base de datos configurada: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
@@ -32,5 +78,6 @@ def create_app():
     # Crear tablas si no existen
     with app.app_context():
         db.create_all()
+        _agregar_columnas_nuevas()
 
     return app
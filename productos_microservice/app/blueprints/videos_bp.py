@@ -1,16 +1,21 @@
 """
 Blueprint para gestión de videos de productos
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, url_for
 from werkzeug.utils import secure_filename
 from app.models.video_evidencia import VideoEvidencia
+from app.models.carga_video import CargaVideo, ParteCargaVideo
 from app.models.producto import Producto
 from app.services.minio_service import MinIOService
 from app.services.redis_queue_service import RedisQueueService
 from app.config.minio_config import MinIOConfig
 from app.extensions import db
+from minio.error import S3Error
 from datetime import datetime
+import base64
+import hashlib
 import os
+import posixpath
 import uuid
 import logging
 
@@ -66,6 +71,60 @@ def generar_nombre_unico_video(filename, producto_id):
     return f"{producto_id}_{timestamp}_{unique_id}.{extension}"
 
 
+def publicar_video_cargado(video_evidencia, metadata_msg):
+    """
+    Publica el video recién cargado para que el worker lo procese
+    
+    Un fallo al publicar no revierte la carga: el video ya está en MinIO.
+    """
+    try:
+        RedisQueueService.publicar_mensaje_video(
+            video_id=video_evidencia.id,
+            producto_id=video_evidencia.producto_id,
+            estado='cargado',
+            ruta_video=video_evidencia.ruta_original,
+            metadata=metadata_msg
+        )
+        
+        logger.info(f"Mensaje publicado a Redis para video {video_evidencia.id}")
+        
+    except Exception as e:
+        logger.error(f"Error publicando mensaje a Redis: {str(e)}")
+        # No fallar la request, el video está subido
+        # El worker puede procesar manualmente si es necesario
+
+
+def respuesta_video_agregado(video_evidencia):
+    """
+    Construye la respuesta de un video agregado exitosamente
+    
+    Args:
+        video_evidencia: VideoEvidencia en estado 'cargado'
+        
+    Returns:
+        dict: Cuerpo de la respuesta 201
+    """
+    return {
+        "mensaje": "Video agregado exitosamente.",
+        "estado": "confirmado",
+        "video": {
+            "id": video_evidencia.id,
+            "producto_id": video_evidencia.producto_id,
+            "nombre_original": video_evidencia.nombre_original,
+            "tamaño_mb": round(video_evidencia.tamaño_archivo / (1024 * 1024), 2),
+            "formato": video_evidencia.formato_original,
+            "descripcion": video_evidencia.descripcion,
+            "estado": video_evidencia.estado,
+            "fecha_subida": video_evidencia.fecha_subida.strftime("%Y-%m-%d %H:%M:%S"),
+            "usuario_registro": video_evidencia.usuario_registro
+        },
+        "procesamiento": {
+            "estado": "en_cola",
+            "mensaje": "El video está en cola para ser procesado"
+        }
+    }
+
+
 @videos_bp.route('/<int:producto_id>/videos', methods=['POST'])
 def subir_video(producto_id):
     """
@@ -213,50 +272,16 @@ def subir_video(producto_id):
         video_evidencia.marcar_como_cargado()
         db.session.commit()
         
-        # 13. Publicar mensaje a Redis Pub/Sub para procesamiento
-        try:
-            metadata_msg = {
-                'nombre_original': nombre_original,
-                'tamaño_bytes': file_size,
-                'formato': extension,
-                'usuario': usuario_registro
-            }
-            
-            RedisQueueService.publicar_mensaje_video(
-                video_id=video_id,
-                producto_id=producto_id,
-                estado='cargado',
-                ruta_video=ruta_original,
-                metadata=metadata_msg
-            )
-            
-            logger.info(f"Mensaje publicado a Redis para video {video_id}")
-            
-        except Exception as e:
-            logger.error(f"Error publicando mensaje a Redis: {str(e)}")
-            # No fallar la request, el video está subido
-            # El worker puede procesar manualmente si es necesario
+        # 13. Publicar mensaje a Redis para procesamiento
+        publicar_video_cargado(video_evidencia, {
+            'nombre_original': nombre_original,
+            'tamaño_bytes': file_size,
+            'formato': extension,
+            'usuario': usuario_registro
+        })
         
         # 14. Preparar respuesta exitosa
-        respuesta = {
-            "mensaje": "Video agregado exitosamente.",
-            "estado": "confirmado",
-            "video": {
-                "id": video_id,
-                "producto_id": producto_id,
-                "nombre_original": nombre_original,
-                "tamaño_mb": round(file_size / (1024 * 1024), 2),
-                "formato": extension,
-                "descripcion": descripcion,
-                "estado": video_evidencia.estado,
-                "fecha_subida": video_evidencia.fecha_subida.strftime("%Y-%m-%d %H:%M:%S"),
-                "usuario_registro": usuario_registro
-            },
-            "procesamiento": {
-                "estado": "en_cola",
-                "mensaje": "El video está en cola para ser procesado"
-            }
-        }
+        respuesta = respuesta_video_agregado(video_evidencia)
         
         return jsonify(respuesta), 201
         
@@ -298,19 +323,23 @@ def listar_videos_producto(producto_id):
             VideoEvidencia.fecha_subida.desc()
         ).all()
         
+        # Firmar en un solo paso las URLs de los videos procesados (reutiliza las vigentes)
+        rutas_pc = [v.ruta_procesado_pc for v in videos if v.esta_procesado() and v.ruta_procesado_pc]
+        urls = {}
+        if rutas_pc:
+            try:
+                urls = MinIOService.obtener_urls_presigned(rutas_pc)
+            except Exception as e:
+                logger.error(f"Error generando URLs para videos del producto {producto_id}: {e}")
+        
         # Serializar videos
         videos_data = []
         for video in videos:
             video_dict = video.to_dict()
             
-            # Si está procesado, generar URL presigned
+            # Si está procesado, agregar URL presigned
             if video.esta_procesado() and video.ruta_procesado_pc:
-                try:
-                    url = MinIOService.obtener_url_presigned(video.ruta_procesado_pc)
-                    video_dict['url_reproduccion'] = url
-                except Exception as e:
-                    logger.error(f"Error generando URL para video {video.id}: {e}")
-                    video_dict['url_reproduccion'] = None
+                video_dict['url_reproduccion'] = urls.get(video.ruta_procesado_pc)
             
             videos_data.append(video_dict)
         
@@ -359,13 +388,18 @@ def obtener_video(video_id):
         # Si está procesado, generar URL presigned
         if video.esta_procesado() and video.ruta_procesado_pc:
             try:
-                url_pc = MinIOService.obtener_url_presigned(video.ruta_procesado_pc)
-                url_mobile = MinIOService.obtener_url_presigned(video.ruta_procesado_mobile) if video.ruta_procesado_mobile else None
+                urls = MinIOService.obtener_urls_presigned(
+                    [video.ruta_procesado_pc, video.ruta_procesado_mobile, video.ruta_poster]
+                )
                 
                 video_dict['urls_reproduccion'] = {
-                    'pc': url_pc,
-                    'mobile': url_mobile,
-                    'expira_en_segundos': MinIOConfig.PRESIGNED_URL_EXPIRY
+                    'pc': urls[video.ruta_procesado_pc],
+                    'mobile': urls.get(video.ruta_procesado_mobile),
+                    'expira_en_segundos': MinIOService.vigencia_url_presigned(video.ruta_procesado_pc),
+                    # HLS adaptativo y miniaturas: playlists servidas por este servicio
+                    'hls': url_for('videos.obtener_recurso_streaming', video_id=video.id, archivo='master.m3u8') if video.ruta_hls else None,
+                    'poster': urls.get(video.ruta_poster),
+                    'miniaturas_vtt': url_for('videos.obtener_recurso_streaming', video_id=video.id, archivo='miniaturas.vtt') if video.ruta_miniaturas else None
                 }
             except Exception as e:
                 logger.error(f"Error generando URLs para video {video_id}: {e}")
@@ -382,6 +416,104 @@ def obtener_video(video_id):
         }), 500
 
 
+# Tipos de contenido de las playlists de streaming
+MIMETYPES_STREAMING = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.vtt': 'text/vtt',
+}
+
+
+def firmar_referencias_playlist(contenido, directorio):
+    """
+    Reemplaza las referencias a segmentos e imágenes de una playlist por URLs presigned
+    
+    Las referencias a otras playlists (.m3u8) se dejan relativas para que el
+    reproductor las vuelva a pedir a este servicio. Los fragmentos (#xywh=...)
+    de las miniaturas se conservan.
+    
+    Args:
+        contenido: Texto de la playlist (.m3u8 o .vtt)
+        directorio: Prefijo en MinIO del que cuelgan las referencias
+        
+    Returns:
+        str: Playlist con las referencias firmadas
+    """
+    lineas = contenido.splitlines()
+    referencias = {}
+    for i, linea in enumerate(lineas):
+        linea = linea.strip()
+        if not linea or linea.startswith('#') or '-->' in linea or linea == 'WEBVTT':
+            continue
+        recurso, _, fragmento = linea.partition('#')
+        if recurso.endswith('.m3u8'):
+            continue
+        referencias[i] = (posixpath.normpath(posixpath.join(directorio, recurso)), fragmento)
+    
+    urls = MinIOService.obtener_urls_presigned([objeto for objeto, _ in referencias.values()])
+    for i, (objeto, fragmento) in referencias.items():
+        lineas[i] = urls[objeto] + (f'#{fragmento}' if fragmento else '')
+    
+    return '\n'.join(lineas) + '\n'
+
+
+@videos_bp.route('/videos/<int:video_id>/streaming/<path:archivo>', methods=['GET'])
+def obtener_recurso_streaming(video_id, archivo):
+    """
+    Entrega una playlist HLS o el WebVTT de miniaturas de un video procesado
+    
+    Los segmentos y el sprite se guardan en MinIO sin acceso público, así que
+    sus referencias se reemplazan por URLs presigned (reutilizadas mientras
+    estén vigentes).
+    
+    Args:
+        video_id: ID del video
+        archivo: Ruta relativa (master.m3u8, mobile/index.m3u8, miniaturas.vtt)
+        
+    Returns:
+        200: Playlist con referencias firmadas
+        404: Video o recurso no encontrado
+        500: Error interno
+    """
+    try:
+        extension = posixpath.splitext(archivo)[1]
+        video = VideoEvidencia.query.get(video_id)
+        directorio = video.directorio_streaming() if video else None
+        
+        if not directorio or extension not in MIMETYPES_STREAMING or '..' in archivo.split('/'):
+            return jsonify({
+                "error": "Recurso de streaming no encontrado",
+                "codigo": "RECURSO_NO_ENCONTRADO",
+                "video_id": video_id
+            }), 404
+        
+        contenido = MinIOService.descargar_video(f"{directorio}/{archivo}").decode('utf-8')
+        carpeta = posixpath.dirname(f"{directorio}/{archivo}")
+        
+        response = Response(
+            firmar_referencias_playlist(contenido, carpeta),
+            mimetype=MIMETYPES_STREAMING[extension]
+        )
+        # Las URLs firmadas caducan: permitir solo un cache corto en el cliente
+        response.headers['Cache-Control'] = 'private, max-age=60'
+        return response
+    
+    except S3Error:
+        # descargar_video solo deja pasar S3Error cuando el objeto no existe
+        return jsonify({
+            "error": "Recurso de streaming no encontrado",
+            "codigo": "RECURSO_NO_ENCONTRADO",
+            "video_id": video_id
+        }), 404
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo recurso de streaming {archivo} del video {video_id}: {str(e)}")
+        return jsonify({
+            "error": "Error obteniendo recurso de streaming",
+            "codigo": "ERROR_INTERNO",
+            "detalles": str(e)
+        }), 500
+
+
 @videos_bp.route('/videos/<int:video_id>/status', methods=['GET'])
 def obtener_status_video(video_id):
     """
@@ -435,3 +567,355 @@ def obtener_status_video(video_id):
             "codigo": "ERROR_INTERNO",
             "detalles": str(e)
         }), 500
+
+
+def _obtener_carga(carga_id):
+    """
+    Busca una carga por partes vigente
+    
+    Returns:
+        tuple: (carga, None) o (None, respuesta de error)
+    """
+    carga = CargaVideo.query.get(carga_id)
+    if not carga:
+        return None, (jsonify({
+            "error": "Carga no encontrada",
+            "codigo": "CARGA_NO_ENCONTRADA",
+            "carga_id": carga_id
+        }), 404)
+    return carga, None
+
+
+@videos_bp.route('/<int:producto_id>/videos/cargas', methods=['POST'])
+def iniciar_carga_video(producto_id):
+    """
+    Inicia la carga reanudable de un video en partes
+    
+    El cliente sube luego cada parte con PUT .../partes/<numero> y la cierra con
+    POST .../completar. Si la conexión se corta, GET .../cargas/<carga_id>
+    indica las partes que faltan.
+    
+    Args:
+        producto_id: ID del producto
+        
+    JSON esperado:
+        - nombre_archivo: Nombre original del video
+        - tamaño_bytes: Tamaño total del video
+        - descripcion: Descripción del video (obligatorio)
+        - usuario_registro: Usuario que sube el video
+        
+    Returns:
+        201: Carga iniciada (carga_id, tamaño_parte, total_partes)
+        400: Datos inválidos
+        404: Producto no encontrado
+        413: Archivo muy grande
+        500: Error interno
+    """
+    try:
+        producto = Producto.query.get(producto_id)
+        if not producto:
+            return jsonify({
+                "error": "Producto no encontrado",
+                "codigo": "PRODUCTO_NO_ENCONTRADO",
+                "producto_id": producto_id
+            }), 404
+        
+        data = request.get_json(silent=True) or {}
+        nombre_archivo = data.get('nombre_archivo') or ''
+        
+        if not validar_extension_video(nombre_archivo):
+            return jsonify({
+                "error": "El formato del archivo no es válido.",
+                "codigo": "FORMATO_INVALIDO",
+                "formatos_permitidos": list(MinIOConfig.ALLOWED_VIDEO_EXTENSIONS)
+            }), 400
+        
+        try:
+            file_size = int(data.get('tamaño_bytes'))
+        except (TypeError, ValueError):
+            file_size = 0
+        if file_size <= 0:
+            return jsonify({
+                "error": "El tamaño del archivo es obligatorio",
+                "codigo": "TAMAÑO_INVALIDO"
+            }), 400
+        
+        if not validar_tamaño_video(file_size):
+            max_mb = MinIOConfig.MAX_VIDEO_SIZE / (1024 * 1024)
+            return jsonify({
+                "error": "El archivo supera el tamaño máximo permitido.",
+                "codigo": "ARCHIVO_MUY_GRANDE",
+                "tamaño_archivo_mb": round(file_size / (1024 * 1024), 2),
+                "tamaño_maximo_mb": int(max_mb)
+            }), 413
+        
+        descripcion = (data.get('descripcion') or '').strip()
+        if not descripcion:
+            return jsonify({
+                "error": "La descripción del video es obligatoria",
+                "codigo": "DESCRIPCION_FALTANTE"
+            }), 400
+        
+        usuario_registro = data.get('usuario_registro', 'sistema')
+        nombre_original = secure_filename(nombre_archivo)
+        extension = nombre_original.rsplit('.', 1)[1].lower()
+        nombre_archivo_minio = generar_nombre_unico_video(nombre_original, producto_id)
+        ruta_original = f"videos/original/{producto_id}/{nombre_archivo_minio}"
+        
+        video_evidencia = VideoEvidencia(
+            producto_id=producto_id,
+            nombre_original=nombre_original,
+            nombre_archivo_minio=nombre_archivo_minio,
+            tamaño_archivo=file_size,
+            formato_original=extension,
+            descripcion=descripcion,
+            estado='cargando',
+            ruta_original=ruta_original,
+            usuario_registro=usuario_registro
+        )
+        db.session.add(video_evidencia)
+        db.session.flush()
+        
+        upload_id = MinIOService.iniciar_carga_multipart(
+            ruta_original,
+            content_type=f'video/{extension}',
+            metadata={
+                'video_id': str(video_evidencia.id),
+                'producto_id': str(producto_id),
+                'usuario': usuario_registro
+            }
+        )
+        
+        carga = CargaVideo(
+            video_id=video_evidencia.id,
+            upload_id=upload_id,
+            ruta_objeto=ruta_original,
+            tamaño_total=file_size,
+            tamaño_parte=MinIOConfig.MULTIPART_PART_SIZE,
+            fecha_expiracion=CargaVideo.calcular_expiracion(MinIOConfig.CARGA_EXPIRACION_HORAS)
+        )
+        db.session.add(carga)
+        db.session.commit()
+        
+        logger.info(f"Carga {carga.id} iniciada para video {video_evidencia.id} ({carga.total_partes} partes)")
+        
+        return jsonify(carga.to_dict()), 201
+        
+    except Exception as e:
+        logger.error(f"Error iniciando carga de video: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({
+            "error": "No fue posible iniciar la carga del video. Intenta nuevamente.",
+            "codigo": "ERROR_INTERNO",
+            "detalles": str(e)
+        }), 500
+
+
+@videos_bp.route('/videos/cargas/<carga_id>', methods=['GET'])
+def obtener_carga_video(carga_id):
+    """
+    Estado de una carga por partes: partes recibidas (con su checksum) y faltantes
+    
+    Returns:
+        200: Estado de la carga
+        404: Carga no encontrada
+    """
+    carga, error = _obtener_carga(carga_id)
+    if error:
+        return error
+    return jsonify(carga.to_dict()), 200
+
+
+@videos_bp.route('/videos/cargas/<carga_id>/partes/<int:numero>', methods=['PUT'])
+def subir_parte_video(carga_id, numero):
+    """
+    Sube una parte de la carga (cuerpo binario)
+    
+    La cabecera X-Checksum-SHA256 (hex) es obligatoria y debe coincidir con el
+    contenido recibido. Volver a subir una parte la reemplaza, por lo que los
+    reintentos son seguros.
+    
+    Returns:
+        200: Parte recibida
+        400: Número de parte, tamaño o checksum inválidos
+        404: Carga no encontrada
+        410: Carga expirada
+        500: Error interno
+    """
+    try:
+        carga, error = _obtener_carga(carga_id)
+        if error:
+            return error
+        
+        if carga.esta_expirada():
+            return jsonify({
+                "error": "La carga expiró, inicia una nueva",
+                "codigo": "CARGA_EXPIRADA"
+            }), 410
+        
+        if numero < 1 or numero > carga.total_partes:
+            return jsonify({
+                "error": f"Número de parte inválido (1-{carga.total_partes})",
+                "codigo": "PARTE_INVALIDA"
+            }), 400
+        
+        checksum = (request.headers.get('X-Checksum-SHA256') or '').strip().lower()
+        if not checksum:
+            return jsonify({
+                "error": "Falta la cabecera X-Checksum-SHA256",
+                "codigo": "CHECKSUM_FALTANTE"
+            }), 400
+        
+        tamaño_esperado = carga.tamaño_esperado_parte(numero)
+        if request.content_length is not None and request.content_length != tamaño_esperado:
+            return jsonify({
+                "error": "El tamaño de la parte no es el esperado",
+                "codigo": "TAMAÑO_PARTE_INVALIDO",
+                "tamaño_esperado": tamaño_esperado
+            }), 400
+        
+        data = request.get_data(cache=False)
+        if len(data) != tamaño_esperado:
+            return jsonify({
+                "error": "El tamaño de la parte no es el esperado",
+                "codigo": "TAMAÑO_PARTE_INVALIDO",
+                "tamaño_esperado": tamaño_esperado
+            }), 400
+        
+        sha256 = hashlib.sha256(data).hexdigest()
+        if sha256 != checksum:
+            return jsonify({
+                "error": "El checksum de la parte no coincide",
+                "codigo": "CHECKSUM_INVALIDO",
+                "sha256_recibido": sha256
+            }), 400
+        
+        etag = MinIOService.subir_parte(
+            carga.ruta_objeto,
+            carga.upload_id,
+            numero,
+            data,
+            md5_base64=base64.b64encode(hashlib.md5(data).digest()).decode()
+        )
+        
+        db.session.merge(ParteCargaVideo(
+            carga_id=carga.id,
+            numero=numero,
+            etag=etag,
+            sha256=sha256,
+            tamaño=len(data),
+            fecha_recepcion=datetime.utcnow()
+        ))
+        db.session.commit()
+        
+        return jsonify({
+            "carga_id": carga.id,
+            "numero": numero,
+            "tamaño": len(data),
+            "sha256": sha256
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error subiendo parte {numero} de la carga {carga_id}: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({
+            "error": "No fue posible subir la parte. Intenta nuevamente.",
+            "codigo": "ERROR_INTERNO",
+            "detalles": str(e)
+        }), 500
+
+
+@videos_bp.route('/videos/cargas/<carga_id>/completar', methods=['POST'])
+def completar_carga_video(carga_id):
+    """
+    Une las partes en MinIO y deja el video en cola para procesamiento
+    
+    Returns:
+        201: Video agregado (misma respuesta que la subida en una sola petición)
+        404: Carga no encontrada
+        409: Faltan partes por subir
+        410: Carga expirada
+        500: Error interno
+    """
+    try:
+        carga, error = _obtener_carga(carga_id)
+        if error:
+            return error
+        
+        if carga.esta_expirada():
+            return jsonify({
+                "error": "La carga expiró, inicia una nueva",
+                "codigo": "CARGA_EXPIRADA"
+            }), 410
+        
+        faltantes = carga.partes_faltantes()
+        if faltantes:
+            return jsonify({
+                "error": "Faltan partes por subir",
+                "codigo": "CARGA_INCOMPLETA",
+                "partes_faltantes": faltantes
+            }), 409
+        
+        MinIOService.completar_carga_multipart(
+            carga.ruta_objeto,
+            carga.upload_id,
+            [(parte.numero, parte.etag) for parte in carga.partes]
+        )
+        
+        video_evidencia = carga.video
+        video_evidencia.marcar_como_cargado()
+        db.session.delete(carga)
+        db.session.commit()
+        
+        logger.info(f"Video {video_evidencia.id} cargado por partes: {video_evidencia.ruta_original}")
+        
+        publicar_video_cargado(video_evidencia, {
+            'nombre_original': video_evidencia.nombre_original,
+            'tamaño_bytes': video_evidencia.tamaño_archivo,
+            'formato': video_evidencia.formato_original,
+            'usuario': video_evidencia.usuario_registro
+        })
+        
+        return jsonify(respuesta_video_agregado(video_evidencia)), 201
+        
+    except Exception as e:
+        logger.error(f"Error completando carga {carga_id}: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({
+            "error": "No fue posible completar la carga del video. Intenta nuevamente.",
+            "codigo": "ERROR_INTERNO",
+            "detalles": str(e)
+        }), 500
+
+
+@videos_bp.route('/videos/cargas/<carga_id>', methods=['DELETE'])
+def cancelar_carga_video(carga_id):
+    """
+    Cancela una carga por partes y descarta las partes subidas
+    
+    Returns:
+        200: Carga cancelada
+        404: Carga no encontrada
+        500: Error interno
+    """
+    try:
+        carga, error = _obtener_carga(carga_id)
+        if error:
+            return error
+        
+        MinIOService.abortar_carga_multipart(carga.ruta_objeto, carga.upload_id)
+        
+        carga.video.marcar_error("Carga cancelada por el cliente")
+        db.session.delete(carga)
+        db.session.commit()
+        
+        return jsonify({"mensaje": "Carga cancelada", "carga_id": carga_id}), 200
+        
+    except Exception as e:
+        logger.error(f"Error cancelando carga {carga_id}: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({
+            "error": "No fue posible cancelar la carga",
+            "codigo": "ERROR_INTERNO",
+            "detalles": str(e)
+        }), 500
@@ -17,6 +17,14 @@ class Config:
     # Configuración de seguridad
     SEND_FILE_MAX_AGE_DEFAULT = 300  # Cache de archivos por 5 minutos
 
+    # Cache HTTP de lecturas (ETag + Cache-Control), en segundos
+    HTTP_CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 60))
+
+    # Pool de conexiones a la base de datos (no aplica a SQLite)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+
     # Configuración de Redis para colas
     REDIS_SERVICE_URL = os.getenv('REDIS_SERVICE_URL', 'http://localhost:5011')
 
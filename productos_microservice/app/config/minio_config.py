@@ -18,13 +18,29 @@ class MinIOConfig:
     
     # Buckets
     MINIO_BUCKET_VIDEOS = os.getenv('MINIO_BUCKET_VIDEOS', 'medisupply-videos')
+    # Las certificaciones van en su propio bucket: sus políticas de acceso y
+    # retención no son las de los videos
+    MINIO_BUCKET_CERTIFICACIONES = os.getenv('MINIO_BUCKET_CERTIFICACIONES', 'medisupply-certificaciones')
     
     # Configuración de videos
     MAX_VIDEO_SIZE = 150 * 1024 * 1024  # 150 MB en bytes
     ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi'}
     
+    # Tamaño de parte para cargas multipart (mínimo 5 MB exigido por S3/MinIO)
+    MULTIPART_PART_SIZE = int(os.getenv('MINIO_MULTIPART_PART_SIZE', 10 * 1024 * 1024))
+    
+    # Cargas de video por partes (reanudables)
+    CARGA_EXPIRACION_HORAS = int(os.getenv('VIDEO_CARGA_EXPIRACION_HORAS', 24))
+    
+    # Certificaciones de productos (llave por hash de contenido: certificaciones/ab/abcd....pdf)
+    CERTIFICACIONES_PREFIX = os.getenv('MINIO_CERTIFICACIONES_PREFIX', 'certificaciones')
+    CERTIFICACION_URL_EXPIRY = int(os.getenv('CERTIFICACION_URL_EXPIRY', 300))  # 5 minutos
+    
     # URLs presigned
     PRESIGNED_URL_EXPIRY = int(os.getenv('PRESIGNED_URL_EXPIRY', 3600))  # 1 hora por defecto
+    # Las URLs firmadas se reutilizan hasta que les quede menos de este margen de vigencia
+    PRESIGNED_URL_MARGEN_RENOVACION = int(os.getenv('PRESIGNED_URL_MARGEN_RENOVACION', 300))
+    PRESIGNED_URL_CACHE_MAX = int(os.getenv('PRESIGNED_URL_CACHE_MAX', 4096))
     
     # Feature flags
     USE_MINIO = os.getenv('USE_MINIO', 'true').lower() == 'true'
@@ -0,0 +1,106 @@
+"""
+Modelos para cargas de video por partes (reanudables)
+"""
+from app.extensions import db
+from datetime import datetime, timedelta
+import math
+import uuid
+
+
+class CargaVideo(db.Model):
+    """
+    Carga de un video en partes, asociada a una carga multipart de MinIO
+    Permite reanudar la subida consultando qué partes ya se recibieron
+    """
+
+    __tablename__ = 'cargas_video'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    video_id = db.Column(db.Integer, db.ForeignKey('videos_evidencia.id'), nullable=False, index=True)
+
+    # Carga multipart en MinIO
+    upload_id = db.Column(db.String(255), nullable=False)
+    ruta_objeto = db.Column(db.String(500), nullable=False)
+
+    # Tamaños en bytes
+    tamaño_total = db.Column(db.BigInteger, nullable=False)
+    tamaño_parte = db.Column(db.Integer, nullable=False)
+
+    # Auditoría
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    fecha_expiracion = db.Column(db.DateTime, nullable=False)
+
+    video = db.relationship('VideoEvidencia')
+    partes = db.relationship(
+        'ParteCargaVideo',
+        backref='carga',
+        lazy=True,
+        cascade='all, delete-orphan',
+        order_by='ParteCargaVideo.numero'
+    )
+
+    def __repr__(self):
+        return f"<CargaVideo {self.id} - video {self.video_id}>"
+
+    @staticmethod
+    def calcular_expiracion(horas):
+        """Fecha de expiración de una carga que inicia ahora"""
+        return datetime.utcnow() + timedelta(hours=horas)
+
+    @property
+    def total_partes(self):
+        """Número de partes en que se divide el archivo"""
+        return max(1, math.ceil(self.tamaño_total / self.tamaño_parte))
+
+    def tamaño_esperado_parte(self, numero):
+        """Tamaño en bytes que debe tener la parte `numero` (la última puede ser menor)"""
+        if numero < self.total_partes:
+            return self.tamaño_parte
+        return self.tamaño_total - self.tamaño_parte * (self.total_partes - 1)
+
+    def esta_expirada(self):
+        """Verifica si la carga ya no admite partes"""
+        return datetime.utcnow() > self.fecha_expiracion
+
+    def partes_faltantes(self):
+        """Números de parte que todavía no se han recibido"""
+        recibidas = {parte.numero for parte in self.partes}
+        return [numero for numero in range(1, self.total_partes + 1) if numero not in recibidas]
+
+    def to_dict(self):
+        """Serializa la carga a diccionario"""
+        return {
+            'carga_id': self.id,
+            'video_id': self.video_id,
+            'tamaño_total': self.tamaño_total,
+            'tamaño_parte': self.tamaño_parte,
+            'total_partes': self.total_partes,
+            'partes_recibidas': [parte.to_dict() for parte in self.partes],
+            'partes_faltantes': self.partes_faltantes(),
+            'fecha_expiracion': self.fecha_expiracion.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+class ParteCargaVideo(db.Model):
+    """Parte recibida de una carga de video, con su checksum"""
+
+    __tablename__ = 'partes_carga_video'
+
+    carga_id = db.Column(db.String(36), db.ForeignKey('cargas_video.id'), primary_key=True)
+    numero = db.Column(db.Integer, primary_key=True)
+
+    etag = db.Column(db.String(255), nullable=False)  # ETag devuelto por MinIO
+    sha256 = db.Column(db.String(64), nullable=False)
+    tamaño = db.Column(db.Integer, nullable=False)
+    fecha_recepcion = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ParteCargaVideo {self.carga_id}#{self.numero}>"
+
+    def to_dict(self):
+        """Serializa la parte a diccionario"""
+        return {
+            'numero': self.numero,
+            'tamaño': self.tamaño,
+            'sha256': self.sha256
+        }
@@ -31,6 +31,11 @@ class VideoEvidencia(db.Model):
     ruta_procesado_pc = db.Column(db.String(500), nullable=True)  # videos/procesado/{producto_id}/{nombre}_procesado_pc.mp4
     ruta_procesado_mobile = db.Column(db.String(500), nullable=True)  # videos/procesado/{producto_id}/{nombre}_procesado_mobile.mp4
     
+    # Recursos de streaming: videos/procesado/{producto_id}/{nombre}_streaming/...
+    ruta_hls = db.Column(db.String(500), nullable=True)  # .../master.m3u8
+    ruta_poster = db.Column(db.String(500), nullable=True)  # .../poster.jpg
+    ruta_miniaturas = db.Column(db.String(500), nullable=True)  # .../miniaturas.vtt (sprite en miniaturas.jpg)
+    
     # URLs presigned (temporal, regenerar cuando se requiera)
     url_reproduccion = db.Column(db.String(1000), nullable=True)
     url_expiracion = db.Column(db.DateTime, nullable=True)
@@ -62,7 +67,7 @@ class VideoEvidencia(db.Model):
         """Marca el video como en procesamiento"""
         self.estado = 'procesando'
     
-    def marcar_como_procesado(self, ruta_pc=None, ruta_mobile=None):
+    def marcar_como_procesado(self, ruta_pc=None, ruta_mobile=None, ruta_hls=None, ruta_poster=None, ruta_miniaturas=None):
         """Marca el video como procesado exitosamente"""
         self.estado = 'procesado'
         self.fecha_procesado = datetime.utcnow()
@@ -70,6 +75,18 @@ class VideoEvidencia(db.Model):
             self.ruta_procesado_pc = ruta_pc
         if ruta_mobile:
             self.ruta_procesado_mobile = ruta_mobile
+        if ruta_hls:
+            self.ruta_hls = ruta_hls
+        if ruta_poster:
+            self.ruta_poster = ruta_poster
+        if ruta_miniaturas:
+            self.ruta_miniaturas = ruta_miniaturas
+    
+    def directorio_streaming(self):
+        """Prefijo en MinIO de los recursos de streaming (None si no se generaron)"""
+        if not self.ruta_hls:
+            return None
+        return self.ruta_hls.rsplit('/', 1)[0]
     
     def marcar_error(self, mensaje):
         """Marca el video con error"""
@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, redirect
 from app.services.producto_service import ProductoService, ConflictError
 from app.services.csv_service import CSVProductoService, CSVImportError
 from app.models.producto import Producto
+from app.services.minio_service import MinIOService
 from app.extensions import db
+from app.utils.http_cache import generar_etag, cliente_tiene_version, aplicar_cabeceras_cache, respuesta_no_modificada
 from datetime import datetime
 from werkzeug.exceptions import RequestEntityTooLarge
 import logging
@@ -13,6 +15,17 @@ logger = logging.getLogger(__name__)
 productos_bp = Blueprint('productos', __name__, url_prefix='/api/productos')
 
 
+def _etag_detalle(marca):
+    """
+    ETag del detalle de un producto a partir de su marca de actualización.
+    Incluye la fecha del día porque el estado de la certificación (Activo/Inactivo)
+    se calcula contra la fecha actual.
+    """
+    if not marca:
+        return None
+    return generar_etag('producto', *marca, datetime.now().date())
+
+
 @productos_bp.route('/health', methods=['GET'])
 def health_check():
     """Endpoint de health check"""
@@ -35,9 +48,11 @@ def listar_productos():
         - estado: Filtrar por estado (Activo/Inactivo)
         - proveedor_id: Filtrar por proveedor
         - buscar: Buscar en nombre o SKU
+        - ids: IDs separados por coma (ej. 1,5,9) para traer solo esos productos
         
     Returns:
-        200: Lista de productos
+        200: Lista de productos (con ETag y Cache-Control)
+        304: Sin cambios respecto al ETag enviado en If-None-Match
         400: Parámetros inválidos
         500: Error interno
     """
@@ -49,9 +64,11 @@ def listar_productos():
         estado = request.args.get('estado')
         proveedor_id = request.args.get('proveedor_id')
         buscar = request.args.get('buscar')
+        ids = request.args.get('ids')
+        producto_ids = sorted({int(pid) for pid in ids.split(',') if pid.strip()}) if ids else None
         
-        # Construir query base con eager loading para evitar N+1 queries
-        query = Producto.query.options(db.joinedload(Producto.certificacion))
+        # Construir query base (el eager loading se agrega después del ETag)
+        query = Producto.query
         
         # Aplicar filtros
         if categoria:
@@ -70,6 +87,26 @@ def listar_productos():
                 (Producto.codigo_sku.ilike(search_pattern))
             )
         
+        if producto_ids is not None:
+            query = query.filter(Producto.id.in_(producto_ids))
+        
+        # ETag a partir de la marca de actualización del conjunto filtrado:
+        # cualquier alta, baja o modificación cambia el conteo o la fecha máxima
+        # (reemplazar la certificación también actualiza fecha_actualizacion)
+        total, ultima_actualizacion = query.with_entities(
+            db.func.count(Producto.id),
+            db.func.max(Producto.fecha_actualizacion)
+        ).one()
+        etag = generar_etag(
+            'productos', total, ultima_actualizacion, page, per_page,
+            categoria, estado, proveedor_id, buscar, producto_ids
+        )
+        if cliente_tiene_version(etag):
+            return respuesta_no_modificada(etag)
+        
+        # Eager loading para evitar N+1 queries
+        query = query.options(db.joinedload(Producto.certificacion))
+        
         # Ordenar por fecha de registro (más recientes primero)
         query = query.order_by(Producto.fecha_registro.desc())
         
@@ -115,11 +152,12 @@ def listar_productos():
                 "categoria": categoria,
                 "estado": estado,
                 "proveedor_id": proveedor_id,
-                "buscar": buscar
+                "buscar": buscar,
+                "ids": producto_ids
             }
         }
         
-        return jsonify(respuesta), 200
+        return aplicar_cabeceras_cache(jsonify(respuesta), etag), 200
         
     except ValueError as e:
         return jsonify({
@@ -146,16 +184,24 @@ def obtener_producto(producto_id):
         
     Returns:
         200: Producto encontrado con toda su información detallada
+        304: Sin cambios respecto al ETag enviado en If-None-Match
         404: Producto no encontrado
         500: Error interno
     """
     try:
+        etag = _etag_detalle(ProductoService.obtener_marca_actualizacion(producto_id=producto_id))
+        if etag and cliente_tiene_version(etag):
+            return respuesta_no_modificada(etag)
+        
         # Usar el nuevo servicio de detalle completo
         detalle = ProductoService.obtener_detalle_completo(producto_id=producto_id)
         
-        return jsonify({
+        response = jsonify({
             "producto": detalle
-        }), 200
+        })
+        if etag:
+            aplicar_cabeceras_cache(response, etag)
+        return response, 200
         
     except ValueError as e:
         return jsonify({
@@ -183,16 +229,24 @@ def obtener_producto_por_sku(sku):
         
     Returns:
         200: Producto encontrado con toda su información detallada
+        304: Sin cambios respecto al ETag enviado en If-None-Match
         404: Producto no encontrado
         500: Error interno
     """
     try:
+        etag = _etag_detalle(ProductoService.obtener_marca_actualizacion(sku=sku))
+        if etag and cliente_tiene_version(etag):
+            return respuesta_no_modificada(etag)
+        
         # Usar el servicio de detalle completo con búsqueda por SKU
         detalle = ProductoService.obtener_detalle_completo(sku=sku)
         
-        return jsonify({
+        response = jsonify({
             "producto": detalle
-        }), 200
+        })
+        if etag:
+            aplicar_cabeceras_cache(response, etag)
+        return response, 200
         
     except ValueError as e:
         return jsonify({
@@ -217,8 +271,13 @@ def descargar_certificacion(producto_id):
     Args:
         producto_id: ID del producto
         
+    Las certificaciones guardadas en MinIO se entregan con una redirección a
+    una URL presigned de corta duración; las que aún están en disco local
+    (anteriores a la migración) se envían directamente.
+    
     Returns:
         200: Archivo de certificación
+        302: Redirección a la URL presigned del archivo
         404: Producto o certificación no encontrada
         500: Error interno
     """
@@ -241,6 +300,14 @@ def descargar_certificacion(producto_id):
                 "producto_id": producto_id
             }), 404
         
+        certificacion = producto.certificacion
+        if MinIOService.es_clave_certificacion(certificacion.ruta_archivo):
+            url = MinIOService.obtener_url_descarga(certificacion.ruta_archivo, certificacion.nombre_archivo)
+            response = redirect(url, code=302)
+            # La URL firmada caduca: no debe quedar guardada en caches intermedios
+            response.headers['Cache-Control'] = 'private, no-store'
+            return response
+        
         # Verificar que el archivo exista
         if not os.path.exists(producto.certificacion.ruta_archivo):
             logger.error(f"Archivo de certificación no encontrado: {producto.certificacion.ruta_archivo}")
@@ -0,0 +1,56 @@
+"""
+Servicio de mantenimiento de las cargas de video por partes
+"""
+from app.extensions import db
+from app.models.carga_video import CargaVideo
+from app.services.minio_service import MinIOService
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CargaVideoService:
+    """Limpieza de cargas por partes abandonadas"""
+    
+    @staticmethod
+    def limpiar_cargas_expiradas(limite=100):
+        """
+        Aborta en MinIO las cargas vencidas y elimina sus registros
+        
+        Se eliminan la carga, sus partes y el video en estado 'cargando' que la
+        esperaba. Si MinIO no confirma el aborto la carga se conserva para
+        reintentarla en la siguiente limpieza (borrarla perdería el upload_id).
+        
+        Args:
+            limite: Máximo de cargas a limpiar por llamada
+            
+        Returns:
+            int: Cargas eliminadas
+        """
+        cargas = (
+            CargaVideo.query
+            .filter(CargaVideo.fecha_expiracion < datetime.utcnow())
+            .order_by(CargaVideo.fecha_expiracion)
+            .limit(limite)
+            .all()
+        )
+        
+        eliminadas = 0
+        for carga in cargas:
+            try:
+                if not MinIOService.abortar_carga_multipart(carga.ruta_objeto, carga.upload_id):
+                    continue
+                video = carga.video
+                db.session.delete(carga)
+                if video is not None and video.estado == 'cargando':
+                    db.session.delete(video)
+                db.session.commit()
+                eliminadas += 1
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"No fue posible limpiar la carga {carga.id}: {e}")
+        
+        if eliminadas:
+            logger.info(f"🧹 {eliminadas} cargas de video expiradas eliminadas")
+        return eliminadas
@@ -1,13 +1,24 @@
 """
 Servicio para interactuar con MinIO (almacenamiento de videos)
+
+Las cargas multipart usan métodos privados del cliente de minio-py
+(_create_multipart_upload, _upload_part, _complete_multipart_upload,
+_abort_multipart_upload), que no forman parte de su API pública y pueden
+cambiar entre versiones: la versión de minio está fijada en requirements.txt
+y estas funciones deben revisarse antes de actualizarla.
 """
 from minio import Minio
+from minio.datatypes import Part
 from minio.error import S3Error
 from app.config.minio_config import MinIOConfig
+from collections import OrderedDict
 from datetime import timedelta
+import hashlib
 import logging
 import io
 import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +28,13 @@ class MinIOService:
     
     _client = None
     
+    # Buckets ya verificados con el cliente actual (cada uno se comprueba una sola vez)
+    _buckets_verificados = set()
+    
+    # URLs presigned vigentes: (object_name, expiry_seconds) -> (url, vence_en)
+    _urls_presigned = OrderedDict()
+    _urls_lock = threading.Lock()
+    
     @staticmethod
     def get_client():
         """
@@ -32,25 +50,40 @@ class MinIOService:
                 secret_key=MinIOConfig.MINIO_SECRET_KEY,
                 secure=MinIOConfig.MINIO_SECURE
             )
+            # Un cliente nuevo invalida lo verificado y firmado con el anterior
+            MinIOService._buckets_verificados = set()
+            with MinIOService._urls_lock:
+                MinIOService._urls_presigned.clear()
         return MinIOService._client
     
     @staticmethod
-    def asegurar_bucket_existe():
+    def asegurar_bucket_existe(forzar=False, bucket_name=None):
         """
-        Asegura que el bucket de videos exista, si no lo crea
+        Asegura que el bucket exista, si no lo crea
+        
+        La verificación se hace una sola vez por cliente y bucket (al iniciar el
+        servicio o en la primera subida); las llamadas siguientes no consultan a MinIO.
+        
+        Args:
+            forzar: Consultar a MinIO aunque el bucket ya se haya verificado
+            bucket_name: Bucket a verificar (default: MINIO_BUCKET_VIDEOS)
         
         Returns:
             bool: True si el bucket existe o fue creado exitosamente
         """
         try:
             client = MinIOService.get_client()
-            bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
+            bucket_name = bucket_name or MinIOConfig.MINIO_BUCKET_VIDEOS
+            
+            if bucket_name in MinIOService._buckets_verificados and not forzar:
+                return True
             
             if not client.bucket_exists(bucket_name):
                 logger.info(f"Creando bucket: {bucket_name}")
                 client.make_bucket(bucket_name)
                 logger.info(f"Bucket creado exitosamente: {bucket_name}")
             
+            MinIOService._buckets_verificados.add(bucket_name)
             return True
         except S3Error as e:
             logger.error(f"Error asegurando bucket: {e}")
@@ -115,11 +148,44 @@ class MinIOService:
             logger.error(f"Error subiendo video a MinIO: {e}")
             raise Exception(f"Error subiendo video: {str(e)}")
     
+    @staticmethod
+    def _firmar_url(client, object_name, expiry_seconds):
+        """
+        Devuelve (url, vence_en) reutilizando la URL guardada mientras le quede
+        más vigencia que PRESIGNED_URL_MARGEN_RENOVACION
+        """
+        clave = (object_name, expiry_seconds)
+        ahora = time.time()
+        
+        with MinIOService._urls_lock:
+            guardada = MinIOService._urls_presigned.get(clave)
+            if guardada and guardada[1] - ahora > MinIOConfig.PRESIGNED_URL_MARGEN_RENOVACION:
+                MinIOService._urls_presigned.move_to_end(clave)
+                return guardada
+        
+        url = client.presigned_get_object(
+            MinIOConfig.MINIO_BUCKET_VIDEOS,
+            object_name,
+            expires=timedelta(seconds=expiry_seconds)
+        )
+        firmada = (url, ahora + expiry_seconds)
+        
+        with MinIOService._urls_lock:
+            MinIOService._urls_presigned[clave] = firmada
+            MinIOService._urls_presigned.move_to_end(clave)
+            while len(MinIOService._urls_presigned) > MinIOConfig.PRESIGNED_URL_CACHE_MAX:
+                MinIOService._urls_presigned.popitem(last=False)
+        
+        logger.info(f"URL presigned generada para: {object_name}")
+        return firmada
+    
     @staticmethod
     def obtener_url_presigned(object_name, expiry_seconds=None):
         """
         Genera una URL presigned para reproducir el video
         
+        La URL se reutiliza entre llamadas hasta poco antes de su vencimiento.
+        
         Args:
             object_name: Nombre del objeto en MinIO
             expiry_seconds: Tiempo de expiración en segundos (default: 1 hora)
@@ -127,27 +193,59 @@ class MinIOService:
         Returns:
             str: URL presigned
         """
+        return MinIOService.obtener_urls_presigned([object_name], expiry_seconds)[object_name]
+    
+    @staticmethod
+    def obtener_urls_presigned(object_names, expiry_seconds=None):
+        """
+        Genera URLs presigned para varios objetos a la vez
+        
+        Args:
+            object_names: Nombres de los objetos en MinIO (se ignoran vacíos y repetidos)
+            expiry_seconds: Tiempo de expiración en segundos (default: 1 hora)
+            
+        Returns:
+            dict: object_name -> URL presigned
+        """
         try:
             client = MinIOService.get_client()
-            bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
             
             if expiry_seconds is None:
                 expiry_seconds = MinIOConfig.PRESIGNED_URL_EXPIRY
             
-            # Generar URL presigned
-            url = client.presigned_get_object(
-                bucket_name,
-                object_name,
-                expires=timedelta(seconds=expiry_seconds)
-            )
-            
-            logger.info(f"URL presigned generada para: {object_name}")
-            return url
+            urls = {}
+            for object_name in object_names:
+                if object_name and object_name not in urls:
+                    urls[object_name] = MinIOService._firmar_url(client, object_name, expiry_seconds)[0]
+            return urls
             
         except S3Error as e:
             logger.error(f"Error generando URL presigned: {e}")
             raise Exception(f"Error generando URL: {str(e)}")
     
+    @staticmethod
+    def vigencia_url_presigned(object_name, expiry_seconds=None):
+        """
+        Segundos de vigencia que le quedan a la URL presigned entregada para un objeto
+        
+        Returns:
+            int: Segundos restantes (la expiración completa si no hay URL guardada)
+        """
+        if expiry_seconds is None:
+            expiry_seconds = MinIOConfig.PRESIGNED_URL_EXPIRY
+        with MinIOService._urls_lock:
+            guardada = MinIOService._urls_presigned.get((object_name, expiry_seconds))
+        if not guardada:
+            return expiry_seconds
+        return max(0, int(guardada[1] - time.time()))
+    
+    @staticmethod
+    def _olvidar_urls(object_name):
+        """Descarta las URLs guardadas de un objeto"""
+        with MinIOService._urls_lock:
+            for clave in [c for c in MinIOService._urls_presigned if c[0] == object_name]:
+                del MinIOService._urls_presigned[clave]
+    
     @staticmethod
     def descargar_video(object_name):
         """
@@ -158,6 +256,10 @@ class MinIOService:
             
         Returns:
             bytes: Contenido del video
+        
+        Raises:
+            S3Error: Si el objeto no existe (NoSuchKey), sin envolver
+            Exception: Si falla la descarga
         """
         try:
             client = MinIOService.get_client()
@@ -172,9 +274,311 @@ class MinIOService:
             return data
             
         except S3Error as e:
+            if e.code in ('NoSuchKey', 'NoSuchObject'):
+                raise
             logger.error(f"Error descargando video: {e}")
             raise Exception(f"Error descargando video: {str(e)}")
     
+    @staticmethod
+    def descargar_video_a_archivo(object_name, file_path):
+        """
+        Descarga un video desde MinIO directamente a disco
+        
+        El contenido se escribe por bloques, sin cargar el video completo en memoria.
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            file_path: Ruta local de destino
+            
+        Returns:
+            str: Ruta local del archivo descargado
+        """
+        try:
+            client = MinIOService.get_client()
+            bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
+            
+            client.fget_object(bucket_name, object_name, file_path)
+            
+            logger.info(f"Video descargado exitosamente a {file_path}: {object_name}")
+            return file_path
+            
+        except S3Error as e:
+            logger.error(f"Error descargando video: {e}")
+            raise Exception(f"Error descargando video: {str(e)}")
+    
+    @staticmethod
+    def subir_video_desde_archivo(file_path, object_name, content_type='video/mp4', metadata=None):
+        """
+        Sube un video a MinIO leyendo directamente desde disco
+        
+        Usa carga multipart por partes de MULTIPART_PART_SIZE, de modo que la
+        memoria usada no depende del tamaño del video.
+        
+        Args:
+            file_path: Ruta local del archivo
+            object_name: Nombre del objeto en MinIO (ruta completa)
+            content_type: Tipo de contenido del video
+            metadata: Metadatos adicionales (dict)
+            
+        Returns:
+            dict: Información del archivo subido
+            
+        Raises:
+            Exception: Si falla la subida
+        """
+        try:
+            client = MinIOService.get_client()
+            bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
+            
+            result = client.fput_object(
+                bucket_name,
+                object_name,
+                file_path,
+                content_type=content_type,
+                metadata=metadata,
+                part_size=MinIOConfig.MULTIPART_PART_SIZE
+            )
+            
+            logger.info(f"Video subido exitosamente desde {file_path}: {object_name}")
+            
+            return {
+                'bucket': bucket_name,
+                'object_name': object_name,
+                'etag': result.etag,
+                'version_id': result.version_id
+            }
+            
+        except S3Error as e:
+            logger.error(f"Error subiendo video a MinIO: {e}")
+            raise Exception(f"Error subiendo video: {str(e)}")
+    
+    @staticmethod
+    def iniciar_carga_multipart(object_name, content_type='video/mp4', metadata=None):
+        """
+        Inicia una carga multipart para subir un video por partes
+        
+        Args:
+            object_name: Nombre del objeto en MinIO (ruta completa)
+            content_type: Tipo de contenido del video
+            metadata: Metadatos adicionales (dict)
+            
+        Returns:
+            str: upload_id de la carga
+        """
+        try:
+            client = MinIOService.get_client()
+            MinIOService.asegurar_bucket_existe()
+            
+            headers = {'Content-Type': content_type}
+            for clave, valor in (metadata or {}).items():
+                headers[f'x-amz-meta-{clave}'] = str(valor)
+            
+            upload_id = client._create_multipart_upload(
+                MinIOConfig.MINIO_BUCKET_VIDEOS, object_name, headers
+            )
+            logger.info(f"Carga multipart iniciada para {object_name}: {upload_id}")
+            return upload_id
+            
+        except S3Error as e:
+            logger.error(f"Error iniciando carga multipart: {e}")
+            raise Exception(f"Error iniciando carga: {str(e)}")
+    
+    @staticmethod
+    def subir_parte(object_name, upload_id, numero, data, md5_base64=None):
+        """
+        Sube una parte de una carga multipart
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            upload_id: ID de la carga multipart
+            numero: Número de parte (desde 1)
+            data: Contenido de la parte (bytes)
+            md5_base64: Content-MD5 para que MinIO verifique la parte recibida
+            
+        Returns:
+            str: ETag de la parte
+        """
+        try:
+            client = MinIOService.get_client()
+            headers = {'Content-MD5': md5_base64} if md5_base64 else None
+            return client._upload_part(
+                MinIOConfig.MINIO_BUCKET_VIDEOS, object_name, data, headers, upload_id, numero
+            )
+        except S3Error as e:
+            logger.error(f"Error subiendo parte {numero} de {object_name}: {e}")
+            raise Exception(f"Error subiendo parte: {str(e)}")
+    
+    @staticmethod
+    def completar_carga_multipart(object_name, upload_id, partes):
+        """
+        Une las partes subidas en el objeto final
+        
+        Args:
+            object_name: Nombre del objeto en MinIO
+            upload_id: ID de la carga multipart
+            partes: Lista de tuplas (numero, etag)
+            
+        Returns:
+            dict: Información del archivo subido
+        """
+        try:
+            client = MinIOService.get_client()
+            bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
+            
+            result = client._complete_multipart_upload(
+                bucket_name,
+                object_name,
+                upload_id,
+                [Part(numero, etag) for numero, etag in sorted(partes)]
+            )
+            
+            logger.info(f"Carga multipart completada: {object_name}")
+            
+            return {
+                'bucket': bucket_name,
+                'object_name': object_name,
+                'etag': result.etag,
+                'version_id': result.version_id
+            }
+            
+        except S3Error as e:
+            logger.error(f"Error completando carga multipart: {e}")
+            raise Exception(f"Error completando carga: {str(e)}")
+    
+    @staticmethod
+    def abortar_carga_multipart(object_name, upload_id):
+        """
+        Cancela una carga multipart y libera las partes subidas
+        
+        Returns:
+            bool: True si se canceló exitosamente
+        """
+        try:
+            client = MinIOService.get_client()
+            client._abort_multipart_upload(MinIOConfig.MINIO_BUCKET_VIDEOS, object_name, upload_id)
+            logger.info(f"Carga multipart cancelada: {object_name}")
+            return True
+        except S3Error as e:
+            if e.code == 'NoSuchUpload':
+                # Ya fue cancelada o completada: no queda nada que liberar
+                return True
+            logger.error(f"Error cancelando carga multipart: {e}")
+            return False
+    
+    @staticmethod
+    def es_clave_certificacion(ruta):
+        """Indica si una ruta de certificación es una llave de MinIO (y no un archivo local o una URL)"""
+        return bool(ruta) and ruta.startswith(f"{MinIOConfig.CERTIFICACIONES_PREFIX}/")
+    
+    @staticmethod
+    def existe_objeto(object_name, bucket_name=None):
+        """
+        Verifica si un objeto existe en MinIO
+        
+        Args:
+            object_name: Nombre del objeto
+            bucket_name: Bucket donde buscarlo (default: MINIO_BUCKET_VIDEOS)
+        
+        Returns:
+            bool: True si el objeto existe
+        """
+        try:
+            MinIOService.get_client().stat_object(bucket_name or MinIOConfig.MINIO_BUCKET_VIDEOS, object_name)
+            return True
+        except S3Error as e:
+            if e.code in ('NoSuchKey', 'NoSuchObject'):
+                return False
+            raise
+    
+    @staticmethod
+    def subir_certificacion(stream, extension, content_type='application/octet-stream'):
+        """
+        Sube un archivo de certificación usando el hash de su contenido como llave
+        
+        El contenido se lee por bloques dos veces (hash y subida) sin cargarlo
+        completo en memoria. Si ya existe un objeto con el mismo hash no se
+        vuelve a subir: certificaciones idénticas comparten el mismo objeto.
+        Se guardan en MINIO_BUCKET_CERTIFICACIONES, separado del de videos.
+        
+        Args:
+            stream: Archivo abierto en modo binario (debe admitir seek)
+            extension: Extensión del archivo, sin punto (pdf, jpg, ...)
+            content_type: Tipo de contenido del archivo
+        
+        Returns:
+            dict: object_name, sha256, tamaño y si el objeto ya existía (deduplicado)
+        
+        Raises:
+            Exception: Si falla la subida
+        """
+        try:
+            sha256 = hashlib.sha256()
+            tamaño = 0
+            stream.seek(0)
+            for bloque in iter(lambda: stream.read(1024 * 1024), b''):
+                sha256.update(bloque)
+                tamaño += len(bloque)
+            digest = sha256.hexdigest()
+            
+            sufijo = f".{extension.lower()}" if extension else ''
+            object_name = f"{MinIOConfig.CERTIFICACIONES_PREFIX}/{digest[:2]}/{digest}{sufijo}"
+            
+            bucket_name = MinIOConfig.MINIO_BUCKET_CERTIFICACIONES
+            MinIOService.asegurar_bucket_existe(bucket_name=bucket_name)
+            deduplicado = MinIOService.existe_objeto(object_name, bucket_name)
+            
+            if not deduplicado:
+                stream.seek(0)
+                MinIOService.get_client().put_object(
+                    bucket_name,
+                    object_name,
+                    stream,
+                    length=tamaño,
+                    content_type=content_type,
+                    metadata={'sha256': digest}
+                )
+                logger.info(f"Certificación subida exitosamente: {object_name}")
+            else:
+                logger.info(f"Certificación ya existente, se reutiliza: {object_name}")
+            
+            return {
+                'object_name': object_name,
+                'sha256': digest,
+                'tamaño': tamaño,
+                'deduplicado': deduplicado
+            }
+        
+        except S3Error as e:
+            logger.error(f"Error subiendo certificación a MinIO: {e}")
+            raise Exception(f"Error subiendo certificación: {str(e)}")
+    
+    @staticmethod
+    def obtener_url_descarga(object_name, nombre_descarga, expiry_seconds=None):
+        """
+        Genera una URL presigned que descarga una certificación como adjunto con el nombre indicado
+        
+        Args:
+            object_name: Nombre del objeto en MINIO_BUCKET_CERTIFICACIONES
+            nombre_descarga: Nombre de archivo que verá el cliente
+            expiry_seconds: Tiempo de expiración en segundos (default: CERTIFICACION_URL_EXPIRY)
+        
+        Returns:
+            str: URL presigned
+        """
+        try:
+            if expiry_seconds is None:
+                expiry_seconds = MinIOConfig.CERTIFICACION_URL_EXPIRY
+            nombre = nombre_descarga.replace('"', '')
+            return MinIOService.get_client().presigned_get_object(
+                MinIOConfig.MINIO_BUCKET_CERTIFICACIONES,
+                object_name,
+                expires=timedelta(seconds=expiry_seconds),
+                response_headers={'response-content-disposition': f'attachment; filename="{nombre}"'}
+            )
+        except S3Error as e:
+            logger.error(f"Error generando URL de descarga: {e}")
+            raise Exception(f"Error generando URL: {str(e)}")
+
     @staticmethod
     def eliminar_video(object_name):
         """
@@ -191,6 +595,7 @@ class MinIOService:
             bucket_name = MinIOConfig.MINIO_BUCKET_VIDEOS
             
             client.remove_object(bucket_name, object_name)
+            MinIOService._olvidar_urls(object_name)
             logger.info(f"Video eliminado exitosamente: {object_name}")
             return True
             
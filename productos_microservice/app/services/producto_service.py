@@ -1,10 +1,13 @@
 from app.extensions import db
 from app.models.producto import Producto, CertificacionProducto
 from app.utils.validators import ProductoValidator, CertificacionValidator
+from app.config.minio_config import MinIOConfig
+from app.services.minio_service import MinIOService
 from werkzeug.utils import secure_filename
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from flask import current_app
+import mimetypes
 import os
 import uuid
 
@@ -94,7 +97,37 @@ class ProductoService:
             })
         
         return detalle
-    
+
+    @staticmethod
+    def obtener_marca_actualizacion(producto_id=None, sku=None):
+        """
+        Obtiene la marca de versión del detalle de un producto sin cargarlo completo
+        Se usa para calcular el ETag antes de serializar la respuesta
+
+        Args:
+            producto_id: ID del producto (opcional)
+            sku: SKU del producto (opcional)
+
+        Returns:
+            Tupla (id, fecha_actualizacion, certificacion_id) o None si no existe
+        """
+        if not producto_id and not sku:
+            return None
+
+        query = db.session.query(
+            Producto.id,
+            Producto.fecha_actualizacion,
+            CertificacionProducto.id
+        ).outerjoin(CertificacionProducto, CertificacionProducto.producto_id == Producto.id)
+
+        if producto_id:
+            query = query.filter(Producto.id == producto_id)
+        else:
+            query = query.filter(Producto.codigo_sku == sku)
+
+        marca = query.first()
+        return tuple(marca) if marca else None
+
     @staticmethod
     def crear_producto(data, archivos_certificacion):
         """
@@ -210,6 +243,36 @@ class ProductoService:
 
     @staticmethod
     def _guardar_certificacion(producto_id, archivo, tipo_certificacion, fecha_vencimiento_cert):
+        """
+        Guarda un archivo de certificación en MinIO
+        
+        El archivo se envía directamente desde el stream recibido, con una llave
+        derivada del hash de su contenido (certificaciones idénticas comparten
+        objeto). Si MinIO está deshabilitado (USE_MINIO=false) se guarda en
+        UPLOAD_FOLDER como antes.
+        """
+        filename = secure_filename(archivo.filename)
+        
+        if not MinIOConfig.USE_MINIO:
+            return ProductoService._guardar_certificacion_local(
+                producto_id, archivo, filename, tipo_certificacion, fecha_vencimiento_cert
+            )
+        
+        extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        content_type = archivo.mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        resultado = MinIOService.subir_certificacion(archivo.stream, extension, content_type)
+        
+        return CertificacionProducto(
+            producto_id=producto_id,
+            tipo_certificacion=tipo_certificacion,
+            nombre_archivo=filename,
+            ruta_archivo=resultado['object_name'],
+            tamaño_archivo=resultado['tamaño'],
+            fecha_vencimiento_cert=fecha_vencimiento_cert
+        )
+    
+    @staticmethod
+    def _guardar_certificacion_local(producto_id, archivo, filename, tipo_certificacion, fecha_vencimiento_cert):
         """Guarda un archivo de certificación en el sistema de archivos"""
         
         # Obtener el directorio base de uploads desde la configuración de Flask
@@ -220,7 +283,6 @@ class ProductoService:
         os.makedirs(upload_dir, exist_ok=True)
         
         # Generar nombre único para el archivo
-        filename = secure_filename(archivo.filename)
         unique_filename = f"{uuid.uuid4()}_{filename}"
         
         # Ruta absoluta completa del archivo
@@ -240,3 +302,76 @@ class ProductoService:
         )
         
         return certificacion
+    
+    @staticmethod
+    def migrar_certificaciones_locales(eliminar_locales=False, simular=False, tamaño_lote=50):
+        """
+        Mueve a MinIO las certificaciones guardadas en el disco local del pod
+        
+        Solo procesa registros cuya ruta_archivo es un archivo local; las llaves
+        de MinIO y las URLs externas (importación CSV) se dejan igual. Es seguro
+        ejecutarla varias veces: lo ya migrado no se vuelve a tocar y los
+        contenidos repetidos no se suben dos veces.
+        
+        Args:
+            eliminar_locales: Borrar el archivo local después de migrarlo
+            simular: Solo contar lo que se migraría, sin subir ni modificar nada
+            tamaño_lote: Registros actualizados por commit
+            
+        Returns:
+            dict: Conteo de migradas, deduplicadas, faltantes, omitidas y errores
+        """
+        resumen = {'migradas': 0, 'deduplicadas': 0, 'faltantes': [], 'omitidas': 0, 'errores': []}
+        pendientes_commit = 0
+        
+        certificaciones = CertificacionProducto.query.order_by(CertificacionProducto.id).all()
+        for cert in certificaciones:
+            ruta = cert.ruta_archivo or ''
+            if MinIOService.es_clave_certificacion(ruta) or ruta.startswith(('http://', 'https://')):
+                resumen['omitidas'] += 1
+                continue
+            
+            if not os.path.isfile(ruta):
+                resumen['faltantes'].append(cert.id)
+                continue
+            
+            if simular:
+                resumen['migradas'] += 1
+                continue
+            
+            try:
+                extension = ruta.rsplit('.', 1)[1].lower() if '.' in os.path.basename(ruta) else ''
+                content_type = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+                with open(ruta, 'rb') as archivo:
+                    resultado = MinIOService.subir_certificacion(archivo, extension, content_type)
+            except Exception as e:
+                resumen['errores'].append({'id': cert.id, 'error': str(e)})
+                continue
+            
+            cert.ruta_archivo = resultado['object_name']
+            cert.tamaño_archivo = resultado['tamaño']
+            # La certificación forma parte de la respuesta del producto: la fecha
+            # de actualización es la que invalida los ETag de listado y detalle
+            Producto.query.filter(Producto.id == cert.producto_id).update(
+                {Producto.fecha_actualizacion: datetime.utcnow()},
+                synchronize_session=False
+            )
+            resumen['migradas'] += 1
+            if resultado['deduplicado']:
+                resumen['deduplicadas'] += 1
+            
+            pendientes_commit += 1
+            if pendientes_commit >= tamaño_lote:
+                db.session.commit()
+                pendientes_commit = 0
+            
+            if eliminar_locales:
+                # El commit debe ocurrir antes de borrar para no perder el archivo si falla
+                db.session.commit()
+                pendientes_commit = 0
+                os.remove(ruta)
+        
+        if pendientes_commit:
+            db.session.commit()
+        
+        return resumen
@@ -1,5 +1,6 @@
 """
-Servicio para publicar mensajes en Redis Pub/Sub para procesamiento de videos.
+Servicio para publicar mensajes de procesamiento de videos en Redis
+(Pub/Sub y cola durable 'video_processing').
 Usa el Redis Service existente.
 """
 import requests
@@ -44,9 +45,12 @@ class RedisQueueService:
                 'metadata': metadata or {}
             }
             
+            # Los videos por procesar se guardan además en la cola durable para
+            # que no se pierdan si ningún worker está escuchando al publicar
             payload = {
                 'channel': 'video_processing',
-                'message': message
+                'message': message,
+                'durable': estado == 'cargado'
             }
             
             response = requests.post(
@@ -1,3 +1,7 @@
 from .validators import ProductoValidator, CertificacionValidator
+from .http_cache import generar_etag, cliente_tiene_version, aplicar_cabeceras_cache, respuesta_no_modificada
 
-__all__ = ['ProductoValidator', 'CertificacionValidator']
+__all__ = [
+    'ProductoValidator', 'CertificacionValidator',
+    'generar_etag', 'cliente_tiene_version', 'aplicar_cabeceras_cache', 'respuesta_no_modificada'
+]
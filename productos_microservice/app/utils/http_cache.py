@@ -0,0 +1,39 @@
+"""
+Utilidades de cache HTTP: ETag fuertes y GET condicional (If-None-Match)
+"""
+import hashlib
+from flask import request, current_app, make_response
+
+
+def generar_etag(*componentes):
+    """
+    Genera un ETag fuerte a partir de una marca de actualización
+
+    Args:
+        *componentes: Valores que identifican la versión del recurso
+            (IDs, fecha_actualizacion, filtros, paginación...)
+
+    Returns:
+        String hexadecimal (sin comillas) apto para usar como ETag
+    """
+    base = '|'.join('' if c is None else str(c) for c in componentes)
+    return hashlib.sha256(base.encode('utf-8')).hexdigest()[:40]
+
+
+def cliente_tiene_version(etag):
+    """Indica si el If-None-Match del request coincide con el ETag dado"""
+    return request.if_none_match.contains(etag)
+
+
+def aplicar_cabeceras_cache(response, etag):
+    """Agrega ETag y Cache-Control a una respuesta"""
+    response.set_etag(etag)
+    max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 0)
+    response.headers['Cache-Control'] = f"private, max-age={max_age}, must-revalidate"
+    return response
+
+
+def respuesta_no_modificada(etag):
+    """Construye una respuesta 304 sin cuerpo con las cabeceras de cache"""
+    response = make_response('', 304)
+    return aplicar_cabeceras_cache(response, etag)
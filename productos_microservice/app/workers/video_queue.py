@@ -0,0 +1,214 @@
+"""
+Cola durable de videos por procesar sobre listas de Redis.
+
+Los mensajes se toman con BRPOPLPUSH (pending -> processing), así un mensaje
+tomado por un worker que se cae no se pierde: queda en la lista processing y
+se recupera cuando vence su lease. Los fallos se reintentan con backoff
+exponencial hasta un máximo de intentos y luego pasan a la lista de
+descartados (dead-letter).
+
+Las llaves son las mismas que usa el Redis Service al publicar con
+"durable": true (queue:{nombre}:pending).
+"""
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Mueve de forma atómica los reintentos vencidos a la lista de pendientes
+_LUA_MOVER_VENCIDOS = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, item in ipairs(items) do
+    redis.call('ZREM', KEYS[1], item)
+    redis.call('LPUSH', KEYS[2], item)
+end
+return #items
+"""
+
+
+class VideoJobQueue:
+    """Cola de trabajos de video con leases, reintentos y dead-letter."""
+
+    def __init__(self, redis_client, nombre='video_processing', lease_segundos=None,
+                 max_intentos=None, backoff_base=None, backoff_max=None):
+        """
+        Args:
+            redis_client: Cliente redis.Redis con decode_responses=True
+            nombre: Nombre de la cola
+            lease_segundos: Tiempo sin heartbeat tras el cual un trabajo se da por abandonado
+            max_intentos: Intentos totales antes de descartar un trabajo
+            backoff_base: Espera (segundos) antes del primer reintento; se duplica en cada intento
+            backoff_max: Espera máxima entre reintentos (segundos)
+        """
+        self.redis = redis_client
+        self.nombre = nombre
+        self.lease_segundos = lease_segundos or int(os.getenv('VIDEO_QUEUE_LEASE_SECONDS', 120))
+        self.max_intentos = max_intentos or int(os.getenv('VIDEO_QUEUE_MAX_INTENTOS', 3))
+        self.backoff_base = backoff_base or int(os.getenv('VIDEO_QUEUE_BACKOFF_BASE', 30))
+        self.backoff_max = backoff_max or int(os.getenv('VIDEO_QUEUE_BACKOFF_MAX', 900))
+        self._mover_vencidos = self.redis.register_script(_LUA_MOVER_VENCIDOS)
+        # Trabajos en processing vistos sin lease: raw -> primera vez que se vieron
+        self._sin_lease = {}
+
+    def _key(self, parte):
+        return f"queue:{self.nombre}:{parte}"
+
+    def _lease_key(self, video_id):
+        return self._key(f"lease:{video_id}")
+
+    def encolar(self, mensaje):
+        """Agrega un mensaje a la cola de pendientes."""
+        return self.redis.lpush(self._key('pending'), json.dumps(mensaje))
+
+    def tomar(self, worker_token, timeout=5):
+        """
+        Espera el siguiente trabajo y toma su lease.
+
+        Args:
+            worker_token: Identificador único del worker que toma el trabajo
+            timeout: Segundos de espera bloqueante
+
+        Returns:
+            Tupla (raw, mensaje) o None si no hay trabajo disponible
+        """
+        raw = self.redis.brpoplpush(self._key('pending'), self._key('processing'), timeout)
+        if raw is None:
+            return None
+
+        try:
+            mensaje = json.loads(raw)
+            video_id = mensaje['video_id']
+        except (ValueError, KeyError, TypeError):
+            logger.error(f"❌ Mensaje inválido en la cola, se descarta: {raw!r}")
+            pipe = self.redis.pipeline()
+            pipe.lrem(self._key('processing'), 1, raw)
+            pipe.zadd(self._key('dead'), {raw: time.time()})
+            pipe.execute()
+            return None
+
+        # Un mismo video no se procesa dos veces en paralelo (mensajes duplicados)
+        if not self.redis.set(self._lease_key(video_id), worker_token, nx=True, ex=self.lease_segundos):
+            logger.info(f"⏭️ Video {video_id} ya está en proceso en otro worker, se descarta el duplicado")
+            self.redis.lrem(self._key('processing'), 1, raw)
+            return None
+
+        return raw, mensaje
+
+    def renovar_lease(self, video_id, worker_token):
+        """
+        Heartbeat: extiende el lease si sigue perteneciendo al worker.
+
+        Returns:
+            bool: False si el lease ya no es del worker (vencido o recuperado)
+        """
+        lease_key = self._lease_key(video_id)
+        if self.redis.get(lease_key) != worker_token:
+            return False
+        return bool(self.redis.expire(lease_key, self.lease_segundos))
+
+    def confirmar(self, raw, mensaje):
+        """Elimina un trabajo terminado de la cola."""
+        pipe = self.redis.pipeline()
+        pipe.lrem(self._key('processing'), 1, raw)
+        pipe.delete(self._lease_key(mensaje['video_id']))
+        pipe.execute()
+
+    def debe_reintentar(self, mensaje):
+        """Indica si un fallo más del mensaje todavía admite reintento."""
+        return mensaje.get('intentos', 0) + 1 < self.max_intentos
+
+    def calcular_backoff(self, intentos):
+        """Espera en segundos antes del reintento número `intentos`."""
+        return min(self.backoff_max, self.backoff_base * 2 ** max(0, intentos - 1))
+
+    def fallar(self, raw, mensaje, error):
+        """
+        Saca un trabajo fallido de processing y lo programa para reintento o
+        lo descarta si agotó sus intentos.
+
+        Returns:
+            'reintento', 'descartado' o None si el trabajo ya no estaba en
+            processing (otro proceso lo recuperó antes)
+        """
+        if not self.redis.lrem(self._key('processing'), 1, raw):
+            return None
+
+        self.redis.delete(self._lease_key(mensaje['video_id']))
+
+        intentos = mensaje.get('intentos', 0) + 1
+        nuevo = dict(mensaje, intentos=intentos, ultimo_error=str(error)[:500])
+        ahora = time.time()
+
+        if intentos < self.max_intentos:
+            espera = self.calcular_backoff(intentos)
+            self.redis.zadd(self._key('delayed'), {json.dumps(nuevo): ahora + espera})
+            logger.warning(
+                f"🔁 Video {mensaje['video_id']} reintentará en {espera}s "
+                f"(intento {intentos}/{self.max_intentos}): {error}"
+            )
+            return 'reintento'
+
+        self.redis.zadd(self._key('dead'), {json.dumps(nuevo): ahora})
+        logger.error(f"☠️ Video {mensaje['video_id']} descartado tras {intentos} intentos: {error}")
+        return 'descartado'
+
+    def mover_reintentos_vencidos(self, ahora=None, limite=100):
+        """Pasa a pendientes los reintentos cuyo backoff ya terminó."""
+        ahora = time.time() if ahora is None else ahora
+        return self._mover_vencidos(
+            keys=[self._key('delayed'), self._key('pending')],
+            args=[ahora, limite]
+        )
+
+    def recuperar_abandonados(self, ahora=None):
+        """
+        Reprograma los trabajos de processing cuyo worker dejó de enviar heartbeat.
+
+        Un trabajo sin lease solo se recupera si sigue sin lease durante un
+        periodo completo de lease, para no robar trabajos recién tomados entre
+        BRPOPLPUSH y la creación de su lease.
+
+        Returns:
+            Lista de tuplas (mensaje, resultado) con resultado 'reintento' o 'descartado'
+        """
+        ahora = time.time() if ahora is None else ahora
+        en_curso = self.redis.lrange(self._key('processing'), 0, -1)
+        recuperados = []
+
+        for raw in en_curso:
+            try:
+                mensaje = json.loads(raw)
+                video_id = mensaje['video_id']
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            if self.redis.exists(self._lease_key(video_id)):
+                self._sin_lease.pop(raw, None)
+                continue
+
+            visto = self._sin_lease.setdefault(raw, ahora)
+            if ahora - visto < self.lease_segundos:
+                continue
+
+            self._sin_lease.pop(raw, None)
+            resultado = self.fallar(raw, mensaje, 'Lease vencido: el worker dejó de responder')
+            if resultado:
+                recuperados.append((mensaje, resultado))
+
+        vigentes = set(en_curso)
+        for raw in list(self._sin_lease):
+            if raw not in vigentes:
+                del self._sin_lease[raw]
+
+        return recuperados
+
+    def estadisticas(self):
+        """Número de mensajes pendientes, en curso, por reintentar y descartados."""
+        return {
+            'pending': self.redis.llen(self._key('pending')),
+            'processing': self.redis.llen(self._key('processing')),
+            'delayed': self.redis.zcard(self._key('delayed')),
+            'dead': self.redis.zcard(self._key('dead')),
+        }
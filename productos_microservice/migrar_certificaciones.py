@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migración única de certificaciones guardadas en disco local a MinIO.
+
+Recorre certificaciones_producto y sube a MinIO los archivos cuya ruta_archivo
+apunta al disco del pod, reemplazándola por la llave por hash de contenido.
+Puede ejecutarse varias veces: lo ya migrado se omite.
+
+Uso:
+    python migrar_certificaciones.py [--simular] [--eliminar-locales]
+"""
+import argparse
+import json
+import os
+import sys
+
+if os.path.exists(".env"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migra las certificaciones del disco local a MinIO")
+    parser.add_argument('--simular', action='store_true',
+                        help="Solo reporta lo que se migraría, sin subir ni modificar registros")
+    parser.add_argument('--eliminar-locales', action='store_true',
+                        help="Borra cada archivo local después de migrarlo")
+    parser.add_argument('--tamaño-lote', type=int, default=50,
+                        help="Registros actualizados por commit (default: 50)")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from app.services.producto_service import ProductoService
+
+    app = create_app()
+    with app.app_context():
+        resumen = ProductoService.migrar_certificaciones_locales(
+            eliminar_locales=args.eliminar_locales,
+            simular=args.simular,
+            tamaño_lote=args.tamaño_lote
+        )
+
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    return 1 if resumen['errores'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,10 +7,19 @@ if os.path.exists(".env"):
     print(f"🔧 Variables cargadas - DATABASE_URL: {os.getenv('DATABASE_URL', 'No encontrada')}")
 
 from app import create_app
+from app.config.minio_config import MinIOConfig
+from app.services.minio_service import MinIOService
 
 # Crear la app a nivel de módulo para que Gunicorn pueda encontrarla
 app = create_app()
 
+# Verificar el bucket de videos una sola vez al iniciar (las subidas no lo repiten)
+if MinIOConfig.USE_MINIO:
+    try:
+        MinIOService.asegurar_bucket_existe()
+    except Exception as e:
+        app.logger.warning(f"No fue posible verificar el bucket de videos al iniciar: {e}")
+
 if __name__ == "__main__":
     debug_mode = os.getenv("FLASK_DEBUG", "False").lower() == "true"
     app.run(debug=debug_mode, host="0.0.0.0", port=os.getenv("PORT", 5008))  # Puerto 5008 para productos
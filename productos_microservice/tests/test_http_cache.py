@@ -0,0 +1,113 @@
+"""
+Tests para ETag y GET condicional en las lecturas de productos
+"""
+from datetime import datetime
+
+from app.extensions import db
+from app.models.producto import Producto
+from app.utils.http_cache import generar_etag
+
+
+def _crear_producto(app, sku="SKU-ETAG-1", nombre="Producto ETag"):
+    with app.app_context():
+        producto = Producto(
+            nombre=nombre,
+            codigo_sku=sku,
+            categoria="medicamento",
+            precio_unitario=10.0,
+            condiciones_almacenamiento="Ambiente",
+            fecha_vencimiento=datetime(2026, 12, 31).date(),
+            proveedor_id=1,
+            usuario_registro="tester@example.com",
+            cantidad_disponible=5
+        )
+        db.session.add(producto)
+        db.session.commit()
+        return producto.id
+
+
+def test_generar_etag_es_determinista():
+    assert generar_etag('a', 1, None) == generar_etag('a', 1, None)
+    assert generar_etag('a', 1) != generar_etag('a', 2)
+
+
+def test_listar_productos_incluye_etag_y_cache_control(client, app):
+    _crear_producto(app)
+
+    response = client.get('/api/productos/')
+
+    assert response.status_code == 200
+    assert response.headers.get('ETag')
+    assert 'max-age=' in response.headers['Cache-Control']
+
+
+def test_listar_productos_responde_304_si_no_hay_cambios(client, app):
+    _crear_producto(app)
+    etag = client.get('/api/productos/').headers['ETag']
+
+    response = client.get('/api/productos/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_listar_productos_etag_cambia_con_nuevos_productos(client, app):
+    _crear_producto(app)
+    etag = client.get('/api/productos/').headers['ETag']
+
+    _crear_producto(app, sku="SKU-ETAG-2", nombre="Otro")
+    response = client.get('/api/productos/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['paginacion']['total_productos'] == 2
+
+
+def test_listar_productos_etag_depende_de_filtros(client, app):
+    _crear_producto(app)
+    etag = client.get('/api/productos/').headers['ETag']
+
+    response = client.get('/api/productos/?categoria=insumo', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+
+
+def test_detalle_producto_responde_304(client, app):
+    producto_id = _crear_producto(app)
+    etag = client.get(f'/api/productos/{producto_id}').headers['ETag']
+
+    response = client.get(f'/api/productos/{producto_id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+
+
+def test_detalle_producto_etag_cambia_al_actualizar(client, app):
+    producto_id = _crear_producto(app)
+    etag = client.get(f'/api/productos/{producto_id}').headers['ETag']
+
+    with app.app_context():
+        producto = db.session.get(Producto, producto_id)
+        producto.cantidad_disponible = 50
+        producto.fecha_actualizacion = datetime(2030, 1, 1)
+        db.session.commit()
+
+    response = client.get(f'/api/productos/{producto_id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.get_json()['producto']['inventario']['cantidad_disponible'] == 50
+
+
+def test_detalle_por_sku_responde_304(client, app):
+    _crear_producto(app, sku="SKU-ETAG-9")
+    etag = client.get('/api/productos/sku/SKU-ETAG-9').headers['ETag']
+
+    response = client.get('/api/productos/sku/SKU-ETAG-9', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+
+
+def test_detalle_inexistente_no_usa_etag(client):
+    response = client.get('/api/productos/999', headers={'If-None-Match': '*'})
+
+    assert response.status_code == 404
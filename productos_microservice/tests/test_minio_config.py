@@ -12,6 +12,7 @@ def _reload_config(monkeypatch, **env_vars):
         'MINIO_SECRET_KEY',
         'MINIO_SECURE',
         'MINIO_BUCKET_VIDEOS',
+        'MINIO_BUCKET_CERTIFICACIONES',
         'PRESIGNED_URL_EXPIRY',
         'USE_MINIO'
     }
@@ -1,6 +1,7 @@
 import pytest
 import io
 from unittest.mock import patch, MagicMock
+from minio.error import S3Error
 from app.services.minio_service import MinIOService
 
 
@@ -154,3 +155,170 @@ class TestMinIOService:
         call_args = mock_client.bucket_exists.call_args
         bucket_name = call_args[0][0]
         assert bucket_name == "medisupply-videos"  # Debe ser el bucket configurado
+    
+    @patch('app.services.minio_service.Minio')
+    def test_descargar_video_a_archivo(self, mock_minio):
+        """Test descarga en streaming a disco con fget_object"""
+        mock_client = MagicMock()
+        mock_minio.return_value = mock_client
+        
+        MinIOService._client = None
+        
+        ruta = MinIOService.descargar_video_a_archivo("videos/original/1/test.mp4", "/tmp/input.mp4")
+        
+        assert ruta == "/tmp/input.mp4"
+        mock_client.fget_object.assert_called_once_with(
+            "medisupply-videos", "videos/original/1/test.mp4", "/tmp/input.mp4"
+        )
+        mock_client.get_object.assert_not_called()
+    
+    @patch('app.services.minio_service.Minio')
+    def test_subir_video_desde_archivo(self, mock_minio):
+        """Test subida multipart desde disco con fput_object"""
+        mock_client = MagicMock()
+        mock_minio.return_value = mock_client
+        mock_client.fput_object.return_value = MagicMock(etag="e1", version_id=None)
+        
+        MinIOService._client = None
+        
+        result = MinIOService.subir_video_desde_archivo(
+            "/tmp/output_pc.mp4", "videos/procesado/1/v_procesado_pc.mp4",
+            metadata={'preset': 'pc'}
+        )
+        
+        assert result['etag'] == "e1"
+        args, kwargs = mock_client.fput_object.call_args
+        assert args == ("medisupply-videos", "videos/procesado/1/v_procesado_pc.mp4", "/tmp/output_pc.mp4")
+        assert kwargs['part_size'] >= 5 * 1024 * 1024
+        mock_client.put_object.assert_not_called()
+
+
+@patch('app.services.minio_service.Minio')
+def test_url_presigned_se_reutiliza_hasta_cerca_del_vencimiento(mock_minio, monkeypatch):
+    """La misma URL se reutiliza y se vuelve a firmar dentro del margen de renovación"""
+    mock_client = MagicMock()
+    mock_minio.return_value = mock_client
+    mock_client.presigned_get_object.side_effect = ["url-1", "url-2"]
+    MinIOService._client = None
+
+    ahora = [1000.0]
+    monkeypatch.setattr('app.services.minio_service.time.time', lambda: ahora[0])
+
+    assert MinIOService.obtener_url_presigned("videos/procesado/1/a.mp4", expiry_seconds=3600) == "url-1"
+    ahora[0] += 3000
+    assert MinIOService.obtener_url_presigned("videos/procesado/1/a.mp4", expiry_seconds=3600) == "url-1"
+    assert MinIOService.vigencia_url_presigned("videos/procesado/1/a.mp4", expiry_seconds=3600) == 600
+    ahora[0] += 400
+    assert MinIOService.obtener_url_presigned("videos/procesado/1/a.mp4", expiry_seconds=3600) == "url-2"
+    assert mock_client.presigned_get_object.call_count == 2
+
+
+@patch('app.services.minio_service.Minio')
+def test_obtener_urls_presigned_en_lote(mock_minio):
+    """El helper de lote firma cada objeto una vez e ignora vacíos"""
+    mock_client = MagicMock()
+    mock_minio.return_value = mock_client
+    mock_client.presigned_get_object.side_effect = lambda bucket, nombre, expires: f"https://minio/{nombre}"
+    MinIOService._client = None
+
+    urls = MinIOService.obtener_urls_presigned(["a.mp4", "b.mp4", "a.mp4", None])
+
+    assert urls == {"a.mp4": "https://minio/a.mp4", "b.mp4": "https://minio/b.mp4"}
+    assert mock_client.presigned_get_object.call_count == 2
+
+
+@patch('app.services.minio_service.Minio')
+def test_bucket_se_verifica_una_sola_vez(mock_minio):
+    """Las subidas no repiten la consulta de existencia del bucket"""
+    mock_client = MagicMock()
+    mock_minio.return_value = mock_client
+    mock_client.bucket_exists.return_value = True
+    MinIOService._client = None
+
+    MinIOService.asegurar_bucket_existe()
+    MinIOService.subir_video(b"contenido", "videos/original/1/a.mp4")
+    MinIOService.subir_video(b"contenido", "videos/original/1/b.mp4")
+
+    mock_client.bucket_exists.assert_called_once()
+
+
+@patch('app.services.minio_service.Minio')
+def test_carga_multipart_por_partes(mock_minio):
+    """Las partes se suben y unen con las operaciones multipart de MinIO"""
+    mock_client = MagicMock()
+    mock_minio.return_value = mock_client
+    mock_client._create_multipart_upload.return_value = "upload-1"
+    mock_client._upload_part.return_value = "etag-1"
+    MinIOService._client = None
+
+    upload_id = MinIOService.iniciar_carga_multipart("videos/original/1/a.mp4", metadata={'video_id': 7})
+    etag = MinIOService.subir_parte("videos/original/1/a.mp4", upload_id, 1, b"datos", md5_base64="bWQ1")
+    MinIOService.completar_carga_multipart("videos/original/1/a.mp4", upload_id, [(1, etag)])
+
+    headers = mock_client._create_multipart_upload.call_args[0][2]
+    assert headers['x-amz-meta-video_id'] == '7'
+    assert mock_client._upload_part.call_args[0][3] == {'Content-MD5': 'bWQ1'}
+    partes = mock_client._complete_multipart_upload.call_args[0][3]
+    assert [(p.part_number, p.etag) for p in partes] == [(1, "etag-1")]
+
+
+class TestCertificacionesMinIOService:
+    """Tests de certificaciones con llave por hash de contenido"""
+    
+    @patch('app.services.minio_service.Minio')
+    def test_subir_certificacion_usa_hash_como_llave(self, mock_minio):
+        import hashlib
+        mock_client = MagicMock()
+        mock_minio.return_value = mock_client
+        mock_client.stat_object.side_effect = S3Error(None, 'NoSuchKey', 'no existe', '', '', '')
+        MinIOService._client = None
+        contenido = b"certificado" * 1000
+        digest = hashlib.sha256(contenido).hexdigest()
+        
+        resultado = MinIOService.subir_certificacion(io.BytesIO(contenido), 'PDF', 'application/pdf')
+        
+        assert resultado == {
+            'object_name': f'certificaciones/{digest[:2]}/{digest}.pdf',
+            'sha256': digest,
+            'tamaño': len(contenido),
+            'deduplicado': False
+        }
+        mock_client.make_bucket.assert_not_called()
+        mock_client.bucket_exists.assert_called_once_with('medisupply-certificaciones')
+        args, kwargs = mock_client.put_object.call_args
+        assert args[0] == 'medisupply-certificaciones'
+        assert args[1] == resultado['object_name']
+        assert args[2].read() == contenido
+        assert kwargs['length'] == len(contenido)
+    
+    @patch('app.services.minio_service.Minio')
+    def test_subir_certificacion_repetida_no_sube(self, mock_minio):
+        mock_client = MagicMock()
+        mock_minio.return_value = mock_client
+        MinIOService._client = None
+        
+        resultado = MinIOService.subir_certificacion(io.BytesIO(b"igual"), 'pdf')
+        
+        assert resultado['deduplicado'] is True
+        mock_client.put_object.assert_not_called()
+    
+    @patch('app.services.minio_service.Minio')
+    def test_url_descarga_como_adjunto(self, mock_minio):
+        mock_client = MagicMock()
+        mock_minio.return_value = mock_client
+        mock_client.presigned_get_object.return_value = 'https://minio/firmada'
+        MinIOService._client = None
+        
+        url = MinIOService.obtener_url_descarga('certificaciones/ab/abc.pdf', 'invima.pdf')
+        
+        assert url == 'https://minio/firmada'
+        assert mock_client.presigned_get_object.call_args[0][0] == 'medisupply-certificaciones'
+        kwargs = mock_client.presigned_get_object.call_args.kwargs
+        assert kwargs['response_headers'] == {'response-content-disposition': 'attachment; filename="invima.pdf"'}
+        assert kwargs['expires'].total_seconds() == 300
+    
+    def test_es_clave_certificacion(self):
+        assert MinIOService.es_clave_certificacion('certificaciones/ab/abc.pdf')
+        assert not MinIOService.es_clave_certificacion('/app/uploads/certificaciones_producto/1/a.pdf')
+        assert not MinIOService.es_clave_certificacion('https://externo/cert.pdf')
+        assert not MinIOService.es_clave_certificacion(None)
@@ -3,6 +3,7 @@ import tempfile
 import os
 from io import BytesIO
 from unittest.mock import patch, MagicMock
+from minio.error import S3Error
 from app import create_app
 from app.extensions import db
 from app.models.producto import Producto, CertificacionProducto, CATEGORIAS_VALIDAS
@@ -237,9 +238,16 @@ class TestProductoService:
             mock_file.tell = MagicMock(return_value=1024)
             mock_file.save = MagicMock()
             
-            with patch('os.path.getsize', return_value=1024):
+            with patch('app.services.producto_service.MinIOService') as mock_minio:
+                mock_minio.subir_certificacion.return_value = {
+                    'object_name': 'certificaciones/ab/abc.pdf', 'sha256': 'abc', 'tamaño': 1024, 'deduplicado': False
+                }
                 producto = ProductoService.crear_producto(data, [mock_file])
             
+            mock_minio.subir_certificacion.assert_called_once_with(mock_file.stream, 'pdf', mock_file.mimetype)
+            assert producto.certificacion.ruta_archivo == 'certificaciones/ab/abc.pdf'
+            assert producto.certificacion.tamaño_archivo == 1024
+            
             assert producto.nombre == 'Paracetamol 500mg'
             assert producto.codigo_sku == 'MED-PARA-500'
             assert producto.estado == 'Activo'
@@ -268,12 +276,14 @@ class TestProductoService:
             mock_file.tell = MagicMock(return_value=1024)
             mock_file.save = MagicMock()
             
-            # Crear primer producto
-            with patch('os.path.getsize', return_value=1024):
+            with patch('app.services.producto_service.MinIOService') as mock_minio:
+                mock_minio.subir_certificacion.return_value = {
+                    'object_name': 'certificaciones/ab/abc.pdf', 'sha256': 'abc', 'tamaño': 1024, 'deduplicado': False
+                }
+                # Crear primer producto
                 ProductoService.crear_producto(data, [mock_file])
-            
-            # Intentar crear segundo producto con mismo SKU
-            with patch('os.path.getsize', return_value=1024):
+                
+                # Intentar crear segundo producto con mismo SKU
                 with pytest.raises(ConflictError) as exc_info:
                     ProductoService.crear_producto(data, [mock_file])
                 error = exc_info.value.args[0]
@@ -309,13 +319,21 @@ class TestProductoEndpoints:
         file_obj = BytesIO(b"contenido del certificado PDF")
         data['certificacion'] = (file_obj, 'invima.pdf')
         
-        response = client.post('/api/productos/',
-                             data=data,
-                             content_type='multipart/form-data')
+        with patch('app.services.minio_service.MinIOService.get_client') as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.bucket_exists.return_value = True
+            mock_client.stat_object.side_effect = S3Error(None, 'NoSuchKey', 'no existe', '', '', '')
+            response = client.post('/api/productos/',
+                                 data=data,
+                                 content_type='multipart/form-data')
         
         assert response.status_code == 201
         response_data = response.get_json()
         assert response_data['mensaje'] == 'Producto registrado exitosamente'
+        # El archivo se sube directamente desde el stream con llave por hash de contenido
+        args, kwargs = mock_client.put_object.call_args
+        assert args[1].startswith('certificaciones/') and args[1].endswith('.pdf')
+        assert kwargs['length'] == len(b"contenido del certificado PDF")
         assert response_data['producto']['codigo_sku'] == 'MED-IBU-400'
     
     def test_registrar_producto_sin_certificacion(self, client):
@@ -366,3 +384,95 @@ class TestProductoEndpoints:
         assert response.status_code == 400
         response_data = response.get_json()
         assert 'CATEGORIA_INVALIDA' in response_data['codigo']
+
+
+class TestCertificacionesMinIO:
+    """Tests del almacenamiento de certificaciones en MinIO"""
+    
+    def _crear_producto(self, ruta_archivo, sku='CERT-MINIO-1'):
+        producto = Producto(
+            nombre="Producto Certificado",
+            codigo_sku=sku,
+            categoria="medicamento",
+            precio_unitario=10.0,
+            condiciones_almacenamiento="Ambiente",
+            fecha_vencimiento=datetime(2027, 1, 1).date(),
+            proveedor_id=1,
+            usuario_registro="tester@example.com"
+        )
+        db.session.add(producto)
+        db.session.flush()
+        db.session.add(CertificacionProducto(
+            producto_id=producto.id,
+            tipo_certificacion="INVIMA",
+            nombre_archivo="invima.pdf",
+            ruta_archivo=ruta_archivo,
+            tamaño_archivo=10,
+            fecha_vencimiento_cert=datetime(2028, 1, 1).date()
+        ))
+        db.session.commit()
+        return producto
+    
+    def test_descarga_redirige_a_url_presigned(self, client, app):
+        """Las certificaciones en MinIO se entregan con redirección a URL presigned"""
+        producto = self._crear_producto('certificaciones/ab/abc.pdf')
+        
+        with patch('app.routes.productos_bp.MinIOService.obtener_url_descarga',
+                   return_value='https://minio/certificaciones/ab/abc.pdf?firma') as mock_url:
+            response = client.get(f'/api/productos/{producto.id}/certificacion/descargar')
+        
+        assert response.status_code == 302
+        assert response.headers['Location'] == 'https://minio/certificaciones/ab/abc.pdf?firma'
+        assert response.headers['Cache-Control'] == 'private, no-store'
+        mock_url.assert_called_once_with('certificaciones/ab/abc.pdf', 'invima.pdf')
+    
+    def test_sin_minio_guarda_en_disco_local(self, app):
+        """Con USE_MINIO=false la certificación se sigue guardando en UPLOAD_FOLDER"""
+        archivo = MagicMock()
+        archivo.filename = 'invima.pdf'
+        archivo.save.side_effect = lambda ruta: open(ruta, 'wb').write(b'pdf')
+        
+        with patch('app.services.producto_service.MinIOConfig.USE_MINIO', False):
+            cert = ProductoService._guardar_certificacion(7, archivo, 'INVIMA', datetime(2028, 1, 1).date())
+        
+        assert cert.ruta_archivo.startswith(app.config['UPLOAD_FOLDER'])
+        assert cert.tamaño_archivo == 3
+    
+    def test_migrar_certificaciones_locales(self, app, tmp_path):
+        """Solo se migran archivos locales existentes; URLs y llaves de MinIO se omiten"""
+        local = tmp_path / "cert.pdf"
+        local.write_bytes(b"certificado")
+        migrada = self._crear_producto(str(local), 'CERT-MIG-1')
+        self._crear_producto('certificaciones/cd/cde.pdf', 'CERT-MIG-2')
+        self._crear_producto('https://externo/cert.pdf', 'CERT-MIG-3')
+        faltante = self._crear_producto(str(tmp_path / "no_existe.pdf"), 'CERT-MIG-4')
+        fecha_anterior = migrada.fecha_actualizacion
+        
+        with patch('app.services.producto_service.MinIOService.subir_certificacion') as mock_subir:
+            mock_subir.return_value = {
+                'object_name': 'certificaciones/ef/efg.pdf', 'sha256': 'efg', 'tamaño': 11, 'deduplicado': True
+            }
+            resumen = ProductoService.migrar_certificaciones_locales(eliminar_locales=True)
+        
+        assert resumen['migradas'] == 1
+        assert resumen['deduplicadas'] == 1
+        assert resumen['omitidas'] == 2
+        assert resumen['faltantes'] == [faltante.certificacion.id]
+        assert mock_subir.call_args[0][1:] == ('pdf', 'application/pdf')
+        assert migrada.certificacion.ruta_archivo == 'certificaciones/ef/efg.pdf'
+        db.session.refresh(migrada)
+        assert migrada.fecha_actualizacion > fecha_anterior
+        assert not local.exists()
+    
+    def test_migrar_certificaciones_simulada_no_modifica(self, app, tmp_path):
+        """En modo simulación no se sube nada ni se cambian registros"""
+        local = tmp_path / "cert.pdf"
+        local.write_bytes(b"certificado")
+        producto = self._crear_producto(str(local))
+        
+        with patch('app.services.producto_service.MinIOService.subir_certificacion') as mock_subir:
+            resumen = ProductoService.migrar_certificaciones_locales(simular=True)
+        
+        assert resumen['migradas'] == 1
+        mock_subir.assert_not_called()
+        assert producto.certificacion.ruta_archivo == str(local)
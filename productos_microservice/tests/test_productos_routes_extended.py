@@ -62,6 +62,26 @@ def test_listar_productos_con_filtros(client, app, tmp_path):
     assert data["paginacion"]["pagina_actual"] == 1
 
 
+
+def test_listar_productos_por_ids(client, app, tmp_path):
+    ibuprofeno = _crear_producto(app, tmp_path, nombre="Ibuprofeno", sku="SKU-IDS-1")
+    _crear_producto(app, tmp_path, nombre="Otro", sku="SKU-IDS-2")
+    gasa = _crear_producto(app, tmp_path, nombre="Gasa", sku="SKU-IDS-3")
+
+    response = client.get("/api/productos/", query_string={"ids": f"{gasa.id},{ibuprofeno.id}"})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert sorted(p["codigo_sku"] for p in data["productos"]) == ["SKU-IDS-1", "SKU-IDS-3"]
+    assert data["filtros_aplicados"]["ids"] == sorted([ibuprofeno.id, gasa.id])
+
+
+def test_listar_productos_ids_invalidos(client):
+    response = client.get("/api/productos/", query_string={"ids": "1,abc"})
+
+    assert response.status_code == 400
+    assert response.get_json()["codigo"] == "PARAMETROS_INVALIDOS"
+
 @patch("app.services.producto_service.ProductoService.obtener_detalle_completo")
 def test_obtener_producto_por_id(mock_detalle, client):
     mock_detalle.return_value = {"id": 1, "nombre": "Demo"}
@@ -189,3 +189,17 @@ class TestRedisQueueService:
         mensaje = payload['message']
         assert mensaje['video_id'] == 42
         assert mensaje['estado'] == 'procesado'
+
+    @patch('requests.post')
+    def test_video_cargado_se_encola_de_forma_durable(self, mock_post):
+        """Los videos por procesar se guardan en la cola durable"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"subscribers": 0, "queued": 1}
+        mock_post.return_value = mock_response
+
+        RedisQueueService.publicar_mensaje_video(1, 1, 'cargado', 'videos/original/1/a.mp4')
+        assert mock_post.call_args[1]['json']['durable'] is True
+
+        RedisQueueService.publicar_mensaje_video(1, 1, 'procesado', 'videos/original/1/a.mp4')
+        assert mock_post.call_args[1]['json']['durable'] is False
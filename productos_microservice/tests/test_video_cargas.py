@@ -0,0 +1,199 @@
+"""
+Tests para la carga reanudable de videos por partes
+"""
+import hashlib
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.config.minio_config import MinIOConfig
+from app.extensions import db
+from app.models.carga_video import CargaVideo
+from app.models.producto import Producto
+from app.models.video_evidencia import VideoEvidencia
+from app.services.carga_video_service import CargaVideoService
+
+
+@pytest.fixture
+def producto_id(app):
+    producto = Producto(
+        nombre="Producto Carga",
+        codigo_sku="SKU-CARGA-1",
+        categoria="medicamento",
+        precio_unitario=10.0,
+        condiciones_almacenamiento="Ambiente",
+        fecha_vencimiento=datetime(2027, 1, 1).date(),
+        proveedor_id=1,
+        usuario_registro="tester@example.com"
+    )
+    db.session.add(producto)
+    db.session.commit()
+    return producto.id
+
+
+@pytest.fixture
+def minio_mock(monkeypatch):
+    monkeypatch.setattr(MinIOConfig, 'MULTIPART_PART_SIZE', 10)
+    with patch('app.blueprints.videos_bp.MinIOService') as mock:
+        mock.iniciar_carga_multipart.return_value = 'upload-1'
+        mock.subir_parte.side_effect = lambda ruta, upload_id, numero, data, md5_base64=None: f'etag-{numero}'
+        yield mock
+
+
+def _iniciar(client, producto_id, tamaño=25):
+    return client.post(f'/api/productos/{producto_id}/videos/cargas', json={
+        'nombre_archivo': 'evidencia.mp4',
+        'tamaño_bytes': tamaño,
+        'descripcion': 'Video por partes',
+        'usuario_registro': 'tester@example.com'
+    })
+
+
+def _expirar(carga_id):
+    carga = db.session.get(CargaVideo, carga_id)
+    carga.fecha_expiracion = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+
+
+def _subir(client, carga_id, numero, contenido, checksum=None):
+    return client.put(
+        f'/api/productos/videos/cargas/{carga_id}/partes/{numero}',
+        data=contenido,
+        headers={'X-Checksum-SHA256': checksum or hashlib.sha256(contenido).hexdigest()},
+        content_type='application/octet-stream'
+    )
+
+
+def test_iniciar_carga_calcula_partes(client, producto_id, minio_mock):
+    response = _iniciar(client, producto_id)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['total_partes'] == 3
+    assert body['partes_faltantes'] == [1, 2, 3]
+    video = db.session.get(VideoEvidencia, body['video_id'])
+    assert video.estado == 'cargando'
+    minio_mock.iniciar_carga_multipart.assert_called_once()
+
+
+def test_iniciar_carga_valida_formato(client, producto_id, minio_mock):
+    response = client.post(f'/api/productos/{producto_id}/videos/cargas', json={
+        'nombre_archivo': 'evidencia.exe', 'tamaño_bytes': 10, 'descripcion': 'x'
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['codigo'] == 'FORMATO_INVALIDO'
+
+
+def test_carga_completa_y_reanudable(client, producto_id, minio_mock):
+    carga_id = _iniciar(client, producto_id).get_json()['carga_id']
+
+    assert _subir(client, carga_id, 1, b'a' * 10).status_code == 200
+    assert _subir(client, carga_id, 3, b'c' * 5).status_code == 200
+
+    estado = client.get(f'/api/productos/videos/cargas/{carga_id}').get_json()
+    assert estado['partes_faltantes'] == [2]
+
+    response = client.post(f'/api/productos/videos/cargas/{carga_id}/completar')
+    assert response.status_code == 409
+    assert response.get_json()['partes_faltantes'] == [2]
+
+    assert _subir(client, carga_id, 2, b'b' * 10).status_code == 200
+
+    with patch('app.blueprints.videos_bp.RedisQueueService.publicar_mensaje_video') as mock_redis:
+        response = client.post(f'/api/productos/videos/cargas/{carga_id}/completar')
+
+    assert response.status_code == 201
+    assert response.get_json()['video']['estado'] == 'cargado'
+    _, upload_id, partes = minio_mock.completar_carga_multipart.call_args[0]
+    assert upload_id == 'upload-1'
+    assert partes == [(1, 'etag-1'), (2, 'etag-2'), (3, 'etag-3')]
+    mock_redis.assert_called_once()
+    assert db.session.get(CargaVideo, carga_id) is None
+
+
+def test_subir_parte_rechaza_checksum_invalido(client, producto_id, minio_mock):
+    carga_id = _iniciar(client, producto_id).get_json()['carga_id']
+
+    response = _subir(client, carga_id, 1, b'a' * 10, checksum='0' * 64)
+
+    assert response.status_code == 400
+    assert response.get_json()['codigo'] == 'CHECKSUM_INVALIDO'
+    minio_mock.subir_parte.assert_not_called()
+
+
+def test_subir_parte_rechaza_tamaño_incorrecto(client, producto_id, minio_mock):
+    carga_id = _iniciar(client, producto_id).get_json()['carga_id']
+
+    response = _subir(client, carga_id, 1, b'a' * 4)
+
+    assert response.status_code == 400
+    assert response.get_json()['codigo'] == 'TAMAÑO_PARTE_INVALIDO'
+
+
+def test_reintentar_parte_la_reemplaza(client, producto_id, minio_mock):
+    carga_id = _iniciar(client, producto_id).get_json()['carga_id']
+
+    _subir(client, carga_id, 1, b'a' * 10)
+    _subir(client, carga_id, 1, b'z' * 10)
+
+    partes = client.get(f'/api/productos/videos/cargas/{carga_id}').get_json()['partes_recibidas']
+    assert len(partes) == 1
+    assert partes[0]['sha256'] == hashlib.sha256(b'z' * 10).hexdigest()
+
+
+def test_cancelar_carga(client, producto_id, minio_mock):
+    body = _iniciar(client, producto_id).get_json()
+
+    response = client.delete(f"/api/productos/videos/cargas/{body['carga_id']}")
+
+    assert response.status_code == 200
+    minio_mock.abortar_carga_multipart.assert_called_once()
+    assert db.session.get(VideoEvidencia, body['video_id']).estado == 'error'
+
+
+def test_carga_inexistente(client):
+    response = client.get('/api/productos/videos/cargas/no-existe')
+
+    assert response.status_code == 404
+    assert response.get_json()['codigo'] == 'CARGA_NO_ENCONTRADA'
+
+
+def test_completar_carga_expirada(client, producto_id, minio_mock):
+    carga_id = _iniciar(client, producto_id, tamaño=10).get_json()['carga_id']
+    _subir(client, carga_id, 1, b'a' * 10)
+    _expirar(carga_id)
+
+    response = client.post(f'/api/productos/videos/cargas/{carga_id}/completar')
+
+    assert response.status_code == 410
+    assert response.get_json()['codigo'] == 'CARGA_EXPIRADA'
+    minio_mock.completar_carga_multipart.assert_not_called()
+
+
+def test_limpiar_cargas_expiradas(client, producto_id, minio_mock):
+    expirada = _iniciar(client, producto_id).get_json()
+    vigente = _iniciar(client, producto_id).get_json()
+    _expirar(expirada['carga_id'])
+
+    with patch('app.services.carga_video_service.MinIOService') as mock:
+        mock.abortar_carga_multipart.return_value = True
+        assert CargaVideoService.limpiar_cargas_expiradas() == 1
+
+    mock.abortar_carga_multipart.assert_called_once()
+    assert db.session.get(CargaVideo, expirada['carga_id']) is None
+    assert db.session.get(VideoEvidencia, expirada['video_id']) is None
+    assert db.session.get(CargaVideo, vigente['carga_id']) is not None
+
+
+def test_limpiar_cargas_conserva_si_no_se_aborta(client, producto_id, minio_mock):
+    body = _iniciar(client, producto_id).get_json()
+    _expirar(body['carga_id'])
+
+    with patch('app.services.carga_video_service.MinIOService') as mock:
+        mock.abortar_carga_multipart.return_value = False
+        assert CargaVideoService.limpiar_cargas_expiradas() == 0
+
+    assert db.session.get(CargaVideo, body['carga_id']) is not None
+    assert db.session.get(VideoEvidencia, body['video_id']).estado == 'cargando'
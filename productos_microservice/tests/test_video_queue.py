@@ -0,0 +1,111 @@
+"""
+Tests para la cola durable de videos (VideoJobQueue)
+"""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.workers.video_queue import VideoJobQueue
+
+
+@pytest.fixture
+def redis_mock():
+    return MagicMock()
+
+
+@pytest.fixture
+def cola(redis_mock):
+    return VideoJobQueue(redis_mock, 'video_processing', lease_segundos=60,
+                         max_intentos=3, backoff_base=10, backoff_max=25)
+
+
+def test_tomar_mueve_a_processing_y_toma_lease(cola, redis_mock):
+    raw = json.dumps({'video_id': 5, 'ruta_video': 'a.mp4'})
+    redis_mock.brpoplpush.return_value = raw
+    redis_mock.set.return_value = True
+
+    assert cola.tomar('w1', timeout=2) == (raw, {'video_id': 5, 'ruta_video': 'a.mp4'})
+    redis_mock.brpoplpush.assert_called_once_with(
+        'queue:video_processing:pending', 'queue:video_processing:processing', 2
+    )
+    redis_mock.set.assert_called_once_with('queue:video_processing:lease:5', 'w1', nx=True, ex=60)
+
+
+def test_tomar_sin_mensajes(cola, redis_mock):
+    redis_mock.brpoplpush.return_value = None
+    assert cola.tomar('w1') is None
+
+
+def test_tomar_descarta_duplicado_en_proceso(cola, redis_mock):
+    raw = json.dumps({'video_id': 5})
+    redis_mock.brpoplpush.return_value = raw
+    redis_mock.set.return_value = None
+
+    assert cola.tomar('w1') is None
+    redis_mock.lrem.assert_called_once_with('queue:video_processing:processing', 1, raw)
+
+
+def test_renovar_lease_solo_si_es_del_worker(cola, redis_mock):
+    redis_mock.get.return_value = 'otro'
+    assert cola.renovar_lease(5, 'w1') is False
+    redis_mock.expire.assert_not_called()
+
+    redis_mock.get.return_value = 'w1'
+    redis_mock.expire.return_value = True
+    assert cola.renovar_lease(5, 'w1') is True
+
+
+def test_calcular_backoff_exponencial_con_maximo(cola):
+    assert [cola.calcular_backoff(i) for i in (1, 2, 3)] == [10, 20, 25]
+
+
+def test_fallar_programa_reintento(cola, redis_mock):
+    redis_mock.lrem.return_value = 1
+
+    assert cola.fallar('raw', {'video_id': 5}, 'boom') == 'reintento'
+
+    args, _ = redis_mock.zadd.call_args
+    assert args[0] == 'queue:video_processing:delayed'
+    mensaje = json.loads(next(iter(args[1])))
+    assert mensaje['intentos'] == 1
+    assert mensaje['ultimo_error'] == 'boom'
+
+
+def test_fallar_descarta_al_agotar_intentos(cola, redis_mock):
+    redis_mock.lrem.return_value = 1
+
+    assert cola.fallar('raw', {'video_id': 5, 'intentos': 2}, 'boom') == 'descartado'
+    assert redis_mock.zadd.call_args[0][0] == 'queue:video_processing:dead'
+
+
+def test_fallar_ignora_trabajo_ya_recuperado(cola, redis_mock):
+    redis_mock.lrem.return_value = 0
+
+    assert cola.fallar('raw', {'video_id': 5}, 'boom') is None
+    redis_mock.zadd.assert_not_called()
+
+
+def test_recuperar_abandonados_espera_un_periodo_de_lease(cola, redis_mock):
+    raw = json.dumps({'video_id': 5})
+    redis_mock.lrange.return_value = [raw]
+    redis_mock.exists.return_value = 0
+    redis_mock.lrem.return_value = 1
+
+    assert cola.recuperar_abandonados(ahora=1000) == []
+    assert cola.recuperar_abandonados(ahora=1030) == []
+    assert cola.recuperar_abandonados(ahora=1060) == [({'video_id': 5}, 'reintento')]
+
+
+def test_recuperar_abandonados_respeta_leases_vigentes(cola, redis_mock):
+    redis_mock.lrange.return_value = [json.dumps({'video_id': 5})]
+    redis_mock.exists.return_value = 1
+
+    assert cola.recuperar_abandonados(ahora=1000) == []
+    assert cola.recuperar_abandonados(ahora=5000) == []
+    redis_mock.lrem.assert_not_called()
+
+
+def test_debe_reintentar(cola):
+    assert cola.debe_reintentar({'video_id': 1}) is True
+    assert cola.debe_reintentar({'video_id': 1, 'intentos': 2}) is False
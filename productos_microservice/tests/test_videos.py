@@ -7,6 +7,23 @@ from app.models.producto import Producto
 from datetime import datetime
 
 
+def test_agregar_columnas_nuevas_en_tabla_existente(app):
+    """Las columnas de streaming se agregan a una tabla videos_evidencia creada antes"""
+    from sqlalchemy import inspect, text
+    from app import _agregar_columnas_nuevas
+    from app.extensions import db
+
+    with db.engine.begin() as conexion:
+        for columna in ('ruta_hls', 'ruta_poster', 'ruta_miniaturas'):
+            conexion.execute(text(f'ALTER TABLE videos_evidencia DROP COLUMN {columna}'))
+
+    _agregar_columnas_nuevas()
+    _agregar_columnas_nuevas()  # idempotente
+
+    columnas = {c['name'] for c in inspect(db.engine).get_columns('videos_evidencia')}
+    assert {'ruta_hls', 'ruta_poster', 'ruta_miniaturas'} <= columnas
+
+
 class TestVideoEvidenciaModel:
     """Tests para el modelo VideoEvidencia"""
     
@@ -459,3 +476,108 @@ class TestVideoValidations:
         # Este test es más conceptual ya que no queremos crear archivos de 150MB
         # Verificamos que la configuración esté correcta
         assert app.config.get('MAX_CONTENT_LENGTH', 0) >= 150 * 1024 * 1024
+
+
+class TestVideoStreaming:
+    """Tests de las playlists HLS y miniaturas servidas por la API"""
+
+    def _crear_video_procesado(self, app):
+        with app.app_context():
+            from app.extensions import db
+
+            producto = Producto(
+                nombre="Test",
+                codigo_sku="TEST-HLS-1",
+                categoria="medicamento",
+                precio_unitario=10.0,
+                condiciones_almacenamiento="Test",
+                fecha_vencimiento=datetime(2026, 12, 31).date(),
+                proveedor_id=1,
+                usuario_registro="test@test.com"
+            )
+            db.session.add(producto)
+            db.session.flush()
+
+            prefijo = f"videos/procesado/{producto.id}/hls_unique_streaming"
+            video = VideoEvidencia(
+                producto_id=producto.id,
+                nombre_original="hls.mp4",
+                nombre_archivo_minio="hls_unique.mp4",
+                ruta_original=f"videos/original/{producto.id}/hls_unique.mp4",
+                tamaño_archivo=1024,
+                formato_original="mp4",
+                descripcion="Test HLS",
+                usuario_registro="test@test.com",
+                estado="procesando"
+            )
+            video.marcar_como_procesado(
+                ruta_hls=f"{prefijo}/master.m3u8",
+                ruta_poster=f"{prefijo}/poster.jpg",
+                ruta_miniaturas=f"{prefijo}/miniaturas.vtt"
+            )
+            db.session.add(video)
+            db.session.commit()
+            return video.id, prefijo
+
+    def test_playlist_de_rendicion_firma_segmentos(self, client, app):
+        """Los segmentos se reemplazan por URLs presigned en un solo lote"""
+        video_id, prefijo = self._crear_video_procesado(app)
+        playlist = b"#EXTM3U\n#EXTINF:4.000000,\nseg_000.ts\n#EXTINF:2.000000,\nseg_001.ts\n#EXT-X-ENDLIST\n"
+
+        with patch('app.blueprints.videos_bp.MinIOService') as mock_minio:
+            mock_minio.descargar_video.return_value = playlist
+            mock_minio.obtener_urls_presigned.side_effect = lambda objetos: {o: f"https://minio/{o}?firma" for o in objetos}
+
+            response = client.get(f'/api/productos/videos/{video_id}/streaming/mobile/index.m3u8')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/vnd.apple.mpegurl'
+        assert response.headers['Cache-Control'] == 'private, max-age=60'
+        lineas = response.get_data(as_text=True).splitlines()
+        assert lineas[2] == f"https://minio/{prefijo}/mobile/seg_000.ts?firma"
+        assert lineas[4] == f"https://minio/{prefijo}/mobile/seg_001.ts?firma"
+        mock_minio.descargar_video.assert_called_once_with(f"{prefijo}/mobile/index.m3u8")
+        mock_minio.obtener_urls_presigned.assert_called_once()
+
+    def test_master_conserva_playlists_relativas_y_vtt_fragmentos(self, client, app):
+        """Las playlists hijas quedan relativas y los fragmentos #xywh se conservan"""
+        video_id, prefijo = self._crear_video_procesado(app)
+
+        with patch('app.blueprints.videos_bp.MinIOService') as mock_minio:
+            mock_minio.obtener_urls_presigned.side_effect = lambda objetos: {o: f"https://minio/{o}" for o in objetos}
+
+            mock_minio.descargar_video.return_value = b'#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=1000\nlow/index.m3u8\n'
+            master = client.get(f'/api/productos/videos/{video_id}/streaming/master.m3u8')
+
+            mock_minio.descargar_video.return_value = (
+                b"WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nminiaturas.jpg#xywh=160,0,160,90\n"
+            )
+            vtt = client.get(f'/api/productos/videos/{video_id}/streaming/miniaturas.vtt')
+
+        assert master.get_data(as_text=True).splitlines()[2] == 'low/index.m3u8'
+        assert vtt.mimetype == 'text/vtt'
+        assert vtt.get_data(as_text=True).splitlines()[3] == f"https://minio/{prefijo}/miniaturas.jpg#xywh=160,0,160,90"
+
+    def test_recurso_streaming_rechaza_rutas_no_permitidas(self, client, app):
+        """Solo se sirven playlists y WebVTT dentro del directorio del video"""
+        video_id, _ = self._crear_video_procesado(app)
+
+        with patch('app.blueprints.videos_bp.MinIOService') as mock_minio:
+            segmento = client.get(f'/api/productos/videos/{video_id}/streaming/low/seg_000.ts')
+            inexistente = client.get('/api/productos/videos/99999/streaming/master.m3u8')
+
+        assert segmento.status_code == 404
+        assert inexistente.status_code == 404
+        mock_minio.descargar_video.assert_not_called()
+
+    def test_recurso_streaming_inexistente_en_minio(self, client, app):
+        """Una rendición que no está en MinIO responde 404, no 500"""
+        from minio.error import S3Error
+        video_id, _ = self._crear_video_procesado(app)
+
+        with patch('app.blueprints.videos_bp.MinIOService') as mock_minio:
+            mock_minio.descargar_video.side_effect = S3Error(None, 'NoSuchKey', 'no existe', '', '', '')
+            response = client.get(f'/api/productos/videos/{video_id}/streaming/hd/index.m3u8')
+
+        assert response.status_code == 404
+        assert response.get_json()['codigo'] == 'RECURSO_NO_ENCONTRADO'
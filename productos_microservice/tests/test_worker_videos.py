@@ -0,0 +1,287 @@
+import subprocess
+from unittest.mock import MagicMock
+
+import worker_videos
+from worker_videos import VideoProcessor, calcular_asignacion_cpu
+
+
+def test_calcular_asignacion_cpu_reparte_cpus(monkeypatch):
+    monkeypatch.delenv("VIDEO_NUM_WORKERS", raising=False)
+    monkeypatch.delenv("FFMPEG_THREADS", raising=False)
+
+    assert calcular_asignacion_cpu(1) == (1, 1)
+    assert calcular_asignacion_cpu(4) == (2, 2)
+    assert calcular_asignacion_cpu(8) == (4, 2)
+
+
+def test_calcular_asignacion_cpu_respeta_variables(monkeypatch):
+    monkeypatch.setenv("VIDEO_NUM_WORKERS", "1")
+    monkeypatch.setenv("FFMPEG_THREADS", "6")
+
+    assert calcular_asignacion_cpu(8) == (1, 6)
+
+
+def test_construir_comando_ffmpeg_una_sola_invocacion():
+    comando = VideoProcessor.construir_comando_ffmpeg(
+        "in.mov", {"pc": "pc.mp4", "mobile": "mobile.mp4"}, hilos=4
+    )
+
+    assert comando.count("-i") == 1
+    filtro = comando[comando.index("-filter_complex") + 1]
+    assert "split=2" in filtro
+    assert "scale=1920:-2[out_pc]" in filtro
+    assert "scale=720:-2[out_mobile]" in filtro
+    assert comando[-1] == "mobile.mp4"
+    assert "pc.mp4" in comando
+    assert comando.count("-threads") == 2
+    assert comando[comando.index("-threads") + 1] == "2"
+
+
+def test_procesar_video_multi_preset_resultado(monkeypatch):
+    run = MagicMock(return_value=MagicMock(returncode=0))
+    monkeypatch.setattr(worker_videos.subprocess, "run", run)
+
+    assert VideoProcessor.procesar_video_multi_preset("in.mp4", {"pc": "out.mp4"}) is True
+    run.assert_called_once()
+
+    run.return_value = MagicMock(returncode=1, stderr=b"fallo")
+    assert VideoProcessor.procesar_video_multi_preset("in.mp4", {"pc": "out.mp4"}) is False
+
+    run.side_effect = subprocess.TimeoutExpired("ffmpeg", 1)
+    assert VideoProcessor.procesar_video_ffmpeg("in.mp4", "out.mp4", preset="mobile") is False
+
+
+def _crear_video(app):
+    from datetime import datetime
+    from app.extensions import db
+    from app.models.producto import Producto
+    from app.models.video_evidencia import VideoEvidencia
+
+    producto = Producto(
+        nombre="Producto Video",
+        codigo_sku="SKU-VID-1",
+        categoria="medicamento",
+        precio_unitario=10,
+        condiciones_almacenamiento="Ambiente",
+        fecha_vencimiento=datetime(2027, 1, 1).date(),
+        proveedor_id=1,
+        usuario_registro="tester",
+    )
+    db.session.add(producto)
+    db.session.flush()
+    video = VideoEvidencia(
+        producto_id=producto.id,
+        nombre_original="video.mp4",
+        nombre_archivo_minio="video_unique.mp4",
+        ruta_original="videos/original/1/video_unique.mp4",
+        tamaño_archivo=1024,
+        formato_original="mp4",
+        usuario_registro="tester",
+        estado="cargado",
+    )
+    db.session.add(video)
+    db.session.commit()
+    return video.id
+
+
+def _simular_ffmpeg(input_path, salidas, hilos=None):
+    for ruta in salidas.values():
+        with open(ruta, "wb") as f:
+            f.write(b"procesado")
+    return True
+
+
+def test_procesar_video_completo_transfiere_por_archivo_y_limpia(app, monkeypatch, tmp_path):
+    from app.models.video_evidencia import VideoEvidencia
+
+    video_id = _crear_video(app)
+    monkeypatch.setattr(worker_videos, "obtener_app", lambda: app)
+    monkeypatch.setattr(worker_videos, "VIDEO_TEMP_DIR", str(tmp_path))
+
+    def descargar(object_name, file_path):
+        with open(file_path, "wb") as f:
+            f.write(b"original")
+        return file_path
+
+    subir = MagicMock()
+    monkeypatch.setattr(worker_videos.MinIOService, "descargar_video_a_archivo", descargar)
+    monkeypatch.setattr(worker_videos.MinIOService, "subir_video_desde_archivo", subir)
+    monkeypatch.setattr(VideoProcessor, "procesar_video_multi_preset", _simular_ffmpeg)
+    monkeypatch.setattr(VideoProcessor, "generar_recursos_streaming", MagicMock(return_value={}))
+
+    resultado = VideoProcessor.procesar_video_completo(video_id, "videos/original/1/video_unique.mp4")
+
+    assert resultado["success"] is True
+    assert resultado["ruta_pc"] == "videos/procesado/1/video_unique_procesado_pc.mp4"
+    assert subir.call_count == 2
+    assert list(tmp_path.iterdir()) == []
+    assert VideoEvidencia.query.get(video_id).estado == "procesado"
+
+
+def test_procesar_video_completo_limpia_temporales_si_falla(app, monkeypatch, tmp_path):
+    from app.models.video_evidencia import VideoEvidencia
+
+    video_id = _crear_video(app)
+    monkeypatch.setattr(worker_videos, "obtener_app", lambda: app)
+    monkeypatch.setattr(worker_videos, "VIDEO_TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        worker_videos.MinIOService, "descargar_video_a_archivo",
+        MagicMock(side_effect=Exception("MinIO caído"))
+    )
+
+    resultado = VideoProcessor.procesar_video_completo(video_id, "videos/original/1/video_unique.mp4")
+
+    assert resultado["success"] is False
+    assert list(tmp_path.iterdir()) == []
+    assert VideoEvidencia.query.get(video_id).estado == "error"
+
+
+def test_procesar_video_completo_reintentable_vuelve_a_cargado(app, monkeypatch, tmp_path):
+    from app.models.video_evidencia import VideoEvidencia
+
+    video_id = _crear_video(app)
+    monkeypatch.setattr(worker_videos, "obtener_app", lambda: app)
+    monkeypatch.setattr(worker_videos, "VIDEO_TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        worker_videos.MinIOService, "descargar_video_a_archivo",
+        MagicMock(side_effect=Exception("MinIO caído"))
+    )
+
+    resultado = VideoProcessor.procesar_video_completo(video_id, "videos/original/1/video_unique.mp4", reintentable=True)
+
+    video = VideoEvidencia.query.get(video_id)
+    assert resultado["success"] is False
+    assert video.estado == "cargado"
+    assert video.mensaje_error == "MinIO caído"
+
+
+def test_procesar_trabajo_confirma_si_termina(monkeypatch):
+    cola = MagicMock(lease_segundos=60)
+    cola.debe_reintentar.return_value = True
+    monkeypatch.setattr(
+        VideoProcessor, "procesar_video_completo",
+        MagicMock(return_value={"success": True, "video_id": 1})
+    )
+    mensaje = {"video_id": 1, "estado": "cargado", "ruta_video": "videos/original/1/a.mp4"}
+
+    worker_videos.procesar_trabajo(cola, "token", "raw", mensaje)
+
+    VideoProcessor.procesar_video_completo.assert_called_once_with(1, "videos/original/1/a.mp4", reintentable=True)
+    cola.confirmar.assert_called_once_with("raw", mensaje)
+    cola.fallar.assert_not_called()
+
+
+def test_procesar_trabajo_reprograma_si_falla(monkeypatch):
+    cola = MagicMock(lease_segundos=60)
+    monkeypatch.setattr(
+        VideoProcessor, "procesar_video_completo",
+        MagicMock(return_value={"success": False, "error": "ffmpeg"})
+    )
+    mensaje = {"video_id": 1, "estado": "cargado", "ruta_video": "a.mp4"}
+
+    worker_videos.procesar_trabajo(cola, "token", "raw", mensaje)
+
+    cola.fallar.assert_called_once_with("raw", mensaje, "ffmpeg")
+    cola.confirmar.assert_not_called()
+
+
+def test_procesar_trabajo_descarta_video_inexistente(monkeypatch):
+    cola = MagicMock(lease_segundos=60)
+    monkeypatch.setattr(
+        VideoProcessor, "procesar_video_completo",
+        MagicMock(return_value={"success": False, "error": "Video no encontrado", "reintentar": False})
+    )
+    mensaje = {"video_id": 1, "estado": "cargado", "ruta_video": "a.mp4"}
+
+    worker_videos.procesar_trabajo(cola, "token", "raw", mensaje)
+
+    cola.confirmar.assert_called_once()
+    cola.fallar.assert_not_called()
+
+
+def test_obtener_app_crea_una_sola_app_con_pool_para_los_hilos(monkeypatch):
+    fabrica = MagicMock(return_value="app")
+    monkeypatch.setattr(worker_videos, "create_app", fabrica)
+    monkeypatch.setattr(worker_videos, "_app", None)
+
+    assert worker_videos.obtener_app() == "app"
+    assert worker_videos.obtener_app() == "app"
+
+    fabrica.assert_called_once()
+    assert fabrica.call_args[0][0]["DB_POOL_SIZE"] == worker_videos.NUM_WORKERS + 1
+
+
+def _escribir_rendicion(directorio, rendicion, tamaños):
+    carpeta = directorio / rendicion
+    carpeta.mkdir()
+    lineas = ["#EXTM3U", "#EXT-X-TARGETDURATION:4"]
+    for i, tamaño in enumerate(tamaños):
+        (carpeta / f"seg_{i:03d}.ts").write_bytes(b"x" * tamaño)
+        lineas += ["#EXTINF:4.000000,", f"seg_{i:03d}.ts"]
+    lineas.append("#EXT-X-ENDLIST")
+    (carpeta / "index.m3u8").write_text("\n".join(lineas))
+
+
+def test_generar_master_hls_mide_ancho_de_banda(tmp_path):
+    _escribir_rendicion(tmp_path, "low", [1000, 3000])
+    _escribir_rendicion(tmp_path, "pc", [10000, 10000])
+
+    duracion = VideoProcessor.generar_master_hls(str(tmp_path), ["low", "pc"])
+
+    master = (tmp_path / "master.m3u8").read_text().splitlines()
+    assert duracion == 8.0
+    assert master[0] == "#EXTM3U"
+    assert master[2] == '#EXT-X-STREAM-INF:BANDWIDTH=6000,AVERAGE-BANDWIDTH=4000,NAME="low"'
+    assert master[3] == "low/index.m3u8"
+    assert master[5] == "pc/index.m3u8"
+
+
+def test_generar_vtt_miniaturas_posiciones_en_sprite(monkeypatch):
+    monkeypatch.setattr(worker_videos, "MINIATURAS_COLUMNAS", 2)
+
+    vtt = VideoProcessor.generar_vtt_miniaturas(5.0, 2, 3, "miniaturas.jpg").splitlines()
+
+    assert vtt[0] == "WEBVTT"
+    assert vtt[2] == "00:00:00.000 --> 00:00:02.000"
+    assert vtt[3] == "miniaturas.jpg#xywh=0,0,160,90"
+    assert vtt[9] == "miniaturas.jpg#xywh=0,90,160,90"
+    assert vtt[8] == "00:00:04.000 --> 00:00:05.000"
+
+
+def test_calcular_grilla_miniaturas_limita_cantidad():
+    assert VideoProcessor.calcular_grilla_miniaturas(30) == (2, 15, 2)
+    intervalo, cantidad, filas = VideoProcessor.calcular_grilla_miniaturas(1000)
+    assert cantidad == 100 and filas == 10 and intervalo == 10
+
+
+def test_procesar_video_completo_sube_recursos_de_streaming(app, monkeypatch, tmp_path):
+    from app.models.video_evidencia import VideoEvidencia
+
+    video_id = _crear_video(app)
+    monkeypatch.setattr(worker_videos, "obtener_app", lambda: app)
+    monkeypatch.setattr(worker_videos, "VIDEO_TEMP_DIR", str(tmp_path))
+    monkeypatch.setattr(worker_videos.MinIOService, "descargar_video_a_archivo", lambda o, f: f)
+    subir = MagicMock()
+    monkeypatch.setattr(worker_videos.MinIOService, "subir_video_desde_archivo", subir)
+    monkeypatch.setattr(VideoProcessor, "procesar_video_multi_preset", _simular_ffmpeg)
+
+    def recursos(salidas, directorio):
+        import os
+        os.makedirs(os.path.join(directorio, "low"))
+        for nombre in ("master.m3u8", "low/index.m3u8", "low/seg_000.ts", "poster.jpg"):
+            open(os.path.join(directorio, nombre), "w").close()
+        return {"hls": os.path.join(directorio, "master.m3u8"), "poster": os.path.join(directorio, "poster.jpg")}
+
+    monkeypatch.setattr(VideoProcessor, "generar_recursos_streaming", recursos)
+
+    resultado = VideoProcessor.procesar_video_completo(video_id, "videos/original/1/video_unique.mp4")
+
+    assert resultado["success"] is True
+    subidos = {c.kwargs["object_name"]: c.kwargs["content_type"] for c in subir.call_args_list}
+    prefijo = "videos/procesado/1/video_unique_streaming"
+    assert subidos[f"{prefijo}/low/seg_000.ts"] == "video/mp2t"
+    assert subidos[f"{prefijo}/master.m3u8"] == "application/vnd.apple.mpegurl"
+    video = VideoEvidencia.query.get(video_id)
+    assert video.ruta_hls == f"{prefijo}/master.m3u8"
+    assert video.ruta_poster == f"{prefijo}/poster.jpg"
+    assert video.ruta_miniaturas is None
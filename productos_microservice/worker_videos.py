@@ -1,17 +1,21 @@
 """
 Worker para procesamiento de videos en paralelo con multithreading
 Procesa videos usando ffmpeg para generar versiones optimizadas para PC y mobile
-Usa Redis Pub/Sub para recibir mensajes de videos a procesar
+Toma los videos a procesar de la cola durable 'video_processing' en Redis
 """
 import os
 import sys
 import json
 import logging
+import math
+import shutil
 import subprocess
+import tempfile
 import threading
+import time
 import redis
 import signal
-from queue import Queue
+import uuid
 from datetime import datetime
 
 # Agregar path para importar módulos de la app
@@ -19,6 +23,8 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from app.models.video_evidencia import VideoEvidencia
 from app.services.minio_service import MinIOService
+from app.services.carga_video_service import CargaVideoService
+from app.workers.video_queue import VideoJobQueue
 from app.extensions import db
 from app import create_app
 
@@ -29,96 +35,470 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Número de workers en paralelo
-NUM_WORKERS = 3
+# Presets de salida: resolución horizontal, calidad (CRF) y bitrate de audio
+PRESETS_VIDEO = {
+    'pc': {'ancho': 1920, 'crf': '23', 'audio_bitrate': '128k'},  # 1080p, mayor calidad
+    'mobile': {'ancho': 720, 'crf': '28', 'audio_bitrate': '96k'},  # 720 px de ancho (~405p en 16:9), mayor compresión
+    'low': {'ancho': 480, 'crf': '30', 'audio_bitrate': '64k'},  # 480 px de ancho (~270p en 16:9), solo como rendición HLS
+}
+
+# Rendiciones HLS (en orden de menor a mayor calidad) y duración de cada segmento
+RENDICIONES_HLS = ('low', 'mobile', 'pc')
+HLS_SEGMENT_SECONDS = int(os.getenv('HLS_SEGMENT_SECONDS', 4))
+
+# Sprite de miniaturas para la barra de reproducción
+MINIATURA_ANCHO = 160
+MINIATURA_ALTO = 90
+MINIATURAS_COLUMNAS = 10
+MINIATURAS_MAX = 100
+MINIATURAS_INTERVALO = int(os.getenv('MINIATURAS_INTERVALO', 2))
+
+# Tipos de contenido de los recursos de streaming al subirlos a MinIO
+CONTENT_TYPES_STREAMING = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.jpg': 'image/jpeg',
+    '.vtt': 'text/vtt',
+}
+
+# Directorio base para los archivos temporales de cada job
+VIDEO_TEMP_DIR = os.getenv('VIDEO_TEMP_DIR', os.path.join(tempfile.gettempdir(), 'video_processing'))
+
+# Tiempo máximo de una invocación de ffmpeg (segundos)
+FFMPEG_TIMEOUT = int(os.getenv('FFMPEG_TIMEOUT', 600))
+
+
+def _cpus_disponibles():
+    """
+    Obtiene el número de CPUs realmente disponibles para el proceso.
+    
+    Considera la afinidad del proceso y, si existe, la cuota de CPU del cgroup
+    (límites de Kubernetes/Docker), que os.cpu_count() no refleja.
+    
+    Returns:
+        int: Número de CPUs (mínimo 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    
+    # cgroup v2: "<cuota> <periodo>" o "max <periodo>"
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            cuota, periodo = f.read().split()[:2]
+        if cuota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(cuota) / int(periodo))))
+    except (OSError, ValueError):
+        pass
+    
+    return max(1, cpus)
+
+
+def calcular_asignacion_cpu(cpus=None):
+    """
+    Calcula cuántos videos procesar en paralelo y cuántos hilos de ffmpeg
+    asignar a cada uno según las CPUs disponibles.
+    
+    Cada video ocupa un proceso ffmpeg con un codificador por preset (pc, mobile
+    y low para HLS) que reparten entre sí los hilos del video; se reservan al
+    menos 2 CPUs por video. Se puede forzar con las variables VIDEO_NUM_WORKERS
+    y FFMPEG_THREADS.
+    
+    Args:
+        cpus: Número de CPUs (por defecto se detecta)
+        
+    Returns:
+        tuple: (num_workers, hilos_por_video)
+    """
+    if cpus is None:
+        cpus = _cpus_disponibles()
+    
+    num_workers = int(os.getenv('VIDEO_NUM_WORKERS', 0)) or max(1, cpus // 2)
+    hilos_por_video = int(os.getenv('FFMPEG_THREADS', 0)) or max(1, cpus // num_workers)
+    return num_workers, hilos_por_video
+
+
+# Número de workers en paralelo y hilos de ffmpeg por video
+NUM_WORKERS, FFMPEG_THREADS = calcular_asignacion_cpu()
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def obtener_app():
+    """
+    Devuelve la aplicación Flask del worker, creándola una sola vez.
+    
+    Todos los hilos comparten la app y su engine; cada job abre su propio
+    app_context, por lo que recibe una sesión de SQLAlchemy propia (scoped
+    por contexto) que se devuelve al pool al cerrar el contexto. El pool se
+    dimensiona para los hilos de procesamiento más el de mantenimiento.
+    
+    Returns:
+        Flask: Aplicación compartida
+    """
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = create_app({
+                'DB_POOL_SIZE': NUM_WORKERS + 1,
+                'DB_MAX_OVERFLOW': int(os.getenv('VIDEO_DB_MAX_OVERFLOW', 2))
+            })
+        return _app
 
 
 class VideoProcessor:
     """Clase para procesar videos individualmente"""
     
     @staticmethod
-    def procesar_video_ffmpeg(input_path, output_path, preset='pc'):
+    def _argumentos_salida(preset, output_path, hilos):
+        """Argumentos de codificación de ffmpeg para una salida según su preset"""
+        config = PRESETS_VIDEO[preset]
+        return [
+            '-c:v', 'libx264',
+            '-preset', 'medium',
+            '-crf', config['crf'],
+            '-c:a', 'aac',
+            '-b:a', config['audio_bitrate'],
+            '-movflags', '+faststart',
+            # Keyframes cada segmento HLS para que las rendiciones queden alineadas
+            '-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})',
+            '-threads', str(hilos),
+            '-y',  # Sobrescribir si existe
+            output_path
+        ]
+    
+    @staticmethod
+    def construir_comando_ffmpeg(input_path, salidas, hilos=None):
         """
-        Procesa un video con ffmpeg
+        Construye un único comando ffmpeg que genera todas las salidas.
+        
+        El video se decodifica una sola vez y se reparte con un filtro split a un
+        escalado por preset, en lugar de leer y decodificar la entrada una vez por
+        cada versión.
         
         Args:
             input_path: Ruta del archivo de entrada
-            output_path: Ruta del archivo de salida
-            preset: Tipo de preset ('pc' o 'mobile')
+            salidas: dict {preset: output_path}
+            hilos: Hilos totales para la codificación (se reparten entre salidas)
             
         Returns:
-            bool: True si el procesamiento fue exitoso
+            list: Comando listo para subprocess
         """
-        try:
-            # Configuración según preset
-            if preset == 'mobile':
-                # Móvil: menor resolución, menor bitrate
-                ffmpeg_cmd = [
-                    'ffmpeg',
-                    '-i', input_path,
-                    '-vf', 'scale=720:-2',  # 720p, mantener aspect ratio
-                    '-c:v', 'libx264',
-                    '-preset', 'medium',
-                    '-crf', '28',  # Mayor compresión
-                    '-c:a', 'aac',
-                    '-b:a', '96k',
-                    '-movflags', '+faststart',
-                    '-y',  # Sobrescribir si existe
-                    output_path
-                ]
-            else:  # pc
-                # PC: mayor calidad
-                ffmpeg_cmd = [
-                    'ffmpeg',
-                    '-i', input_path,
-                    '-vf', 'scale=1920:-2',  # 1080p, mantener aspect ratio
-                    '-c:v', 'libx264',
-                    '-preset', 'medium',
-                    '-crf', '23',  # Mejor calidad
-                    '-c:a', 'aac',
-                    '-b:a', '128k',
-                    '-movflags', '+faststart',
-                    '-y',
-                    output_path
-                ]
+        presets = list(salidas.keys())
+        hilos = hilos or FFMPEG_THREADS
+        hilos_por_salida = max(1, hilos // len(presets))
+        
+        etiquetas = ''.join(f'[v{i}]' for i in range(len(presets)))
+        filtros = [f'[0:v]split={len(presets)}{etiquetas}']
+        for i, preset in enumerate(presets):
+            # Escalar manteniendo aspect ratio
+            filtros.append(f"[v{i}]scale={PRESETS_VIDEO[preset]['ancho']}:-2[out_{preset}]")
+        
+        comando = ['ffmpeg', '-i', input_path, '-filter_complex', ';'.join(filtros)]
+        for preset in presets:
+            comando += ['-map', f'[out_{preset}]', '-map', '0:a?']
+            comando += VideoProcessor._argumentos_salida(preset, salidas[preset], hilos_por_salida)
+        
+        return comando
+    
+    @staticmethod
+    def procesar_video_multi_preset(input_path, salidas, hilos=None):
+        """
+        Procesa un video generando todas las versiones en una sola invocación de ffmpeg
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            salidas: dict {preset: output_path}
+            hilos: Hilos de ffmpeg para este video
             
-            # Ejecutar ffmpeg
-            logger.info(f"Procesando video {preset}: {input_path}")
+        Returns:
+            bool: True si el procesamiento fue exitoso
+        """
+        presets = ', '.join(salidas.keys())
+        ffmpeg_cmd = VideoProcessor.construir_comando_ffmpeg(input_path, salidas, hilos)
+        
+        logger.info(f"Procesando video ({presets}): {input_path}")
+        return VideoProcessor._ejecutar_ffmpeg(ffmpeg_cmd, presets)
+    
+    @staticmethod
+    def _ejecutar_ffmpeg(comando, descripcion):
+        """
+        Ejecuta un comando de ffmpeg con el timeout configurado
+        
+        Args:
+            comando: Comando listo para subprocess
+            descripcion: Texto para identificar la operación en los logs
             
+        Returns:
+            bool: True si ffmpeg terminó correctamente
+        """
+        try:
             result = subprocess.run(
-                ffmpeg_cmd,
+                comando,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                timeout=600  # 10 minutos max
+                timeout=FFMPEG_TIMEOUT
             )
             
             if result.returncode == 0:
-                logger.info(f"Video procesado exitosamente ({preset}): {output_path}")
+                logger.info(f"Video procesado exitosamente ({descripcion})")
                 return True
             else:
-                logger.error(f"Error en ffmpeg ({preset}): {result.stderr.decode()}")
+                logger.error(f"Error en ffmpeg ({descripcion}): {result.stderr.decode()}")
                 return False
                 
         except subprocess.TimeoutExpired:
-            logger.error(f"Timeout procesando video ({preset})")
+            logger.error(f"Timeout procesando video ({descripcion})")
             return False
         except Exception as e:
-            logger.error(f"Error procesando video ({preset}): {e}")
+            logger.error(f"Error procesando video ({descripcion}): {e}")
             return False
     
     @staticmethod
-    def procesar_video_completo(video_id, ruta_original):
+    def comando_segmentar_hls(input_path, directorio):
+        """
+        Comando que segmenta una rendición ya codificada en HLS sin recodificar
+        
+        Args:
+            input_path: MP4 de la rendición
+            directorio: Directorio donde quedan index.m3u8 y los segmentos
+        """
+        return [
+            'ffmpeg', '-i', input_path,
+            '-c', 'copy',
+            '-f', 'hls',
+            '-hls_time', str(HLS_SEGMENT_SECONDS),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(directorio, 'seg_%03d.ts'),
+            '-y', os.path.join(directorio, 'index.m3u8')
+        ]
+    
+    @staticmethod
+    def leer_playlist_hls(playlist_path):
+        """
+        Lee una playlist de medios HLS
+        
+        Returns:
+            list: Tuplas (duracion_segundos, nombre_segmento)
+        """
+        segmentos = []
+        duracion = None
+        with open(playlist_path) as f:
+            for linea in f:
+                linea = linea.strip()
+                if linea.startswith('#EXTINF:'):
+                    duracion = float(linea[len('#EXTINF:'):].split(',')[0])
+                elif linea and not linea.startswith('#') and duracion is not None:
+                    segmentos.append((duracion, linea))
+                    duracion = None
+        return segmentos
+    
+    @staticmethod
+    def generar_master_hls(directorio, rendiciones):
+        """
+        Escribe master.m3u8 con el ancho de banda medido de cada rendición
+        
+        BANDWIDTH es el pico por segmento y AVERAGE-BANDWIDTH el promedio, ambos
+        calculados con el tamaño real de los segmentos generados.
+        
+        Args:
+            directorio: Directorio HLS con un subdirectorio por rendición
+            rendiciones: Nombres de las rendiciones a incluir
+            
+        Returns:
+            float: Duración total del video en segundos
+        """
+        lineas = ['#EXTM3U', '#EXT-X-VERSION:3']
+        duracion_total = 0.0
+        
+        for rendicion in rendiciones:
+            carpeta = os.path.join(directorio, rendicion)
+            segmentos = VideoProcessor.leer_playlist_hls(os.path.join(carpeta, 'index.m3u8'))
+            if not segmentos:
+                continue
+            
+            bits = [os.path.getsize(os.path.join(carpeta, nombre)) * 8 for _, nombre in segmentos]
+            duracion = sum(d for d, _ in segmentos)
+            pico = max(b / max(d, 0.001) for b, (d, _) in zip(bits, segmentos))
+            promedio = sum(bits) / max(duracion, 0.001)
+            duracion_total = max(duracion_total, duracion)
+            
+            lineas.append(
+                f'#EXT-X-STREAM-INF:BANDWIDTH={int(pico)},AVERAGE-BANDWIDTH={int(promedio)},NAME="{rendicion}"'
+            )
+            lineas.append(f'{rendicion}/index.m3u8')
+        
+        with open(os.path.join(directorio, 'master.m3u8'), 'w') as f:
+            f.write('\n'.join(lineas) + '\n')
+        
+        return duracion_total
+    
+    @staticmethod
+    def comando_poster(input_path, output_path):
+        """Comando que extrae un fotograma representativo como poster"""
+        return [
+            'ffmpeg', '-i', input_path,
+            '-vf', 'thumbnail,scale=1280:-2',
+            '-frames:v', '1',
+            '-y', output_path
+        ]
+    
+    @staticmethod
+    def calcular_grilla_miniaturas(duracion):
+        """
+        Calcula el intervalo entre miniaturas y las filas del sprite
+        
+        Returns:
+            tuple: (intervalo_segundos, cantidad, filas)
+        """
+        intervalo = max(MINIATURAS_INTERVALO, duracion / MINIATURAS_MAX)
+        cantidad = max(1, min(MINIATURAS_MAX, math.ceil(duracion / intervalo)))
+        filas = math.ceil(cantidad / MINIATURAS_COLUMNAS)
+        return intervalo, cantidad, filas
+    
+    @staticmethod
+    def comando_sprite(input_path, output_path, intervalo, filas):
+        """Comando que genera el sprite de miniaturas en una grilla fija"""
+        filtro = (
+            f"fps=1/{intervalo:g},"
+            f"scale={MINIATURA_ANCHO}:{MINIATURA_ALTO}:force_original_aspect_ratio=decrease,"
+            f"pad={MINIATURA_ANCHO}:{MINIATURA_ALTO}:(ow-iw)/2:(oh-ih)/2,"
+            f"tile={MINIATURAS_COLUMNAS}x{filas}"
+        )
+        return ['ffmpeg', '-i', input_path, '-vf', filtro, '-frames:v', '1', '-y', output_path]
+    
+    @staticmethod
+    def generar_vtt_miniaturas(duracion, intervalo, cantidad, nombre_sprite):
+        """
+        Genera el WebVTT que asocia cada tramo del video con su miniatura del sprite
+        
+        Returns:
+            str: Contenido del archivo .vtt
+        """
+        def marca(segundos):
+            horas, resto = divmod(segundos, 3600)
+            minutos, segs = divmod(resto, 60)
+            return f"{int(horas):02d}:{int(minutos):02d}:{segs:06.3f}"
+        
+        lineas = ['WEBVTT', '']
+        for i in range(cantidad):
+            inicio = i * intervalo
+            fin = min(duracion, (i + 1) * intervalo)
+            x = (i % MINIATURAS_COLUMNAS) * MINIATURA_ANCHO
+            y = (i // MINIATURAS_COLUMNAS) * MINIATURA_ALTO
+            lineas.append(f"{marca(inicio)} --> {marca(fin)}")
+            lineas.append(f"{nombre_sprite}#xywh={x},{y},{MINIATURA_ANCHO},{MINIATURA_ALTO}")
+            lineas.append('')
+        return '\n'.join(lineas)
+    
+    @staticmethod
+    def generar_recursos_streaming(salidas, directorio):
+        """
+        Genera HLS multi-rendición, poster y sprite de miniaturas
+        
+        Las rendiciones ya codificadas se segmentan sin recodificar. Los recursos
+        son complementarios a los MP4: si alguno falla se registra y se omite.
+        
+        Args:
+            salidas: dict {preset: mp4} con las rendiciones codificadas
+            directorio: Directorio de salida (se suben juntos a MinIO)
+            
+        Returns:
+            dict: Rutas locales generadas ('hls', 'poster', 'miniaturas')
+        """
+        recursos = {}
+        rendiciones = [r for r in RENDICIONES_HLS if r in salidas]
+        
+        for rendicion in rendiciones:
+            carpeta = os.path.join(directorio, rendicion)
+            os.makedirs(carpeta, exist_ok=True)
+            if not VideoProcessor._ejecutar_ffmpeg(
+                VideoProcessor.comando_segmentar_hls(salidas[rendicion], carpeta), f"hls {rendicion}"
+            ):
+                logger.warning("No fue posible generar HLS, se omite")
+                return recursos
+        
+        duracion = VideoProcessor.generar_master_hls(directorio, rendiciones)
+        recursos['hls'] = os.path.join(directorio, 'master.m3u8')
+        
+        fuente_poster = salidas.get('pc') or salidas[rendiciones[-1]]
+        poster = os.path.join(directorio, 'poster.jpg')
+        if VideoProcessor._ejecutar_ffmpeg(VideoProcessor.comando_poster(fuente_poster, poster), "poster"):
+            recursos['poster'] = poster
+        
+        if duracion > 0:
+            intervalo, cantidad, filas = VideoProcessor.calcular_grilla_miniaturas(duracion)
+            sprite = os.path.join(directorio, 'miniaturas.jpg')
+            fuente_sprite = salidas[rendiciones[0]]
+            if VideoProcessor._ejecutar_ffmpeg(
+                VideoProcessor.comando_sprite(fuente_sprite, sprite, intervalo, filas), "miniaturas"
+            ):
+                vtt = os.path.join(directorio, 'miniaturas.vtt')
+                with open(vtt, 'w') as f:
+                    f.write(VideoProcessor.generar_vtt_miniaturas(duracion, intervalo, cantidad, 'miniaturas.jpg'))
+                recursos['miniaturas'] = vtt
+        
+        return recursos
+    
+    @staticmethod
+    def subir_directorio_streaming(directorio, prefijo, video_id):
+        """
+        Sube a MinIO todos los archivos del directorio de streaming conservando su estructura
+        
+        Args:
+            directorio: Directorio local generado por generar_recursos_streaming
+            prefijo: Prefijo en MinIO (ej. videos/procesado/{producto_id}/{base}_hls)
+            video_id: ID del video (metadato)
+        """
+        for raiz, _, archivos in os.walk(directorio):
+            for archivo in archivos:
+                ruta_local = os.path.join(raiz, archivo)
+                relativa = os.path.relpath(ruta_local, directorio).replace(os.sep, '/')
+                MinIOService.subir_video_desde_archivo(
+                    ruta_local,
+                    object_name=f"{prefijo}/{relativa}",
+                    content_type=CONTENT_TYPES_STREAMING.get(os.path.splitext(archivo)[1], 'application/octet-stream'),
+                    metadata={'video_id': str(video_id)}
+                )
+    
+    @staticmethod
+    def procesar_video_ffmpeg(input_path, output_path, preset='pc'):
+        """
+        Procesa un video con ffmpeg para un único preset
+        
+        Args:
+            input_path: Ruta del archivo de entrada
+            output_path: Ruta del archivo de salida
+            preset: Tipo de preset ('pc' o 'mobile')
+            
+        Returns:
+            bool: True si el procesamiento fue exitoso
+        """
+        if preset not in PRESETS_VIDEO:
+            preset = 'pc'
+        return VideoProcessor.procesar_video_multi_preset(input_path, {preset: output_path})
+    
+    @staticmethod
+    def procesar_video_completo(video_id, ruta_original, reintentable=False):
         """
         Procesa un video completo: descarga, procesa y sube versiones
         
         Args:
             video_id: ID del video en la base de datos
             ruta_original: Ruta del video original en MinIO
+            reintentable: Si el fallo se reintentará, el video vuelve a 'cargado'
+                (en cola) en lugar de quedar en 'error'
             
         Returns:
-            dict: Resultado del procesamiento
+            dict: Resultado del procesamiento. 'reintentar' es False cuando
+            no tiene sentido volver a intentarlo (el video no existe)
         """
-        app = create_app()
+        app = obtener_app()
+        
+        temp_dir = None
         
         with app.app_context():
             try:
@@ -126,88 +506,94 @@ class VideoProcessor:
                 video = VideoEvidencia.query.get(video_id)
                 if not video:
                     logger.error(f"Video {video_id} no encontrado en DB")
-                    return {'success': False, 'error': 'Video no encontrado'}
+                    return {'success': False, 'error': 'Video no encontrado', 'reintentar': False}
+                
+                # Un mensaje repetido de un video ya procesado no se vuelve a procesar
+                if video.esta_procesado():
+                    logger.info(f"Video {video_id} ya estaba procesado, se omite")
+                    return {'success': True, 'video_id': video_id, 'omitido': True}
                 
                 # 2. Marcar como procesando
                 video.marcar_como_procesando()
                 db.session.commit()
                 logger.info(f"Video {video_id} marcado como procesando")
                 
-                # 3. Crear directorio temporal
-                temp_dir = '/tmp/video_processing' if os.name != 'nt' else 'C:\\temp\\video_processing'
-                os.makedirs(temp_dir, exist_ok=True)
+                # 3. Crear directorio temporal propio del job
+                os.makedirs(VIDEO_TEMP_DIR, exist_ok=True)
+                temp_dir = tempfile.mkdtemp(prefix=f"video_{video_id}_", dir=VIDEO_TEMP_DIR)
                 
-                # 4. Descargar video original desde MinIO
-                temp_input = os.path.join(temp_dir, f"input_{video_id}.{video.formato_original}")
+                # 4. Descargar video original desde MinIO (streaming a disco)
+                temp_input = os.path.join(temp_dir, f"input.{video.formato_original}")
                 logger.info(f"Descargando video desde MinIO: {ruta_original}")
                 
-                video_data = MinIOService.descargar_video(ruta_original)
-                
-                with open(temp_input, 'wb') as f:
-                    f.write(video_data)
+                MinIOService.descargar_video_a_archivo(ruta_original, temp_input)
                 
                 logger.info(f"Video descargado: {temp_input}")
                 
-                # 5. Procesar para PC
-                temp_output_pc = os.path.join(temp_dir, f"output_pc_{video_id}.mp4")
-                success_pc = VideoProcessor.procesar_video_ffmpeg(
-                    temp_input, temp_output_pc, preset='pc'
-                )
-                
-                if not success_pc:
-                    raise Exception("Error procesando versión PC")
+                # 5-6. Procesar PC, mobile y la rendición baja en una sola pasada de ffmpeg
+                temp_output_pc = os.path.join(temp_dir, "output_pc.mp4")
+                temp_output_mobile = os.path.join(temp_dir, "output_mobile.mp4")
+                temp_output_low = os.path.join(temp_dir, "output_low.mp4")
+                salidas = {'pc': temp_output_pc, 'mobile': temp_output_mobile, 'low': temp_output_low}
+                success = VideoProcessor.procesar_video_multi_preset(temp_input, salidas)
                 
-                # 6. Procesar para mobile
-                temp_output_mobile = os.path.join(temp_dir, f"output_mobile_{video_id}.mp4")
-                success_mobile = VideoProcessor.procesar_video_ffmpeg(
-                    temp_input, temp_output_mobile, preset='mobile'
-                )
+                if not success:
+                    raise Exception("Error procesando versiones PC y mobile")
                 
-                if not success_mobile:
-                    raise Exception("Error procesando versión mobile")
+                # Empaquetar HLS y generar poster y sprite de miniaturas
+                temp_streaming = os.path.join(temp_dir, "streaming")
+                os.makedirs(temp_streaming, exist_ok=True)
+                recursos = VideoProcessor.generar_recursos_streaming(salidas, temp_streaming)
                 
                 # 7. Subir versiones procesadas a MinIO
                 producto_id = video.producto_id
                 base_name = os.path.splitext(video.nombre_archivo_minio)[0]
                 
-                # Subir versión PC
+                # Subir versión PC (multipart desde disco)
                 ruta_pc = f"videos/procesado/{producto_id}/{base_name}_procesado_pc.mp4"
-                with open(temp_output_pc, 'rb') as f:
-                    MinIOService.subir_video(
-                        file_data=f.read(),
-                        object_name=ruta_pc,
-                        content_type='video/mp4',
-                        metadata={'preset': 'pc', 'video_id': str(video_id)}
-                    )
+                MinIOService.subir_video_desde_archivo(
+                    temp_output_pc,
+                    object_name=ruta_pc,
+                    content_type='video/mp4',
+                    metadata={'preset': 'pc', 'video_id': str(video_id)}
+                )
                 
                 logger.info(f"Versión PC subida: {ruta_pc}")
                 
                 # Subir versión mobile
                 ruta_mobile = f"videos/procesado/{producto_id}/{base_name}_procesado_mobile.mp4"
-                with open(temp_output_mobile, 'rb') as f:
-                    MinIOService.subir_video(
-                        file_data=f.read(),
-                        object_name=ruta_mobile,
-                        content_type='video/mp4',
-                        metadata={'preset': 'mobile', 'video_id': str(video_id)}
-                    )
+                MinIOService.subir_video_desde_archivo(
+                    temp_output_mobile,
+                    object_name=ruta_mobile,
+                    content_type='video/mp4',
+                    metadata={'preset': 'mobile', 'video_id': str(video_id)}
+                )
                 
                 logger.info(f"Versión mobile subida: {ruta_mobile}")
                 
+                # Subir HLS, poster y miniaturas bajo el mismo prefijo
+                rutas_streaming = {}
+                if recursos:
+                    prefijo = f"videos/procesado/{producto_id}/{base_name}_streaming"
+                    VideoProcessor.subir_directorio_streaming(temp_streaming, prefijo, video_id)
+                    rutas_streaming = {
+                        clave: f"{prefijo}/{os.path.relpath(ruta, temp_streaming)}"
+                        for clave, ruta in recursos.items()
+                    }
+                    logger.info(f"Recursos de streaming subidos: {prefijo}")
+                
                 # 8. Actualizar registro en DB
-                video.marcar_como_procesado(ruta_pc=ruta_pc, ruta_mobile=ruta_mobile)
+                video.marcar_como_procesado(
+                    ruta_pc=ruta_pc,
+                    ruta_mobile=ruta_mobile,
+                    ruta_hls=rutas_streaming.get('hls'),
+                    ruta_poster=rutas_streaming.get('poster'),
+                    ruta_miniaturas=rutas_streaming.get('miniaturas')
+                )
                 db.session.commit()
                 
                 logger.info(f"Video {video_id} procesado exitosamente")
                 
-                # 9. Limpiar archivos temporales
-                try:
-                    os.remove(temp_input)
-                    os.remove(temp_output_pc)
-                    os.remove(temp_output_mobile)
-                except:
-                    pass
-                
                 return {
                     'success': True,
                     'video_id': video_id,
@@ -218,120 +604,177 @@ class VideoProcessor:
             except Exception as e:
                 logger.error(f"Error procesando video {video_id}: {e}", exc_info=True)
                 
-                # Marcar video como error
+                # Marcar video como error (o de vuelta en cola si se reintentará)
                 try:
+                    db.session.rollback()
                     video = VideoEvidencia.query.get(video_id)
                     if video:
-                        video.marcar_error(str(e))
+                        if reintentable:
+                            video.marcar_como_cargado()
+                            video.mensaje_error = str(e)
+                        else:
+                            video.marcar_error(str(e))
                         db.session.commit()
                 except:
                     pass
                 
                 return {'success': False, 'error': str(e)}
+            
+            finally:
+                # 9. Limpiar archivos temporales del job (también si falló)
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
 
 
-def worker_thread(worker_id, task_queue):
+def actualizar_estado_recuperados(recuperados):
     """
-    Thread worker que procesa videos de la cola
+    Sincroniza en la DB el estado de los trabajos recuperados de workers caídos
+    
+    Args:
+        recuperados: Lista de tuplas (mensaje, resultado) de VideoJobQueue.recuperar_abandonados
+    """
+    if not recuperados:
+        return
+    
+    app = obtener_app()
+    with app.app_context():
+        for mensaje, resultado in recuperados:
+            video = VideoEvidencia.query.get(mensaje['video_id'])
+            if not video or video.esta_procesado():
+                continue
+            if resultado == 'reintento':
+                video.marcar_como_cargado()
+                video.mensaje_error = 'Reintento pendiente: el worker dejó de responder'
+            else:
+                video.marcar_error('Procesamiento abandonado tras agotar los reintentos')
+        db.session.commit()
+
+
+def _heartbeat(cola, video_id, worker_token, detener):
+    """Renueva el lease del trabajo mientras el worker lo procesa."""
+    intervalo = max(1, cola.lease_segundos // 3)
+    while not detener.wait(intervalo):
+        if not cola.renovar_lease(video_id, worker_token):
+            logger.warning(f"⚠️ Se perdió el lease del video {video_id}")
+            return
+
+
+def procesar_trabajo(cola, worker_token, raw, mensaje):
+    """
+    Procesa un trabajo tomado de la cola y lo confirma, reprograma o descarta
+    
+    Args:
+        cola: VideoJobQueue de donde se tomó el trabajo
+        worker_token: Token del lease del worker
+        raw: Mensaje tal como está guardado en la cola
+        mensaje: Mensaje decodificado
+    
+    Returns:
+        dict: Resultado de VideoProcessor.procesar_video_completo
+    """
+    video_id = mensaje['video_id']
+    
+    if mensaje.get('estado', 'cargado') != 'cargado':
+        logger.info(f"⏭️ Video {video_id} ignorado (estado: {mensaje.get('estado')})")
+        cola.confirmar(raw, mensaje)
+        return {'success': True, 'video_id': video_id, 'omitido': True}
+    
+    detener = threading.Event()
+    latido = threading.Thread(
+        target=_heartbeat,
+        args=(cola, video_id, worker_token, detener),
+        daemon=True
+    )
+    latido.start()
+    
+    try:
+        result = VideoProcessor.procesar_video_completo(
+            video_id,
+            mensaje['ruta_video'],
+            reintentable=cola.debe_reintentar(mensaje)
+        )
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    finally:
+        detener.set()
+        latido.join(timeout=5)
+    
+    if result['success'] or result.get('reintentar') is False:
+        cola.confirmar(raw, mensaje)
+    else:
+        cola.fallar(raw, mensaje, result.get('error'))
+    
+    return result
+
+
+def worker_thread(worker_id, cola, running):
+    """
+    Thread worker que procesa videos de la cola durable
     
     Args:
         worker_id: ID del worker
-        task_queue: Cola de tareas
+        cola: VideoJobQueue compartida
+        running: Lista [bool] que indica si el worker debe seguir
     """
+    worker_token = f"{os.getenv('HOSTNAME', 'worker')}:{os.getpid()}:{worker_id}:{uuid.uuid4().hex[:8]}"
     logger.info(f"Worker {worker_id} iniciado")
     
-    while True:
+    while running[0]:
         try:
-            # Obtener tarea de la cola
-            task = task_queue.get()
-            
-            if task is None:
-                # Señal de parada
-                logger.info(f"Worker {worker_id} detenido")
-                break
-            
-            video_id = task['video_id']
-            ruta_original = task['ruta_video']
+            trabajo = cola.tomar(worker_token, timeout=5)
+            if trabajo is None:
+                continue
             
-            logger.info(f"Worker {worker_id} procesando video {video_id}")
+            raw, mensaje = trabajo
+            video_id = mensaje['video_id']
+            logger.info(f"Worker {worker_id} procesando video {video_id} (intento {mensaje.get('intentos', 0) + 1})")
             
-            # Procesar video
-            result = VideoProcessor.procesar_video_completo(video_id, ruta_original)
+            result = procesar_trabajo(cola, worker_token, raw, mensaje)
             
             if result['success']:
                 logger.info(f"Worker {worker_id} completó video {video_id}")
             else:
                 logger.error(f"Worker {worker_id} falló procesando video {video_id}: {result.get('error')}")
             
-            # Marcar tarea como completada
-            task_queue.task_done()
-            
+        except redis.ConnectionError as e:
+            logger.error(f"Worker {worker_id} sin conexión a Redis: {e}")
+            time.sleep(5)
         except Exception as e:
             logger.error(f"Error en worker {worker_id}: {e}", exc_info=True)
-            task_queue.task_done()
+    
+    logger.info(f"Worker {worker_id} detenido")
 
 
-def callback_mensaje_redis(message_data: str, task_queue: Queue):
+def mantenimiento_cola(cola, running, intervalo=None):
     """
-    Callback para procesar mensajes de Redis Pub/Sub
+    Mueve los reintentos vencidos a pendientes, recupera trabajos de workers
+    caídos y elimina las cargas por partes expiradas
     
     Args:
-        message_data: Cuerpo del mensaje (JSON string)
-        task_queue: Cola de tareas para los workers
+        cola: VideoJobQueue compartida
+        running: Lista [bool] que indica si el hilo debe seguir
+        intervalo: Segundos entre revisiones
     """
-    try:
-        mensaje = json.loads(message_data)
-        
-        video_id = mensaje.get('video_id')
-        estado = mensaje.get('estado')
-        ruta_video = mensaje.get('ruta_video')
-        
-        logger.info(f"📨 Mensaje recibido - Video: {video_id}, Estado: {estado}")
-        
-        # Solo procesar si está en estado 'cargado'
-        if estado == 'cargado':
-            # Agregar a cola de procesamiento
-            task_queue.put({
-                'video_id': video_id,
-                'ruta_video': ruta_video,
-                'metadata': mensaje.get('metadata', {})
-            })
-            
-            logger.info(f"✅ Video {video_id} agregado a cola de procesamiento")
-        else:
-            logger.info(f"⏭️ Video {video_id} ignorado (estado: {estado})")
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Error decodificando mensaje: {e}")
-    except Exception as e:
-        logger.error(f"❌ Error procesando mensaje: {e}", exc_info=True)
+    intervalo = intervalo or max(5, cola.lease_segundos // 4)
+    while running[0]:
+        try:
+            movidos = cola.mover_reintentos_vencidos()
+            if movidos:
+                logger.info(f"🔁 {movidos} videos devueltos a la cola para reintento")
+            actualizar_estado_recuperados(cola.recuperar_abandonados())
+            with obtener_app().app_context():
+                CargaVideoService.limpiar_cargas_expiradas()
+        except Exception as e:
+            logger.error(f"Error en mantenimiento de la cola: {e}", exc_info=True)
+        time.sleep(intervalo)
 
 
 if __name__ == "__main__":
     logger.info("=" * 60)
     logger.info("Iniciando worker de procesamiento de videos")
-    logger.info(f"Workers en paralelo: {NUM_WORKERS}")
+    logger.info(f"Workers en paralelo: {NUM_WORKERS} (hilos ffmpeg por video: {FFMPEG_THREADS})")
     logger.info("=" * 60)
     
-    # Crear aplicación Flask (para contexto de DB)
-    app = create_app()
-    
-    # Crear cola de tareas para workers
-    task_queue = Queue()
-    
-    # Crear y arrancar workers
-    workers = []
-    for i in range(NUM_WORKERS):
-        worker = threading.Thread(
-            target=worker_thread,
-            args=(i + 1, task_queue),
-            daemon=True
-        )
-        worker.start()
-        workers.append(worker)
-    
-    logger.info(f"✅ {NUM_WORKERS} workers iniciados correctamente")
-    
     # Configuración de Redis - soporta varias formas de pasar la configuración
     # - REDIS_URL (ej: redis://host:6379/0)
     # - REDIS_PORT puede venir como un número o como 'tcp://ip:port'
@@ -394,7 +837,7 @@ if __name__ == "__main__":
     
     # Variables de control
     redis_client = None
-    pubsub = None
+    workers = []
     running = [True]  # Usar lista para poder modificar en signal_handler
     
     def signal_handler(signum, frame):
@@ -407,35 +850,44 @@ if __name__ == "__main__":
     signal.signal(signal.SIGTERM, signal_handler)
     
     try:
-        # Conectar a Redis
+        # Conectar a Redis (el timeout de lectura debe superar el de BRPOPLPUSH)
         redis_client = redis.Redis(
             host=redis_host,
             port=redis_port,
             db=redis_db,
             decode_responses=True,
-            socket_connect_timeout=5
+            socket_connect_timeout=5,
+            socket_timeout=30,
+            health_check_interval=30
         )
 
         # Test de conexión
         redis_client.ping()
         logger.info("✅ Conectado a Redis exitosamente")
 
-        # Suscribirse al canal de procesamiento de videos
-        pubsub = redis_client.pubsub()
-        pubsub.subscribe('video_processing')
-        logger.info("✅ Suscrito al canal 'video_processing'")
-        logger.info("👂 Esperando mensajes...")
-
-        # Loop de escucha
-        for message in pubsub.listen():
-            if not running[0]:
-                logger.info("🛑 Deteniendo loop de escucha...")
-                break
-
-            if message['type'] == 'message':
-                callback_mensaje_redis(message['data'], task_queue)
-            elif message['type'] == 'subscribe':
-                logger.info(f"✅ Subscripción confirmada al canal '{message['channel']}'")
+        # Crear la app y el pool de conexiones una sola vez para todos los hilos
+        obtener_app()
+        
+        cola = VideoJobQueue(redis_client, 'video_processing')
+        logger.info(f"📊 Estado de la cola 'video_processing': {cola.estadisticas()}")
+        
+        # Crear y arrancar workers
+        for i in range(NUM_WORKERS):
+            worker = threading.Thread(
+                target=worker_thread,
+                args=(i + 1, cola, running),
+                daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+        
+        threading.Thread(target=mantenimiento_cola, args=(cola, running), daemon=True).start()
+        
+        logger.info(f"✅ {NUM_WORKERS} workers iniciados correctamente")
+        logger.info("👂 Esperando videos...")
+        
+        while running[0]:
+            time.sleep(1)
         
     except redis.ConnectionError as e:
         logger.error(f"❌ Error de conexión a Redis: {e}")
@@ -446,21 +898,15 @@ if __name__ == "__main__":
         logger.error(f"❌ Error fatal en worker: {e}", exc_info=True)
         sys.exit(1)
     finally:
-        # Cleanup
+        # Cleanup: los workers terminan el video en curso; lo que no alcance a
+        # terminar queda en 'processing' y se recupera al vencer su lease
         logger.info("🧹 Limpiando recursos...")
+        running[0] = False
         
-        # Detener workers
         logger.info("⏹️ Deteniendo workers de procesamiento...")
-        for _ in range(NUM_WORKERS):
-            task_queue.put(None)
-        
         for worker in workers:
-            worker.join(timeout=5)
+            worker.join(timeout=30)
         
-        # Cerrar Redis
-        if pubsub:
-            pubsub.unsubscribe()
-            pubsub.close()
         if redis_client:
             redis_client.close()
         
@@ -20,6 +20,17 @@ class Config:
     # Cache Configuration
     CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 3600))  # 1 hora
     CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    # Claves examinadas por llamada a SCAN (tamaño de página por defecto al listar)
+    CACHE_SCAN_COUNT = int(os.getenv('CACHE_SCAN_COUNT', 500))
+    CACHE_SCAN_MAX_COUNT = int(os.getenv('CACHE_SCAN_MAX_COUNT', 5000))
+    # Operaciones máximas por llamada a /api/cache/pipeline
+    CACHE_PIPELINE_MAX_OPS = int(os.getenv('CACHE_PIPELINE_MAX_OPS', 1000))
+    # Formato de los valores: json | orjson | msgpack, compresión none | zlib | zstd | lz4
+    CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'json')
+    CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'none')
+    CACHE_COMPRESSION_MIN_BYTES = int(os.getenv('CACHE_COMPRESSION_MIN_BYTES', 1024))
+    # Canal donde se publican las claves escritas o eliminadas (caches L1 de los BFFs); vacío = no publicar
+    CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidaciones')
     
     # Queue Configuration
     QUEUE_CHANNEL = os.getenv('QUEUE_CHANNEL', 'inventarios_updates')
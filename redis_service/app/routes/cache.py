@@ -1,7 +1,8 @@
 """
 Endpoints para operaciones de Cache
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
+from app.services.cache_codec import MEDIA_TYPE
 from app.services.redis_service import redis_client
 
 cache_bp = Blueprint('cache', __name__)
@@ -13,8 +14,23 @@ def get_cache(key):
     Obtener valor del cache
     
     GET /api/cache/{key}
+    
+    Con "Accept: application/vnd.medisupply.cache" se devuelve el valor
+    codificado tal como está guardado, para que el cliente lo decodifique
+    (ver cache_codec) sin pasar por JSON.
     """
     try:
+        if request.accept_mimetypes.best == MEDIA_TYPE:
+            data = redis_client.cache_get_raw(key)
+            if data is None:
+                return jsonify({
+                    'message': 'Clave no encontrada en cache',
+                    'key': key
+                }), 404
+            response = Response(data, mimetype=MEDIA_TYPE)
+            response.headers['X-Cache-TTL'] = str(redis_client.cache_ttl(key))
+            return response
+        
         value = redis_client.cache_get(key)
         
         if value is None:
@@ -69,6 +85,36 @@ def set_cache():
         return jsonify({'error': str(e)}), 500
 
 
+@cache_bp.route('/<key>', methods=['PUT'])
+def set_cache_raw(key):
+    """
+    Guardar un valor ya codificado por el cliente
+    
+    PUT /api/cache/{key}?ttl=3600
+    Content-Type: application/vnd.medisupply.cache
+    Body: valor codificado (ver cache_codec)
+    """
+    try:
+        if request.mimetype != MEDIA_TYPE:
+            return jsonify({
+                'error': f'Content-Type debe ser {MEDIA_TYPE}'
+            }), 415
+        
+        ttl = request.args.get('ttl', type=int)
+        redis_client.cache_set_raw(key, request.get_data(), ttl)
+        
+        return jsonify({
+            'message': 'Valor guardado en cache',
+            'key': key,
+            'ttl': ttl or redis_client.config['CACHE_DEFAULT_TTL']
+        }), 201
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @cache_bp.route('/<key>', methods=['DELETE'])
 def delete_cache(key):
     """
@@ -99,16 +145,21 @@ def delete_cache_pattern(pattern):
     """
     Eliminar claves que coincidan con un patrón
     
-    DELETE /api/cache/pattern/{pattern}
+    DELETE /api/cache/pattern/{pattern}?async=true
     Ejemplo: DELETE /api/cache/pattern/inventarios:*
+    
+    Con async=true se usa UNLINK: Redis libera la memoria en segundo plano,
+    recomendado para invalidaciones grandes.
     """
     try:
-        deleted_count = redis_client.cache_delete_pattern(pattern)
+        unlink = request.args.get('async', 'false').lower() == 'true'
+        deleted_count = redis_client.cache_delete_pattern(pattern, unlink=unlink)
         
         return jsonify({
             'message': f'Claves eliminadas',
             'pattern': pattern,
-            'deleted_count': deleted_count
+            'deleted_count': deleted_count,
+            'async': unlink
         }), 200
         
     except Exception as e:
@@ -137,20 +188,79 @@ def exists_cache(key):
 @cache_bp.route('/keys', methods=['GET'])
 def list_keys():
     """
-    Listar claves que coincidan con un patrón
+    Listar claves que coincidan con un patrón, paginado con SCAN
+    
+    GET /api/cache/keys?pattern=inventarios:*&cursor=0&count=500
     
-    GET /api/cache/keys?pattern=inventarios:*
+    Para obtener la página siguiente se envía el "cursor" de la respuesta;
+    el listado termina cuando la respuesta trae "cursor": "0".
     """
     try:
         pattern = request.args.get('pattern', '*')
-        keys = redis_client.cache_keys(pattern)
+        config = redis_client.config or {}
+        max_count = config.get('CACHE_SCAN_MAX_COUNT', 5000)
+        
+        try:
+            cursor = int(request.args.get('cursor', 0))
+            count = int(request.args.get('count', config.get('CACHE_SCAN_COUNT', 500)))
+        except ValueError:
+            return jsonify({'error': 'Los parámetros "cursor" y "count" deben ser enteros'}), 400
+        
+        if cursor < 0 or count < 1:
+            return jsonify({'error': 'Los parámetros "cursor" y "count" deben ser positivos'}), 400
+        
+        next_cursor, keys = redis_client.cache_scan(pattern, cursor, min(count, max_count))
         
         return jsonify({
             'pattern': pattern,
             'count': len(keys),
-            'keys': keys
+            'keys': keys,
+            # Como texto: los cursores de SCAN pueden exceder el rango seguro de JSON
+            'cursor': str(next_cursor),
+            'complete': next_cursor == 0
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@cache_bp.route('/pipeline', methods=['POST'])
+def pipeline_cache():
+    """
+    Ejecutar varias operaciones de cache en un solo viaje a Redis
+    
+    POST /api/cache/pipeline
+    Body: {
+        "operations": [
+            {"op": "set", "key": "a", "value": {...}, "ttl": 60},
+            {"op": "get", "key": "b"},
+            {"op": "delete", "key": "c"},
+            {"op": "ttl", "key": "a"},
+            {"op": "exists", "key": "b"}
+        ],
+        "transaction": false  // opcional, true = MULTI/EXEC
+    }
+    
+    Devuelve un resultado por operación, en el mismo orden.
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Se requiere un objeto JSON con "operations"'}), 400
+        
+        transaction = bool(data.get('transaction', False))
+        results = redis_client.cache_pipeline(data.get('operations'), transaction=transaction)
+        
+        return jsonify({
+            'transaction': transaction,
+            'count': len(results),
+            'errors': sum(1 for result in results if 'error' in result),
+            'results': results
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
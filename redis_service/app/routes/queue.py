@@ -20,8 +20,13 @@ def publish_message():
             "event": "update",
             "producto_id": 123,
             "data": {...}
-        }
+        },
+        "durable": false
     }
+
+    Con "durable": true el mensaje además se guarda en la cola durable del mismo
+    nombre (queue:{channel}:pending), de modo que no se pierde si no hay
+    consumidores conectados en ese momento.
     """
     try:
         data = request.get_json()
@@ -34,17 +39,31 @@ def publish_message():
         channel = data['channel']
         message = data['message']
 
+        durable = data.get('durable', False)
+        if not isinstance(durable, bool):
+            return jsonify({
+                'error': 'El campo "durable" debe ser booleano (true/false)'
+            }), 400
+
+        queued = None
+        if durable:
+            queued = redis_client.queue_push(channel, message)
+
         subscribers = redis_client.queue_publish(channel, message)
 
         current_app.logger.info(
             "📤 Mensaje publicado en '%s' - %s subscriptores", channel, subscribers
         )
 
-        return jsonify({
+        body = {
             'message': 'Mensaje publicado',
             'channel': channel,
             'subscribers': subscribers
-        }), 200
+        }
+        if durable:
+            body['queued'] = queued
+
+        return jsonify(body), 200
 
     except BadRequest as exc:
         return jsonify({'error': 'JSON inválido', 'details': str(exc)}), 400
@@ -99,3 +118,23 @@ def get_subscribers(channel):
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@queue_bp.route('/jobs/<queue>', methods=['GET'])
+def get_queue_stats(queue):
+    """
+    Obtener el número de mensajes pendientes, en curso, programados para
+    reintento y descartados de una cola durable
+
+    GET /api/queue/jobs/{queue}
+    """
+    try:
+        stats = redis_client.queue_stats(queue)
+
+        return jsonify({
+            'queue': queue,
+            **stats
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,16 +2,23 @@
 Servicio de Redis para Cache y Cola (Pub/Sub)
 """
 import json
+import logging
 import redis
-from typing import Optional, Dict, Any, List
+from app.services.cache_codec import CacheCodec
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
 
 class RedisService:
     """Servicio para manejar operaciones de Redis"""
     
     def __init__(self):
         self.client: Optional[redis.Redis] = None
+        # Cliente sin decode_responses para los valores de cache (pueden ser binarios)
+        self.value_client: Optional[redis.Redis] = None
+        self.codec = CacheCodec()
         self.pubsub = None
         self.config = None
     
@@ -31,6 +38,18 @@ class RedisService:
                 health_check_interval=30
             )
             
+            self.value_client = redis.Redis(
+                host=app.config['REDIS_HOST'],
+                port=app.config['REDIS_PORT'],
+                db=app.config['REDIS_DB'],
+                password=app.config['REDIS_PASSWORD'],
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+            self.codec = CacheCodec.from_config(app.config)
+            
             # Test conexión
             self.client.ping()
             app.logger.info(f"✅ Redis conectado en {app.config['REDIS_HOST']}:{app.config['REDIS_PORT']}")
@@ -50,12 +69,27 @@ class RedisService:
     # OPERACIONES DE CACHE
     # ============================================
     
+    def _publish_invalidation(self, message: Dict[str, Any]) -> None:
+        """
+        Avisar a los caches L1 de los BFFs que una o más claves cambiaron
+        
+        Se publica en CACHE_INVALIDATION_CHANNEL; un fallo al publicar no
+        invalida la escritura (los L1 igual expiran por TTL).
+        """
+        channel = (self.config or {}).get('CACHE_INVALIDATION_CHANNEL')
+        if not channel:
+            return
+        try:
+            self.client.publish(channel, json.dumps(message))
+        except Exception as e:
+            logger.warning(f"No se pudo publicar invalidación {message}: {e}")
+    
     def cache_get(self, key: str) -> Optional[Any]:
-        """Obtener valor del cache"""
+        """Obtener valor del cache (en cualquiera de los formatos del codec)"""
         try:
-            value = self.client.get(key)
+            value = self.value_client.get(key)
             if value:
-                return json.loads(value)
+                return self.codec.decode(value)
             return None
         except Exception as e:
             raise Exception(f"Error al obtener cache: {str(e)}")
@@ -66,44 +100,70 @@ class RedisService:
         
         Args:
             key: Clave del cache
-            value: Valor a guardar (será serializado a JSON)
+            value: Valor a guardar (serializado con el codec configurado)
             ttl: Tiempo de vida en segundos (None = usa default)
         """
         try:
             ttl = ttl or self.config['CACHE_DEFAULT_TTL']
-            serialized = json.dumps(value)
-            return self.client.setex(key, ttl, serialized)
+            result = self.value_client.setex(key, ttl, self.codec.encode(value))
+            self._publish_invalidation({'keys': [key]})
+            return result
+        except Exception as e:
+            raise Exception(f"Error al guardar en cache: {str(e)}")
+    
+    def cache_get_raw(self, key: str) -> Optional[bytes]:
+        """Obtener el valor codificado tal como está guardado (sin decodificar)"""
+        try:
+            return self.value_client.get(key)
+        except Exception as e:
+            raise Exception(f"Error al obtener cache: {str(e)}")
+    
+    def cache_set_raw(self, key: str, data: bytes, ttl: Optional[int] = None) -> bool:
+        """
+        Guardar un valor ya codificado por el cliente (ver cache_codec)
+        
+        Raises:
+            ValueError: Si los bytes no tienen un formato de valor reconocible
+        """
+        if not CacheCodec.is_encoded(data):
+            raise ValueError('El valor no tiene un formato de cache válido')
+        try:
+            ttl = ttl or self.config['CACHE_DEFAULT_TTL']
+            result = self.value_client.setex(key, ttl, data)
+            self._publish_invalidation({'keys': [key]})
+            return result
         except Exception as e:
             raise Exception(f"Error al guardar en cache: {str(e)}")
     
     def cache_delete(self, key: str) -> int:
         """Eliminar clave del cache"""
         try:
-            return self.client.delete(key)
+            deleted = self.client.delete(key)
+            self._publish_invalidation({'keys': [key]})
+            return deleted
         except Exception as e:
             raise Exception(f"Error al eliminar cache: {str(e)}")
     
-    def cache_delete_pattern(self, pattern: str) -> int:
+    def cache_delete_pattern(self, pattern: str, unlink: bool = False) -> int:
         """
         Eliminar múltiples claves que coincidan con un patrón
         
         Args:
             pattern: Patrón Redis (ej: "inventarios:producto:*")
+            unlink: Usar UNLINK en lugar de DEL; Redis libera la memoria en
+                segundo plano, así borrar valores grandes no bloquea el servidor
         
         Returns:
             Número de claves eliminadas
         """
         try:
-            cursor = 0
+            borrar = self.client.unlink if unlink else self.client.delete
             deleted = 0
 
-            while True:
-                cursor, keys = self.client.scan(cursor=cursor, match=pattern, count=100)
-                if keys:
-                    deleted += self.client.delete(*keys)
-                if cursor == 0:
-                    break
+            for keys in self._scan_batches(pattern, self._scan_count()):
+                deleted += borrar(*keys)
 
+            self._publish_invalidation({'pattern': pattern})
             return deleted
         except Exception as e:
             raise Exception(f"Error al eliminar claves por patrón: {str(e)}")
@@ -122,17 +182,163 @@ class RedisService:
         except Exception as e:
             raise Exception(f"Error al obtener TTL: {str(e)}")
     
+    def _scan_count(self) -> int:
+        """Claves examinadas por cada llamada a SCAN"""
+        return (self.config or {}).get('CACHE_SCAN_COUNT', 500)
+
+    def _scan_batches(self, pattern: str, count: int):
+        """Recorrer con SCAN las claves de un patrón, lote por lote (sin lotes vacíos)"""
+        cursor = 0
+        while True:
+            cursor, keys = self.client.scan(cursor=cursor, match=pattern, count=count)
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
+    def cache_scan(self, pattern: str = "*", cursor: int = 0, count: Optional[int] = None) -> Tuple[int, List[str]]:
+        """
+        Obtener una página de claves que coincidan con un patrón
+        
+        Usa SCAN, que recorre el keyspace por partes sin bloquear Redis. Como
+        SCAN puede devolver lotes vacíos cuando pocas claves coinciden, se sigue
+        avanzando hasta reunir `count` claves o terminar el recorrido.
+        
+        Args:
+            pattern: Patrón Redis (ej: "inventarios:*")
+            cursor: Cursor devuelto por la página anterior (0 para empezar)
+            count: Tamaño de página aproximado (None = usa CACHE_SCAN_COUNT)
+        
+        Returns:
+            Tupla (cursor siguiente, claves); el cursor es 0 cuando no hay más páginas
+        """
+        try:
+            count = count or self._scan_count()
+            keys: List[str] = []
+            while True:
+                cursor, batch = self.client.scan(cursor=cursor, match=pattern, count=count)
+                keys.extend(batch)
+                if cursor == 0 or len(keys) >= count:
+                    return cursor, keys
+        except Exception as e:
+            raise Exception(f"Error al listar claves: {str(e)}")
+
     def cache_keys(self, pattern: str = "*") -> List[str]:
-        """Listar claves que coincidan con un patrón"""
+        """Listar todas las claves que coincidan con un patrón (recorriendo con SCAN)"""
         try:
-            return self.client.keys(pattern)
+            keys = set()
+            for batch in self._scan_batches(pattern, self._scan_count()):
+                keys.update(batch)
+            return list(keys)
         except Exception as e:
             raise Exception(f"Error al listar claves: {str(e)}")
     
+    PIPELINE_OPERATIONS = ('get', 'set', 'delete', 'ttl', 'exists')
+    
+    def _validate_pipeline_operations(self, operations: Any) -> None:
+        """
+        Validar las operaciones antes de enviar nada a Redis
+        
+        Raises:
+            ValueError: Si alguna operación es inválida (se indica su posición)
+        """
+        max_ops = (self.config or {}).get('CACHE_PIPELINE_MAX_OPS', 1000)
+        if not isinstance(operations, list) or not operations:
+            raise ValueError('Se requiere una lista "operations" no vacía')
+        if len(operations) > max_ops:
+            raise ValueError(f'Máximo {max_ops} operaciones por pipeline')
+        
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                raise ValueError(f'Operación {index}: debe ser un objeto')
+            if operation.get('op') not in self.PIPELINE_OPERATIONS:
+                raise ValueError(
+                    f'Operación {index}: "op" debe ser uno de {", ".join(self.PIPELINE_OPERATIONS)}'
+                )
+            if not isinstance(operation.get('key'), str) or not operation['key']:
+                raise ValueError(f'Operación {index}: se requiere "key"')
+            if operation['op'] == 'set':
+                if 'value' not in operation:
+                    raise ValueError(f'Operación {index}: "set" requiere "value"')
+                ttl = operation.get('ttl')
+                if ttl is not None and (not isinstance(ttl, int) or isinstance(ttl, bool) or ttl < 1):
+                    raise ValueError(f'Operación {index}: "ttl" debe ser un entero positivo')
+    
+    def cache_pipeline(self, operations: List[Dict[str, Any]], transaction: bool = False) -> List[Dict[str, Any]]:
+        """
+        Ejecutar varias operaciones de cache en un solo viaje a Redis
+        
+        Args:
+            operations: Lista ordenada de operaciones, por ejemplo
+                {"op": "set", "key": "k", "value": {...}, "ttl": 60},
+                {"op": "get", "key": "k"}, {"op": "delete", "key": "k"},
+                {"op": "ttl", "key": "k"}, {"op": "exists", "key": "k"}
+            transaction: Ejecutar dentro de MULTI/EXEC (todo o nada frente a
+                otros clientes); sin transacción solo se agrupan los comandos
+        
+        Returns:
+            Un resultado por operación, en el mismo orden. Si una operación
+            falla en Redis su resultado trae "error" y las demás se conservan.
+        
+        Raises:
+            ValueError: Si alguna operación es inválida (no se ejecuta ninguna)
+        """
+        self._validate_pipeline_operations(operations)
+        
+        try:
+            default_ttl = self.config['CACHE_DEFAULT_TTL']
+            pipe = self.value_client.pipeline(transaction=transaction)
+            for operation in operations:
+                op, key = operation['op'], operation['key']
+                if op == 'get':
+                    pipe.get(key)
+                elif op == 'set':
+                    pipe.setex(key, operation.get('ttl') or default_ttl, self.codec.encode(operation['value']))
+                elif op == 'delete':
+                    pipe.delete(key)
+                elif op == 'ttl':
+                    pipe.ttl(key)
+                else:
+                    pipe.exists(key)
+            replies = pipe.execute(raise_on_error=False)
+        except Exception as e:
+            raise Exception(f"Error al ejecutar pipeline: {str(e)}")
+        
+        results = []
+        changed_keys = []
+        for operation, reply in zip(operations, replies):
+            op, key = operation['op'], operation['key']
+            result = {'op': op, 'key': key}
+            if isinstance(reply, Exception):
+                result['error'] = str(reply)
+            elif op == 'get':
+                try:
+                    result['found'] = reply is not None
+                    result['value'] = self.codec.decode(reply) if reply is not None else None
+                except ValueError as e:
+                    result = {'op': op, 'key': key, 'error': str(e)}
+            elif op == 'set':
+                result['ttl'] = operation.get('ttl') or default_ttl
+                changed_keys.append(key)
+            elif op == 'delete':
+                result['deleted'] = reply
+                changed_keys.append(key)
+            elif op == 'ttl':
+                result['ttl'] = reply
+            else:
+                result['exists'] = bool(reply)
+            results.append(result)
+        
+        if changed_keys:
+            self._publish_invalidation({'keys': list(dict.fromkeys(changed_keys))})
+        return results
+    
     def cache_flush(self) -> bool:
         """Limpiar todo el cache (¡usar con precaución!)"""
         try:
-            return self.client.flushdb()
+            result = self.client.flushdb()
+            self._publish_invalidation({'flush': True})
+            return result
         except Exception as e:
             raise Exception(f"Error al limpiar cache: {str(e)}")
     
@@ -188,7 +394,59 @@ class RedisService:
             return result[0][1] if result else 0
         except Exception as e:
             raise Exception(f"Error al obtener subscriptores: {str(e)}")
-    
+
+    # ============================================
+    # COLAS DURABLES (listas)
+    # ============================================
+
+    @staticmethod
+    def queue_key(queue: str, parte: str) -> str:
+        """
+        Nombre de la llave de una cola durable
+
+        Los consumidores usan las mismas llaves: queue:{nombre}:pending (por tomar),
+        :processing (en curso), :delayed (reintentos programados) y :dead (descartados).
+        """
+        return f"queue:{queue}:{parte}"
+
+    def queue_push(self, queue: str, message: Dict[str, Any]) -> int:
+        """
+        Agregar un mensaje a una cola durable
+
+        A diferencia de Pub/Sub, el mensaje queda guardado en Redis hasta que un
+        consumidor lo toma, aunque no haya nadie escuchando al momento de publicar.
+
+        Args:
+            queue: Nombre de la cola
+            message: Mensaje (será serializado a JSON)
+
+        Returns:
+            Número de mensajes pendientes en la cola
+        """
+        try:
+            serialized = json.dumps(message)
+            return self.client.lpush(self.queue_key(queue, 'pending'), serialized)
+        except Exception as e:
+            raise Exception(f"Error al encolar mensaje: {str(e)}")
+
+    def queue_stats(self, queue: str) -> Dict[str, int]:
+        """Obtener el número de mensajes en cada estado de una cola durable"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.llen(self.queue_key(queue, 'pending'))
+            pipe.llen(self.queue_key(queue, 'processing'))
+            pipe.zcard(self.queue_key(queue, 'delayed'))
+            pipe.zcard(self.queue_key(queue, 'dead'))
+            pending, processing, delayed, dead = pipe.execute()
+            return {
+                'pending': pending,
+                'processing': processing,
+                'delayed': delayed,
+                'dead': dead
+            }
+        except Exception as e:
+            raise Exception(f"Error al obtener estado de la cola: {str(e)}")
+
     # ============================================
     # ESTADÍSTICAS Y MONITOREO
     # ============================================
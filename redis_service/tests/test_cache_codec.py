@@ -0,0 +1,64 @@
+"""Pruebas del codec de valores de cache."""
+
+import json
+import zlib
+
+import pytest
+
+from app.services.cache_codec import CacheCodec, MAGIC
+
+
+def test_json_sin_compresion_es_formato_anterior():
+    codec = CacheCodec()
+    data = codec.encode({'a': [1, 2]})
+
+    assert json.loads(data) == {'a': [1, 2]}
+    assert codec.decode(data) == {'a': [1, 2]}
+
+
+def test_lee_valores_antiguos_guardados_como_texto():
+    codec = CacheCodec('orjson', 'zlib')
+
+    assert codec.decode('{"legacy": true}') == {'legacy': True}
+    assert codec.decode(b'[1, 2, 3]') == [1, 2, 3]
+
+
+def test_comprime_solo_sobre_el_umbral():
+    codec = CacheCodec('orjson', 'zlib', compression_min_bytes=100)
+    pequeño = codec.encode({'id': 1})
+    grande = codec.encode({'productos': ['x' * 10] * 50})
+
+    assert pequeño[:3] == MAGIC + b'j-'
+    assert grande[:3] == MAGIC + b'jz'
+    assert json.loads(zlib.decompress(grande[3:])) == {'productos': ['x' * 10] * 50}
+    assert codec.decode(grande) == {'productos': ['x' * 10] * 50}
+
+
+def test_decodifica_formato_distinto_al_propio():
+    escritor = CacheCodec('json', 'zlib', compression_min_bytes=0)
+    lector = CacheCodec()
+
+    assert lector.decode(escritor.encode({'v': 1})) == {'v': 1}
+
+
+def test_formato_no_soportado():
+    with pytest.raises(ValueError):
+        CacheCodec('pickle')
+    with pytest.raises(ValueError):
+        CacheCodec('json', 'brotli')
+    with pytest.raises(ValueError):
+        CacheCodec().decode(MAGIC + b'x-{}')
+
+
+def test_from_config():
+    codec = CacheCodec.from_config({'CACHE_SERIALIZER': 'orjson', 'CACHE_COMPRESSION': 'zlib',
+                                    'CACHE_COMPRESSION_MIN_BYTES': '10'})
+
+    assert (codec.serializer, codec.compression, codec.compression_min_bytes) == ('orjson', 'zlib', 10)
+
+
+def test_is_encoded():
+    assert CacheCodec.is_encoded(b'{"a": 1}')
+    assert CacheCodec.is_encoded(MAGIC + b'mz...')
+    assert not CacheCodec.is_encoded(MAGIC + b'?')
+    assert not CacheCodec.is_encoded(b'')
@@ -118,6 +118,48 @@ def test_cache_delete_error(client, cache_service_mock):
     assert 'fail' in response.get_json()['error']
 
 
+def test_cache_get_raw_devuelve_valor_codificado(client, cache_service_mock):
+    cache_service_mock.cache_get_raw.return_value = b'\xc1jz\x00\x01'
+    cache_service_mock.cache_ttl.return_value = 90
+
+    response = client.get('/api/cache/catalogo', headers={'Accept': 'application/vnd.medisupply.cache'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.medisupply.cache'
+    assert response.data == b'\xc1jz\x00\x01'
+    assert response.headers['X-Cache-TTL'] == '90'
+    cache_service_mock.cache_get.assert_not_called()
+
+
+def test_cache_get_raw_miss(client, cache_service_mock):
+    cache_service_mock.cache_get_raw.return_value = None
+
+    response = client.get('/api/cache/catalogo', headers={'Accept': 'application/vnd.medisupply.cache'})
+
+    assert response.status_code == 404
+
+
+def test_cache_put_raw(client, cache_service_mock):
+    response = client.put(
+        '/api/cache/catalogo?ttl=60',
+        data=b'\xc1j-[]',
+        content_type='application/vnd.medisupply.cache'
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()['ttl'] == 60
+    cache_service_mock.cache_set_raw.assert_called_once_with('catalogo', b'\xc1j-[]', 60)
+
+
+def test_cache_put_raw_valida_content_type_y_formato(client, cache_service_mock):
+    response = client.put('/api/cache/catalogo', json={'value': 1})
+    assert response.status_code == 415
+
+    cache_service_mock.cache_set_raw.side_effect = ValueError('El valor no tiene un formato de cache válido')
+    response = client.put('/api/cache/catalogo', data=b'\xc1?', content_type='application/vnd.medisupply.cache')
+    assert response.status_code == 400
+
+
 def test_cache_delete_pattern(client, cache_service_mock):
     cache_service_mock.cache_delete_pattern.return_value = 3
 
@@ -127,6 +169,18 @@ def test_cache_delete_pattern(client, cache_service_mock):
     body = response.get_json()
     assert body['pattern'] == 'inventarios:*'
     assert body['deleted_count'] == 3
+    assert body['async'] is False
+    cache_service_mock.cache_delete_pattern.assert_called_once_with('inventarios:*', unlink=False)
+
+
+def test_cache_delete_pattern_async_usa_unlink(client, cache_service_mock):
+    cache_service_mock.cache_delete_pattern.return_value = 40
+
+    response = client.delete('/api/cache/pattern/productos:*?async=true')
+
+    assert response.status_code == 200
+    assert response.get_json()['async'] is True
+    cache_service_mock.cache_delete_pattern.assert_called_once_with('productos:*', unlink=True)
 
 
 def test_cache_exists(client, cache_service_mock):
@@ -139,7 +193,7 @@ def test_cache_exists(client, cache_service_mock):
 
 
 def test_cache_keys(client, cache_service_mock):
-    cache_service_mock.cache_keys.return_value = ['sku:1', 'sku:2']
+    cache_service_mock.cache_scan.return_value = (0, ['sku:1', 'sku:2'])
 
     response = client.get('/api/cache/keys?pattern=sku:*')
 
@@ -148,10 +202,32 @@ def test_cache_keys(client, cache_service_mock):
     assert body['pattern'] == 'sku:*'
     assert body['count'] == 2
     assert body['keys'] == ['sku:1', 'sku:2']
+    assert body['cursor'] == '0'
+    assert body['complete'] is True
+    cache_service_mock.cache_scan.assert_called_once_with('sku:*', 0, 500)
+
+
+def test_cache_keys_devuelve_cursor_de_continuacion(client, cache_service_mock):
+    cache_service_mock.config = {'CACHE_SCAN_COUNT': 500, 'CACHE_SCAN_MAX_COUNT': 1000}
+    cache_service_mock.cache_scan.return_value = (18446744073709551615, ['sku:3'])
+
+    response = client.get('/api/cache/keys?pattern=sku:*&cursor=42&count=5000')
+
+    body = response.get_json()
+    assert body['cursor'] == '18446744073709551615'
+    assert body['complete'] is False
+    cache_service_mock.cache_scan.assert_called_once_with('sku:*', 42, 1000)
+
+
+def test_cache_keys_parametros_invalidos(client, cache_service_mock):
+    response = client.get('/api/cache/keys?cursor=abc')
+
+    assert response.status_code == 400
+    cache_service_mock.cache_scan.assert_not_called()
 
 
 def test_cache_keys_error(client, cache_service_mock):
-    cache_service_mock.cache_keys.side_effect = RuntimeError('fail')
+    cache_service_mock.cache_scan.side_effect = RuntimeError('fail')
 
     response = client.get('/api/cache/keys')
 
@@ -173,3 +249,36 @@ def test_cache_flush_success(client, cache_service_mock):
 
     assert response.status_code == 200
     assert response.get_json()['message'] == 'Cache limpiado completamente'
+
+
+def test_cache_pipeline_success(client, cache_service_mock):
+    cache_service_mock.cache_pipeline.return_value = [
+        {'op': 'get', 'key': 'a', 'found': True, 'value': 1},
+        {'op': 'delete', 'key': 'b', 'error': 'fail'},
+    ]
+    operations = [{'op': 'get', 'key': 'a'}, {'op': 'delete', 'key': 'b'}]
+
+    response = client.post('/api/cache/pipeline', json={'operations': operations, 'transaction': True})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert body['errors'] == 1
+    assert body['transaction'] is True
+    cache_service_mock.cache_pipeline.assert_called_once_with(operations, transaction=True)
+
+
+def test_cache_pipeline_operaciones_invalidas(client, cache_service_mock):
+    cache_service_mock.cache_pipeline.side_effect = ValueError('Operación 0: se requiere "key"')
+
+    response = client.post('/api/cache/pipeline', json={'operations': [{'op': 'get'}]})
+
+    assert response.status_code == 400
+    assert 'key' in response.get_json()['error']
+
+
+def test_cache_pipeline_sin_body(client, cache_service_mock):
+    response = client.post('/api/cache/pipeline', data='x', content_type='text/plain')
+
+    assert response.status_code == 400
+    cache_service_mock.cache_pipeline.assert_not_called()
@@ -70,3 +70,44 @@ def test_queue_subscribers_error(client, queue_service_mock):
 
     assert response.status_code == 500
     assert 'fail' in response.get_json()['error']
+
+
+def test_queue_publish_durable_encola_mensaje(client, queue_service_mock):
+    queue_service_mock.queue_publish.return_value = 0
+    queue_service_mock.queue_push.return_value = 3
+
+    payload = {'channel': 'video_processing', 'message': {'video_id': 1}, 'durable': True}
+    response = client.post('/api/queue/publish', json=payload)
+
+    assert response.status_code == 200
+    assert response.get_json()['queued'] == 3
+    queue_service_mock.queue_push.assert_called_once_with('video_processing', {'video_id': 1})
+
+
+def test_queue_publish_sin_durable_no_encola(client, queue_service_mock):
+    queue_service_mock.queue_publish.return_value = 1
+
+    client.post('/api/queue/publish', json={'channel': 'a', 'message': {}})
+
+    queue_service_mock.queue_push.assert_not_called()
+
+
+
+@pytest.mark.parametrize('durable', ['false', '0', 1, None])
+def test_queue_publish_durable_no_booleano(client, queue_service_mock, durable):
+    payload = {'channel': 'a', 'message': {}, 'durable': durable}
+    response = client.post('/api/queue/publish', json=payload)
+
+    assert response.status_code == 400
+    queue_service_mock.queue_push.assert_not_called()
+    queue_service_mock.queue_publish.assert_not_called()
+
+def test_queue_job_stats_success(client, queue_service_mock):
+    queue_service_mock.queue_stats.return_value = {'pending': 2, 'processing': 1, 'delayed': 0, 'dead': 4}
+
+    response = client.get('/api/queue/jobs/video_processing')
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'queue': 'video_processing', 'pending': 2, 'processing': 1, 'delayed': 0, 'dead': 4
+    }
@@ -59,6 +59,26 @@ class TestRedisServiceUnit:
             service.cache_set("key", "value")
         assert "Error al guardar en cache" in str(exc.value)
 
+    def test_cache_set_usa_codec_configurado(self, service):
+        from app.services.cache_codec import CacheCodec
+        service.codec = CacheCodec('orjson', 'zlib', compression_min_bytes=0)
+        service.cache_set("catalogo", {"productos": [1]}, 60)
+        key, ttl, data = service.value_client.setex.call_args[0]
+        assert (key, ttl) == ("catalogo", 60)
+        assert data[:3] == b'\xc1jz'
+        service.value_client.get.return_value = data
+        assert service.cache_get("catalogo") == {"productos": [1]}
+
+    def test_cache_get_lee_valores_json_anteriores(self, service):
+        service.value_client.get.return_value = b'{"a": 1}'
+        assert service.cache_get("k") == {"a": 1}
+
+    def test_cache_set_raw_valida_formato(self, service):
+        with pytest.raises(ValueError):
+            service.cache_set_raw("k", b'\xc1?', 60)
+        service.cache_set_raw("k", b'\xc1m-\x90', 60)
+        service.value_client.setex.assert_called_with("k", 60, b'\xc1m-\x90')
+
     def test_cache_delete_error(self, service):
         service.client.delete.side_effect = Exception("Redis error")
         with pytest.raises(Exception) as exc:
@@ -84,11 +104,33 @@ class TestRedisServiceUnit:
         assert "Error al obtener TTL" in str(exc.value)
 
     def test_cache_keys_error(self, service):
-        service.client.keys.side_effect = Exception("Redis error")
+        service.client.scan.side_effect = Exception("Redis error")
         with pytest.raises(Exception) as exc:
             service.cache_keys("*")
         assert "Error al listar claves" in str(exc.value)
 
+    def test_cache_keys_recorre_con_scan_sin_keys(self, service):
+        service.client.scan.side_effect = [(7, ["a", "b"]), (0, ["b", "c"])]
+        assert sorted(service.cache_keys("x:*")) == ["a", "b", "c"]
+        service.client.keys.assert_not_called()
+
+    def test_cache_scan_avanza_lotes_vacios_hasta_llenar_pagina(self, service):
+        service.client.scan.side_effect = [(5, []), (9, ["a"]), (12, ["b", "c"])]
+        cursor, keys = service.cache_scan("x:*", cursor=3, count=2)
+        assert (cursor, keys) == (12, ["a", "b", "c"])
+        service.client.scan.assert_any_call(cursor=3, match="x:*", count=2)
+
+    def test_cache_scan_termina_con_cursor_cero(self, service):
+        service.client.scan.side_effect = [(0, ["a"])]
+        assert service.cache_scan("x:*", count=10) == (0, ["a"])
+
+    def test_cache_delete_pattern_unlink(self, service):
+        service.client.scan.side_effect = [(4, ["a", "b"]), (0, [])]
+        service.client.unlink.return_value = 2
+        assert service.cache_delete_pattern("x:*", unlink=True) == 2
+        service.client.unlink.assert_called_once_with("a", "b")
+        service.client.delete.assert_not_called()
+
     def test_cache_flush_error(self, service):
         service.client.flushdb.side_effect = Exception("Redis error")
         with pytest.raises(Exception) as exc:
@@ -119,8 +161,80 @@ class TestRedisServiceUnit:
             service.queue_num_subscribers("channel")
         assert "Error al obtener subscriptores" in str(exc.value)
 
+    def test_queue_push_usa_lista_pendientes(self, service):
+        service.client.lpush.return_value = 1
+        assert service.queue_push("video_processing", {"video_id": 7}) == 1
+        service.client.lpush.assert_called_once_with(
+            "queue:video_processing:pending", json.dumps({"video_id": 7})
+        )
+
+    def test_queue_push_error(self, service):
+        service.client.lpush.side_effect = Exception("Redis error")
+        with pytest.raises(Exception) as exc:
+            service.queue_push("video_processing", {})
+        assert "Error al encolar mensaje" in str(exc.value)
+
     def test_get_stats_error(self, service):
         service.client.info.side_effect = Exception("Redis error")
         stats = service.get_stats()
         assert stats['status'] == 'error'
         assert "Redis error" in stats['error']
+
+    def test_escrituras_publican_invalidacion(self, service):
+        service.config['CACHE_INVALIDATION_CHANNEL'] = 'cache:invalidaciones'
+        service.cache_set("zonas", ["norte"], 60)
+        service.cache_delete("zonas")
+        service.client.scan.return_value = (0, [])
+        service.cache_delete_pattern("inventarios:*")
+        service.cache_flush()
+
+        mensajes = [json.loads(c.args[1]) for c in service.client.publish.call_args_list]
+        assert mensajes == [{"keys": ["zonas"]}, {"keys": ["zonas"]}, {"pattern": "inventarios:*"}, {"flush": True}]
+
+    def test_fallo_al_publicar_invalidacion_no_falla_escritura(self, service):
+        service.config['CACHE_INVALIDATION_CHANNEL'] = 'cache:invalidaciones'
+        service.client.publish.side_effect = Exception("Redis error")
+        service.value_client.setex.return_value = True
+        assert service.cache_set("zonas", ["norte"], 60) is True
+
+    def test_cache_pipeline_ejecuta_en_orden(self, service):
+        service.config['CACHE_INVALIDATION_CHANNEL'] = 'cache:invalidaciones'
+        pipe = service.value_client.pipeline.return_value
+        pipe.execute.return_value = [True, b'{"a": 1}', None, 1, 55, 0, redis.ResponseError("WRONGTYPE")]
+
+        results = service.cache_pipeline([
+            {"op": "set", "key": "a", "value": {"a": 1}},
+            {"op": "get", "key": "a"},
+            {"op": "get", "key": "b"},
+            {"op": "delete", "key": "c"},
+            {"op": "ttl", "key": "a"},
+            {"op": "exists", "key": "b"},
+            {"op": "get", "key": "lista"},
+        ], transaction=True)
+
+        service.value_client.pipeline.assert_called_once_with(transaction=True)
+        pipe.setex.assert_called_once_with("a", 300, b'{"a": 1}')
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+        assert results == [
+            {"op": "set", "key": "a", "ttl": 300},
+            {"op": "get", "key": "a", "found": True, "value": {"a": 1}},
+            {"op": "get", "key": "b", "found": False, "value": None},
+            {"op": "delete", "key": "c", "deleted": 1},
+            {"op": "ttl", "key": "a", "ttl": 55},
+            {"op": "exists", "key": "b", "exists": False},
+            {"op": "get", "key": "lista", "error": "WRONGTYPE"},
+        ]
+        mensaje = json.loads(service.client.publish.call_args.args[1])
+        assert mensaje == {"keys": ["a", "c"]}
+
+    @pytest.mark.parametrize("operations", [
+        [],
+        [{"op": "incr", "key": "a"}],
+        [{"op": "get"}],
+        [{"op": "set", "key": "a"}],
+        [{"op": "set", "key": "a", "value": 1, "ttl": 0}],
+    ])
+    def test_cache_pipeline_valida_antes_de_ejecutar(self, service, operations):
+        with pytest.raises(ValueError):
+            service.cache_pipeline(operations)
+        service.value_client.pipeline.assert_not_called()
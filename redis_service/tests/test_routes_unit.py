@@ -21,7 +21,7 @@ class TestRoutesUnit:
              patch.object(redis_client, 'cache_delete') as mock_delete, \
              patch.object(redis_client, 'cache_delete_pattern') as mock_delete_pattern, \
              patch.object(redis_client, 'cache_exists') as mock_exists, \
-             patch.object(redis_client, 'cache_keys') as mock_keys, \
+             patch.object(redis_client, 'cache_scan') as mock_keys, \
              patch.object(redis_client, 'cache_flush') as mock_flush, \
              patch.object(redis_client, 'queue_publish') as mock_publish, \
              patch.object(redis_client, 'queue_channels') as mock_channels, \